@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização do CLI
+
+Executa ``aws-agent --version`` várias vezes em processos novos e compara a
+mediana do tempo de inicialização com o orçamento definido. Também verifica
+que o boto3/botocore e o rich não são importados só para exibir a versão.
+
+Uso:
+    python scripts/maintenance/bench_startup.py [--runs 20] [--budget-ms 150]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# Módulos pesados que não devem ser carregados por --version
+FORBIDDEN_MODULES = ("boto3", "botocore", "rich", "aws_agent.core.agent")
+
+CHECK_IMPORTS = (
+    "import sys, aws_agent.cli.main; "
+    "print(','.join(sorted({m.split('.')[0] if not m.startswith('aws_agent') else m "
+    f"for m in sys.modules if m.startswith({FORBIDDEN_MODULES!r})}})))"
+)
+
+# Equivalente ao entry point 'aws-agent --version'
+RUN_VERSION = (
+    "import sys; sys.argv = ['aws-agent', '--version']; "
+    "from aws_agent.cli.main import main; main()"
+)
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure(runs: int) -> list:
+    """Mede o tempo (ms) de cada execução de 'aws-agent --version'"""
+    command = [sys.executable, "-c", RUN_VERSION]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=_env(), check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20, help="Número de execuções")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="Orçamento para a mediana em milissegundos")
+    args = parser.parse_args()
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", CHECK_IMPORTS], env=_env(), check=True,
+        capture_output=True, text=True
+    ).stdout.strip()
+
+    # Baseline: interpretador vazio, para separar o custo do Python do nosso
+    baseline = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        baseline.append((time.perf_counter() - start) * 1000)
+
+    timings = measure(args.runs)
+    median = statistics.median(timings)
+
+    print(f"python -c pass:         mediana {statistics.median(baseline):7.1f} ms")
+    print(f"aws-agent --version:    mediana {median:7.1f} ms "
+          f"(min {min(timings):.1f} / max {max(timings):.1f}, {args.runs} execuções)")
+    print(f"orçamento:              {args.budget_ms:7.1f} ms")
+
+    if loaded:
+        print(f"❌ Módulos pesados carregados na inicialização: {loaded}")
+        return 1
+
+    if median > args.budget_ms:
+        print("❌ Orçamento de inicialização excedido")
+        return 1
+
+    print("✅ Inicialização dentro do orçamento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
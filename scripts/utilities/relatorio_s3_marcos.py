@@ -13,6 +13,9 @@ from rich.panel import Panel
 
 console = Console()
 
+# Objetos exibidos por bucket no detalhamento
+DETAIL_LIMIT = 20
+
 def generate_s3_report():
     """Gera relatório completo dos recursos S3"""
     
@@ -48,6 +51,8 @@ def generate_s3_report():
                 bucket_table.add_column("Tamanho Total", style="blue", width=12)
                 
                 buckets = s3_service.list_buckets()
+                # Métricas diárias do CloudWatch para todos os buckets (listagem apenas sem métricas)
+                statistics = s3_service.get_bucket_statistics([bucket['name'] for bucket in buckets])
                 total_objects = 0
                 total_size = 0
                 
@@ -58,9 +63,8 @@ def generate_s3_report():
                     
                     # Estatísticas do bucket
                     try:
-                        objects = s3_service.list_objects(bucket_name)
-                        obj_count = len(objects)
-                        bucket_size = sum(obj['size'] for obj in objects)
+                        obj_count = statistics[bucket_name]['objects']
+                        bucket_size = statistics[bucket_name]['size']
                         
                         total_objects += obj_count
                         total_size += bucket_size
@@ -116,9 +120,12 @@ def generate_s3_report():
                     
                     for bucket in buckets:
                         bucket_name = bucket['name']
+                        bucket_objects = statistics.get(bucket_name, {}).get('objects')
                         
                         try:
-                            objects = s3_service.list_objects(bucket_name)
+                            # Apenas uma amostra: buckets sem objetos não são listados
+                            objects = s3_service.list_objects(bucket_name, max_keys=DETAIL_LIMIT) \
+                                if bucket_objects != 0 else []
                             
                             if objects:
                                 console.print(f"\n🗂️  [bold cyan]{bucket_name}[/bold cyan]:")
@@ -155,6 +162,8 @@ def generate_s3_report():
                                     )
                                 
                                 console.print(obj_table)
+                                if bucket_objects and bucket_objects > len(objects):
+                                    console.print(f"[dim]... e mais {bucket_objects - len(objects)} objetos[/dim]")
                             else:
                                 console.print(f"\n📭 [dim]{bucket_name}: Bucket vazio[/dim]")
                                 
@@ -54,6 +54,8 @@ setup(
             "pandas>=2.0.0",
             "matplotlib>=3.7.0",
             "seaborn>=0.12.0",
+            "numpy>=1.22.0",
+            "pyarrow>=12.0.0",
         ],
     },
     entry_points={
@@ -9,9 +9,20 @@ __author__ = "AWS Multi-Account Agent Team"
 __email__ = "team@aws-agent.com"
 __description__ = "Agente AWS para gerenciamento de múltiplas contas com credenciais seguras"
 
-from aws_agent.core.agent import AWSAgent
-from aws_agent.core.account_manager import AccountManager
-from aws_agent.core.config import Config
+# Importados sob demanda para que o CLI (ex: --help, --version) não carregue
+# boto3 e pydantic antes de precisar deles
+_LAZY_IMPORTS = {
+    "AWSAgent": "aws_agent.core.agent",
+    "AccountManager": "aws_agent.core.account_manager",
+    "Config": "aws_agent.core.config",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     "AWSAgent",
@@ -5,37 +5,59 @@ Este módulo implementa a interface de linha de comando usando Click,
 permitindo interação intuitiva com o agente AWS.
 """
 
-import click
 import sys
-from typing import Optional, List, Dict, Any
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt, Confirm
-from rich.panel import Panel
-from rich.text import Text
-from rich import print as rprint
-from pathlib import Path
-
-from ..core.agent import AWSAgent
-from ..core.account_manager import AWSCredentials
-from ..core.config import get_config
+from typing import TYPE_CHECKING
+
+import click
+
+if TYPE_CHECKING:
+    from ..core.agent import AWSAgent
+
+
+class _LazyConsole:
+    """Console rich criado apenas no primeiro uso (rich é caro de importar)"""
+    
+    def __init__(self):
+        self._console = None
+    
+    def __getattr__(self, name):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return getattr(self._console, name)
 
-# Console para output formatado
-console = Console()
-from rich.console import Console
-from rich.table import Table
-from rich.prompt import Prompt, Confirm
-from rich.text import Text
-from rich.panel import Panel
-from rich import print as rprint
-import json
 
-from ..core.agent import AWSAgent
-from ..core.account_manager import AWSCredentials
-from ..core.config import get_config
+# Console para output formatado
+console = _LazyConsole()
 
 
-console = Console()
+def get_agent(ctx: click.Context, remote: bool = False) -> 'AWSAgent':
+    """
+    Obtém o agente do contexto, criando-o no primeiro uso
+    
+    O agente configura logging, lê a configuração e descriptografa as
+    credenciais, então só é criado pelos comandos que precisam dele.
+    
+    Args:
+        ctx: Contexto do Click
+        remote: Se True, usa o daemon residente quando ele estiver ativo
+        
+    Returns:
+        Instância do AWSAgent (ou proxy do daemon)
+    """
+    obj = ctx.find_root().ensure_object(dict)
+    
+    if remote and not obj.get('no_daemon'):
+        if 'remote_agent' not in obj:
+            from ..core.daemon import get_remote_agent
+            obj['remote_agent'] = get_remote_agent()
+        if obj['remote_agent'] is not None:
+            return obj['remote_agent']
+    
+    if obj.get('agent') is None:
+        from ..core.agent import AWSAgent
+        obj['agent'] = AWSAgent()
+    return obj['agent']
 
 
 def print_logo():
@@ -69,22 +91,27 @@ def print_warning(message: str):
 
 @click.group()
 @click.version_option(version="1.0.0")
+@click.option('--no-daemon', is_flag=True, envvar='AWS_AGENT_NO_DAEMON',
+              help='Não usa o daemon residente mesmo que esteja ativo')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, no_daemon):
     """
     AWS Multi-Account Agent - Gerenciador de múltiplas contas AWS
     
     Um agente completo para gerenciar credenciais AWS de forma segura
     e executar operações em múltiplas contas.
     """
+    # O agente é criado sob demanda por get_agent()
     ctx.ensure_object(dict)
-    ctx.obj['agent'] = AWSAgent()
+    ctx.obj['no_daemon'] = no_daemon
 
 @cli.command()
 @click.pass_context
 def status(ctx):
     """Mostra o status atual do agente"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.table import Table
+    
+    agent = get_agent(ctx, remote=True)
     
     try:
         status_info = agent.get_status()
@@ -112,7 +139,9 @@ def status(ctx):
 @click.pass_context
 def add_account(ctx):
     """Adiciona uma nova conta AWS"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt, Confirm
+    
+    agent = get_agent(ctx)
     
     try:
         console.print("[bold blue]Adicionando Nova Conta AWS[/bold blue]")
@@ -193,7 +222,9 @@ def add_account(ctx):
 @click.pass_context
 def list_accounts(ctx):
     """Lista todas as contas configuradas"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.table import Table
+    
+    agent = get_agent(ctx, remote=True)
     
     try:
         accounts = agent.list_accounts()
@@ -251,7 +282,9 @@ def list_accounts(ctx):
 @click.pass_context
 def remove_account(ctx, account_name):
     """Remove uma conta AWS"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Confirm
+    
+    agent = get_agent(ctx)
     
     try:
         # Verifica se conta existe
@@ -282,12 +315,14 @@ def remove_account(ctx, account_name):
 @click.pass_context
 def connect(ctx, account_name):
     """Conecta a uma conta AWS"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx, remote=True)
     
     try:
         # Se não especificou conta, mostra menu
         if not account_name:
-            accounts = agent.account_manager.list_accounts()
+            accounts = [account['account_name'] for account in agent.list_accounts()]
             
             if not accounts:
                 console.print("[yellow]Nenhuma conta configurada[/yellow]")
@@ -343,7 +378,7 @@ def connect(ctx, account_name):
 @click.pass_context
 def disconnect(ctx):
     """Desconecta da conta atual"""
-    agent: AWSAgent = ctx.obj['agent']
+    agent = get_agent(ctx, remote=True)
     
     try:
         if not agent.current_account:
@@ -364,7 +399,7 @@ def disconnect(ctx):
 @click.pass_context
 def services(ctx):
     """Lista serviços AWS disponíveis"""
-    agent: AWSAgent = ctx.obj['agent']
+    agent = get_agent(ctx, remote=True)
     
     try:
         services = agent.get_available_services()
@@ -390,7 +425,7 @@ def services(ctx):
 @click.pass_context
 def backup(ctx, path):
     """Cria backup da configuração"""
-    agent: AWSAgent = ctx.obj['agent']
+    agent = get_agent(ctx)
     
     try:
         console.print("[yellow]Criando backup da configuração...[/yellow]")
@@ -412,7 +447,7 @@ def backup(ctx, path):
 @click.pass_context
 def cleanup(ctx):
     """Remove credenciais expiradas"""
-    agent: AWSAgent = ctx.obj['agent']
+    agent = get_agent(ctx, remote=True)
     
     try:
         console.print("[yellow]Removendo credenciais expiradas...[/yellow]")
@@ -435,7 +470,10 @@ def cleanup(ctx):
 @click.pass_context
 def interactive(ctx):
     """Modo interativo do AWS Agent"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    from rich.panel import Panel
+    
+    agent = get_agent(ctx)
     
     try:
         console.print(Panel.fit(
@@ -494,7 +532,7 @@ def interactive(ctx):
 @click.pass_context
 def add_account(ctx, name, access_key_id, secret_access_key, region):
     """Adiciona uma nova conta AWS"""
-    agent: AWSAgent = ctx.obj['agent']
+    agent = get_agent(ctx)
     
     console.print(f"\n➕ Adicionando conta '{name}'...", style="bold")
     
@@ -514,7 +552,10 @@ def add_account(ctx, name, access_key_id, secret_access_key, region):
 @click.pass_context
 def start(ctx):
     """Inicia o agente AWS com seleção interativa de conta"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt, Confirm
+    from rich.table import Table
+    
+    agent = get_agent(ctx)
     
     print_logo()
     console.print("Iniciando AWS Multi-Account Agent...\n", style="bold")
@@ -582,7 +623,9 @@ def start(ctx):
 @click.pass_context
 def list_accounts(ctx):
     """Lista todas as contas AWS configuradas"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.table import Table
+    
+    agent = get_agent(ctx, remote=True)
     
     accounts = agent.list_accounts()
     
@@ -612,7 +655,9 @@ def list_accounts(ctx):
 
 def show_main_menu(ctx):
     """Exibe o menu principal do agente"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx)
     
     while True:
         console.print("\n" + "="*60, style="bold")
@@ -673,6 +718,9 @@ def show_main_menu(ctx):
 
 def show_config_menu(ctx):
     """Exibe menu de configurações"""
+    from rich.table import Table
+    from ..core.config import get_config
+    
     config = get_config()
     
     console.print("\n⚙️  CONFIGURAÇÕES", style="bold blue")
@@ -698,7 +746,9 @@ def show_config_menu(ctx):
 @click.pass_context
 def ec2(ctx):
     """Operações EC2"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx)
     
     if not agent.current_account:
         print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
@@ -753,14 +803,19 @@ def ec2(ctx):
 @click.pass_context
 def s3(ctx):
     """Operações S3"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx)
     
     if not agent.current_account:
         print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
         return
     
-    from ..services.s3 import S3Service
-    s3_service = S3Service(agent.current_session, agent.get_current_region())
+    if 's3' not in agent.services:
+        print_error("Serviço S3 não disponível")
+        return
+    
+    s3_service = agent.services['s3']
     
     while True:
         console.print("\n" + "="*50, style="bold")
@@ -808,14 +863,19 @@ def s3(ctx):
 @click.pass_context
 def iam(ctx):
     """Operações IAM"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx)
     
     if not agent.current_account:
         print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
         return
     
-    from ..services.iam import IAMService
-    iam_service = IAMService(agent.current_session, agent.get_current_region())
+    if 'iam' not in agent.services:
+        print_error("Serviço IAM não disponível")
+        return
+    
+    iam_service = agent.services['iam']
     
     while True:
         console.print("\n" + "="*50, style="bold")
@@ -863,14 +923,19 @@ def iam(ctx):
 @click.pass_context
 def lambda_cmd(ctx):
     """Operações Lambda"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.prompt import Prompt
+    
+    agent = get_agent(ctx)
     
     if not agent.current_account:
         print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
         return
     
-    from ..services.lambda_service import LambdaService
-    lambda_service = LambdaService(agent.current_session, agent.get_current_region())
+    if 'lambda' not in agent.services:
+        print_error("Serviço Lambda não disponível")
+        return
+    
+    lambda_service = agent.services['lambda']
     
     while True:
         console.print("\n" + "="*50, style="bold")
@@ -915,7 +980,9 @@ def lambda_cmd(ctx):
 @click.pass_context
 def account_info(ctx):
     """Informações da conta atual"""
-    agent: AWSAgent = ctx.obj['agent']
+    from rich.table import Table
+    
+    agent = get_agent(ctx, remote=True)
     
     if not agent.current_account:
         print_error("Nenhuma conta conectada")
@@ -943,15 +1010,481 @@ def account_info(ctx):
     console.print(table)
 
 
+@cli.command()
+@click.option('--region', '-r', 'regions', multiple=True, help='Região a sincronizar (repetível)')
+@click.option('--full', is_flag=True, help='Força a re-listagem completa')
+@click.pass_context
+def sync(ctx, regions, full):
+    """Sincroniza o inventário local via CloudTrail"""
+    from rich.table import Table
+    
+    agent = get_agent(ctx, remote=True)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada")
+        return
+    
+    results = agent.sync_inventory(list(regions) or None, full=full)
+    
+    table = Table(title="Sincronização do Inventário")
+    table.add_column("Região", style="cyan")
+    table.add_column("Modo", style="magenta")
+    table.add_column("Eventos", justify="right")
+    table.add_column("Atualizados", justify="right")
+    table.add_column("Re-listados", justify="right")
+    
+    for result in results:
+        if 'error' in result:
+            table.add_row(result['region'], "[red]erro[/red]", "-", "-", result['error'])
+            continue
+        table.add_row(result['region'], result['mode'], str(result['events']),
+                      str(result['patched']), str(result['relisted']))
+    
+    console.print(table)
+
+
+@cli.command()
+@click.argument('local_dir')
+@click.argument('bucket')
+@click.option('--prefix', '-p', default='', help='Prefixo S3 correspondente ao diretório')
+@click.option('--download', is_flag=True, help='Sincroniza do S3 para o diretório local')
+@click.option('--delete', is_flag=True, help='Remove do destino o que não existe na origem')
+@click.option('--dry-run', is_flag=True, help='Apenas mostra o que seria feito')
+@click.option('--exclude', '-x', multiple=True, help='Padrão de arquivos a ignorar (repetível)')
+@click.pass_context
+def s3_sync(ctx, local_dir, bucket, prefix, download, delete, dry_run, exclude):
+    """Sincroniza um diretório local com um bucket S3"""
+    from rich.table import Table
+    from ..utils.helpers import format_size
+    
+    agent = get_agent(ctx)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    s3_service = agent.services['s3']
+    with console.status("Comparando arquivos..."):
+        result = s3_service.sync(local_dir, bucket, prefix,
+                                 direction='download' if download else 'upload',
+                                 delete=delete, dry_run=dry_run, exclude=list(exclude))
+    
+    if result is None:
+        print_error("Falha na sincronização")
+        return
+    
+    if result['plan']:
+        table = Table(title="Plano de Sincronização" if dry_run else "Sincronização S3")
+        table.add_column("Ação", style="cyan")
+        table.add_column("Chave", style="green")
+        table.add_column("Tamanho", justify="right")
+        table.add_column("Motivo", style="magenta")
+        
+        for action in result['plan']:
+            table.add_row(action['action'], action['key'], format_size(action['size']), action['reason'])
+        console.print(table)
+    
+    print_info(f"{len(result['plan'])} ações, {result['unchanged']} arquivos inalterados")
+    if not dry_run:
+        for failure in result['failed']:
+            print_error(f"{failure['key']}: {failure['error']}")
+        print_success(f"{result['transferred']} transferidos, {result['deleted']} removidos")
+
+
+@cli.command()
+@click.option('--bucket', '-b', 'buckets', multiple=True, help='Bucket a consultar (repetível; padrão: todos)')
+@click.option('--older-than', type=float, default=24, show_default=True,
+              help='Apenas uploads iniciados há mais de N horas')
+@click.option('--abort', is_flag=True, help='Aborta os uploads listados')
+@click.option('--yes', '-y', is_flag=True, help='Não pede confirmação para abortar')
+@click.pass_context
+def s3_uploads(ctx, buckets, older_than, abort, yes):
+    """Lista (e aborta) multipart uploads S3 incompletos"""
+    from rich.table import Table
+    
+    agent = get_agent(ctx)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    s3_service = agent.services['s3']
+    with console.status("Consultando multipart uploads..."):
+        uploads = s3_service.list_multipart_uploads(list(buckets) or None, older_than=older_than)
+    
+    if not uploads:
+        print_info(f"Nenhum multipart upload incompleto há mais de {older_than:g}h")
+        return
+    
+    table = Table(title="Multipart Uploads Incompletos")
+    table.add_column("Bucket", style="cyan")
+    table.add_column("Chave", style="green")
+    table.add_column("Iniciado em", style="yellow")
+    table.add_column("Retomável", justify="center")
+    
+    for upload in uploads:
+        table.add_row(upload['bucket'], upload['key'],
+                      upload['initiated'].strftime('%Y-%m-%d %H:%M'),
+                      "✓" if upload['in_journal'] else "")
+    console.print(table)
+    
+    if not abort:
+        return
+    if not yes and not click.confirm(f"Abortar {len(uploads)} uploads?"):
+        return
+    
+    result = s3_service.abort_multipart_uploads(uploads)
+    for failure in result['failed']:
+        print_error(f"{failure['upload_id']}: {failure['error']}")
+    print_success(f"{result['aborted']} uploads abortados")
+
+
+@cli.command()
+@click.argument('bucket')
+@click.argument('manifest')
+@click.option('--depth', type=int, default=1, show_default=True, help='Profundidade dos prefixos')
+@click.option('--processes', type=int, default=None, help='Processos de agregação (padrão: CPUs)')
+@click.option('--top', type=int, default=20, show_default=True, help='Prefixos exibidos')
+@click.pass_context
+def s3_inventory(ctx, bucket, manifest, depth, processes, top):
+    """Analisa uma entrega do S3 Inventory (manifest.json ou pasta da configuração)"""
+    from rich.table import Table
+    from ..utils.helpers import format_size
+    
+    agent = get_agent(ctx)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    s3_service = agent.services['s3']
+    with console.status("Processando inventário...") as status:
+        result = s3_service.analyze_inventory(
+            bucket, manifest, prefix_depth=depth, processes=processes,
+            progress=lambda p: status.update(
+                f"Processando inventário... {p['files']}/{p['total_files']} arquivos, "
+                f"{p.get('objects', 0)} objetos")
+        )
+    
+    if result is None:
+        print_error("Falha ao ler o inventário")
+        return
+    
+    titles = {'prefixes': 'Prefixo', 'storage_classes': 'Classe de Armazenamento',
+              'ages': 'Idade', 'encryption': 'Criptografia'}
+    for dimension, title in titles.items():
+        table = Table(title=f"{result['source_bucket']} por {title.lower()}")
+        table.add_column(title, style="cyan")
+        table.add_column("Objetos", justify="right")
+        table.add_column("Tamanho", justify="right", style="green")
+        
+        items = list(result[dimension].items())
+        for value, totals in items[:top] if dimension == 'prefixes' else items:
+            table.add_row(value or '(raiz)', str(totals['objects']), format_size(totals['size']))
+        console.print(table)
+    
+    for failure in result['failed']:
+        print_error(f"{failure['key']}: {failure['error']}")
+    print_success(f"{result['objects']} objetos, {format_size(result['size'])} "
+                  f"(inventário de {result['created_at']:%Y-%m-%d})")
+
+
+@cli.command()
+@click.argument('bucket')
+@click.option('--prefix', '-p', default='', help='Considera apenas as chaves com este prefixo')
+@click.option('--depth', '-d', type=int, default=3, show_default=True, help='Níveis de prefixo')
+@click.option('--min-size', type=int, default=0, help='Omite prefixos menores que N bytes')
+@click.option('--inventory-bucket', default=None, help='Bucket de destino do S3 Inventory')
+@click.option('--inventory', 'inventory_manifest', default=None,
+              help='manifest.json ou pasta da configuração do S3 Inventory')
+@click.option('--save', 'save_path', type=click.Path(dir_okay=False), help='Grava a árvore em JSON')
+@click.option('--compare', 'compare_path', type=click.Path(exists=True, dir_okay=False),
+              help='Compara com uma árvore gravada anteriormente')
+@click.pass_context
+def s3_du(ctx, bucket, prefix, depth, min_size, inventory_bucket, inventory_manifest,
+          save_path, compare_path):
+    """Mostra o uso de armazenamento por prefixo de um bucket (como o du)"""
+    from rich.table import Table
+    from ..services.s3_usage import PrefixTree
+    from ..utils.helpers import format_size
+    
+    agent = get_agent(ctx)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    s3_service = agent.services['s3']
+    with console.status("Somando objetos...") as status:
+        tree = s3_service.prefix_usage(
+            bucket, depth=depth, prefix=prefix, inventory_bucket=inventory_bucket,
+            inventory_manifest=inventory_manifest,
+            progress=lambda p: status.update(f"Somando objetos... {p.get('objects', 0)} objetos")
+        )
+    
+    if tree is None:
+        print_error("Falha ao calcular o uso do bucket")
+        return
+    
+    for line in tree.du_lines(min_size=min_size):
+        console.print(line, markup=False, highlight=False)
+    
+    if compare_path:
+        changes = tree.diff(PrefixTree.load(compare_path))
+        table = Table(title=f"Variação desde {compare_path}")
+        table.add_column("Prefixo", style="cyan")
+        table.add_column("Tamanho", justify="right")
+        table.add_column("Variação", justify="right", style="magenta")
+        table.add_column("Objetos", justify="right")
+        
+        for change in changes:
+            sign = '-' if change['size_delta'] < 0 else '+'
+            table.add_row(change['prefix'] or '(raiz)', format_size(change['size']),
+                          f"{sign}{format_size(abs(change['size_delta']))}",
+                          f"{change['objects_delta']:+d}")
+        console.print(table)
+    
+    if save_path:
+        tree.save(save_path)
+        print_success(f"Árvore gravada em {save_path}")
+
+
+@cli.command('s3-lifecycle-sim')
+@click.argument('bucket')
+@click.argument('rules_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--months', type=int, default=12, show_default=True, help='Meses projetados')
+@click.option('--reads', type=float, default=0.0, show_default=True,
+              help='Fração dos bytes lida por mês')
+@click.option('--prices', 'prices_file', type=click.Path(exists=True, dir_okay=False),
+              help='JSON classe -> preços que substituem a tabela padrão')
+@click.option('--current', is_flag=True, help='Inclui as regras atuais do bucket')
+@click.option('--depth', '-d', type=int, default=1, show_default=True,
+              help='Níveis de prefixo usados pelos filtros das regras')
+@click.option('--inventory-bucket', default=None, help='Bucket de destino do S3 Inventory')
+@click.option('--inventory', 'inventory_manifest', default=None,
+              help='manifest.json ou pasta da configuração do S3 Inventory')
+@click.pass_context
+def s3_lifecycle_sim(ctx, bucket, rules_file, months, reads, prices_file, current, depth,
+                     inventory_bucket, inventory_manifest):
+    """Compara o custo de variantes de regras de ciclo de vida de um bucket
+    
+    RULES_FILE é um JSON com nome da variante -> lista de regras no formato da
+    API (ou uma lista de regras, tratada como uma única variante).
+    """
+    import json
+    from pathlib import Path
+    from rich.table import Table
+    from ..services.s3_lifecycle import DEFAULT_PRICES, StoragePrice, comparison_rows
+    
+    agent = get_agent(ctx)
+    
+    if not agent.current_account:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    with open(rules_file, encoding='utf-8') as f:
+        variants = json.load(f)
+    if isinstance(variants, list):
+        variants = {Path(rules_file).stem: variants}
+    
+    prices = None
+    if prices_file:
+        with open(prices_file, encoding='utf-8') as f:
+            prices = {
+                name: (DEFAULT_PRICES[name]._replace(**fields) if name in DEFAULT_PRICES
+                       else StoragePrice(**fields))
+                for name, fields in json.load(f).items()
+            }
+    
+    s3_service = agent.services['s3']
+    with console.status("Carregando objetos...") as status:
+        result = s3_service.simulate_lifecycle(
+            bucket, variants, months=months, monthly_reads=reads, prices=prices,
+            include_current=current, prefix_depth=depth, inventory_bucket=inventory_bucket,
+            inventory_manifest=inventory_manifest,
+            progress=lambda p: status.update(f"Carregando objetos... {p.get('objects', 0)} objetos")
+        )
+    
+    if result is None:
+        print_error("Falha ao simular as regras de ciclo de vida")
+        return
+    
+    table = Table(title=f"Custo projetado de {bucket} em {months} meses")
+    table.add_column("Variante", style="cyan")
+    table.add_column("Armazenamento", justify="right")
+    table.add_column("Transições", justify="right")
+    table.add_column("Leitura", justify="right")
+    table.add_column("Total", justify="right", style="green")
+    table.add_column("Economia", justify="right", style="magenta")
+    
+    for row in comparison_rows(result):
+        table.add_row(*row)
+    console.print(table)
+
+
+@cli.command('s3-dedup')
+@click.argument('buckets', nargs=-1)
+@click.option('--account', '-a', 'accounts', multiple=True,
+              help='Conta cadastrada cujos buckets são todos analisados (repetível)')
+@click.option('--min-size', type=int, default=1, show_default=True,
+              help='Ignora objetos menores que N bytes')
+@click.option('--confirm', is_flag=True,
+              help='Confirma ETags multipart pelo checksum do objeto inteiro (HEAD)')
+@click.option('--top', type=int, default=20, show_default=True, help='Grupos exibidos')
+@click.option('--workdir', type=click.Path(exists=True, file_okay=False),
+              help='Diretório do índice temporário em disco')
+@click.pass_context
+def s3_dedup(ctx, buckets, accounts, min_size, confirm, top, workdir):
+    """Procura objetos duplicados (mesmo tamanho e ETag) entre buckets e contas
+    
+    BUCKETS são buckets da conta atual ou 'conta:bucket'. Sem BUCKETS nem
+    --account, analisa todos os buckets da conta atual.
+    """
+    from rich.table import Table
+    from ..services.s3_dedup import summarize_duplicates
+    from ..utils.helpers import format_size
+    
+    agent = get_agent(ctx)
+    
+    targets = {account: None for account in accounts}
+    for bucket in buckets:
+        account, _, name = bucket.rpartition(':')
+        account = account or agent.current_account
+        if targets.get(account, []) is not None:
+            targets.setdefault(account, []).append(name)
+    if not buckets and not accounts:
+        targets[agent.current_account] = None
+    
+    if None in targets:
+        print_error("Nenhuma conta conectada. Use 'connect' primeiro.")
+        return
+    
+    try:
+        with console.status("Indexando objetos...") as status:
+            groups = agent.find_duplicates_across_accounts(
+                targets, min_size=min_size, confirm=confirm, workdir=workdir,
+                progress=lambda p: status.update(
+                    f"Indexando objetos... {p['bucket']}: {p['objects']} objetos")
+            )
+            summary = summarize_duplicates(groups, top)
+    except ValueError as e:
+        print_error(str(e))
+        return
+    
+    table = Table(title="Maiores grupos de duplicatas")
+    table.add_column("Tamanho", justify="right")
+    table.add_column("Cópias", justify="right")
+    table.add_column("Recuperável", justify="right", style="green")
+    table.add_column("Confirmado", justify="center")
+    table.add_column("Objetos", style="cyan")
+    
+    for group in summary['top']:
+        locations = [f"{obj['account']}:{obj['bucket']}/{obj['key']}" for obj in group['objects']]
+        if len(locations) > 3:
+            locations = locations[:3] + [f"... e mais {len(locations) - 3}"]
+        table.add_row(format_size(group['size']), str(len(group['objects'])),
+                      format_size(group['reclaimable']), "sim" if group['verified'] else "não",
+                      "\n".join(locations))
+    console.print(table)
+    
+    print_success(f"{summary['groups']} grupos, {summary['duplicates']} cópias excedentes, "
+                  f"{format_size(summary['reclaimable'])} recuperáveis "
+                  f"({format_size(summary['verified_reclaimable'])} confirmados)")
+
+
+# ==============================================================================
+# DAEMON RESIDENTE
+# ==============================================================================
+
+@cli.group()
+def daemon():
+    """Gerencia o daemon residente do agente"""
+
+
+@daemon.command('start')
+@click.option('--foreground', is_flag=True, help='Executa em primeiro plano')
+def daemon_start(foreground):
+    """Inicia o daemon residente"""
+    import subprocess
+    import time
+    from ..core.daemon import AgentDaemon, DaemonClient
+    
+    client = DaemonClient()
+    if client.is_running():
+        print_info(f"Daemon já está em execução em {client.socket_path}")
+        return
+    
+    if foreground:
+        print_info(f"Daemon escutando em {client.socket_path}")
+        AgentDaemon(socket_path=client.socket_path).start()
+        return
+    
+    subprocess.Popen(
+        [sys.executable, '-m', 'aws_agent.core.daemon'],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True
+    )
+    
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if client.is_running():
+            print_success(f"Daemon iniciado em {client.socket_path}")
+            return
+        time.sleep(0.1)
+    
+    print_error("Daemon não respondeu a tempo")
+    sys.exit(1)
+
+
+@daemon.command('stop')
+def daemon_stop():
+    """Para o daemon residente"""
+    import time
+    from ..core.daemon import DaemonClient
+    
+    client = DaemonClient(timeout=10)
+    if not client.is_running():
+        print_info("Daemon não está em execução")
+        return
+    
+    client.call('shutdown')
+    
+    deadline = time.monotonic() + 10
+    while client.socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    
+    print_success("Daemon finalizado")
+
+
+@daemon.command('status')
+def daemon_status():
+    """Mostra o status do daemon residente"""
+    from ..core.daemon import DaemonClient, DaemonError
+    
+    client = DaemonClient(timeout=10)
+    try:
+        info = client.call('ping')
+    except (OSError, DaemonError):
+        print_info("Daemon não está em execução")
+        sys.exit(1)
+    
+    console.print(f"🟢 Daemon ativo (PID {info.get('pid')}) em {client.socket_path}", style="bold green")
+    console.print(f"Conta atual: {info.get('current_account') or 'Nenhuma'}")
+
+
 # ==============================================================================
 # FUNÇÕES AUXILIARES DOS SERVIÇOS
 # ==============================================================================
 
 def show_instances(ec2_service):
     """Lista instâncias EC2"""
+    from rich.table import Table
+    
     console.print("\n📋 Listando instâncias EC2...", style="bold")
     try:
-        instances = ec2_service.list_instances()
+        instances = ec2_service.list_cached('instances')
         if not instances:
             print_info("Nenhuma instância encontrada")
             return
@@ -1000,9 +1533,11 @@ def show_key_pairs(ec2_service):
 
 def show_s3_buckets(s3_service):
     """Lista buckets S3"""
+    from rich.table import Table
+    
     console.print("\n🪣 Listando buckets S3...", style="bold")
     try:
-        buckets = s3_service.list_buckets()
+        buckets = s3_service.list_cached('buckets')
         if not buckets:
             print_info("Nenhum bucket encontrado")
             return
@@ -1051,6 +1586,8 @@ def show_s3_bucket_info(s3_service):
 
 def show_iam_current_user(iam_service):
     """Mostra informações do usuário atual"""
+    from rich.table import Table
+    
     console.print("\n👤 Informações do usuário atual...", style="bold")
     try:
         user = iam_service.get_current_user()
@@ -1099,9 +1636,11 @@ def show_iam_account_summary(iam_service):
 
 def show_lambda_functions(lambda_service):
     """Lista funções Lambda"""
+    from rich.table import Table
+    
     console.print("\n⚡ Listando funções Lambda...", style="bold")
     try:
-        functions = lambda_service.list_functions()
+        functions = lambda_service.list_cached('functions')
         if not functions:
             print_info("Nenhuma função encontrada")
             return
@@ -2,8 +2,18 @@
 Core module do AWS Agent - módulo principal
 """
 
-from .agent import AWSAgent
-from .account_manager import AccountManager
-from .config import Config
+# Importados sob demanda (ver aws_agent.__init__)
+_LAZY_IMPORTS = {
+    "AWSAgent": ".agent",
+    "AccountManager": ".account_manager",
+    "Config": ".config",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        import importlib
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = ["AWSAgent", "AccountManager", "Config"]
@@ -12,11 +12,12 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from cryptography.fernet import Fernet
 from datetime import datetime, timedelta
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from pydantic import BaseModel, Field, validator
 
 from .config import get_config
+from .session_pool import get_session_pool, credentials_fingerprint
+from .identity_cache import get_identity_cache
 
 
 @dataclass
@@ -246,8 +247,15 @@ class AccountManager:
         """
         try:
             if account_name in self._accounts:
-                del self._accounts[account_name]
+                credentials = self._accounts.pop(account_name)
                 self._save_accounts()
+                
+                # Descarta sessões, clientes e identidade da conta removida
+                account_key = credentials_fingerprint(
+                    credentials.access_key_id, credentials.secret_access_key, credentials.session_token
+                )
+                get_session_pool().invalidate(account_key)
+                get_identity_cache().invalidate(account_key)
                 return True
             else:
                 print(f"Conta não encontrada: {account_name}")
@@ -306,29 +314,22 @@ class AccountManager:
             'has_role': credentials.role_arn is not None,
         }
     
-    def validate_credentials(self, credentials: AWSCredentials) -> bool:
+    def validate_credentials(self, credentials: AWSCredentials,
+                             force_refresh: bool = False) -> bool:
         """
         Valida credenciais AWS
         
         Args:
             credentials: Credenciais para validar
+            force_refresh: Se True, ignora a identidade em cache e consulta o STS
             
         Returns:
             True se válidas
         """
         try:
-            # Cria cliente STS para validar credenciais
-            session = boto3.Session(
-                aws_access_key_id=credentials.access_key_id,
-                aws_secret_access_key=credentials.secret_access_key,
-                aws_session_token=credentials.session_token,
-                region_name=credentials.region
-            )
-            
-            sts_client = session.client('sts')
-            
-            # Tenta obter identidade
-            response = sts_client.get_caller_identity()
+            # Obtém identidade (do cache, se ainda válida)
+            session = get_session_pool().get_session(credentials)
+            response = get_identity_cache().get_caller_identity(session, force_refresh)
             
             # Atualiza informações da conta
             credentials.account_id = response.get('Account')
@@ -353,15 +354,8 @@ class AccountManager:
             Informações da conta ou None em caso de erro
         """
         try:
-            session = boto3.Session(
-                aws_access_key_id=credentials.access_key_id,
-                aws_secret_access_key=credentials.secret_access_key,
-                aws_session_token=credentials.session_token,
-                region_name=credentials.region
-            )
-            
-            sts_client = session.client('sts')
-            response = sts_client.get_caller_identity()
+            session = get_session_pool().get_session(credentials)
+            response = get_identity_cache().get_caller_identity(session)
             
             return {
                 'account_id': response.get('Account'),
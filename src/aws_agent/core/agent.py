@@ -6,18 +6,18 @@ todas as operações e serviços disponíveis.
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Type
+from typing import Callable, Dict, List, Optional, Any, Type, Iterator
 from datetime import datetime
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 
 from .config import get_config
 from .account_manager import AccountManager, AWSCredentials
+from .session_pool import get_session_pool
+from .identity_cache import get_identity_cache
 from ..services.base import BaseAWSService
-from ..services.ec2 import EC2Service
-from ..services.s3 import S3Service
-from ..services.iam import IAMService
-from ..services.lambda_service import LambdaService
+from ..services.registry import LazyServiceMap, get_service_registry
+from ..utils.helpers import iter_concurrent
 
 
 class AWSAgent:
@@ -39,7 +39,8 @@ class AWSAgent:
         self.account_manager = AccountManager(config_path)
         self.current_account: Optional[str] = None
         self.current_session: Optional[boto3.Session] = None
-        self.services: Dict[str, BaseAWSService] = {}
+        # Serviços são instanciados sob demanda no primeiro acesso
+        self.services: LazyServiceMap = LazyServiceMap()
         self.logger = self._setup_logging()
         
         # Registra serviços disponíveis
@@ -79,13 +80,37 @@ class AWSAgent:
         return logger
     
     def _register_services(self) -> None:
-        """Registra serviços AWS disponíveis"""
-        # Registra serviços apenas quando há uma sessão ativa
+        """Vincula os serviços registrados à sessão atual"""
+        # Os serviços (e seus clientes) só são criados no primeiro acesso
         if self.current_session:
-            self.services['ec2'] = EC2Service(self.current_session, self.get_current_region())
-            self.services['s3'] = S3Service(self.current_session, self.get_current_region())
-            self.services['iam'] = IAMService(self.current_session, self.get_current_region())
-            self.services['lambda'] = LambdaService(self.current_session, self.get_current_region())
+            self.services.bind(self.current_session, self.get_current_region())
+    
+    def _create_service(self, service_name: str, session: boto3.Session,
+                        region: str) -> BaseAWSService:
+        """
+        Instancia um serviço AWS para uma sessão
+        
+        Args:
+            service_name: Nome do serviço
+            session: Sessão boto3 autenticada
+            region: Região do serviço
+            
+        Returns:
+            Instância do serviço
+        """
+        return get_service_registry().create(service_name, session, region)
+    
+    def _create_session(self, credentials: AWSCredentials) -> boto3.Session:
+        """
+        Obtém a sessão boto3 de uma conta a partir do pool compartilhado
+        
+        Args:
+            credentials: Credenciais da conta
+            
+        Returns:
+            Sessão boto3
+        """
+        return get_session_pool().get_session(credentials)
     
     def get_current_region(self) -> str:
         """Obtém a região atual da sessão"""
@@ -192,12 +217,13 @@ class AWSAgent:
             self.logger.error(f"Erro ao listar contas: {e}")
             return []
     
-    def connect(self, account_name: str) -> bool:
+    def connect(self, account_name: str, revalidate: bool = False) -> bool:
         """
         Conecta a uma conta AWS específica
         
         Args:
             account_name: Nome da conta para conectar
+            revalidate: Se True, ignora a identidade em cache e valida no STS
             
         Returns:
             True se conectado com sucesso
@@ -214,15 +240,10 @@ class AWSAgent:
                 return False
             
             # Cria sessão boto3
-            self.current_session = boto3.Session(
-                aws_access_key_id=credentials.access_key_id,
-                aws_secret_access_key=credentials.secret_access_key,
-                aws_session_token=credentials.session_token,
-                region_name=credentials.region
-            )
+            self.current_session = self._create_session(credentials)
             
             # Valida conexão
-            if self._validate_connection():
+            if self._validate_connection(force_refresh=revalidate):
                 self.current_account = account_name
                 self.account_manager.update_last_used(account_name)
                 
@@ -249,10 +270,13 @@ class AWSAgent:
             self.current_session = None
             self.services.clear()  # Limpa serviços registrados
     
-    def _validate_connection(self) -> bool:
+    def _validate_connection(self, force_refresh: bool = False) -> bool:
         """
         Valida a conexão atual
         
+        Args:
+            force_refresh: Se True, ignora a identidade em cache e consulta o STS
+            
         Returns:
             True se conexão válida
         """
@@ -260,8 +284,7 @@ class AWSAgent:
             if self.current_session is None:
                 return False
             
-            sts_client = self.current_session.client('sts')
-            sts_client.get_caller_identity()
+            get_identity_cache().get_caller_identity(self.current_session, force_refresh)
             return True
         
         except (ClientError, NoCredentialsError):
@@ -270,10 +293,13 @@ class AWSAgent:
             self.logger.error(f"Erro na validação da conexão: {e}")
             return False
     
-    def get_current_account_info(self) -> Optional[Dict[str, Any]]:
+    def get_current_account_info(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Obtém informações da conta atual
         
+        Args:
+            force_refresh: Se True, ignora a identidade em cache e consulta o STS
+            
         Returns:
             Informações da conta atual ou None se não conectado
         """
@@ -281,8 +307,7 @@ class AWSAgent:
             return None
         
         try:
-            sts_client = self.current_session.client('sts')
-            response = sts_client.get_caller_identity()
+            response = get_identity_cache().get_caller_identity(self.current_session, force_refresh)
             
             account_info = self.account_manager.get_account_info(self.current_account)
             if account_info:
@@ -323,7 +348,7 @@ class AWSAgent:
             return None
         
         try:
-            return self.current_session.client(service_name, region_name=region)
+            return get_session_pool().get_client(self.current_session, service_name, region)
         except Exception as e:
             self.logger.error(f"Erro ao criar cliente para '{service_name}': {e}")
             return None
@@ -382,6 +407,210 @@ class AWSAgent:
             self.logger.error(f"Erro ao executar {service_name}.{operation}: {e}")
             raise
     
+    def iter_execute_across_accounts(self, service_name: str, operation: str,
+                                     accounts: Optional[List[str]] = None,
+                                     max_workers: Optional[int] = None,
+                                     **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Executa uma operação em várias contas simultaneamente
+        
+        Cada conta recebe sua própria sessão e instância do serviço, sem
+        alterar a conexão atual do agente. Os resultados são entregues à
+        medida que cada conta termina.
+        
+        Args:
+            service_name: Nome do serviço
+            operation: Nome da operação
+            accounts: Contas alvo (todas as contas se não especificado)
+            max_workers: Número máximo de contas processadas em paralelo
+            **kwargs: Argumentos da operação
+            
+        Returns:
+            Iterador com o resultado de cada conta ('account_name', 'account_id',
+            'success', 'result', 'error')
+        """
+        service_class = get_service_registry().resolve(service_name)
+        if operation.startswith('_') or not callable(getattr(service_class, operation, None)):
+            raise ValueError(f"Operação '{operation}' não encontrada no serviço '{service_name}'")
+        
+        if accounts is None:
+            accounts = self.account_manager.list_accounts()
+        
+        max_workers = max_workers or self.config.max_workers
+        self.logger.info(
+            f"Executando {service_name}.{operation} em {len(accounts)} contas "
+            f"(até {max_workers} em paralelo)"
+        )
+        
+        def run(account_name: str) -> Any:
+            return self._execute_on_account(account_name, service_name, operation, **kwargs)
+        
+        for account_name, result, error in iter_concurrent(run, accounts, max_workers):
+            credentials = self.account_manager.get_account(account_name)
+            
+            if error is not None:
+                self.logger.error(f"Erro ao executar {service_name}.{operation} em '{account_name}': {error}")
+            
+            yield {
+                'account_name': account_name,
+                'account_id': credentials.account_id if credentials else None,
+                'success': error is None,
+                'result': result,
+                'error': str(error) if error is not None else None,
+            }
+    
+    def execute_across_accounts(self, service_name: str, operation: str,
+                                accounts: Optional[List[str]] = None,
+                                max_workers: Optional[int] = None,
+                                **kwargs) -> Dict[str, Dict[str, Any]]:
+        """
+        Executa uma operação em várias contas e coleta todos os resultados
+        
+        Args:
+            service_name: Nome do serviço
+            operation: Nome da operação
+            accounts: Contas alvo (todas as contas se não especificado)
+            max_workers: Número máximo de contas processadas em paralelo
+            **kwargs: Argumentos da operação
+            
+        Returns:
+            Dicionário com o resultado de cada conta, indexado pelo nome da conta
+        """
+        return {
+            outcome['account_name']: outcome
+            for outcome in self.iter_execute_across_accounts(
+                service_name, operation, accounts=accounts,
+                max_workers=max_workers, **kwargs
+            )
+        }
+    
+    def _execute_on_account(self, account_name: str, service_name: str,
+                            operation: str, **kwargs) -> Any:
+        """
+        Executa uma operação em uma conta sem alterar a conexão atual
+        
+        Args:
+            account_name: Nome da conta
+            service_name: Nome do serviço
+            operation: Nome da operação
+            **kwargs: Argumentos da operação
+            
+        Returns:
+            Resultado da operação
+        """
+        service = self.get_account_service(account_name, service_name)
+        return getattr(service, operation)(**kwargs)
+    
+    def get_account_service(self, account_name: str, service_name: str) -> Any:
+        """
+        Cria uma instância de serviço para uma conta sem alterar a conexão atual
+        
+        Args:
+            account_name: Nome da conta
+            service_name: Nome do serviço
+            
+        Returns:
+            Instância do serviço com sessão própria da conta
+        """
+        credentials = self.account_manager.get_account(account_name)
+        if credentials is None:
+            raise ValueError(f"Conta '{account_name}' não encontrada")
+        
+        if credentials.is_expired:
+            raise ValueError(f"Credenciais da conta '{account_name}' expiraram")
+        
+        session = self._create_session(credentials)
+        return self._create_service(service_name, session, credentials.region)
+    
+    def copy_across_accounts(self, source_account: str, source_bucket: str, dest_bucket: str,
+                             source_prefix: str = "", dest_prefix: Optional[str] = None,
+                             grant: bool = False,
+                             max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Copia objetos de um bucket de outra conta para um bucket da conta atual
+        
+        A cópia é feita no próprio S3 com as credenciais da conta atual
+        (destino), de modo que os objetos copiados pertencem a ela. A conta de
+        origem é usada apenas para listar e consultar os objetos e, com
+        grant=True, para conceder à conta atual leitura do bucket de origem.
+        
+        Args:
+            source_account: Conta cadastrada dona do bucket de origem
+            source_bucket: Bucket de origem
+            dest_bucket: Bucket de destino (da conta atual)
+            source_prefix: Prefixo de origem ('' copia o bucket inteiro)
+            dest_prefix: Prefixo de destino (usa o prefixo de origem se não especificado)
+            grant: Se True, ajusta a política do bucket de origem antes de copiar
+            max_workers: Número máximo de cópias simultâneas
+            
+        Returns:
+            Contadores (copied, bytes) e lista de falhas (ver S3Service.copy_prefix)
+        """
+        if self.current_session is None:
+            raise ValueError("Nenhuma sessão ativa. Conecte-se a uma conta primeiro.")
+        
+        source_service = self.get_account_service(source_account, 's3')
+        
+        if grant:
+            credentials = self.account_manager.get_account(self.current_account)
+            if credentials is None or not credentials.account_id:
+                raise ValueError(f"ID da conta '{self.current_account}' desconhecido")
+            if not source_service.grant_cross_account_read(source_bucket, credentials.account_id,
+                                                           source_prefix):
+                raise ValueError(f"Não foi possível conceder acesso ao bucket '{source_bucket}'")
+        
+        self.logger.info(
+            f"Copiando '{source_bucket}/{source_prefix}' ({source_account}) para "
+            f"'{dest_bucket}' ({self.current_account})"
+        )
+        return self.services['s3'].copy_prefix(
+            source_bucket, source_prefix, dest_bucket, dest_prefix,
+            source_service=source_service, max_workers=max_workers
+        )
+    
+    def find_duplicates_across_accounts(self, targets: Dict[str, Optional[List[str]]],
+                                        min_size: int = 1, confirm: bool = False,
+                                        max_workers: Optional[int] = None,
+                                        workdir: Optional[str] = None,
+                                        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                                        ) -> Iterator[Dict[str, Any]]:
+        """
+        Procura objetos duplicados em buckets de várias contas
+        
+        Cada conta é listada com as próprias credenciais (a conta atual usa a
+        sessão conectada) e todas as listagens vão para o mesmo índice em
+        disco (ver S3Service.find_duplicates).
+        
+        Args:
+            targets: Conta cadastrada -> buckets analisados (None para todos os buckets da conta)
+            min_size: Ignora objetos menores que este tamanho
+            confirm: Se True, confirma ETags multipart pelo checksum do objeto inteiro
+            max_workers: Número máximo de listagens e consultas simultâneas
+            workdir: Diretório do índice temporário
+            progress: Função chamada com {'bucket', 'objects'} durante a listagem
+            
+        Returns:
+            Iterador de grupos de duplicatas; cada objeto traz a conta em 'account'
+        """
+        from ..services.s3_dedup import DuplicateIndex, checksum_verifier, iter_duplicate_groups
+        
+        services = {}
+        for account_name in targets:
+            if account_name == self.current_account and self.current_session is not None:
+                services[account_name] = self.services['s3']
+            else:
+                services[account_name] = self.get_account_service(account_name, 's3')
+        
+        with DuplicateIndex(workdir) as index:
+            for account_name, bucket_names in targets.items():
+                self.logger.info(f"Indexando objetos da conta '{account_name}'")
+                services[account_name].index_objects(
+                    index, bucket_names, account=account_name, min_size=min_size,
+                    max_workers=max_workers, progress=progress
+                )
+            verify = checksum_verifier(services, max_workers) if confirm else None
+            yield from iter_duplicate_groups(index, verify)
+    
     def get_available_services(self) -> List[str]:
         """
         Obtém lista de serviços disponíveis
@@ -420,6 +649,29 @@ class AWSAgent:
             self.logger.info(f"Credenciais expiradas removidas: {expired}")
         return expired
     
+    def sync_inventory(self, regions: Optional[List[str]] = None,
+                       full: bool = False) -> List[Dict[str, Any]]:
+        """
+        Sincroniza o inventário local com os eventos do CloudTrail
+        
+        Args:
+            regions: Regiões a sincronizar (usa a região atual se não especificado)
+            full: Se True, força a re-listagem completa
+            
+        Returns:
+            Resumo da sincronização por região
+        """
+        if self.current_session is None:
+            raise ValueError("Nenhuma sessão ativa. Conecte-se a uma conta primeiro.")
+        
+        from .inventory_sync import InventorySync
+        
+        results = InventorySync(self.current_session, self.services).sync(
+            regions or [self.get_current_region()], full=full
+        )
+        self.logger.info(f"Inventário sincronizado: {results}")
+        return results
+    
     def backup_configuration(self, backup_path: Optional[str] = None) -> bool:
         """
         Faz backup da configuração
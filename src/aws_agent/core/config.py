@@ -26,6 +26,19 @@ class Config(BaseModel):
         encryption_key_name: Nome da chave de criptografia no keyring
         default_region: Região AWS padrão
         session_timeout: Timeout da sessão em segundos
+        max_workers: Número máximo de operações AWS simultâneas
+        client_pool_size: Número máximo de clientes AWS mantidos no pool
+        identity_cache_ttl: Validade da identidade STS em cache, em segundos (0 desativa)
+        inventory_ttl: TTL padrão do inventário local de recursos, em segundos (0 desativa)
+        inventory_ttls: TTLs do inventário por '<serviço>.<tipo>' (ex: 'ec2.instances')
+        inventory_max_stale: Idade máxima de uma entrada servida enquanto é atualizada
+        inventory_full_sync_interval: Intervalo entre re-listagens completas na sincronização incremental
+        inventory_sync_lag: Atraso de entrega de eventos do CloudTrail considerado na sincronização
+        s3_max_concurrency: Número máximo de threads por transferência S3
+        s3_multipart_threshold: Tamanho a partir do qual transferências S3 usam multipart, em bytes
+        s3_multipart_chunksize: Tamanho de cada parte das transferências multipart, em bytes
+        s3_use_threads: Se False, as transferências S3 são feitas na thread atual
+        s3_max_bandwidth: Limite de banda por transferência S3, em bytes/s (None = sem limite)
     """
     
     app_name: str = Field(default="aws-multi-account-agent")
@@ -37,6 +50,19 @@ class Config(BaseModel):
     encryption_key_name: str = Field(default="aws-agent-encryption-key")
     default_region: str = Field(default="us-east-1")
     session_timeout: int = Field(default=3600)
+    max_workers: int = Field(default=10)
+    client_pool_size: int = Field(default=128)
+    identity_cache_ttl: int = Field(default=900)
+    inventory_ttl: int = Field(default=300)
+    inventory_ttls: Dict[str, int] = Field(default_factory=dict)
+    inventory_max_stale: int = Field(default=86400)
+    inventory_full_sync_interval: int = Field(default=86400)
+    inventory_sync_lag: int = Field(default=900)
+    s3_max_concurrency: int = Field(default=10)
+    s3_multipart_threshold: int = Field(default=8 * 1024 * 1024)
+    s3_multipart_chunksize: int = Field(default=8 * 1024 * 1024)
+    s3_use_threads: bool = Field(default=True)
+    s3_max_bandwidth: Optional[int] = Field(default=None)
     
     @field_validator('log_level')
     @classmethod
@@ -55,6 +81,74 @@ class Config(BaseModel):
             raise ValueError('Session timeout must be between 60 and 86400 seconds')
         return v
     
+    @field_validator('max_workers')
+    @classmethod
+    def validate_max_workers(cls, v):
+        """Valida o número máximo de workers"""
+        if v < 1 or v > 128:
+            raise ValueError('Max workers must be between 1 and 128')
+        return v
+    
+    @field_validator('client_pool_size')
+    @classmethod
+    def validate_client_pool_size(cls, v):
+        """Valida o tamanho do pool de clientes"""
+        if v < 1:
+            raise ValueError('Client pool size must be at least 1')
+        return v
+    
+    @field_validator('identity_cache_ttl')
+    @classmethod
+    def validate_identity_cache_ttl(cls, v):
+        """Valida a validade do cache de identidade"""
+        if v < 0 or v > 86400:
+            raise ValueError('Identity cache TTL must be between 0 and 86400 seconds')
+        return v
+    
+    @field_validator('inventory_ttl', 'inventory_max_stale',
+                     'inventory_full_sync_interval', 'inventory_sync_lag')
+    @classmethod
+    def validate_inventory_ttl(cls, v):
+        """Valida os tempos do inventário local"""
+        if v < 0:
+            raise ValueError('Inventory TTL must be non-negative')
+        return v
+    
+    @field_validator('inventory_ttls')
+    @classmethod
+    def validate_inventory_ttls(cls, v):
+        """Valida os TTLs do inventário por tipo de recurso"""
+        for key, ttl in v.items():
+            if '.' not in key:
+                raise ValueError(f"Inventory TTL key '{key}' must be '<service>.<resource_type>'")
+            if ttl < 0:
+                raise ValueError('Inventory TTL must be non-negative')
+        return v
+    
+    @field_validator('s3_max_concurrency')
+    @classmethod
+    def validate_s3_max_concurrency(cls, v):
+        """Valida o número de threads por transferência S3"""
+        if v < 1 or v > 256:
+            raise ValueError('S3 max concurrency must be between 1 and 256')
+        return v
+    
+    @field_validator('s3_multipart_threshold', 's3_multipart_chunksize')
+    @classmethod
+    def validate_s3_multipart_size(cls, v):
+        """Valida os tamanhos de multipart (partes entre 5 MiB e 5 GiB)"""
+        if v < 5 * 1024 * 1024 or v > 5 * 1024 ** 3:
+            raise ValueError('S3 multipart sizes must be between 5 MiB and 5 GiB')
+        return v
+    
+    @field_validator('s3_max_bandwidth')
+    @classmethod
+    def validate_s3_max_bandwidth(cls, v):
+        """Valida o limite de banda das transferências S3"""
+        if v is not None and v < 1:
+            raise ValueError('S3 max bandwidth must be positive')
+        return v
+    
     @property
     def credentials_path(self) -> Path:
         """Caminho completo para o arquivo de credenciais"""
@@ -129,13 +223,14 @@ class Config(BaseModel):
             'AWS_AGENT_LOG_LEVEL': 'log_level',
             'AWS_AGENT_DEFAULT_REGION': 'default_region',
             'AWS_AGENT_SESSION_TIMEOUT': 'session_timeout',
+            'AWS_AGENT_MAX_WORKERS': 'max_workers',
         }
         
         for env_var, config_key in env_mapping.items():
             value = os.getenv(env_var)
             if value:
                 # Conversão de tipos quando necessário
-                if config_key == 'session_timeout':
+                if config_key in ('session_timeout', 'max_workers'):
                     try:
                         value = int(value)
                     except ValueError:
@@ -0,0 +1,394 @@
+"""
+Daemon residente do AWS Agent
+
+Este módulo mantém um ``AWSAgent`` em memória (credenciais já
+descriptografadas, sessões validadas e clientes aquecidos) e o expõe por
+JSON-RPC 2.0 em um socket Unix local. Cada mensagem é um objeto JSON por
+linha. Comandos do CLI e automações (cron) usam o ``DaemonClient`` e pagam
+apenas uma ida e volta local em vez de inicializar o agente a cada chamada.
+
+O socket é criado com permissão 0600: apenas o dono do processo pode usá-lo.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+# Métodos do agente expostos pelo daemon
+RPC_METHODS = (
+    'get_status',
+    'list_accounts',
+    'connect',
+    'disconnect',
+    'get_current_account_info',
+    'get_available_services',
+    'get_service_operations',
+    'execute_operation',
+    'execute_across_accounts',
+    'cleanup_expired_credentials',
+    'sync_inventory',
+    'copy_across_accounts',
+)
+
+# Métodos que não dependem da conexão atual e não precisam de exclusão mútua
+_STATELESS_METHODS = ('ping', 'execute_across_accounts')
+
+# Códigos de erro JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+logger = logging.getLogger('aws_agent.daemon')
+
+
+def default_socket_path() -> Path:
+    """
+    Obtém o caminho padrão do socket do daemon
+
+    Resolvido sem carregar a configuração completa, para manter os clientes
+    leves: AWS_AGENT_DAEMON_SOCKET ou <config_dir>/agent.sock.
+
+    Returns:
+        Caminho do socket
+    """
+    if os.getenv('AWS_AGENT_DAEMON_SOCKET'):
+        return Path(os.environ['AWS_AGENT_DAEMON_SOCKET'])
+
+    config_dir = os.getenv('AWS_AGENT_CONFIG_DIR')
+    base = Path(config_dir) if config_dir else Path.home() / ".aws-agent"
+    return base / "agent.sock"
+
+
+class DaemonError(Exception):
+    """Erro retornado pelo daemon"""
+
+    def __init__(self, message: str, code: int = SERVER_ERROR, error_type: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+        self.error_type = error_type
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Processa requisições JSON-RPC (uma por linha) de uma conexão"""
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.agent_daemon.handle_request(line)
+            self.wfile.write(response + b'\n')
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AgentDaemon:
+    """
+    Servidor JSON-RPC que mantém um AWSAgent residente
+    """
+
+    def __init__(self, agent: Optional[Any] = None,
+                 socket_path: Optional[Union[str, Path]] = None):
+        """
+        Inicializa o daemon
+
+        Args:
+            agent: Agente a ser exposto (criado no início do serviço se não especificado)
+            socket_path: Caminho do socket Unix (usa o caminho padrão se não especificado)
+        """
+        self.agent = agent
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+        # O estado de conexão do agente é compartilhado entre os clientes
+        self._lock = threading.RLock()
+
+    def _bind(self) -> _UnixServer:
+        """Cria o socket com permissões restritas, removendo sockets órfãos"""
+        if self.socket_path.exists():
+            if DaemonClient(self.socket_path, timeout=1).is_running():
+                raise RuntimeError(f"Daemon já em execução em {self.socket_path}")
+            self.socket_path.unlink()
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+
+        old_umask = os.umask(0o177)
+        try:
+            server = _UnixServer(str(self.socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        os.chmod(self.socket_path, 0o600)
+
+        server.agent_daemon = self
+        return server
+
+    def start(self, background: bool = False) -> None:
+        """
+        Inicia o daemon
+
+        Args:
+            background: Se True, atende em uma thread e retorna imediatamente
+        """
+        if self.agent is None:
+            from .agent import AWSAgent
+            self.agent = AWSAgent()
+
+        self._server = self._bind()
+        logger.info(f"Daemon escutando em {self.socket_path}")
+
+        if background:
+            self._thread = threading.Thread(target=self._serve, name='aws-agent-daemon', daemon=True)
+            self._thread.start()
+        else:
+            self._serve()
+
+    def _serve(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.info("Daemon finalizado")
+
+    def stop(self) -> None:
+        """Para o daemon e remove o socket"""
+        if self._server is not None:
+            # shutdown() bloqueia até o laço terminar: executa fora da thread da requisição
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            if self._thread is not None and self._thread is not threading.current_thread():
+                self._thread.join(timeout=5)
+
+    def dispatch(self, method: str, params: Union[Dict[str, Any], List[Any]]) -> Any:
+        """
+        Executa um método do agente
+
+        Args:
+            method: Nome do método
+            params: Argumentos nomeados (dict) ou posicionais (lista)
+
+        Returns:
+            Resultado do método
+        """
+        if method == 'ping':
+            return {'pid': os.getpid(), 'current_account': self.agent.current_account}
+
+        if method == 'shutdown':
+            self.stop()
+            return True
+
+        if method not in RPC_METHODS:
+            raise DaemonError(f"Método '{method}' não encontrado", METHOD_NOT_FOUND)
+
+        func = getattr(self.agent, method)
+        args, kwargs = (params, {}) if isinstance(params, list) else ([], params)
+
+        if method in _STATELESS_METHODS:
+            return func(*args, **kwargs)
+
+        with self._lock:
+            return func(*args, **kwargs)
+
+    def handle_request(self, raw: bytes) -> bytes:
+        """
+        Processa uma requisição JSON-RPC serializada
+
+        Args:
+            raw: Requisição JSON
+
+        Returns:
+            Resposta JSON
+        """
+        request_id = None
+        try:
+            try:
+                request = json.loads(raw)
+            except ValueError as e:
+                raise DaemonError(f"JSON inválido: {e}", PARSE_ERROR)
+
+            if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+                raise DaemonError("Requisição inválida", INVALID_REQUEST)
+
+            request_id = request.get('id')
+            params = request.get('params') or {}
+            if not isinstance(params, (dict, list)):
+                raise DaemonError("Parâmetros inválidos", INVALID_PARAMS)
+
+            try:
+                result = self.dispatch(request['method'], params)
+            except TypeError as e:
+                raise DaemonError(str(e), INVALID_PARAMS, type(e).__name__)
+
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+        except DaemonError as e:
+            response = self._error(request_id, e.code, str(e), e.error_type)
+        except Exception as e:
+            logger.error(f"Erro ao processar requisição: {e}")
+            response = self._error(request_id, SERVER_ERROR, str(e), type(e).__name__)
+
+        # Respostas da AWS contêm datetime e outros tipos não serializáveis
+        return json.dumps(response, default=str).encode()
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str,
+               error_type: Optional[str] = None) -> Dict[str, Any]:
+        error: Dict[str, Any] = {'code': code, 'message': message}
+        if error_type:
+            error['data'] = {'type': error_type}
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': error}
+
+
+class DaemonClient:
+    """
+    Cliente JSON-RPC do daemon
+
+    Não importa boto3 nem a configuração; pode ser usado por comandos leves.
+    """
+
+    def __init__(self, socket_path: Optional[Union[str, Path]] = None,
+                 timeout: Optional[float] = 300):
+        """
+        Inicializa o cliente
+
+        Args:
+            socket_path: Caminho do socket Unix (usa o caminho padrão se não especificado)
+            timeout: Timeout de cada chamada em segundos
+        """
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path()
+        self.timeout = timeout
+        self._next_id = 0
+
+    def is_running(self) -> bool:
+        """
+        Verifica se há um daemon respondendo no socket
+
+        Returns:
+            True se o daemon estiver ativo
+        """
+        if not self.socket_path.exists():
+            return False
+        try:
+            self.call('ping')
+            return True
+        except (OSError, DaemonError, ValueError):
+            return False
+
+    def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Chama um método do daemon
+
+        Args:
+            method: Nome do método
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            Resultado do método
+
+        Raises:
+            DaemonError: Se o daemon retornar um erro
+            OSError: Se não for possível falar com o daemon
+        """
+        if args and kwargs:
+            # JSON-RPC não mistura argumentos posicionais e nomeados
+            raise ValueError("Use apenas argumentos posicionais ou apenas nomeados")
+
+        self._next_id += 1
+        request = {
+            'jsonrpc': '2.0',
+            'id': self._next_id,
+            'method': method,
+            'params': list(args) if args else kwargs,
+        }
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            sock.sendall(json.dumps(request).encode() + b'\n')
+
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+
+        if not line:
+            raise DaemonError("Conexão encerrada pelo daemon")
+
+        response = json.loads(line)
+        if 'error' in response:
+            error = response['error']
+            raise DaemonError(error.get('message', ''), error.get('code', SERVER_ERROR),
+                              (error.get('data') or {}).get('type'))
+
+        return response.get('result')
+
+
+class RemoteAgent:
+    """
+    Proxy do AWSAgent que encaminha as chamadas ao daemon
+
+    Oferece os métodos de RPC_METHODS com a mesma assinatura do AWSAgent.
+    """
+
+    def __init__(self, client: DaemonClient):
+        """
+        Inicializa o proxy
+
+        Args:
+            client: Cliente do daemon
+        """
+        self.client = client
+
+    @property
+    def current_account(self) -> Optional[str]:
+        """Conta atualmente conectada no daemon"""
+        return self.client.call('ping').get('current_account')
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in RPC_METHODS:
+            raise AttributeError(f"'{type(self).__name__}' não suporta '{name}' via daemon")
+
+        def remote_call(*args: Any, **kwargs: Any) -> Any:
+            return self.client.call(name, *args, **kwargs)
+
+        remote_call.__name__ = name
+        return remote_call
+
+
+def get_remote_agent(socket_path: Optional[Union[str, Path]] = None) -> Optional[RemoteAgent]:
+    """
+    Obtém um proxy do agente se houver um daemon ativo
+
+    Args:
+        socket_path: Caminho do socket Unix (usa o caminho padrão se não especificado)
+
+    Returns:
+        Proxy do agente ou None se o daemon não estiver ativo
+    """
+    if os.getenv('AWS_AGENT_NO_DAEMON'):
+        return None
+
+    client = DaemonClient(socket_path)
+    if client.is_running():
+        return RemoteAgent(client)
+    return None
+
+
+def main() -> None:
+    """Executa o daemon em primeiro plano"""
+    AgentDaemon().start()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Cache de identidade AWS
+
+Este módulo guarda a resposta de ``sts:GetCallerIdentity`` por impressão
+digital das credenciais, evitando uma chamada de rede a cada validação de
+conexão ou consulta de informações da conta.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+
+from .config import get_config
+from .session_pool import get_session_pool
+
+
+class IdentityCache:
+    """
+    Cache thread-safe de identidades STS com expiração por TTL
+
+    As entradas são indexadas pela impressão digital das credenciais, então
+    qualquer troca de credenciais resulta automaticamente em nova consulta.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            ttl: Tempo de vida das entradas em segundos (usa Config.identity_cache_ttl)
+        """
+        self.ttl = ttl if ttl is not None else get_config().identity_cache_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[Dict[str, Any], float]] = {}
+
+    def get_caller_identity(self, session: boto3.Session,
+                            force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Obtém a identidade das credenciais de uma sessão
+
+        Args:
+            session: Sessão boto3 autenticada
+            force_refresh: Se True, ignora o cache e consulta o STS
+
+        Returns:
+            Resposta do GetCallerIdentity ('Account', 'UserId', 'Arn')
+
+        Raises:
+            ClientError: Se as credenciais forem inválidas
+        """
+        pool = get_session_pool()
+        account_key = pool.session_key(session)
+
+        if not force_refresh:
+            identity = self.get(account_key)
+            if identity is not None:
+                return identity
+
+        response = pool.get_client(session, 'sts').get_caller_identity()
+        identity = {
+            'Account': response.get('Account'),
+            'UserId': response.get('UserId'),
+            'Arn': response.get('Arn'),
+        }
+
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[account_key] = (identity, time.monotonic())
+
+        return dict(identity)
+
+    def get(self, account_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém uma identidade válida do cache sem consultar o STS
+
+        Args:
+            account_key: Impressão digital das credenciais
+
+        Returns:
+            Identidade ou None se ausente/expirada
+        """
+        with self._lock:
+            entry = self._entries.get(account_key)
+            if entry is None:
+                return None
+
+            identity, cached_at = entry
+            if time.monotonic() - cached_at > self.ttl:
+                del self._entries[account_key]
+                return None
+
+            return dict(identity)
+
+    def invalidate(self, account_key: Optional[str] = None) -> None:
+        """
+        Remove identidades do cache
+
+        Args:
+            account_key: Impressão digital das credenciais (remove tudo se não especificado)
+        """
+        with self._lock:
+            if account_key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(account_key, None)
+
+
+# Instância global do cache
+_cache_instance: Optional[IdentityCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_identity_cache() -> IdentityCache:
+    """
+    Obtém a instância global do cache de identidade
+
+    Returns:
+        Instância do cache
+    """
+    global _cache_instance
+    if _cache_instance is None:
+        with _cache_lock:
+            if _cache_instance is None:
+                _cache_instance = IdentityCache()
+    return _cache_instance
+
+
+def reset_identity_cache() -> None:
+    """Reset do cache global (útil para testes)"""
+    global _cache_instance
+    _cache_instance = None
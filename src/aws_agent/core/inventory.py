@@ -0,0 +1,602 @@
+"""
+Cache local de inventário de recursos AWS
+
+Este módulo mantém em SQLite (``<config_dir>/inventory.db``) o resultado das
+listagens de recursos, indexado por conta, região, serviço, tipo de recurso
+e parâmetros da listagem. Cada tipo de recurso tem seu próprio TTL; entradas
+vencidas continuam sendo servidas enquanto são atualizadas em segundo plano
+(stale-while-revalidate), até o limite de ``inventory_max_stale``.
+
+Métodos que alteram recursos são marcados com ``@invalidates(...)`` e
+removem automaticamente as entradas afetadas. A sincronização incremental
+(ver core.inventory_sync) atualiza recurso a recurso as listagens padrão
+a partir dos eventos do CloudTrail.
+
+O mesmo banco guarda a região de cada bucket S3, que nunca muda enquanto o
+bucket existir, e os metadados de objetos S3 obtidos por HEAD, válidos
+enquanto o ETag e a data de modificação do objeto não mudarem.
+"""
+
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import get_config
+
+
+# TTL padrão (segundos) por '<serviço>.<tipo de recurso>'
+DEFAULT_TTLS: Dict[str, int] = {
+    'ec2.instances': 60,
+    'ec2.volumes': 300,
+    'ec2.security_groups': 900,
+    'ec2.key_pairs': 3600,
+    'ec2.vpcs': 3600,
+    's3.buckets': 900,
+    's3.objects': 120,
+    'iam.users': 900,
+    'iam.groups': 900,
+    'iam.roles': 900,
+    'iam.policies': 3600,
+    'lambda.functions': 300,
+}
+
+logger = logging.getLogger('aws_agent.inventory')
+
+
+def _encode(value: Any) -> Any:
+    """Serializa tipos não suportados pelo JSON preservando datetimes"""
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+def _decode(obj: Dict[str, Any]) -> Any:
+    """Restaura datetimes serializados por _encode"""
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__date__' in obj:
+            return date.fromisoformat(obj['__date__'])
+    return obj
+
+
+class InventoryCache:
+    """
+    Cache persistente e thread-safe de listagens de recursos
+    """
+
+    def __init__(self, db_path: Optional[Path] = None,
+                 default_ttl: Optional[int] = None,
+                 ttls: Optional[Dict[str, int]] = None,
+                 max_stale: Optional[int] = None):
+        """
+        Inicializa o cache
+
+        Args:
+            db_path: Caminho do banco SQLite (usa <config_dir>/inventory.db)
+            default_ttl: TTL padrão em segundos (usa Config.inventory_ttl; 0 desativa o cache)
+            ttls: TTLs por '<serviço>.<tipo>' (combinados com DEFAULT_TTLS e Config.inventory_ttls)
+            max_stale: Idade máxima (segundos) de uma entrada servida enquanto é atualizada
+        """
+        config = get_config()
+        self.db_path = Path(db_path) if db_path else config.config_dir / "inventory.db"
+        self.default_ttl = default_ttl if default_ttl is not None else config.inventory_ttl
+        self.ttls = {**DEFAULT_TTLS, **config.inventory_ttls, **(ttls or {})}
+        self.max_stale = max_stale if max_stale is not None else config.inventory_max_stale
+
+        self._lock = threading.RLock()
+        self._refreshing: set = set()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco criando o esquema se necessário"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        if is_new:
+            # Metadados de recursos não devem ser legíveis por outros usuários
+            os.chmod(self.db_path, 0o600)
+
+        # WAL permite leituras do CLI enquanto o daemon atualiza o inventário
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS inventory (
+                account TEXT NOT NULL,
+                region TEXT NOT NULL,
+                service TEXT NOT NULL,
+                resource_type TEXT NOT NULL,
+                params TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (account, region, service, resource_type, params)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS inventory_sync (
+                account TEXT NOT NULL,
+                region TEXT NOT NULL,
+                watermark REAL NOT NULL,
+                last_full_sync REAL NOT NULL,
+                PRIMARY KEY (account, region)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS bucket_regions (
+                bucket TEXT PRIMARY KEY,
+                region TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS object_metadata (
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                last_modified REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (bucket, key)
+            )
+        """)
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def _params_key(params: Optional[Dict[str, Any]]) -> str:
+        """Chave canônica dos parâmetros de uma listagem"""
+        return json.dumps(params or {}, sort_keys=True, default=str)
+
+    def get_ttl(self, service: str, resource_type: str) -> int:
+        """
+        Obtém o TTL de um tipo de recurso
+
+        Args:
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+
+        Returns:
+            TTL em segundos
+        """
+        return self.ttls.get(f"{service}.{resource_type}", self.default_ttl)
+
+    def get(self, account: str, region: str, service: str, resource_type: str,
+            params: Optional[Dict[str, Any]] = None) -> Optional[Tuple[Any, float]]:
+        """
+        Obtém uma entrada do cache sem considerar o TTL
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+            params: Parâmetros da listagem
+
+        Returns:
+            Tupla (dados, idade em segundos) ou None se ausente
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, fetched_at FROM inventory WHERE account = ? AND region = ? "
+                "AND service = ? AND resource_type = ? AND params = ?",
+                (account, region, service, resource_type, self._params_key(params))
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        data, fetched_at = row
+        return json.loads(data, object_hook=_decode), max(0.0, time.time() - fetched_at)
+
+    def put(self, account: str, region: str, service: str, resource_type: str,
+            data: Any, params: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Armazena o resultado de uma listagem
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+            data: Resultado da listagem
+            params: Parâmetros da listagem
+        """
+        payload = json.dumps(data, default=_encode)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO inventory VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (account, region, service, resource_type, self._params_key(params),
+                 payload, time.time())
+            )
+            self._conn.commit()
+
+    def invalidate(self, account: Optional[str] = None, region: Optional[str] = None,
+                   service: Optional[str] = None, resource_type: Optional[str] = None) -> int:
+        """
+        Remove entradas do cache (critérios não especificados abrangem tudo)
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+
+        Returns:
+            Número de entradas removidas
+        """
+        criteria = {'account': account, 'region': region,
+                    'service': service, 'resource_type': resource_type}
+        clauses = [f"{column} = ?" for column, value in criteria.items() if value is not None]
+        values = [value for value in criteria.values() if value is not None]
+
+        query = "DELETE FROM inventory"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+
+        with self._lock:
+            cursor = self._conn.execute(query, values)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def cached_types(self, account: str, region: str) -> List[Tuple[str, str]]:
+        """
+        Lista os tipos de recurso com listagem padrão (sem parâmetros) em cache
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+
+        Returns:
+            Lista de tuplas (serviço, tipo de recurso)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT service, resource_type FROM inventory "
+                "WHERE account = ? AND region = ? AND params = ?",
+                (account, region, self._params_key(None))
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def patch(self, account: str, region: str, service: str, resource_type: str,
+              key_field: str, items: Dict[str, Optional[Dict[str, Any]]]) -> bool:
+        """
+        Atualiza recursos individuais na listagem padrão de um tipo
+
+        Listagens com parâmetros (filtros) não podem ser atualizadas recurso a
+        recurso e são removidas.
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+            key_field: Campo que identifica o recurso na listagem (ex: 'instance_id')
+            items: Recursos atualizados por ID (None remove o recurso)
+
+        Returns:
+            True se a listagem padrão estava em cache e foi atualizada
+        """
+        default_params = self._params_key(None)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM inventory WHERE account = ? AND region = ? AND service = ? "
+                "AND resource_type = ? AND params != ?",
+                (account, region, service, resource_type, default_params)
+            )
+            self._conn.commit()
+
+            cached = self.get(account, region, service, resource_type)
+            if cached is None:
+                return False
+
+            pending = dict(items)
+            data = []
+            for item in cached[0]:
+                resource_id = item.get(key_field)
+                if resource_id in pending:
+                    item = pending.pop(resource_id)
+                if item is not None:
+                    data.append(item)
+            data.extend(item for item in pending.values() if item is not None)
+
+            self.put(account, region, service, resource_type, data)
+            return True
+
+    def renew(self, account: str, region: str, service: str, resource_type: str) -> None:
+        """
+        Marca a listagem padrão de um tipo como atual
+
+        Usado quando a sincronização incremental confirma que não houve
+        alterações desde a última consulta.
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE inventory SET fetched_at = ? WHERE account = ? AND region = ? "
+                "AND service = ? AND resource_type = ? AND params = ?",
+                (time.time(), account, region, service, resource_type, self._params_key(None))
+            )
+            self._conn.commit()
+
+    def get_sync_state(self, account: str, region: str) -> Optional[Dict[str, float]]:
+        """
+        Obtém o estado da sincronização incremental de uma conta/região
+
+        Args:
+            account: ID da conta
+            region: Região
+
+        Returns:
+            Dicionário com 'watermark' e 'last_full_sync' (timestamps) ou None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, last_full_sync FROM inventory_sync "
+                "WHERE account = ? AND region = ?",
+                (account, region)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return {'watermark': row[0], 'last_full_sync': row[1]}
+
+    def set_sync_state(self, account: str, region: str, watermark: float,
+                       last_full_sync: float) -> None:
+        """
+        Registra o estado da sincronização incremental de uma conta/região
+
+        Args:
+            account: ID da conta
+            region: Região
+            watermark: Instante até o qual os eventos já foram processados
+            last_full_sync: Instante da última re-listagem completa
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO inventory_sync VALUES (?, ?, ?, ?)",
+                (account, region, watermark, last_full_sync)
+            )
+            self._conn.commit()
+
+    def get_bucket_regions(self, bucket_names: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Obtém as regiões conhecidas de buckets S3
+
+        Args:
+            bucket_names: Buckets desejados (todos os conhecidos se não especificado)
+
+        Returns:
+            Dicionário bucket -> região (apenas buckets conhecidos)
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT bucket, region FROM bucket_regions").fetchall()
+
+        regions = dict(rows)
+        if bucket_names is None:
+            return regions
+        return {name: regions[name] for name in bucket_names if name in regions}
+
+    def set_bucket_regions(self, regions: Dict[str, str]) -> None:
+        """
+        Registra a região de buckets S3
+
+        Args:
+            regions: Dicionário bucket -> região
+        """
+        if not regions:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bucket_regions VALUES (?, ?)", list(regions.items())
+            )
+            self._conn.commit()
+
+    def forget_bucket_region(self, bucket_name: str) -> None:
+        """
+        Remove a região registrada de um bucket (ex: bucket removido)
+
+        Args:
+            bucket_name: Nome do bucket
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM bucket_regions WHERE bucket = ?", (bucket_name,))
+            self._conn.commit()
+
+    def get_object_metadata(self, bucket_name: str,
+                            objects: List[Tuple[str, str, Optional[float]]]) -> Dict[str, Any]:
+        """
+        Obtém metadados em cache de objetos S3 ainda inalterados
+
+        Args:
+            bucket_name: Nome do bucket
+            objects: Tuplas (chave, ETag, data de modificação em timestamp ou None)
+
+        Returns:
+            Dicionário chave -> metadados (apenas objetos com ETag e data iguais aos do cache)
+        """
+        found: Dict[str, Any] = {}
+        for start in range(0, len(objects), 500):
+            chunk = objects[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, etag, last_modified, data FROM object_metadata "
+                    f"WHERE bucket = ? AND key IN ({placeholders})",
+                    [bucket_name] + [key for key, _, _ in chunk]
+                ).fetchall()
+            cached = {row[0]: row[1:] for row in rows}
+            for key, etag, last_modified in chunk:
+                entry = cached.get(key)
+                if entry is None or entry[0] != etag:
+                    continue
+                if last_modified is not None and abs(entry[1] - last_modified) > 1:
+                    continue
+                found[key] = json.loads(entry[2], object_hook=_decode)
+        return found
+
+    def set_object_metadata(self, bucket_name: str, items: List[Dict[str, Any]]) -> None:
+        """
+        Registra metadados de objetos S3
+
+        Args:
+            bucket_name: Nome do bucket
+            items: Metadados no formato de S3Service.get_object_info
+        """
+        if not items:
+            return
+        rows = [
+            (bucket_name, item['key'], item['etag'], item['last_modified'].timestamp(),
+             json.dumps(item, default=_encode))
+            for item in items
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO object_metadata VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def forget_object_metadata(self, bucket_name: str) -> None:
+        """
+        Remove os metadados em cache dos objetos de um bucket
+
+        Args:
+            bucket_name: Nome do bucket
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM object_metadata WHERE bucket = ?", (bucket_name,))
+            self._conn.commit()
+
+    def get_or_fetch(self, account: str, region: str, service: str, resource_type: str,
+                     fetch: Callable[[], Any], params: Optional[Dict[str, Any]] = None,
+                     force_refresh: bool = False) -> Any:
+        """
+        Obtém uma listagem do cache ou da AWS
+
+        Entradas dentro do TTL são retornadas diretamente. Entradas vencidas,
+        mas com menos de max_stale segundos, são retornadas imediatamente e
+        atualizadas em segundo plano. Nos demais casos a listagem é feita
+        de forma síncrona.
+
+        Args:
+            account: ID da conta
+            region: Região (ou 'global')
+            service: Nome do serviço
+            resource_type: Tipo de recurso
+            fetch: Função que lista os recursos na AWS
+            params: Parâmetros da listagem
+            force_refresh: Se True, ignora o cache
+
+        Returns:
+            Resultado da listagem
+        """
+        ttl = self.get_ttl(service, resource_type)
+        if ttl <= 0:
+            return fetch()
+
+        key = (account, region, service, resource_type)
+        cached = None if force_refresh else self.get(*key, params)
+
+        if cached is not None:
+            data, age = cached
+            if age <= ttl:
+                return data
+            if age <= self.max_stale:
+                self._refresh_in_background(key, fetch, params)
+                return data
+
+        data = fetch()
+        self.put(*key, data, params)
+        return data
+
+    def _refresh_in_background(self, key: Tuple[str, str, str, str],
+                               fetch: Callable[[], Any],
+                               params: Optional[Dict[str, Any]]) -> None:
+        """Atualiza uma entrada em segundo plano (uma atualização por chave)"""
+        refresh_key = key + (self._params_key(params),)
+        with self._lock:
+            if refresh_key in self._refreshing:
+                return
+            self._refreshing.add(refresh_key)
+
+        def refresh() -> None:
+            try:
+                self.put(*key, fetch(), params)
+            except Exception as e:
+                logger.warning(f"Falha ao atualizar inventário {'/'.join(key[1:])}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(refresh_key)
+
+        threading.Thread(target=refresh, name='aws-agent-inventory-refresh', daemon=True).start()
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
+
+
+def invalidates(*resource_types: str) -> Callable:
+    """
+    Decorador para métodos de serviço que alteram recursos
+
+    Após a execução, remove do inventário as listagens dos tipos informados
+    para a conta e região do serviço.
+
+    Args:
+        *resource_types: Tipos de recurso afetados (ex: 'instances')
+
+    Returns:
+        Decorador
+    """
+    def decorator(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # Invalida mesmo em falha: a operação pode ter sido parcial
+                self.invalidate_inventory(*resource_types)
+        return wrapper
+    return decorator
+
+
+# Instância global do cache
+_inventory_instance: Optional[InventoryCache] = None
+_inventory_lock = threading.Lock()
+
+
+def get_inventory_cache() -> InventoryCache:
+    """
+    Obtém a instância global do cache de inventário
+
+    Returns:
+        Instância do cache
+    """
+    global _inventory_instance
+    if _inventory_instance is None:
+        with _inventory_lock:
+            if _inventory_instance is None:
+                _inventory_instance = InventoryCache()
+    return _inventory_instance
+
+
+def reset_inventory_cache() -> None:
+    """Reset do cache global (útil para testes)"""
+    global _inventory_instance
+    if _inventory_instance is not None:
+        _inventory_instance.close()
+    _inventory_instance = None
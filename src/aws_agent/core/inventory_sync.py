@@ -0,0 +1,348 @@
+"""
+Sincronização incremental do inventário local via CloudTrail
+
+Em vez de re-listar a conta inteira para perceber algumas alterações, a
+sincronização consulta no CloudTrail (``lookup_events``) os eventos de
+escrita ocorridos desde a última marca d'água da conta/região e atualiza
+no inventário apenas os recursos citados nesses eventos. A re-listagem
+completa passa a ser um fallback periódico (``inventory_full_sync_interval``).
+
+O CloudTrail entrega eventos com alguns minutos de atraso; por isso a marca
+d'água fica ``inventory_sync_lag`` segundos atrás do momento da consulta e
+os eventos mais recentes são reprocessados na sincronização seguinte (a
+atualização é idempotente).
+"""
+
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+import boto3
+
+from .config import get_config
+from .identity_cache import get_identity_cache
+from .inventory import InventoryCache, get_inventory_cache
+from .session_pool import get_session_pool
+
+
+# Eventos de escrita -> (serviço, tipo de recurso) afetado
+WRITE_EVENTS: Dict[str, Tuple[str, str]] = {
+    'RunInstances': ('ec2', 'instances'),
+    'StartInstances': ('ec2', 'instances'),
+    'StopInstances': ('ec2', 'instances'),
+    'TerminateInstances': ('ec2', 'instances'),
+    'ModifyInstanceAttribute': ('ec2', 'instances'),
+    'CreateVolume': ('ec2', 'volumes'),
+    'DeleteVolume': ('ec2', 'volumes'),
+    'AttachVolume': ('ec2', 'volumes'),
+    'DetachVolume': ('ec2', 'volumes'),
+    'ModifyVolume': ('ec2', 'volumes'),
+    'CreateSecurityGroup': ('ec2', 'security_groups'),
+    'DeleteSecurityGroup': ('ec2', 'security_groups'),
+    'AuthorizeSecurityGroupIngress': ('ec2', 'security_groups'),
+    'AuthorizeSecurityGroupEgress': ('ec2', 'security_groups'),
+    'RevokeSecurityGroupIngress': ('ec2', 'security_groups'),
+    'RevokeSecurityGroupEgress': ('ec2', 'security_groups'),
+    'CreateKeyPair': ('ec2', 'key_pairs'),
+    'ImportKeyPair': ('ec2', 'key_pairs'),
+    'DeleteKeyPair': ('ec2', 'key_pairs'),
+    'CreateVpc': ('ec2', 'vpcs'),
+    'DeleteVpc': ('ec2', 'vpcs'),
+    'CreateBucket': ('s3', 'buckets'),
+    'DeleteBucket': ('s3', 'buckets'),
+    'CreateUser': ('iam', 'users'),
+    'DeleteUser': ('iam', 'users'),
+    'UpdateUser': ('iam', 'users'),
+    'CreateGroup': ('iam', 'groups'),
+    'DeleteGroup': ('iam', 'groups'),
+    'UpdateGroup': ('iam', 'groups'),
+    'CreateRole': ('iam', 'roles'),
+    'DeleteRole': ('iam', 'roles'),
+    'UpdateRole': ('iam', 'roles'),
+    'CreatePolicy': ('iam', 'policies'),
+    'DeletePolicy': ('iam', 'policies'),
+    'CreatePolicyVersion': ('iam', 'policies'),
+    'AttachUserPolicy': ('iam', 'policies'),
+    'DetachUserPolicy': ('iam', 'policies'),
+    'AttachGroupPolicy': ('iam', 'policies'),
+    'DetachGroupPolicy': ('iam', 'policies'),
+    'AttachRolePolicy': ('iam', 'policies'),
+    'DetachRolePolicy': ('iam', 'policies'),
+    'CreateFunction': ('lambda', 'functions'),
+    'DeleteFunction': ('lambda', 'functions'),
+    'UpdateFunctionCode': ('lambda', 'functions'),
+    'UpdateFunctionConfiguration': ('lambda', 'functions'),
+}
+
+# Eventos que afetam recursos de qualquer tipo citado no evento
+TAG_EVENTS = ('CreateTags', 'DeleteTags')
+
+# Tipos de recurso do CloudTrail -> (serviço, tipo de recurso)
+RESOURCE_TYPES: Dict[str, Tuple[str, str]] = {
+    'AWS::EC2::Instance': ('ec2', 'instances'),
+    'AWS::EC2::Volume': ('ec2', 'volumes'),
+    'AWS::EC2::SecurityGroup': ('ec2', 'security_groups'),
+    'AWS::EC2::KeyPair': ('ec2', 'key_pairs'),
+    'AWS::EC2::VPC': ('ec2', 'vpcs'),
+    'AWS::S3::Bucket': ('s3', 'buckets'),
+    'AWS::IAM::User': ('iam', 'users'),
+    'AWS::IAM::Group': ('iam', 'groups'),
+    'AWS::IAM::Role': ('iam', 'roles'),
+    'AWS::IAM::Policy': ('iam', 'policies'),
+    'AWS::Lambda::Function': ('lambda', 'functions'),
+}
+
+# Serviços globais cujos eventos são registrados em uma única região
+EVENT_REGIONS: Dict[str, str] = {'iam': 'us-east-1'}
+
+# O CloudTrail mantém o histórico de eventos por 90 dias
+CLOUDTRAIL_RETENTION = 90 * 86400
+
+# Sufixo de versão da API nos nomes de eventos do Lambda (ex: CreateFunction20150331)
+_EVENT_VERSION_SUFFIX = re.compile(r'\d{8}(v\d+)?$')
+
+logger = logging.getLogger('aws_agent.inventory_sync')
+
+
+def _normalize_id(target: Tuple[str, str], resource_name: str) -> str:
+    """Converte o nome do recurso no CloudTrail para o ID usado nas listagens"""
+    if target == ('iam', 'policies') or not resource_name.startswith('arn:'):
+        return resource_name
+    if target[0] == 'lambda':
+        # arn:aws:lambda:<região>:<conta>:function:<nome>[:<qualificador>]
+        parts = resource_name.split(':')
+        return parts[6] if len(parts) > 6 else resource_name
+    return resource_name.rsplit('/', 1)[-1]
+
+
+def event_targets(event: Dict[str, Any]) -> List[Tuple[Tuple[str, str], Optional[str]]]:
+    """
+    Identifica os recursos do inventário afetados por um evento do CloudTrail
+
+    Args:
+        event: Evento retornado por lookup_events
+
+    Returns:
+        Lista de ((serviço, tipo de recurso), ID do recurso); o ID é None
+        quando o evento não identifica o recurso e o tipo deve ser re-listado
+    """
+    event_name = _EVENT_VERSION_SUFFIX.sub('', event.get('EventName', ''))
+    target = WRITE_EVENTS.get(event_name)
+    if target is None and event_name not in TAG_EVENTS:
+        return []
+
+    found = []
+    for resource in event.get('Resources') or []:
+        mapped = RESOURCE_TYPES.get(resource.get('ResourceType'))
+        if mapped is None or (target is not None and mapped != target):
+            continue
+        if resource.get('ResourceName'):
+            found.append((mapped, _normalize_id(mapped, resource['ResourceName'])))
+
+    if target is not None and not found:
+        found.append((target, None))
+    return found
+
+
+class InventorySync:
+    """
+    Sincroniza o inventário local com base nos eventos do CloudTrail
+    """
+
+    def __init__(self, session: boto3.Session, services: Mapping[str, Any],
+                 cache: Optional[InventoryCache] = None,
+                 full_sync_interval: Optional[int] = None,
+                 lag: Optional[int] = None):
+        """
+        Inicializa a sincronização
+
+        Args:
+            session: Sessão boto3 autenticada
+            services: Serviços da sessão por nome (ex: AWSAgent.services)
+            cache: Inventário local (usa o inventário global se não especificado)
+            full_sync_interval: Intervalo entre re-listagens completas em segundos
+            lag: Atraso de entrega dos eventos do CloudTrail em segundos
+        """
+        config = get_config()
+        self.session = session
+        self.services = services
+        self.cache = cache or get_inventory_cache()
+        self.full_sync_interval = (full_sync_interval if full_sync_interval is not None
+                                   else config.inventory_full_sync_interval)
+        self.lag = lag if lag is not None else config.inventory_sync_lag
+
+    def sync(self, regions: List[str], full: bool = False) -> List[Dict[str, Any]]:
+        """
+        Sincroniza o inventário das regiões informadas
+
+        Args:
+            regions: Regiões a sincronizar
+            full: Se True, força a re-listagem completa
+
+        Returns:
+            Resumo por região ('mode', 'events', 'patched', 'relisted' ou 'error')
+        """
+        account = get_identity_cache().get_caller_identity(self.session)['Account']
+
+        results = []
+        for region in regions:
+            try:
+                results.append(self.sync_region(account, region, full))
+            except Exception as e:
+                logger.error(f"Erro ao sincronizar inventário em {region}: {e}")
+                results.append({'region': region, 'error': str(e)})
+        return results
+
+    def sync_region(self, account: str, region: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Sincroniza o inventário de uma conta em uma região
+
+        Args:
+            account: ID da conta
+            region: Região
+            full: Se True, força a re-listagem completa
+
+        Returns:
+            Resumo da sincronização
+        """
+        now = time.time()
+        state = self.cache.get_sync_state(account, region)
+
+        if (full or state is None
+                or now - state['last_full_sync'] >= self.full_sync_interval
+                or now - state['watermark'] >= CLOUDTRAIL_RETENTION):
+            relisted = self._full_sync(account, region)
+            self.cache.set_sync_state(account, region, now - self.lag, now)
+            return {'region': region, 'mode': 'full', 'events': 0,
+                    'patched': 0, 'relisted': relisted}
+
+        changed: Dict[Tuple[str, str], Set[str]] = {}
+        relist: Set[Tuple[str, str]] = set()
+        events = 0
+        for event in self._lookup_write_events(region, state['watermark'], now):
+            events += 1
+            for target, resource_id in event_targets(event):
+                if resource_id is None:
+                    relist.add(target)
+                else:
+                    changed.setdefault(target, set()).add(resource_id)
+
+        patched = relisted = 0
+        for target in set(changed) | relist:
+            service = self._service(target[0], region)
+            if service is None:
+                continue
+
+            scope = 'global' if service.is_global else region
+            count = None if target in relist else self._patch(account, scope, service, target,
+                                                               changed[target])
+            if count is not None:
+                patched += count
+            elif self._relist(account, scope, service, target[1]):
+                relisted += 1
+
+        # Tipos sem eventos não mudaram: as listagens em cache seguem atuais
+        touched = set(changed) | relist
+        for scope in self._scopes(region):
+            for target in self.cache.cached_types(account, scope):
+                if target not in touched and self._observed(target, scope, region):
+                    self.cache.renew(account, scope, *target)
+
+        self.cache.set_sync_state(account, region, max(state['watermark'], now - self.lag),
+                                  state['last_full_sync'])
+        return {'region': region, 'mode': 'incremental', 'events': events,
+                'patched': patched, 'relisted': relisted}
+
+    def _lookup_write_events(self, region: str, start: float, end: float) -> Iterator[Dict[str, Any]]:
+        """Itera sobre os eventos de escrita do CloudTrail em um intervalo"""
+        client = get_session_pool().get_client(self.session, 'cloudtrail', region)
+        paginator = client.get_paginator('lookup_events')
+
+        pages = paginator.paginate(
+            LookupAttributes=[{'AttributeKey': 'ReadOnly', 'AttributeValue': 'false'}],
+            StartTime=datetime.fromtimestamp(start, timezone.utc),
+            EndTime=datetime.fromtimestamp(end, timezone.utc),
+        )
+        for page in pages:
+            yield from page.get('Events', [])
+
+    def _service(self, service_name: str, region: str) -> Optional[Any]:
+        """Obtém o serviço na região (None se o serviço não estiver disponível)"""
+        if service_name not in self.services:
+            return None
+        service = self.services[service_name]
+        return service if service.is_global else service.for_region(region)
+
+    def _scopes(self, region: str) -> List[str]:
+        """Escopos do inventário sincronizados junto com a região"""
+        if region in EVENT_REGIONS.values():
+            return [region, 'global']
+        return [region]
+
+    def _observed(self, target: Tuple[str, str], scope: str, region: str) -> bool:
+        """Indica se todos os eventos que alteram o tipo são vistos nesta região"""
+        if target not in WRITE_EVENTS.values():
+            return False
+        if scope == 'global':
+            return EVENT_REGIONS.get(target[0]) == region
+        return True
+
+    def _patch(self, account: str, scope: str, service: Any,
+               target: Tuple[str, str], resource_ids: Set[str]) -> Optional[int]:
+        """Atualiza recursos individuais; None se o tipo precisa ser re-listado"""
+        key_field = service.inventory_keys.get(target[1])
+        if key_field is None:
+            return None
+
+        try:
+            items = service.describe_inventory_items(target[1], sorted(resource_ids))
+        except Exception as e:
+            logger.warning(f"Erro ao consultar {target[0]}.{target[1]} alterados: {e}")
+            return None
+
+        if items is None:
+            return None
+
+        # Sem listagem padrão em cache não há o que atualizar
+        if not self.cache.patch(account, scope, target[0], target[1], key_field, items):
+            return 0
+        return len(items)
+
+    def _relist(self, account: str, scope: str, service: Any, resource_type: str) -> bool:
+        """Re-lista um tipo de recurso se sua listagem padrão estiver em cache"""
+        cached = (service.service_name, resource_type) in self.cache.cached_types(account, scope)
+        self.cache.invalidate(account, scope, service.service_name, resource_type)
+        if not cached:
+            return False
+
+        try:
+            data = service.fetch_resources(resource_type)
+        except Exception as e:
+            # A entrada já foi removida: a próxima leitura consulta a AWS
+            logger.warning(f"Erro ao re-listar {service.service_name}.{resource_type}: {e}")
+            return False
+
+        self.cache.put(account, scope, service.service_name, resource_type, data)
+        return True
+
+    def _full_sync(self, account: str, region: str) -> int:
+        """Descarta o inventário da região e re-lista os tipos que estavam em cache"""
+        relisted = 0
+        for scope in self._scopes(region):
+            cached = self.cache.cached_types(account, scope)
+            self.cache.invalidate(account, scope)
+
+            for service_name, resource_type in cached:
+                service = self._service(service_name, region)
+                if service is None:
+                    continue
+                try:
+                    data = service.fetch_resources(resource_type)
+                except Exception as e:
+                    logger.warning(f"Erro ao re-listar {service_name}.{resource_type}: {e}")
+                    continue
+                self.cache.put(account, scope, service_name, resource_type, data)
+                relisted += 1
+        return relisted
@@ -0,0 +1,275 @@
+"""
+Pool de sessões e clientes AWS
+
+Este módulo mantém um pool compartilhado por todo o processo de sessões
+boto3 e clientes botocore, indexados por conta (impressão digital das
+credenciais), serviço e região. Criar um cliente carrega e interpreta o
+modelo JSON do serviço e abre um novo pool HTTP; reaproveitá-los torna
+reconexões e trocas de conta praticamente gratuitas.
+"""
+
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+
+from .config import get_config
+
+
+def credentials_fingerprint(access_key_id: str, secret_access_key: str,
+                            session_token: Optional[str] = None) -> str:
+    """
+    Calcula a impressão digital de um conjunto de credenciais
+
+    A impressão digital muda sempre que qualquer parte das credenciais muda,
+    sem expor o segredo em logs ou chaves de cache.
+
+    Args:
+        access_key_id: AWS Access Key ID
+        secret_access_key: AWS Secret Access Key
+        session_token: Token de sessão (opcional)
+
+    Returns:
+        Hash hexadecimal das credenciais
+    """
+    material = '\0'.join([str(access_key_id), str(secret_access_key), str(session_token or '')])
+    return hashlib.sha256(material.encode()).hexdigest()[:32]
+
+
+def session_fingerprint(session: boto3.Session) -> str:
+    """
+    Calcula a impressão digital das credenciais de uma sessão boto3
+
+    Args:
+        session: Sessão boto3
+
+    Returns:
+        Hash hexadecimal das credenciais da sessão
+    """
+    credentials = session.get_credentials()
+    if credentials is None:
+        return f"anonymous-{id(session)}"
+
+    frozen = credentials.get_frozen_credentials()
+    return credentials_fingerprint(frozen.access_key, frozen.secret_key, frozen.token)
+
+
+class SessionPool:
+    """
+    Pool thread-safe de sessões e clientes AWS
+
+    Entradas expiram após ``ttl`` segundos e, quando o pool atinge o limite,
+    as menos usadas recentemente são descartadas (LRU).
+    """
+
+    def __init__(self, ttl: Optional[int] = None, max_size: Optional[int] = None):
+        """
+        Inicializa o pool
+
+        Args:
+            ttl: Tempo de vida das entradas em segundos (usa Config.session_timeout)
+            max_size: Número máximo de clientes (usa Config.client_pool_size)
+        """
+        config = get_config()
+        self.ttl = ttl if ttl is not None else config.session_timeout
+        self.max_size = max_size if max_size is not None else config.client_pool_size
+
+        self._lock = threading.RLock()
+        self._sessions: 'OrderedDict[Tuple[str, str], Tuple[boto3.Session, float]]' = OrderedDict()
+        self._clients: 'OrderedDict[Tuple[str, str, str], Tuple[Any, float]]' = OrderedDict()
+        self._session_keys: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        # Sessões boto3 não são thread-safe: um lock por conta serializa a
+        # criação de clientes sem bloquear contas diferentes entre si
+        self._creation_locks: Dict[str, threading.Lock] = {}
+
+    def _get(self, entries: OrderedDict, key: Tuple) -> Optional[Any]:
+        """Obtém uma entrada válida e marca como usada recentemente"""
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+
+            value, created_at = entry
+            if time.monotonic() - created_at > self.ttl:
+                del entries[key]
+                return None
+
+            entries.move_to_end(key)
+            return value
+
+    def _put(self, entries: OrderedDict, key: Tuple, value: Any) -> None:
+        """Armazena uma entrada descartando as menos usadas se necessário"""
+        with self._lock:
+            entries[key] = (value, time.monotonic())
+            entries.move_to_end(key)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+
+    def _creation_lock(self, account_key: str) -> threading.Lock:
+        """Obtém o lock de criação de clientes de uma conta"""
+        with self._lock:
+            return self._creation_locks.setdefault(account_key, threading.Lock())
+
+    def session_key(self, session: boto3.Session) -> str:
+        """
+        Obtém a chave de conta de uma sessão
+
+        Args:
+            session: Sessão boto3
+
+        Returns:
+            Impressão digital das credenciais da sessão
+        """
+        with self._lock:
+            key = self._session_keys.get(session)
+
+        if key is None:
+            key = session_fingerprint(session)
+            with self._lock:
+                self._session_keys[session] = key
+
+        return key
+
+    def get_session(self, credentials: Any) -> boto3.Session:
+        """
+        Obtém (ou cria) a sessão boto3 de um conjunto de credenciais
+
+        Args:
+            credentials: Credenciais da conta (AWSCredentials)
+
+        Returns:
+            Sessão boto3
+        """
+        account_key = credentials_fingerprint(
+            credentials.access_key_id, credentials.secret_access_key, credentials.session_token
+        )
+        key = (account_key, credentials.region)
+
+        session = self._get(self._sessions, key)
+        if session is not None:
+            return session
+
+        with self._creation_lock(account_key):
+            session = self._get(self._sessions, key)
+            if session is None:
+                session = boto3.Session(
+                    aws_access_key_id=credentials.access_key_id,
+                    aws_secret_access_key=credentials.secret_access_key,
+                    aws_session_token=credentials.session_token,
+                    region_name=credentials.region
+                )
+                self._put(self._sessions, key, session)
+                with self._lock:
+                    self._session_keys[session] = account_key
+
+        return session
+
+    def get_client(self, session: boto3.Session, service_name: str,
+                   region: Optional[str] = None) -> Any:
+        """
+        Obtém (ou cria) um cliente para a conta da sessão
+
+        Args:
+            session: Sessão boto3 autenticada
+            service_name: Nome do serviço AWS
+            region: Região (usa a região da sessão se não especificado)
+
+        Returns:
+            Cliente AWS
+        """
+        region = region or session.region_name
+        account_key = self.session_key(session)
+        key = (account_key, service_name, str(region))
+
+        client = self._get(self._clients, key)
+        if client is not None:
+            return client
+
+        with self._creation_lock(account_key):
+            client = self._get(self._clients, key)
+            if client is None:
+                client = session.client(service_name, region_name=region)
+                self._put(self._clients, key, client)
+
+        return client
+
+    def invalidate(self, account_key: Optional[str] = None) -> None:
+        """
+        Remove entradas do pool
+
+        Args:
+            account_key: Impressão digital da conta (remove tudo se não especificado)
+        """
+        with self._lock:
+            if account_key is None:
+                self._sessions.clear()
+                self._clients.clear()
+                return
+
+            for key in [k for k in self._sessions if k[0] == account_key]:
+                del self._sessions[key]
+            for key in [k for k in self._clients if k[0] == account_key]:
+                del self._clients[key]
+
+    def purge_expired(self) -> int:
+        """
+        Remove entradas expiradas
+
+        Returns:
+            Número de entradas removidas
+        """
+        now = time.monotonic()
+        removed = 0
+
+        with self._lock:
+            for entries in (self._sessions, self._clients):
+                for key in [k for k, (_, created_at) in entries.items() if now - created_at > self.ttl]:
+                    del entries[key]
+                    removed += 1
+
+        return removed
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Obtém estatísticas do pool
+
+        Returns:
+            Número de sessões e clientes no pool
+        """
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'clients': len(self._clients),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+            }
+
+
+# Instância global do pool
+_pool_instance: Optional[SessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """
+    Obtém a instância global do pool de sessões
+
+    Returns:
+        Instância do pool
+    """
+    global _pool_instance
+    if _pool_instance is None:
+        with _pool_lock:
+            if _pool_instance is None:
+                _pool_instance = SessionPool()
+    return _pool_instance
+
+
+def reset_session_pool() -> None:
+    """Reset do pool global (útil para testes)"""
+    global _pool_instance
+    _pool_instance = None
@@ -0,0 +1,219 @@
+"""
+Diário local de multipart uploads
+
+Este módulo registra em SQLite (``<config_dir>/uploads.db``) os multipart
+uploads em andamento: upload ID, arquivo de origem (tamanho e data de
+modificação no início do envio), tamanho das partes e, para cada parte
+concluída, o ETag e o MD5 enviado. Um upload interrompido pode então ser
+retomado enviando apenas as partes que faltam (ver
+``S3Service.upload_file_resumable``).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .config import get_config
+
+
+class UploadJournal:
+    """
+    Registro persistente e thread-safe de multipart uploads
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Inicializa o diário
+
+        Args:
+            db_path: Caminho do banco SQLite (usa <config_dir>/uploads.db)
+        """
+        self.db_path = Path(db_path) if db_path else get_config().config_dir / "uploads.db"
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco criando o esquema se necessário"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        is_new = not self.db_path.exists()
+
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        if is_new:
+            os.chmod(self.db_path, 0o600)
+
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS uploads (
+                upload_id TEXT PRIMARY KEY,
+                bucket TEXT NOT NULL,
+                key TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_mtime REAL NOT NULL,
+                part_size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS upload_parts (
+                upload_id TEXT NOT NULL,
+                part_number INTEGER NOT NULL,
+                etag TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (upload_id, part_number)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS uploads_target ON uploads (bucket, key, file_path)")
+        conn.commit()
+        return conn
+
+    def find(self, bucket: str, key: str, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém o upload registrado mais recente de um arquivo para um destino
+
+        Args:
+            bucket: Nome do bucket
+            key: Chave do objeto
+            file_path: Caminho absoluto do arquivo
+
+        Returns:
+            Registro do upload ou None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT upload_id, file_size, file_mtime, part_size, created_at FROM uploads "
+                "WHERE bucket = ? AND key = ? AND file_path = ? ORDER BY created_at DESC LIMIT 1",
+                (bucket, key, file_path)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'upload_id': row[0], 'bucket': bucket, 'key': key, 'file_path': file_path,
+            'file_size': row[1], 'file_mtime': row[2], 'part_size': row[3], 'created_at': row[4],
+        }
+
+    def start(self, upload_id: str, bucket: str, key: str, file_path: str,
+              file_size: int, file_mtime: float, part_size: int) -> None:
+        """
+        Registra um novo multipart upload
+
+        Args:
+            upload_id: ID do multipart upload
+            bucket: Nome do bucket
+            key: Chave do objeto
+            file_path: Caminho absoluto do arquivo
+            file_size: Tamanho do arquivo no início do envio
+            file_mtime: Data de modificação do arquivo no início do envio
+            part_size: Tamanho das partes
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (upload_id, bucket, key, file_path, file_size, file_mtime, part_size, time.time())
+            )
+            self._conn.commit()
+
+    def record_part(self, upload_id: str, part_number: int, etag: str,
+                    checksum: str, size: int) -> None:
+        """
+        Registra uma parte enviada
+
+        Args:
+            upload_id: ID do multipart upload
+            part_number: Número da parte
+            etag: ETag retornado pelo UploadPart
+            checksum: MD5 (base64) enviado como Content-MD5
+            size: Tamanho da parte
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO upload_parts VALUES (?, ?, ?, ?, ?)",
+                (upload_id, part_number, etag, checksum, size)
+            )
+            self._conn.commit()
+
+    def get_parts(self, upload_id: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Obtém as partes registradas de um upload
+
+        Args:
+            upload_id: ID do multipart upload
+
+        Returns:
+            Dicionário número da parte -> {etag, checksum, size}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT part_number, etag, checksum, size FROM upload_parts WHERE upload_id = ?",
+                (upload_id,)
+            ).fetchall()
+        return {row[0]: {'etag': row[1], 'checksum': row[2], 'size': row[3]} for row in rows}
+
+    def list_uploads(self) -> List[Dict[str, Any]]:
+        """
+        Lista os uploads registrados
+
+        Returns:
+            Lista de uploads com o número de partes concluídas
+        """
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT u.upload_id, u.bucket, u.key, u.file_path, u.file_size, u.created_at,
+                       COUNT(p.part_number), COALESCE(SUM(p.size), 0)
+                FROM uploads u LEFT JOIN upload_parts p ON p.upload_id = u.upload_id
+                GROUP BY u.upload_id ORDER BY u.created_at
+            """).fetchall()
+        return [
+            {'upload_id': row[0], 'bucket': row[1], 'key': row[2], 'file_path': row[3],
+             'file_size': row[4], 'created_at': row[5], 'parts': row[6], 'uploaded_bytes': row[7]}
+            for row in rows
+        ]
+
+    def forget(self, upload_id: str) -> None:
+        """
+        Remove um upload (concluído ou abortado) do diário
+
+        Args:
+            upload_id: ID do multipart upload
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM upload_parts WHERE upload_id = ?", (upload_id,))
+            self._conn.execute("DELETE FROM uploads WHERE upload_id = ?", (upload_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
+
+
+# Instância global do diário
+_journal_instance: Optional[UploadJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_upload_journal() -> UploadJournal:
+    """
+    Obtém a instância global do diário de uploads
+
+    Returns:
+        Instância do diário
+    """
+    global _journal_instance
+    if _journal_instance is None:
+        with _journal_lock:
+            if _journal_instance is None:
+                _journal_instance = UploadJournal()
+    return _journal_instance
+
+
+def reset_upload_journal() -> None:
+    """Reset do diário global (útil para testes)"""
+    global _journal_instance
+    if _journal_instance is not None:
+        _journal_instance.close()
+    _journal_instance = None
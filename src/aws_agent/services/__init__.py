@@ -1,25 +1,50 @@
 """
 Services module do AWS Agent - Módulos dos serviços AWS
+
+As classes dos serviços são importadas sob demanda pelo registro de
+serviços; importar este pacote não carrega EC2, S3, IAM nem Lambda.
 """
 
 from .base import BaseAWSService
-from .ec2 import EC2Service
-from .s3 import S3Service
-from .iam import IAMService
-from .lambda_service import LambdaService
+from .registry import (
+    BUILTIN_SERVICES,
+    ENTRY_POINT_GROUP,
+    LazyServiceMap,
+    ServiceRegistry,
+    _import_target,
+    get_service_registry,
+)
 
 __all__ = [
     'BaseAWSService',
     'EC2Service',
     'S3Service',
     'IAMService',
-    'LambdaService'
+    'LambdaService',
+    'AVAILABLE_SERVICES',
+    'BUILTIN_SERVICES',
+    'ENTRY_POINT_GROUP',
+    'LazyServiceMap',
+    'ServiceRegistry',
+    'get_service_registry',
 ]
 
-# Mapeamento de serviços disponíveis
-AVAILABLE_SERVICES = {
-    'ec2': EC2Service,
-    's3': S3Service,
-    'iam': IAMService,
-    'lambda': LambdaService
+# Classes nativas exportadas sob demanda (nome da classe -> nome do serviço)
+_SERVICE_CLASSES = {
+    'EC2Service': 'ec2',
+    'S3Service': 's3',
+    'IAMService': 'iam',
+    'LambdaService': 'lambda',
 }
+
+
+def __getattr__(name):
+    if name in _SERVICE_CLASSES:
+        return _import_target(BUILTIN_SERVICES[_SERVICE_CLASSES[name]])
+
+    if name == 'AVAILABLE_SERVICES':
+        # Mapeamento de serviços disponíveis (importa todos os serviços)
+        registry = get_service_registry()
+        return {service: registry.resolve(service) for service in registry.names()}
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,12 +5,21 @@ Este módulo contém a classe base que todos os serviços AWS devem implementar,
 fornecendo funcionalidades comuns como logging, validação e tratamento de erros.
 """
 
+import copy
 import logging
+import sqlite3
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Iterator, Tuple
 import boto3
+import jmespath
 from botocore.exceptions import ClientError, NoCredentialsError
 
+from ..core.identity_cache import get_identity_cache
+from ..core.inventory import get_inventory_cache
+from ..core.session_pool import get_session_pool
+from ..utils.helpers import iter_concurrent
+
 
 class BaseAWSService(ABC):
     """
@@ -20,6 +29,12 @@ class BaseAWSService(ABC):
     tratamento de erros e métodos utilitários.
     """
     
+    # Serviços globais não dependem da região para listar recursos
+    is_global: bool = False
+    
+    # Campo que identifica cada recurso nas listagens, por tipo de recurso
+    inventory_keys: Dict[str, str] = {}
+    
     def __init__(self, session: boto3.Session, region: Optional[str] = None):
         """
         Inicializa o serviço AWS
@@ -35,6 +50,9 @@ class BaseAWSService(ABC):
         # Clientes serão criados sob demanda
         self._clients: Dict[str, Any] = {}
         self._resources: Dict[str, Any] = {}
+        # Sessões boto3 não são thread-safe: a criação de resources é serializada
+        self._lock = threading.RLock()
+        self._available_regions: Optional[List[str]] = None
     
     @property
     @abstractmethod
@@ -42,6 +60,16 @@ class BaseAWSService(ABC):
         """Nome do serviço AWS (ex: 'ec2', 's3', 'iam')"""
         pass
     
+    @property
+    def client(self) -> Any:
+        """Cliente do serviço na região atual"""
+        return self.get_client()
+    
+    @property
+    def resource(self) -> Any:
+        """Resource do serviço na região atual"""
+        return self.get_resource()
+    
     def get_client(self, service: Optional[str] = None, region: Optional[str] = None) -> Any:
         """
         Obtém cliente AWS para o serviço
@@ -60,7 +88,8 @@ class BaseAWSService(ABC):
         
         if cache_key not in self._clients:
             try:
-                self._clients[cache_key] = self.session.client(service, region_name=region)
+                # Clientes vêm do pool compartilhado e são reaproveitados entre instâncias
+                self._clients[cache_key] = get_session_pool().get_client(self.session, service, region)
             except Exception as e:
                 self.logger.error(f"Erro ao criar cliente {service}: {e}")
                 raise
@@ -84,11 +113,13 @@ class BaseAWSService(ABC):
         cache_key = f"{service}_{region}"
         
         if cache_key not in self._resources:
-            try:
-                self._resources[cache_key] = self.session.resource(service, region_name=region)
-            except Exception as e:
-                self.logger.error(f"Erro ao criar resource {service}: {e}")
-                raise
+            with self._lock:
+                if cache_key not in self._resources:
+                    try:
+                        self._resources[cache_key] = self.session.resource(service, region_name=region)
+                    except Exception as e:
+                        self.logger.error(f"Erro ao criar resource {service}: {e}")
+                        raise
         
         return self._resources[cache_key]
     
@@ -118,21 +149,69 @@ class BaseAWSService(ABC):
         user_message = error_mapping.get(error_code, f"Erro AWS: {error_message}")
         raise ValueError(user_message)
     
-    def validate_session(self) -> bool:
+    def validate_session(self, force_refresh: bool = False) -> bool:
         """
         Valida se a sessão está ativa e funcional
         
+        Args:
+            force_refresh: Se True, ignora a identidade em cache e consulta o STS
+            
         Returns:
             True se sessão válida
         """
         try:
-            sts_client = self.session.client('sts')
-            sts_client.get_caller_identity()
+            get_identity_cache().get_caller_identity(self.session, force_refresh)
             return True
         except (ClientError, NoCredentialsError) as e:
             self.logger.error(f"Sessão inválida: {e}")
             return False
     
+    def iter_paginated(self, operation: str, result_key: Optional[str] = None,
+                       page_size: Optional[int] = None, max_items: Optional[int] = None,
+                       client: Optional[Any] = None, **kwargs) -> Iterator[Any]:
+        """
+        Itera sobre os itens de uma operação paginada, página por página
+        
+        Apenas uma página fica em memória por vez, e a próxima só é
+        solicitada quando o consumidor chega ao fim da atual; interromper a
+        iteração (ou atingir max_items) não busca páginas adicionais.
+        
+        Args:
+            operation: Nome da operação (ex: 'list_users')
+            result_key: Expressão JMESPath dos itens em cada página
+                (ex: 'Reservations[].Instances[]'); usa o mapeamento padrão
+                da operação se não especificado
+            page_size: Número de itens solicitados por página (PageSize)
+            max_items: Número máximo de itens retornados
+            client: Cliente AWS (usa o cliente do serviço se não especificado)
+            **kwargs: Parâmetros da operação
+            
+        Returns:
+            Iterador com os itens de todas as páginas
+            
+        Raises:
+            ClientError: Se alguma página falhar
+        """
+        client = client or self.get_client()
+        
+        if page_size:
+            kwargs['PaginationConfig'] = {**kwargs.get('PaginationConfig', {}), 'PageSize': page_size}
+        
+        result_key = result_key or self._get_result_key(operation)
+        expression = jmespath.compile(result_key) if result_key else None
+        
+        if max_items is not None and max_items <= 0:
+            return
+        
+        count = 0
+        for page in client.get_paginator(operation).paginate(**kwargs):
+            items = expression.search(page) if expression else [page]
+            for item in items or []:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+    
     def paginate_results(self, operation: str, **kwargs) -> List[Dict[str, Any]]:
         """
         Executa operação com paginação automática
@@ -144,22 +223,8 @@ class BaseAWSService(ABC):
         Returns:
             Lista com todos os resultados paginados
         """
-        client = self.get_client()
-        
         try:
-            paginator = client.get_paginator(operation)
-            results = []
-            
-            for page in paginator.paginate(**kwargs):
-                # Determina a chave de resultados baseada na operação
-                result_key = self._get_result_key(operation)
-                if result_key and result_key in page:
-                    results.extend(page[result_key])
-                else:
-                    # Se não conseguir determinar a chave, adiciona a página inteira
-                    results.append(page)
-            
-            return results
+            return list(self.iter_paginated(operation, **kwargs))
         
         except ClientError as e:
             self.handle_aws_error(e, operation)
@@ -186,6 +251,7 @@ class BaseAWSService(ABC):
             'list_buckets': 'Buckets',
             'list_objects_v2': 'Contents',
             'list_users': 'Users',
+            'list_groups': 'Groups',
             'list_roles': 'Roles',
             'list_policies': 'Policies',
             'describe_db_instances': 'DBInstances',
@@ -202,8 +268,7 @@ class BaseAWSService(ABC):
             ID da conta ou None se não conseguir obter
         """
         try:
-            sts_client = self.session.client('sts')
-            response = sts_client.get_caller_identity()
+            response = get_identity_cache().get_caller_identity(self.session)
             return response.get('Account')
         except Exception as e:
             self.logger.error(f"Erro ao obter ID da conta: {e}")
@@ -225,10 +290,22 @@ class BaseAWSService(ABC):
         Returns:
             Lista de regiões disponíveis
         """
+        if self._available_regions is not None:
+            return list(self._available_regions)
+        
         try:
-            client = self.get_client()
+            # describe_regions só existe no EC2 e retorna as regiões habilitadas na conta
+            client = self.get_client('ec2')
             response = client.describe_regions()
-            return [region['RegionName'] for region in response['Regions']]
+            regions = [region['RegionName'] for region in response['Regions']]
+            
+            # Restringe às regiões em que o serviço está disponível
+            service_regions = self.session.get_available_regions(self.service_name)
+            if service_regions:
+                regions = [region for region in regions if region in service_regions]
+            
+            self._available_regions = regions
+            return list(regions)
         except Exception as e:
             self.logger.debug(f"Não foi possível listar regiões para {self.service_name}: {e}")
             # Retorna regiões padrão se não conseguir obter dinamicamente
@@ -239,6 +316,200 @@ class BaseAWSService(ABC):
                 'sa-east-1'
             ]
     
+    def for_region(self, region: str) -> 'BaseAWSService':
+        """
+        Obtém uma visão do serviço em outra região
+        
+        A cópia compartilha a sessão e o cache de clientes com a instância
+        original, de modo que clientes já criados por região são reaproveitados.
+        
+        Args:
+            region: Região desejada
+            
+        Returns:
+            Instância do serviço apontando para a região
+        """
+        if region == self.region:
+            return self
+        
+        service = copy.copy(self)
+        service.region = region
+        return service
+    
+    def iter_resources_all_regions(self, resource_type: Optional[str] = None,
+                                   regions: Optional[List[str]] = None,
+                                   max_workers: Optional[int] = None,
+                                   **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Lista recursos em várias regiões simultaneamente
+        
+        Os resultados de cada região são entregues à medida que terminam.
+        Serviços globais (ex: IAM) são consultados uma única vez.
+        
+        Args:
+            resource_type: Tipo de recurso (usa o padrão do serviço se não especificado)
+            regions: Regiões a consultar (todas as disponíveis se não especificado)
+            max_workers: Número máximo de regiões consultadas em paralelo
+            **kwargs: Parâmetros específicos do recurso
+            
+        Returns:
+            Iterador com o resultado de cada região ('region', 'resources', 'error')
+        """
+        if resource_type is not None:
+            kwargs['resource_type'] = resource_type
+        
+        if self.is_global:
+            regions = [self.region]
+        elif regions is None:
+            regions = self.list_available_regions()
+        
+        if max_workers is None:
+            from ..core.config import get_config
+            max_workers = get_config().max_workers
+        
+        def list_region(region: str) -> List[Dict[str, Any]]:
+            return self.for_region(region).list_resources(**kwargs)
+        
+        for region, resources, error in iter_concurrent(list_region, regions, max_workers):
+            if error is not None:
+                self.logger.warning(f"Erro ao listar recursos {self.service_name} em {region}: {error}")
+            
+            yield {
+                'region': region,
+                'resources': resources or [],
+                'error': str(error) if error is not None else None,
+            }
+    
+    def list_resources_all_regions(self, resource_type: Optional[str] = None,
+                                   regions: Optional[List[str]] = None,
+                                   max_workers: Optional[int] = None,
+                                   **kwargs) -> List[Dict[str, Any]]:
+        """
+        Lista recursos de todas as regiões em uma única lista
+        
+        Args:
+            resource_type: Tipo de recurso (usa o padrão do serviço se não especificado)
+            regions: Regiões a consultar (todas as disponíveis se não especificado)
+            max_workers: Número máximo de regiões consultadas em paralelo
+            **kwargs: Parâmetros específicos do recurso
+            
+        Returns:
+            Lista de recursos, cada um com a chave 'region'
+        """
+        resources = []
+        
+        for outcome in self.iter_resources_all_regions(resource_type, regions, max_workers, **kwargs):
+            for item in outcome['resources']:
+                resources.append({**item, 'region': outcome['region']})
+        
+        return resources
+    
+    def _inventory_scope(self) -> Optional[Tuple[str, str]]:
+        """Conta e região usadas como chave no inventário local"""
+        account_id = self.get_account_id()
+        if not account_id:
+            return None
+        return account_id, 'global' if self.is_global else self.region
+    
+    def fetch_resources(self, resource_type: str, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Lista recursos na AWS propagando erros
+        
+        Usa o gerador iter_<tipo> quando existir, evitando que uma falha seja
+        guardada no inventário como lista vazia.
+        
+        Args:
+            resource_type: Tipo de recurso (ex: 'instances', 'buckets')
+            **kwargs: Parâmetros específicos do recurso
+            
+        Returns:
+            Lista de recursos
+            
+        Raises:
+            ClientError: Se a consulta falhar (apenas tipos com iter_<tipo>)
+        """
+        iterator = getattr(self, f"iter_{resource_type}", None)
+        if callable(iterator):
+            return list(iterator(**kwargs))
+        return self.list_resources(resource_type, **kwargs)
+    
+    def list_cached(self, resource_type: str, force_refresh: bool = False,
+                    **kwargs) -> List[Dict[str, Any]]:
+        """
+        Lista recursos usando o inventário local
+        
+        Listagens recentes são servidas do cache; listagens vencidas são
+        servidas e atualizadas em segundo plano (ver core.inventory).
+        
+        Args:
+            resource_type: Tipo de recurso (ex: 'instances', 'buckets')
+            force_refresh: Se True, ignora o cache e consulta a AWS
+            **kwargs: Parâmetros específicos do recurso
+            
+        Returns:
+            Lista de recursos
+        """
+        def fetch() -> List[Dict[str, Any]]:
+            return self.fetch_resources(resource_type, **kwargs)
+        
+        try:
+            scope = self._inventory_scope()
+            if scope is None:
+                return fetch()
+            
+            return get_inventory_cache().get_or_fetch(
+                scope[0], scope[1], self.service_name, resource_type, fetch,
+                params=kwargs, force_refresh=force_refresh
+            )
+        
+        except ClientError as e:
+            self.handle_aws_error(e, f"list_{resource_type}")
+            return []
+        except sqlite3.Error as e:
+            self.logger.warning(f"Inventário local indisponível: {e}")
+            return self.list_resources(resource_type, **kwargs)
+    
+    def invalidate_inventory(self, *resource_types: str) -> None:
+        """
+        Remove do inventário local as listagens afetadas por uma alteração
+        
+        Args:
+            *resource_types: Tipos de recurso (todos do serviço se não especificado)
+        """
+        try:
+            scope = self._inventory_scope()
+            if scope is None:
+                return
+            
+            cache = get_inventory_cache()
+            for resource_type in resource_types or (None,):
+                cache.invalidate(scope[0], scope[1], self.service_name, resource_type)
+        
+        except Exception as e:
+            # Falhas no cache nunca devem afetar a operação principal
+            self.logger.warning(f"Erro ao invalidar inventário local: {e}")
+    
+    def describe_inventory_items(self, resource_type: str,
+                                 resource_ids: List[str]) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Consulta recursos individuais para atualizar o inventário local
+        
+        Usado pela sincronização incremental. Serviços que não implementam
+        consultas por recurso têm seus tipos re-listados por completo.
+        
+        Args:
+            resource_type: Tipo de recurso (ex: 'instances')
+            resource_ids: IDs dos recursos (valores do campo em inventory_keys)
+            
+        Returns:
+            Recursos formatados por ID (None para recursos removidos; IDs
+            ausentes não alteram a listagem) ou None se o tipo não é suportado
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        return None
+    
     def format_tags(self, tags: List[Dict[str, str]]) -> Dict[str, str]:
         """
         Formata tags AWS para dicionário
@@ -6,12 +6,13 @@ incluindo gerenciamento de instâncias, volumes, security groups e VPCs.
 """
 
 import logging
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterator, List, Optional, Any, Union
 from datetime import datetime
 import boto3
 from botocore.exceptions import ClientError
 
 from .base import BaseAWSService
+from ..core.inventory import invalidates
 from ..utils.helpers import format_datetime, format_size, safe_get
 
 
@@ -23,6 +24,12 @@ class EC2Service(BaseAWSService):
     key pairs e outros recursos EC2.
     """
     
+    inventory_keys = {
+        'instances': 'instance_id',
+        'volumes': 'volume_id',
+        'security_groups': 'group_id',
+    }
+    
     @property
     def service_name(self) -> str:
         """Nome do serviço AWS"""
@@ -73,41 +80,98 @@ class EC2Service(BaseAWSService):
         else:
             raise ValueError(f"Tipo de recurso '{resource_type}' não suportado")
     
-    def list_instances(self, state: Optional[str] = None, instance_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def describe_inventory_items(self, resource_type: str,
+                                 resource_ids: List[str]) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Consulta instâncias, volumes ou security groups pelos IDs
+        
+        Args:
+            resource_type: Tipo de recurso ('instances', 'volumes', 'security_groups')
+            resource_ids: IDs dos recursos
+            
+        Returns:
+            Recursos formatados por ID (None para recursos inexistentes)
+            ou None se o tipo não é suportado
+        """
+        iterators = {
+            'instances': lambda ids: self.iter_instances(instance_ids=ids),
+            'volumes': lambda ids: self.iter_volumes(volume_ids=ids),
+            'security_groups': lambda ids: self.iter_security_groups(group_ids=ids),
+        }
+        if resource_type not in iterators:
+            return None
+        
+        key_field = self.inventory_keys[resource_type]
+        items: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(resource_ids)
+        
+        try:
+            items.update((item[key_field], item) for item in iterators[resource_type](list(resource_ids)))
+        except ClientError as e:
+            if not e.response.get('Error', {}).get('Code', '').endswith('NotFound'):
+                raise
+            # Um único ID inexistente invalida a consulta inteira: consulta um a um
+            for resource_id in resource_ids:
+                try:
+                    items.update((item[key_field], item) for item in iterators[resource_type]([resource_id]))
+                except ClientError as e:
+                    if not e.response.get('Error', {}).get('Code', '').endswith('NotFound'):
+                        raise
+        
+        return items
+    
+    def iter_instances(self, state: Optional[str] = None, instance_ids: Optional[List[str]] = None,
+                       page_size: Optional[int] = None,
+                       max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre instâncias EC2, página por página
+        
+        Args:
+            state: Filtrar por estado (running, stopped, terminated, etc.)
+            instance_ids: Lista de IDs específicos
+            page_size: Número de instâncias por página (ignorado com instance_ids)
+            max_items: Número máximo de instâncias retornadas
+            
+        Returns:
+            Iterador de instâncias formatadas
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        # Prepara filtros
+        filters = []
+        if state:
+            filters.append({'Name': 'instance-state-name', 'Values': [state]})
+        
+        # Prepara parâmetros
+        params = {}
+        if filters:
+            params['Filters'] = filters
+        if instance_ids:
+            # A API não aceita MaxResults junto com InstanceIds
+            params['InstanceIds'] = instance_ids
+            page_size = None
+        
+        for instance in self.iter_paginated('describe_instances', 'Reservations[].Instances[]',
+                                            page_size, max_items, **params):
+            yield self._format_instance(instance)
+    
+    def list_instances(self, state: Optional[str] = None, instance_ids: Optional[List[str]] = None,
+                       page_size: Optional[int] = None,
+                       max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista instâncias EC2
         
         Args:
             state: Filtrar por estado (running, stopped, terminated, etc.)
             instance_ids: Lista de IDs específicos
+            page_size: Número de instâncias por página
+            max_items: Número máximo de instâncias retornadas
             
         Returns:
             Lista de instâncias formatadas
         """
         try:
-            client = self.get_client()
-            
-            # Prepara filtros
-            filters = []
-            if state:
-                filters.append({'Name': 'instance-state-name', 'Values': [state]})
-            
-            # Prepara parâmetros
-            params = {}
-            if filters:
-                params['Filters'] = filters
-            if instance_ids:
-                params['InstanceIds'] = instance_ids
-            
-            # Executa consulta
-            response = client.describe_instances(**params)
-            
-            instances = []
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    instances.append(self._format_instance(instance))
-            
-            return instances
+            return list(self.iter_instances(state, instance_ids, page_size, max_items))
         
         except ClientError as e:
             self.handle_aws_error(e, 'list_instances')
@@ -131,6 +195,7 @@ class EC2Service(BaseAWSService):
             self.logger.error(f"Erro ao obter detalhes da instância {instance_id}: {e}")
             return None
     
+    @invalidates('instances')
     def start_instance(self, instance_id: str) -> bool:
         """
         Inicia uma instância EC2
@@ -156,6 +221,7 @@ class EC2Service(BaseAWSService):
             self.handle_aws_error(e, f'start_instance_{instance_id}')
             return False
     
+    @invalidates('instances')
     def stop_instance(self, instance_id: str, force: bool = False) -> bool:
         """
         Para uma instância EC2
@@ -207,6 +273,7 @@ class EC2Service(BaseAWSService):
             self.handle_aws_error(e, f'reboot_instance_{instance_id}')
             return False
     
+    @invalidates('instances')
     def terminate_instance(self, instance_id: str) -> bool:
         """
         Termina uma instância EC2
@@ -379,30 +446,49 @@ class EC2Service(BaseAWSService):
             ]
         }
     
-    def list_volumes(self, volume_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def iter_volumes(self, volume_ids: Optional[List[str]] = None,
+                     page_size: Optional[int] = None,
+                     max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre volumes EBS, página por página
+        
+        Args:
+            volume_ids: IDs específicos de volumes
+            page_size: Número de volumes por página (ignorado com volume_ids)
+            max_items: Número máximo de volumes retornados
+            
+        Returns:
+            Iterador de volumes formatados
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {}
+        if volume_ids:
+            # A API não aceita MaxResults junto com VolumeIds
+            params['VolumeIds'] = volume_ids
+            page_size = None
+        
+        for volume in self.iter_paginated('describe_volumes', 'Volumes',
+                                          page_size, max_items, **params):
+            yield self._format_volume(volume)
+    
+    def list_volumes(self, volume_ids: Optional[List[str]] = None,
+                     page_size: Optional[int] = None,
+                     max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista volumes EBS
         
         Args:
             volume_ids: IDs específicos de volumes
+            page_size: Número de volumes por página
+            max_items: Número máximo de volumes retornados
             
         Returns:
             Lista de volumes formatados
         """
         try:
-            client = self.get_client()
-            
-            params = {}
-            if volume_ids:
-                params['VolumeIds'] = volume_ids
-            
-            response = client.describe_volumes(**params)
-            
-            volumes = []
-            for volume in response['Volumes']:
-                volumes.append(self._format_volume(volume))
-            
-            return volumes
+            return list(self.iter_volumes(volume_ids, page_size, max_items))
         
         except ClientError as e:
             self.handle_aws_error(e, 'list_volumes')
@@ -426,30 +512,49 @@ class EC2Service(BaseAWSService):
             self.logger.error(f"Erro ao obter detalhes do volume {volume_id}: {e}")
             return None
     
-    def list_security_groups(self, group_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    def iter_security_groups(self, group_ids: Optional[List[str]] = None,
+                             page_size: Optional[int] = None,
+                             max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre security groups, página por página
+        
+        Args:
+            group_ids: IDs específicos de security groups
+            page_size: Número de security groups por página (ignorado com group_ids)
+            max_items: Número máximo de security groups retornados
+            
+        Returns:
+            Iterador de security groups formatados
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {}
+        if group_ids:
+            # A API não aceita MaxResults junto com GroupIds
+            params['GroupIds'] = group_ids
+            page_size = None
+        
+        for sg in self.iter_paginated('describe_security_groups', 'SecurityGroups',
+                                      page_size, max_items, **params):
+            yield self._format_security_group(sg)
+    
+    def list_security_groups(self, group_ids: Optional[List[str]] = None,
+                             page_size: Optional[int] = None,
+                             max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista security groups
         
         Args:
             group_ids: IDs específicos de security groups
+            page_size: Número de security groups por página
+            max_items: Número máximo de security groups retornados
             
         Returns:
             Lista de security groups formatados
         """
         try:
-            client = self.get_client()
-            
-            params = {}
-            if group_ids:
-                params['GroupIds'] = group_ids
-            
-            response = client.describe_security_groups(**params)
-            
-            security_groups = []
-            for sg in response['SecurityGroups']:
-                security_groups.append(self._format_security_group(sg))
-            
-            return security_groups
+            return list(self.iter_security_groups(group_ids, page_size, max_items))
         
         except ClientError as e:
             self.handle_aws_error(e, 'list_security_groups')
@@ -473,6 +578,21 @@ class EC2Service(BaseAWSService):
             self.logger.error(f"Erro ao obter detalhes do security group {group_id}: {e}")
             return None
     
+    def iter_key_pairs(self) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre os key pairs
+        
+        Returns:
+            Iterador de key pairs formatados
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        # DescribeKeyPairs não é paginado
+        response = self.get_client().describe_key_pairs()
+        for kp in response['KeyPairs']:
+            yield self._format_key_pair(kp)
+    
     def list_key_pairs(self) -> List[Dict[str, Any]]:
         """
         Lista key pairs
@@ -481,37 +601,44 @@ class EC2Service(BaseAWSService):
             Lista de key pairs formatados
         """
         try:
-            client = self.get_client()
-            
-            response = client.describe_key_pairs()
-            
-            key_pairs = []
-            for kp in response['KeyPairs']:
-                key_pairs.append(self._format_key_pair(kp))
-            
-            return key_pairs
+            return list(self.iter_key_pairs())
         
         except ClientError as e:
             self.handle_aws_error(e, 'list_key_pairs')
             return []
     
-    def list_vpcs(self) -> List[Dict[str, Any]]:
+    def iter_vpcs(self, page_size: Optional[int] = None,
+                  max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre VPCs, página por página
+        
+        Args:
+            page_size: Número de VPCs por página
+            max_items: Número máximo de VPCs retornados
+            
+        Returns:
+            Iterador de VPCs formatados
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        for vpc in self.iter_paginated('describe_vpcs', 'Vpcs', page_size, max_items):
+            yield self._format_vpc(vpc)
+    
+    def list_vpcs(self, page_size: Optional[int] = None,
+                  max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista VPCs
         
+        Args:
+            page_size: Número de VPCs por página
+            max_items: Número máximo de VPCs retornados
+            
         Returns:
             Lista de VPCs formatados
         """
         try:
-            client = self.get_client()
-            
-            response = client.describe_vpcs()
-            
-            vpcs = []
-            for vpc in response['Vpcs']:
-                vpcs.append(self._format_vpc(vpc))
-            
-            return vpcs
+            return list(self.iter_vpcs(page_size, max_items))
         
         except ClientError as e:
             self.handle_aws_error(e, 'list_vpcs')
@@ -4,11 +4,12 @@ Serviço IAM para gerenciamento de usuários, grupos, roles e políticas
 
 import boto3
 from botocore.exceptions import ClientError
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime
 import json
 
 from .base import BaseAWSService
+from ..core.inventory import invalidates
 
 
 class IAMService(BaseAWSService):
@@ -16,10 +17,18 @@ class IAMService(BaseAWSService):
     Serviço para operações com AWS IAM
     """
     
+    is_global = True
+    
+    inventory_keys = {
+        'users': 'username',
+        'groups': 'group_name',
+        'roles': 'role_name',
+        'policies': 'arn',
+    }
+    
     def __init__(self, session: boto3.Session, region: str = "us-east-1"):
+        # Clientes são criados sob demanda no primeiro uso
         super().__init__(session, region)
-        self.client = session.client('iam', region_name=region)
-        self.resource = session.resource('iam', region_name=region)
     
     @property
     def service_name(self) -> str:
@@ -71,37 +80,86 @@ class IAMService(BaseAWSService):
         else:
             raise ValueError(f"Tipo de recurso '{resource_type}' não suportado")
     
-    def list_users(self, path_prefix: str = "/") -> List[Dict[str, Any]]:
+    def describe_inventory_items(self, resource_type: str,
+                                 resource_ids: List[str]) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Consulta usuários, grupos, roles ou políticas individualmente
+        
+        Args:
+            resource_type: Tipo de recurso ('users', 'groups', 'roles', 'policies')
+            resource_ids: Nomes dos recursos (ARNs para políticas)
+            
+        Returns:
+            Recursos formatados por ID (None para recursos inexistentes)
+            ou None se o tipo não é suportado
+        """
+        getters = {
+            'users': lambda name: self._format_user(self.client.get_user(UserName=name)['User']),
+            'groups': lambda name: self._format_group(self.client.get_group(GroupName=name)['Group']),
+            'roles': lambda name: self._format_role(self.client.get_role(RoleName=name)['Role']),
+            'policies': lambda arn: self._format_policy(self.client.get_policy(PolicyArn=arn)['Policy']),
+        }
+        if resource_type not in getters:
+            return None
+        
+        items: Dict[str, Optional[Dict[str, Any]]] = {}
+        for resource_id in resource_ids:
+            if resource_type == 'policies' and ':aws:policy/' in resource_id:
+                # Políticas gerenciadas pela AWS não fazem parte da listagem padrão (Local)
+                continue
+            try:
+                items[resource_id] = getters[resource_type](resource_id)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchEntity':
+                    raise
+                items[resource_id] = None
+        
+        return items
+    
+    def iter_users(self, path_prefix: str = "/",
+                   page_size: Optional[int] = None,
+                   max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre usuários IAM, página por página
+        
+        Args:
+            path_prefix: Prefixo do caminho para filtrar usuários
+            page_size: Número de itens por página (MaxItems da API)
+            max_items: Número máximo de itens retornados
+            
+        Returns:
+            Iterador de usuários
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {'PathPrefix': path_prefix}
+        
+        for user in self.iter_paginated('list_users', 'Users', page_size, max_items, **params):
+            yield self._format_user(user)
+    
+    def list_users(self, path_prefix: str = "/",
+                   page_size: Optional[int] = None,
+                   max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista usuários IAM
         
         Args:
             path_prefix: Prefixo do caminho para filtrar usuários
+            page_size: Número de itens por página
+            max_items: Número máximo de itens retornados
             
         Returns:
             Lista de usuários
         """
         try:
-            response = self.client.list_users(PathPrefix=path_prefix)
-            users = []
-            
-            for user in response['Users']:
-                user_info = {
-                    'username': user['UserName'],
-                    'user_id': user['UserId'],
-                    'arn': user['Arn'],
-                    'path': user['Path'],
-                    'create_date': user['CreateDate'],
-                    'password_last_used': user.get('PasswordLastUsed')
-                }
-                users.append(user_info)
-                
-            return users
+            return list(self.iter_users(path_prefix, page_size, max_items))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar usuários: {e}")
             return []
     
+    @invalidates('users')
     def create_user(self, username: str, path: str = "/") -> bool:
         """
         Cria um novo usuário IAM
@@ -122,6 +180,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao criar usuário '{username}': {e}")
             return False
     
+    @invalidates('users', 'groups')
     def delete_user(self, username: str, force: bool = False) -> bool:
         """
         Remove um usuário IAM
@@ -152,36 +211,50 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao remover usuário '{username}': {e}")
             return False
     
-    def list_groups(self, path_prefix: str = "/") -> List[Dict[str, Any]]:
+    def iter_groups(self, path_prefix: str = "/",
+                    page_size: Optional[int] = None,
+                    max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre grupos IAM, página por página
+        
+        Args:
+            path_prefix: Prefixo do caminho para filtrar grupos
+            page_size: Número de itens por página (MaxItems da API)
+            max_items: Número máximo de itens retornados
+            
+        Returns:
+            Iterador de grupos
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {'PathPrefix': path_prefix}
+        
+        for group in self.iter_paginated('list_groups', 'Groups', page_size, max_items, **params):
+            yield self._format_group(group)
+    
+    def list_groups(self, path_prefix: str = "/",
+                    page_size: Optional[int] = None,
+                    max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista grupos IAM
         
         Args:
             path_prefix: Prefixo do caminho para filtrar grupos
+            page_size: Número de itens por página
+            max_items: Número máximo de itens retornados
             
         Returns:
             Lista de grupos
         """
         try:
-            response = self.client.list_groups(PathPrefix=path_prefix)
-            groups = []
-            
-            for group in response['Groups']:
-                group_info = {
-                    'group_name': group['GroupName'],
-                    'group_id': group['GroupId'],
-                    'arn': group['Arn'],
-                    'path': group['Path'],
-                    'create_date': group['CreateDate']
-                }
-                groups.append(group_info)
-                
-            return groups
+            return list(self.iter_groups(path_prefix, page_size, max_items))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar grupos: {e}")
             return []
     
+    @invalidates('groups')
     def create_group(self, group_name: str, path: str = "/") -> bool:
         """
         Cria um novo grupo IAM
@@ -202,6 +275,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao criar grupo '{group_name}': {e}")
             return False
     
+    @invalidates('groups')
     def delete_group(self, group_name: str, force: bool = False) -> bool:
         """
         Remove um grupo IAM
@@ -228,38 +302,50 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao remover grupo '{group_name}': {e}")
             return False
     
-    def list_roles(self, path_prefix: str = "/") -> List[Dict[str, Any]]:
+    def iter_roles(self, path_prefix: str = "/",
+                   page_size: Optional[int] = None,
+                   max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre roles IAM, página por página
+        
+        Args:
+            path_prefix: Prefixo do caminho para filtrar roles
+            page_size: Número de itens por página (MaxItems da API)
+            max_items: Número máximo de itens retornados
+            
+        Returns:
+            Iterador de roles
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {'PathPrefix': path_prefix}
+        
+        for role in self.iter_paginated('list_roles', 'Roles', page_size, max_items, **params):
+            yield self._format_role(role)
+    
+    def list_roles(self, path_prefix: str = "/",
+                   page_size: Optional[int] = None,
+                   max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista roles IAM
         
         Args:
             path_prefix: Prefixo do caminho para filtrar roles
+            page_size: Número de itens por página
+            max_items: Número máximo de itens retornados
             
         Returns:
             Lista de roles
         """
         try:
-            response = self.client.list_roles(PathPrefix=path_prefix)
-            roles = []
-            
-            for role in response['Roles']:
-                role_info = {
-                    'role_name': role['RoleName'],
-                    'role_id': role['RoleId'],
-                    'arn': role['Arn'],
-                    'path': role['Path'],
-                    'create_date': role['CreateDate'],
-                    'assume_role_policy_document': role.get('AssumeRolePolicyDocument'),
-                    'max_session_duration': role.get('MaxSessionDuration')
-                }
-                roles.append(role_info)
-                
-            return roles
+            return list(self.iter_roles(path_prefix, page_size, max_items))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar roles: {e}")
             return []
     
+    @invalidates('roles')
     def create_role(self, role_name: str, assume_role_policy: Dict[str, Any],
                    path: str = "/", description: str = "") -> bool:
         """
@@ -292,6 +378,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao criar role '{role_name}': {e}")
             return False
     
+    @invalidates('roles')
     def delete_role(self, role_name: str, force: bool = False) -> bool:
         """
         Remove uma role IAM
@@ -318,45 +405,54 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao remover role '{role_name}': {e}")
             return False
     
-    def list_policies(self, scope: str = "Local", only_attached: bool = False) -> List[Dict[str, Any]]:
+    def iter_policies(self, scope: str = "Local", only_attached: bool = False,
+                      page_size: Optional[int] = None,
+                      max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre políticas IAM, página por página
+        
+        Args:
+            scope: Escopo das políticas ("Local", "AWS", "All")
+            only_attached: Se True, apenas políticas anexadas
+            page_size: Número de itens por página (MaxItems da API)
+            max_items: Número máximo de itens retornados
+            
+        Returns:
+            Iterador de políticas
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {'Scope': scope}
+        if only_attached:
+            params['OnlyAttached'] = True
+        
+        for policy in self.iter_paginated('list_policies', 'Policies', page_size, max_items, **params):
+            yield self._format_policy(policy)
+    
+    def list_policies(self, scope: str = "Local", only_attached: bool = False,
+                      page_size: Optional[int] = None,
+                      max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista políticas IAM
         
         Args:
             scope: Escopo das políticas ("Local", "AWS", "All")
             only_attached: Se True, apenas políticas anexadas
+            page_size: Número de itens por página
+            max_items: Número máximo de itens retornados
             
         Returns:
             Lista de políticas
         """
         try:
-            params = {'Scope': scope}
-            if only_attached:
-                params['OnlyAttached'] = True
-            
-            response = self.client.list_policies(**params)
-            policies = []
-            
-            for policy in response['Policies']:
-                policy_info = {
-                    'policy_name': policy['PolicyName'],
-                    'policy_id': policy['PolicyId'],
-                    'arn': policy['Arn'],
-                    'path': policy['Path'],
-                    'create_date': policy['CreateDate'],
-                    'update_date': policy['UpdateDate'],
-                    'attachment_count': policy.get('AttachmentCount', 0),
-                    'permissions_boundary_usage_count': policy.get('PermissionsBoundaryUsageCount', 0),
-                    'is_attachable': policy.get('IsAttachable', False)
-                }
-                policies.append(policy_info)
-                
-            return policies
+            return list(self.iter_policies(scope, only_attached, page_size, max_items))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar políticas: {e}")
             return []
     
+    @invalidates('policies')
     def create_policy(self, policy_name: str, policy_document: Dict[str, Any],
                      path: str = "/", description: str = "") -> Optional[str]:
         """
@@ -391,6 +487,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao criar política '{policy_name}': {e}")
             return None
     
+    @invalidates('policies')
     def delete_policy(self, policy_arn: str) -> bool:
         """
         Remove uma política IAM
@@ -410,6 +507,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao remover política '{policy_arn}': {e}")
             return False
     
+    @invalidates('policies')
     def attach_user_policy(self, username: str, policy_arn: str) -> bool:
         """
         Anexa uma política a um usuário
@@ -433,6 +531,7 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao anexar política ao usuário: {e}")
             return False
     
+    @invalidates('policies')
     def detach_user_policy(self, username: str, policy_arn: str) -> bool:
         """
         Desanexa uma política de um usuário
@@ -581,6 +680,53 @@ class IAMService(BaseAWSService):
             self.logger.error(f"Erro ao obter resumo da conta: {e}")
             return {}
     
+    def _format_user(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata usuário para exibição"""
+        return {
+            'username': user['UserName'],
+            'user_id': user['UserId'],
+            'arn': user['Arn'],
+            'path': user['Path'],
+            'create_date': user['CreateDate'],
+            'password_last_used': user.get('PasswordLastUsed')
+        }
+    
+    def _format_group(self, group: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata grupo para exibição"""
+        return {
+            'group_name': group['GroupName'],
+            'group_id': group['GroupId'],
+            'arn': group['Arn'],
+            'path': group['Path'],
+            'create_date': group['CreateDate']
+        }
+    
+    def _format_role(self, role: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata role para exibição"""
+        return {
+            'role_name': role['RoleName'],
+            'role_id': role['RoleId'],
+            'arn': role['Arn'],
+            'path': role['Path'],
+            'create_date': role['CreateDate'],
+            'assume_role_policy_document': role.get('AssumeRolePolicyDocument'),
+            'max_session_duration': role.get('MaxSessionDuration')
+        }
+    
+    def _format_policy(self, policy: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata política para exibição"""
+        return {
+            'policy_name': policy['PolicyName'],
+            'policy_id': policy['PolicyId'],
+            'arn': policy['Arn'],
+            'path': policy['Path'],
+            'create_date': policy['CreateDate'],
+            'update_date': policy['UpdateDate'],
+            'attachment_count': policy.get('AttachmentCount', 0),
+            'permissions_boundary_usage_count': policy.get('PermissionsBoundaryUsageCount', 0),
+            'is_attachable': policy.get('IsAttachable', False)
+        }
+    
     def _detach_user_policies(self, username: str) -> None:
         """Remove todas as políticas de um usuário"""
         try:
@@ -4,7 +4,7 @@ Serviço Lambda para gerenciamento de funções serverless
 
 import boto3
 from botocore.exceptions import ClientError
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 import json
 import base64
 import zipfile
@@ -12,6 +12,7 @@ import io
 from pathlib import Path
 
 from .base import BaseAWSService
+from ..core.inventory import invalidates
 
 
 class LambdaService(BaseAWSService):
@@ -19,9 +20,11 @@ class LambdaService(BaseAWSService):
     Serviço para operações com AWS Lambda
     """
     
+    inventory_keys = {'functions': 'function_name'}
+    
     def __init__(self, session: boto3.Session, region: str = "us-east-1"):
+        # Clientes são criados sob demanda no primeiro uso
         super().__init__(session, region)
-        self.client = session.client('lambda', region_name=region)
     
     @property
     def service_name(self) -> str:
@@ -72,42 +75,91 @@ class LambdaService(BaseAWSService):
         else:
             raise ValueError(f"Tipo de recurso '{resource_type}' não suportado")
     
-    def list_functions(self) -> List[Dict[str, Any]]:
+    def describe_inventory_items(self, resource_type: str,
+                                 resource_ids: List[str]) -> Optional[Dict[str, Optional[Dict[str, Any]]]]:
+        """
+        Consulta funções individualmente
+        
+        Args:
+            resource_type: Tipo de recurso ('functions')
+            resource_ids: Nomes das funções
+            
+        Returns:
+            Funções formatadas por nome (None para funções inexistentes)
+            ou None se o tipo não é suportado
+        """
+        if resource_type != 'functions':
+            return None
+        
+        items: Dict[str, Optional[Dict[str, Any]]] = {}
+        for function_name in resource_ids:
+            try:
+                config = self.client.get_function_configuration(FunctionName=function_name)
+                items[function_name] = self._format_function(config)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ResourceNotFoundException':
+                    raise
+                items[function_name] = None
+        
+        return items
+    
+    def iter_functions(self, page_size: Optional[int] = None,
+                       max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre as funções Lambda, página por página
+        
+        Args:
+            page_size: Número de funções por página (MaxItems da API)
+            max_items: Número máximo de funções retornadas
+            
+        Returns:
+            Iterador de funções
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        for func in self.iter_paginated('list_functions', 'Functions', page_size, max_items):
+            yield self._format_function(func)
+    
+    def list_functions(self, page_size: Optional[int] = None,
+                       max_items: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista todas as funções Lambda
         
+        Args:
+            page_size: Número de funções por página
+            max_items: Número máximo de funções retornadas
+            
         Returns:
             Lista de funções
         """
         try:
-            response = self.client.list_functions()
-            functions = []
-            
-            for func in response['Functions']:
-                function_info = {
-                    'function_name': func['FunctionName'],
-                    'function_arn': func['FunctionArn'],
-                    'runtime': func['Runtime'],
-                    'role': func['Role'],
-                    'handler': func['Handler'],
-                    'code_size': func['CodeSize'],
-                    'description': func.get('Description', ''),
-                    'timeout': func['Timeout'],
-                    'memory_size': func['MemorySize'],
-                    'last_modified': func['LastModified'],
-                    'code_sha256': func['CodeSha256'],
-                    'version': func['Version'],
-                    'environment': func.get('Environment', {}).get('Variables', {}),
-                    'layers': func.get('Layers', [])
-                }
-                functions.append(function_info)
-                
-            return functions
+            return list(self.iter_functions(page_size, max_items))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar funções: {e}")
             return []
     
+    def _format_function(self, func: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata função para exibição"""
+        return {
+            'function_name': func['FunctionName'],
+            'function_arn': func['FunctionArn'],
+            'runtime': func['Runtime'],
+            'role': func['Role'],
+            'handler': func['Handler'],
+            'code_size': func['CodeSize'],
+            'description': func.get('Description', ''),
+            'timeout': func['Timeout'],
+            'memory_size': func['MemorySize'],
+            'last_modified': func['LastModified'],
+            'code_sha256': func['CodeSha256'],
+            'version': func['Version'],
+            'environment': func.get('Environment', {}).get('Variables', {}),
+            'layers': func.get('Layers', [])
+        }
+    
+    @invalidates('functions')
     def create_function(self, function_name: str, runtime: str, role: str,
                        handler: str, code: Dict[str, Any], 
                        description: str = "", timeout: int = 3,
@@ -160,6 +212,7 @@ class LambdaService(BaseAWSService):
             self.logger.error(f"Erro ao criar função '{function_name}': {e}")
             return None
     
+    @invalidates('functions')
     def delete_function(self, function_name: str) -> bool:
         """
         Remove uma função Lambda
@@ -221,6 +274,7 @@ class LambdaService(BaseAWSService):
             self.logger.error(f"Erro ao invocar função '{function_name}': {e}")
             return None
     
+    @invalidates('functions')
     def update_function_code(self, function_name: str, code: Dict[str, Any]) -> bool:
         """
         Atualiza o código de uma função
@@ -246,6 +300,7 @@ class LambdaService(BaseAWSService):
             self.logger.error(f"Erro ao atualizar código da função: {e}")
             return False
     
+    @invalidates('functions')
     def update_function_configuration(self, function_name: str, **kwargs) -> bool:
         """
         Atualiza configuração de uma função
@@ -432,6 +487,35 @@ class LambdaService(BaseAWSService):
             self.logger.error(f"Erro ao remover alias: {e}")
             return False
     
+    def iter_event_source_mappings(self, function_name: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre os mapeamentos de origem de eventos, página por página
+        
+        Args:
+            function_name: Nome da função (opcional)
+            
+        Returns:
+            Iterador de mapeamentos
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        params = {}
+        if function_name:
+            params['FunctionName'] = function_name
+        
+        for mapping in self.iter_paginated('list_event_source_mappings', 'EventSourceMappings',
+                                           **params):
+            yield {
+                'uuid': mapping['UUID'],
+                'event_source_arn': mapping.get('EventSourceArn'),
+                'function_name': mapping['FunctionName'],
+                'last_modified': mapping['LastModified'],
+                'last_processing_result': mapping.get('LastProcessingResult'),
+                'state': mapping['State'],
+                'state_transition_reason': mapping.get('StateTransitionReason')
+            }
+    
     def list_event_source_mappings(self, function_name: str = None) -> List[Dict[str, Any]]:
         """
         Lista mapeamentos de origem de eventos
@@ -443,26 +527,7 @@ class LambdaService(BaseAWSService):
             Lista de mapeamentos
         """
         try:
-            params = {}
-            if function_name:
-                params['FunctionName'] = function_name
-            
-            response = self.client.list_event_source_mappings(**params)
-            mappings = []
-            
-            for mapping in response['EventSourceMappings']:
-                mapping_info = {
-                    'uuid': mapping['UUID'],
-                    'event_source_arn': mapping.get('EventSourceArn'),
-                    'function_name': mapping['FunctionName'],
-                    'last_modified': mapping['LastModified'],
-                    'last_processing_result': mapping.get('LastProcessingResult'),
-                    'state': mapping['State'],
-                    'state_transition_reason': mapping.get('StateTransitionReason')
-                }
-                mappings.append(mapping_info)
-                
-            return mappings
+            return list(self.iter_event_source_mappings(function_name))
             
         except ClientError as e:
             self.logger.error(f"Erro ao listar mapeamentos de eventos: {e}")
@@ -534,7 +599,7 @@ class LambdaService(BaseAWSService):
         """
         try:
             # Usar CloudWatch Logs para obter logs da função
-            logs_client = self.session.client('logs', region_name=self.region)
+            logs_client = self.get_client('logs')
             log_group_name = f"/aws/lambda/{function_name}"
             
             # Listar streams de log
@@ -0,0 +1,327 @@
+"""
+Registro de serviços AWS
+
+Este módulo mantém o registro dos serviços disponíveis para o agente.
+Os serviços são registrados por referência (``'modulo:Classe'``) e só são
+importados quando usados pela primeira vez, então um comando que usa apenas
+o S3 não carrega os módulos (nem os modelos botocore) de EC2, IAM e Lambda.
+
+Pacotes de terceiros podem registrar serviços pelo grupo de entry points
+``aws_agent.services``::
+
+    [project.entry-points."aws_agent.services"]
+    rds = "meu_pacote.rds:RDSService"
+"""
+
+import importlib
+import logging
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Type, Union
+
+import boto3
+
+from .base import BaseAWSService
+
+
+# Grupo de entry points para serviços de terceiros
+ENTRY_POINT_GROUP = 'aws_agent.services'
+
+# Serviços nativos do agente
+BUILTIN_SERVICES: Dict[str, str] = {
+    'ec2': 'aws_agent.services.ec2:EC2Service',
+    's3': 'aws_agent.services.s3:S3Service',
+    'iam': 'aws_agent.services.iam:IAMService',
+    'lambda': 'aws_agent.services.lambda_service:LambdaService',
+}
+
+logger = logging.getLogger('aws_agent.services.registry')
+
+
+def _import_target(target: str) -> Any:
+    """
+    Importa um objeto a partir de uma referência 'modulo:atributo'
+
+    Args:
+        target: Referência no formato 'pacote.modulo:Classe'
+
+    Returns:
+        Objeto referenciado
+    """
+    module_name, _, attribute = target.partition(':')
+    obj = importlib.import_module(module_name)
+    for part in filter(None, attribute.split('.')):
+        obj = getattr(obj, part)
+    return obj
+
+
+class ServiceRegistry:
+    """
+    Registro thread-safe de serviços AWS com carregamento sob demanda
+
+    Cada serviço é registrado por uma classe, uma referência 'modulo:Classe'
+    ou um entry point; a classe só é importada na primeira resolução.
+    """
+
+    def __init__(self, load_entry_points: bool = True):
+        """
+        Inicializa o registro com os serviços nativos
+
+        Args:
+            load_entry_points: Se True, descobre serviços de terceiros pelo
+                grupo de entry points 'aws_agent.services'
+        """
+        self._lock = threading.RLock()
+        self._targets: Dict[str, Any] = dict(BUILTIN_SERVICES)
+        self._classes: Dict[str, Type[BaseAWSService]] = {}
+        self._entry_points_loaded = not load_entry_points
+
+    def _load_entry_points(self) -> None:
+        """Descobre os serviços de terceiros (sem importá-los)"""
+        with self._lock:
+            if self._entry_points_loaded:
+                return
+            self._entry_points_loaded = True
+
+            try:
+                from importlib import metadata
+
+                entry_points = metadata.entry_points()
+                if hasattr(entry_points, 'select'):
+                    group = entry_points.select(group=ENTRY_POINT_GROUP)
+                else:
+                    # Python 3.9: entry_points() retorna um dicionário por grupo
+                    group = entry_points.get(ENTRY_POINT_GROUP, [])
+            except Exception as e:
+                logger.error(f"Erro ao descobrir serviços de terceiros: {e}")
+                return
+
+            for entry_point in group:
+                if entry_point.name in self._targets:
+                    logger.warning(
+                        f"Serviço '{entry_point.name}' já registrado; "
+                        f"entry point '{entry_point.value}' ignorado"
+                    )
+                    continue
+                self._targets[entry_point.name] = entry_point
+
+    def register(self, name: str,
+                 target: Union[str, Type[BaseAWSService]]) -> None:
+        """
+        Registra (ou substitui) um serviço
+
+        Args:
+            name: Nome do serviço (ex: 'rds')
+            target: Classe do serviço ou referência 'modulo:Classe'
+        """
+        with self._lock:
+            self._targets[name] = target
+            self._classes.pop(name, None)
+
+    def unregister(self, name: str) -> bool:
+        """
+        Remove um serviço do registro
+
+        Args:
+            name: Nome do serviço
+
+        Returns:
+            True se o serviço estava registrado
+        """
+        self._load_entry_points()
+        with self._lock:
+            self._classes.pop(name, None)
+            return self._targets.pop(name, None) is not None
+
+    def names(self) -> List[str]:
+        """
+        Lista os serviços registrados
+
+        Returns:
+            Nomes dos serviços
+        """
+        self._load_entry_points()
+        with self._lock:
+            return list(self._targets)
+
+    def __contains__(self, name: object) -> bool:
+        with self._lock:
+            if name in self._targets:
+                return True
+        self._load_entry_points()
+        with self._lock:
+            return name in self._targets
+
+    def resolve(self, name: str) -> Type[BaseAWSService]:
+        """
+        Obtém a classe de um serviço, importando-a se necessário
+
+        Args:
+            name: Nome do serviço
+
+        Returns:
+            Classe do serviço
+
+        Raises:
+            ValueError: Se o serviço não estiver registrado
+            TypeError: Se o alvo registrado não for um BaseAWSService
+        """
+        with self._lock:
+            service_class = self._classes.get(name)
+            if service_class is not None:
+                return service_class
+
+        if name not in self:
+            raise ValueError(f"Serviço '{name}' não encontrado")
+
+        with self._lock:
+            service_class = self._classes.get(name)
+            if service_class is not None:
+                return service_class
+
+            target = self._targets[name]
+            if isinstance(target, str):
+                service_class = _import_target(target)
+            elif isinstance(target, type):
+                service_class = target
+            else:
+                service_class = target.load()
+
+            if not (isinstance(service_class, type) and issubclass(service_class, BaseAWSService)):
+                raise TypeError(f"Serviço '{name}' não é uma subclasse de BaseAWSService")
+
+            self._classes[name] = service_class
+            return service_class
+
+    def create(self, name: str, session: boto3.Session,
+               region: Optional[str] = None) -> BaseAWSService:
+        """
+        Instancia um serviço para uma sessão
+
+        Args:
+            name: Nome do serviço
+            session: Sessão boto3 autenticada
+            region: Região do serviço
+
+        Returns:
+            Instância do serviço
+        """
+        return self.resolve(name)(session, region)
+
+
+class LazyServiceMap(MutableMapping):
+    """
+    Mapeamento nome -> serviço que instancia cada serviço no primeiro acesso
+
+    Enquanto não estiver vinculado a uma sessão, o mapeamento fica vazio.
+    """
+
+    def __init__(self, registry: Optional[ServiceRegistry] = None):
+        """
+        Inicializa o mapeamento
+
+        Args:
+            registry: Registro de serviços (usa o registro global se não especificado)
+        """
+        self._registry = registry or get_service_registry()
+        self._lock = threading.RLock()
+        self._session: Optional[boto3.Session] = None
+        self._region: Optional[str] = None
+        self._instances: Dict[str, BaseAWSService] = {}
+
+    def bind(self, session: boto3.Session, region: Optional[str] = None) -> None:
+        """
+        Vincula o mapeamento a uma sessão, descartando instâncias anteriores
+
+        Args:
+            session: Sessão boto3 autenticada
+            region: Região dos serviços
+        """
+        with self._lock:
+            self._session = session
+            self._region = region
+            self._instances.clear()
+
+    def clear(self) -> None:
+        """Desvincula a sessão e descarta todas as instâncias"""
+        with self._lock:
+            self._session = None
+            self._region = None
+            self._instances.clear()
+
+    def loaded(self) -> List[str]:
+        """
+        Lista os serviços já instanciados
+
+        Returns:
+            Nomes dos serviços instanciados
+        """
+        with self._lock:
+            return list(self._instances)
+
+    def __getitem__(self, name: str) -> BaseAWSService:
+        with self._lock:
+            service = self._instances.get(name)
+            if service is not None:
+                return service
+
+            if self._session is None or name not in self._registry:
+                raise KeyError(name)
+
+            service = self._registry.create(name, self._session, self._region)
+            self._instances[name] = service
+            return service
+
+    def __setitem__(self, name: str, service: BaseAWSService) -> None:
+        with self._lock:
+            self._instances[name] = service
+
+    def __delitem__(self, name: str) -> None:
+        with self._lock:
+            del self._instances[name]
+
+    def __contains__(self, name: object) -> bool:
+        # Não instancia o serviço apenas para testar a existência
+        with self._lock:
+            if name in self._instances:
+                return True
+            return self._session is not None and name in self._registry
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = list(self._instances)
+            if self._session is not None:
+                names += [name for name in self._registry.names() if name not in self._instances]
+        return iter(names)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(loaded={self.loaded()!r})"
+
+
+# Instância global do registro
+_registry_instance: Optional[ServiceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_service_registry() -> ServiceRegistry:
+    """
+    Obtém a instância global do registro de serviços
+
+    Returns:
+        Instância do registro
+    """
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                _registry_instance = ServiceRegistry()
+    return _registry_instance
+
+
+def reset_service_registry() -> None:
+    """Reset do registro global (útil para testes)"""
+    global _registry_instance
+    _registry_instance = None
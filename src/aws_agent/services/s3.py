@@ -3,13 +3,114 @@ Serviço S3 para gerenciamento de buckets e objetos
 """
 
 import boto3
-from botocore.exceptions import ClientError
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Any, Tuple, Union
+from datetime import datetime, timedelta, timezone
+import base64
+import fnmatch
+import hashlib
+import io
+import json
+import mimetypes
+import multiprocessing
 import os
+import queue
+import random
+import string
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from .base import BaseAWSService
+from .s3_dedup import DuplicateIndex, checksum_verifier, full_object_checksum, iter_duplicate_groups
+from .s3_inventory import (InventoryAggregate, InventoryManifest, aggregate_inventory_file,
+                           inventory_prefix_tree, latest_manifest_key, parse_manifest)
+from .s3_lifecycle import ObjectArrays, StoragePrice, compare_lifecycle, inventory_object_arrays
+from .s3_ranged import S3ObjectReader, byte_ranges, get_range
+from .s3_sync import (SyncAction, adjusted_chunksize, build_sync_plan, etag_reproducible,
+                      normalize_prefix, scan_local)
+from .s3_transfer import BufferReader, StreamFiller, TransferProgress, build_transfer_config
+from .s3_usage import PrefixTree
+from ..core.config import get_config
+from ..core.inventory import get_inventory_cache, invalidates
+from ..core.upload_journal import get_upload_journal
+from ..utils.helpers import iter_concurrent
+
+
+# Caracteres usados para amostrar pontos de divisão do espaço de chaves
+# (caracteres seguros para chaves S3, em ordem binária)
+_SPLIT_CHARS = sorted(string.digits + string.ascii_letters + "!-_.*'()/")
+
+# Limites da descoberta de partições
+_MAX_DISCOVERY_DEPTH = 4
+_SPLIT_ROUNDS = 4
+_MAX_SPLIT_PROBES = 512
+# Sondas por rodada para cada partição desejada (cada sonda revela no máximo um ponto)
+_SPLIT_PROBES_PER_TARGET = 2
+
+# Páginas mantidas em memória por partição durante a listagem paralela
+_PARTITION_QUEUE_PAGES = 4
+
+# Exclusão em lote: máximo de chaves por DeleteObjects e novas tentativas
+DELETE_BATCH_SIZE = 1000
+_DELETE_MAX_RETRIES = 8
+
+# Novas tentativas de cada faixa em downloads por faixas
+_RANGE_MAX_RETRIES = 3
+
+# Backoff exponencial com jitter entre novas tentativas
+_BACKOFF_BASE = 0.5
+_BACKOFF_MAX = 20.0
+
+# Erros transitórios (throttling e falhas do serviço) que justificam nova tentativa;
+# respostas de HEAD não têm corpo e trazem apenas o status HTTP como código
+_RETRYABLE_ERRORS = (
+    'SlowDown', 'Throttling', 'ThrottlingException', 'RequestLimitExceeded',
+    'ServiceUnavailable', 'InternalError', 'RequestTimeout', '500', '503',
+)
+
+# Cópia no servidor: limite do CopyObject e tamanho padrão das partes do UploadPartCopy
+COPY_OBJECT_LIMIT = 5 * 1024 * 1024 * 1024
+_COPY_PART_SIZE = 256 * 1024 * 1024
+
+# Campos do objeto de origem repassados ao multipart upload (o CopyObject os copia sozinho)
+_COPIED_HEADERS = ('ContentType', 'ContentEncoding', 'ContentLanguage', 'ContentDisposition',
+                   'CacheControl', 'Expires', 'Metadata', 'WebsiteRedirectLocation')
+
+# Métricas diárias de armazenamento publicadas pelo S3 no CloudWatch
+_STORAGE_METRICS = ('BucketSizeBytes', 'NumberOfObjects')
+_METRIC_QUERIES_PER_CALL = 500
+_METRIC_PERIOD = 86400
+# As métricas são publicadas uma vez por dia, com atraso de até dois dias
+_METRIC_LOOKBACK = timedelta(days=3)
+
+# Consultas HEAD: novas tentativas e objetos por consulta ao cache de metadados
+_HEAD_MAX_RETRIES = 5
+_METADATA_CACHE_BATCH = 500
+
+# Modos de resolução da região dos buckets em list_buckets
+REGION_RESOLUTION_MODES = ('off', 'lazy', 'eager')
+
+
+class _KeyRange(NamedTuple):
+    """Faixa de chaves: prefixo, chave exclusiva inicial e chave inclusiva final"""
+    prefix: str
+    start_after: Optional[str] = None
+    end: Optional[str] = None
+    
+    @property
+    def lower_bound(self) -> str:
+        return self.start_after or self.prefix
+
+
+def _backoff(attempt: int) -> None:
+    """Aguarda antes da nova tentativa de número attempt (1, 2, ...)"""
+    delay = min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** (attempt - 1))
+    time.sleep(random.uniform(delay / 2, delay))
 
 
 class S3Service(BaseAWSService):
@@ -17,10 +118,13 @@ class S3Service(BaseAWSService):
     Serviço para operações com Amazon S3
     """
     
+    is_global = True
+    
     def __init__(self, session: boto3.Session, region: str = "us-east-1"):
+        # Clientes são criados sob demanda no primeiro uso
         super().__init__(session, region)
-        self.client = session.client('s3', region_name=region)
-        self.resource = session.resource('s3', region_name=region)
+        # Ajustes de transferência que substituem a configuração global
+        self.transfer_settings: Dict[str, Any] = {}
     
     @property
     def service_name(self) -> str:
@@ -39,9 +143,9 @@ class S3Service(BaseAWSService):
             Lista de recursos
         """
         if resource_type == 'buckets':
-            return self.list_buckets()
+            return self.list_buckets(**kwargs)
         elif resource_type == 'objects':
-            bucket_name = kwargs.get('bucket_name')
+            bucket_name = kwargs.pop('bucket_name', None)
             if not bucket_name:
                 raise ValueError("bucket_name é obrigatório para listar objetos")
             return self.list_objects(bucket_name, **kwargs)
@@ -70,30 +174,245 @@ class S3Service(BaseAWSService):
         else:
             raise ValueError(f"Tipo de recurso '{resource_type}' não suportado")
     
-    def list_buckets(self) -> List[Dict[str, Any]]:
+    def iter_buckets(self, resolve_regions: str = 'eager',
+                     max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre os buckets S3
+        
+        A região de cada bucket vem da própria resposta do ListBuckets
+        (BucketRegion) ou do cache persistente de regiões; com as regiões em
+        cache a listagem é uma única chamada. No modo 'eager' as regiões
+        desconhecidas são resolvidas com GetBucketLocation em paralelo e
+        gravadas no cache.
+        
+        Args:
+            resolve_regions: 'off' (apenas BucketRegion), 'lazy' (regiões
+                conhecidas; demais como None, ver get_bucket_region) ou
+                'eager' (resolve todas as regiões)
+            max_workers: Número máximo de consultas simultâneas (usa Config.max_workers)
+            
+        Returns:
+            Iterador de buckets (name, creation_date, region)
+            
+        Raises:
+            ClientError: Se o ListBuckets falhar
+        """
+        if resolve_regions not in REGION_RESOLUTION_MODES:
+            raise ValueError(f"resolve_regions deve ser um de {REGION_RESOLUTION_MODES}")
+        
+        response = self.client.list_buckets()
+        
+        listed = {bucket['Name']: bucket.get('BucketRegion') for bucket in response['Buckets']}
+        regions = {name: region for name, region in listed.items() if region}
+        
+        if resolve_regions != 'off':
+            self._store_bucket_regions(regions)
+            missing = [name for name in listed if name not in regions]
+            regions.update(self._cached_bucket_regions(missing))
+            
+            missing = [name for name in listed if name not in regions]
+            if resolve_regions == 'eager' and missing:
+                resolved = {}
+                for name, region, error in iter_concurrent(self._get_bucket_region, missing,
+                                                           max_workers or get_config().max_workers):
+                    if error is None and region != 'unknown':
+                        resolved[name] = region
+                self._store_bucket_regions(resolved)
+                regions.update(resolved)
+                # Sem permissão de GetBucketLocation a região fica desconhecida
+                regions.update({name: 'unknown' for name in missing if name not in resolved})
+        
+        for bucket in response['Buckets']:
+            yield {
+                'name': bucket['Name'],
+                'creation_date': bucket['CreationDate'],
+                'region': regions.get(bucket['Name'])
+            }
+    
+    def list_buckets(self, resolve_regions: str = 'eager',
+                     max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Lista todos os buckets S3
+        Lista todos os buckets S3 (ver iter_buckets)
         
+        Args:
+            resolve_regions: 'off', 'lazy' ou 'eager' (ver iter_buckets)
+            max_workers: Número máximo de consultas simultâneas (usa Config.max_workers)
+            
         Returns:
             Lista de buckets
         """
         try:
-            response = self.client.list_buckets()
-            buckets = []
-            
-            for bucket in response['Buckets']:
-                bucket_info = {
-                    'name': bucket['Name'],
-                    'creation_date': bucket['CreationDate'],
-                    'region': self._get_bucket_region(bucket['Name'])
-                }
-                buckets.append(bucket_info)
-                
-            return buckets
+            return list(self.iter_buckets(resolve_regions, max_workers))
         except ClientError as e:
             self.logger.error(f"Erro ao listar buckets: {e}")
             return []
     
+    def get_bucket_region(self, bucket_name: str) -> str:
+        """
+        Obtém a região de um bucket usando o cache persistente de regiões
+        
+        Args:
+            bucket_name: Nome do bucket
+            
+        Returns:
+            Região do bucket ('unknown' se não for possível determinar)
+        """
+        cached = self._cached_bucket_regions([bucket_name])
+        if bucket_name in cached:
+            return cached[bucket_name]
+        
+        region = self._get_bucket_region(bucket_name)
+        if region != 'unknown':
+            self._store_bucket_regions({bucket_name: region})
+        return region
+    
+    def _cached_bucket_regions(self, bucket_names: List[str]) -> Dict[str, str]:
+        """Regiões conhecidas no cache persistente (vazio se o cache falhar)"""
+        if not bucket_names:
+            return {}
+        try:
+            return get_inventory_cache().get_bucket_regions(bucket_names)
+        except Exception as e:
+            self.logger.warning(f"Cache de regiões de buckets indisponível: {e}")
+            return {}
+    
+    def _store_bucket_regions(self, regions: Dict[str, str]) -> None:
+        """Grava regiões no cache persistente (falhas não afetam a operação)"""
+        try:
+            get_inventory_cache().set_bucket_regions(regions)
+        except Exception as e:
+            self.logger.warning(f"Erro ao gravar cache de regiões de buckets: {e}")
+    
+    def get_bucket_statistics(self, bucket_names: Optional[List[str]] = None, exact: bool = False,
+                              fallback: bool = True,
+                              max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Obtém número de objetos e tamanho de cada bucket, por classe de armazenamento
+        
+        Por padrão os valores vêm das métricas diárias de armazenamento do
+        CloudWatch (BucketSizeBytes e NumberOfObjects): um ListMetrics por
+        região descobre as séries existentes e um GetMetricData a cada 500
+        séries obtém os valores, qualquer que seja o número de objetos. Os
+        valores refletem o último dia publicado.
+        
+        Com exact=True (ou, com fallback, para buckets sem métricas, como
+        buckets criados há menos de um dia ou em regiões sem acesso ao
+        CloudWatch) os valores são somados a partir da listagem paralela do
+        bucket, sem manter os objetos em memória.
+        
+        Args:
+            bucket_names: Buckets a consultar (todos se não especificado)
+            exact: Se True, soma a listagem de todos os buckets em vez de usar o CloudWatch
+            fallback: Se True, lista os buckets sem métricas no CloudWatch
+            max_workers: Número máximo de regiões/buckets consultados simultaneamente
+            
+        Returns:
+            Dicionário bucket -> {objects, size, storage_classes (classe -> bytes,
+            com os nomes do CloudWatch, ex: 'StandardStorage', ou da listagem,
+            ex: 'STANDARD'), source ('cloudwatch' ou 'listing'), timestamp}
+        """
+        max_workers = max_workers or get_config().max_workers
+        
+        if bucket_names is None:
+            buckets = self.list_buckets(resolve_regions='off' if exact else 'eager',
+                                        max_workers=max_workers)
+            regions = {bucket['name']: bucket['region'] for bucket in buckets}
+        else:
+            regions = {name: None for name in bucket_names}
+        
+        statistics: Dict[str, Dict[str, Any]] = {}
+        if not exact:
+            # As métricas ficam na região de cada bucket
+            unresolved = [name for name, region in regions.items() if not region]
+            for name, region, _ in iter_concurrent(self.get_bucket_region, unresolved, max_workers):
+                regions[name] = region
+            
+            by_region: Dict[str, List[str]] = {}
+            for name, region in regions.items():
+                region = region if region and region != 'unknown' else self.region
+                by_region.setdefault(region, []).append(name)
+            
+            def fetch(region: str) -> Dict[str, Dict[str, Any]]:
+                return self._metric_statistics(region, by_region[region])
+            
+            for region, result, error in iter_concurrent(fetch, list(by_region), max_workers):
+                if error is not None:
+                    self.logger.error(f"Erro ao obter métricas do CloudWatch em '{region}': {error}")
+                    continue
+                statistics.update(result)
+        
+        missing = [name for name in regions if name not in statistics]
+        if missing and (exact or fallback):
+            for name, result, error in iter_concurrent(
+                    lambda name: self._listing_statistics(name, max_workers), missing, max_workers):
+                if error is not None:
+                    self.logger.error(f"Erro ao listar objetos no bucket '{name}': {error}")
+                    continue
+                statistics[name] = result
+        
+        return statistics
+    
+    def _metric_statistics(self, region: str, bucket_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Estatísticas de buckets de uma região a partir do CloudWatch; propaga erros"""
+        cloudwatch = self.get_client('cloudwatch', region)
+        wanted = set(bucket_names)
+        
+        # Apenas as combinações bucket/classe com dados recentes são consultadas
+        series = []
+        for metric_name in _STORAGE_METRICS:
+            paginator = cloudwatch.get_paginator('list_metrics')
+            for page in paginator.paginate(Namespace='AWS/S3', MetricName=metric_name):
+                for metric in page['Metrics']:
+                    dimensions = {d['Name']: d['Value'] for d in metric['Dimensions']}
+                    if dimensions.get('BucketName') in wanted and 'StorageType' in dimensions:
+                        series.append((metric, dimensions['BucketName'], dimensions['StorageType']))
+        
+        statistics: Dict[str, Dict[str, Any]] = {}
+        end = datetime.now(timezone.utc)
+        for offset in range(0, len(series), _METRIC_QUERIES_PER_CALL):
+            batch = series[offset:offset + _METRIC_QUERIES_PER_CALL]
+            queries = [
+                {'Id': f"m{index}", 'ReturnData': True,
+                 'MetricStat': {'Metric': metric, 'Period': _METRIC_PERIOD, 'Stat': 'Average'}}
+                for index, (metric, _, _) in enumerate(batch)
+            ]
+            paginator = cloudwatch.get_paginator('get_metric_data')
+            for page in paginator.paginate(MetricDataQueries=queries, StartTime=end - _METRIC_LOOKBACK,
+                                           EndTime=end, ScanBy='TimestampDescending'):
+                for data in page['MetricDataResults']:
+                    if not data['Values']:
+                        continue
+                    metric, bucket_name, storage_type = batch[int(data['Id'][1:])]
+                    entry = statistics.setdefault(bucket_name, {
+                        'objects': 0, 'size': 0, 'storage_classes': {},
+                        'source': 'cloudwatch', 'timestamp': None,
+                    })
+                    # Valores em ordem decrescente de data: o primeiro é o mais recente
+                    value, timestamp = int(data['Values'][0]), data['Timestamps'][0]
+                    if metric['MetricName'] == 'NumberOfObjects':
+                        entry['objects'] += value
+                    else:
+                        entry['size'] += value
+                        entry['storage_classes'][storage_type] = value
+                    if entry['timestamp'] is None or timestamp > entry['timestamp']:
+                        entry['timestamp'] = timestamp
+        
+        return statistics
+    
+    def _listing_statistics(self, bucket_name: str, max_workers: int) -> Dict[str, Any]:
+        """Estatísticas exatas de um bucket somando a listagem; propaga erros"""
+        objects = size = 0
+        storage_classes: Dict[str, int] = {}
+        for obj in self.iter_objects_parallel(bucket_name, max_workers=max_workers, ordered=False):
+            objects += 1
+            size += obj['size']
+            storage_classes[obj['storage_class']] = storage_classes.get(obj['storage_class'], 0) + obj['size']
+        return {
+            'objects': objects, 'size': size, 'storage_classes': storage_classes,
+            'source': 'listing', 'timestamp': datetime.now(timezone.utc),
+        }
+    
+    @invalidates('buckets')
     def create_bucket(self, bucket_name: str, region: Optional[str] = None) -> bool:
         """
         Cria um novo bucket S3
@@ -117,6 +436,7 @@ class S3Service(BaseAWSService):
                     CreateBucketConfiguration={'LocationConstraint': region}
                 )
             
+            self._store_bucket_regions({bucket_name: region})
             self.logger.info(f"Bucket '{bucket_name}' criado com sucesso")
             return True
             
@@ -124,6 +444,7 @@ class S3Service(BaseAWSService):
             self.logger.error(f"Erro ao criar bucket '{bucket_name}': {e}")
             return False
     
+    @invalidates('buckets', 'objects')
     def delete_bucket(self, bucket_name: str, force: bool = False) -> bool:
         """
         Remove um bucket S3
@@ -141,6 +462,12 @@ class S3Service(BaseAWSService):
                 self.empty_bucket(bucket_name)
             
             self.client.delete_bucket(Bucket=bucket_name)
+            try:
+                # O nome pode ser recriado por outra conta em outra região
+                get_inventory_cache().forget_bucket_region(bucket_name)
+                get_inventory_cache().forget_object_metadata(bucket_name)
+            except Exception as e:
+                self.logger.warning(f"Erro ao atualizar cache de regiões de buckets: {e}")
             self.logger.info(f"Bucket '{bucket_name}' removido com sucesso")
             return True
             
@@ -148,163 +475,2059 @@ class S3Service(BaseAWSService):
             self.logger.error(f"Erro ao remover bucket '{bucket_name}': {e}")
             return False
     
-    def empty_bucket(self, bucket_name: str) -> bool:
+    @invalidates('objects')
+    def empty_bucket(self, bucket_name: str, max_workers: Optional[int] = None,
+                     progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
         """
         Remove todos os objetos de um bucket
         
+        Em buckets com versionamento (ativo ou suspenso) remove todas as
+        versões e marcadores de exclusão. As chaves são listadas por partições
+        em paralelo e removidas em lotes simultâneos (ver delete_objects).
+        
         Args:
             bucket_name: Nome do bucket
+            max_workers: Número máximo de operações simultâneas (usa Config.max_workers)
+            progress: Função chamada com os contadores após cada lote
             
         Returns:
             True se esvaziado com sucesso
         """
         try:
-            bucket = self.resource.Bucket(bucket_name)
-            bucket.objects.all().delete()
-            
-            # Remove versões se versionamento estiver habilitado
-            bucket.object_versions.all().delete()
+            versioned = 'Status' in self.client.get_bucket_versioning(Bucket=bucket_name)
+            if versioned:
+                items = self.iter_object_versions(bucket_name, max_workers=max_workers)
+            else:
+                items = self.iter_objects_parallel(bucket_name, max_workers=max_workers, ordered=False)
             
-            self.logger.info(f"Bucket '{bucket_name}' esvaziado com sucesso")
-            return True
+            result = self.delete_objects(bucket_name, items, max_workers=max_workers,
+                                         progress=progress)
             
-        except ClientError as e:
+        except (ClientError, BotoCoreError) as e:
             self.logger.error(f"Erro ao esvaziar bucket '{bucket_name}': {e}")
             return False
+        
+        if result['failed']:
+            self.logger.error(f"Bucket '{bucket_name}': {len(result['failed'])} objetos não removidos "
+                              f"(ex: {result['failed'][0]['key']}: {result['failed'][0]['message']})")
+            return False
+        
+        self.logger.info(f"Bucket '{bucket_name}' esvaziado com sucesso ({result['deleted']} objetos)")
+        return True
     
-    def list_objects(self, bucket_name: str, prefix: str = "", 
-                    max_keys: int = 1000) -> List[Dict[str, Any]]:
+    @invalidates('objects')
+    def delete_objects(self, bucket_name: str, objects: Iterable[Union[str, Dict[str, Any]]],
+                       max_workers: Optional[int] = None,
+                       progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
-        Lista objetos em um bucket
+        Remove objetos em lotes de até 1000 chaves
+        
+        As chaves são consumidas do iterável à medida que os lotes ficam
+        prontos, então listagens podem alimentar a exclusão sem serem
+        carregadas inteiras em memória. Os lotes são enviados em paralelo;
+        throttling e falhas transitórias são repetidos com backoff
+        exponencial, e os demais erros são registrados por chave.
         
         Args:
             bucket_name: Nome do bucket
-            prefix: Prefixo para filtrar objetos
-            max_keys: Número máximo de objetos a retornar
+            objects: Chaves ou dicionários com 'key' e opcionalmente 'version_id'
+            max_workers: Número máximo de lotes simultâneos (usa Config.max_workers)
+            progress: Função chamada com os contadores após cada lote
             
         Returns:
-            Lista de objetos
+            Contadores (deleted, batches) e lista de falhas (key, version_id, code, message)
         """
-        try:
-            response = self.client.list_objects_v2(
-                Bucket=bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
-            )
-            
-            objects = []
-            for obj in response.get('Contents', []):
-                object_info = {
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified'],
-                    'etag': obj['ETag'],
-                    'storage_class': obj.get('StorageClass', 'STANDARD')
-                }
-                objects.append(object_info)
-                
-            return objects
+        max_workers = max_workers or get_config().max_workers
+        result: Dict[str, Any] = {'deleted': 0, 'batches': 0, 'failed': []}
+        
+        def batches() -> Iterator[List[Dict[str, str]]]:
+            batch = []
+            for obj in objects:
+                if isinstance(obj, str):
+                    entry = {'Key': obj}
+                else:
+                    entry = {'Key': obj['key']}
+                    if obj.get('version_id'):
+                        entry['VersionId'] = obj['version_id']
+                batch.append(entry)
+                if len(batch) == DELETE_BATCH_SIZE:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        
+        def collect(future) -> None:
+            deleted, errors = future.result()
+            result['deleted'] += deleted
+            result['batches'] += 1
+            result['failed'].extend(errors)
+            if progress is not None:
+                progress({'deleted': result['deleted'], 'batches': result['batches'],
+                          'failed': len(result['failed'])})
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            for batch in batches():
+                # Limita os lotes pendentes: a listagem não corre à frente da exclusão
+                if len(in_flight) >= max_workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                in_flight.add(executor.submit(self._delete_batch, bucket_name, batch))
             
-        except ClientError as e:
-            self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
-            return []
+            for future in in_flight:
+                collect(future)
+        
+        return result
     
-    def upload_file(self, file_path: str, bucket_name: str, 
-                   object_key: Optional[str] = None) -> bool:
+    @invalidates('objects')
+    def copy_object(self, source_bucket: str, source_key: str, dest_bucket: str,
+                    dest_key: Optional[str] = None, source_service: Optional['S3Service'] = None,
+                    extra_args: Optional[Dict[str, Any]] = None,
+                    part_size: Optional[int] = None,
+                    max_workers: Optional[int] = None) -> bool:
         """
-        Faz upload de um arquivo para S3
+        Copia um objeto no próprio S3, sem passar os dados por esta máquina
+        
+        Objetos de até 5 GB usam CopyObject; maiores são copiados com
+        UploadPartCopy em partes paralelas. A origem é conferida pelo ETag
+        (CopySourceIfMatch), então um objeto substituído durante a cópia gera
+        erro em vez de um objeto misturado.
+        
+        Para copiar entre contas, este serviço deve ser o da conta de destino
+        e source_service o da conta de origem (usado para consultar a origem);
+        o bucket de origem precisa conceder leitura à conta de destino (ver
+        grant_cross_account_read e AWSAgent.copy_across_accounts).
         
         Args:
-            file_path: Caminho do arquivo local
-            bucket_name: Nome do bucket
-            object_key: Chave do objeto (se None, usa o nome do arquivo)
+            source_bucket: Bucket de origem
+            source_key: Chave de origem
+            dest_bucket: Bucket de destino
+            dest_key: Chave de destino (usa a chave de origem se não especificada)
+            source_service: Serviço S3 da conta de origem (usa este serviço se não especificado)
+            extra_args: Parâmetros adicionais do destino (ex: StorageClass, ServerSideEncryption)
+            part_size: Tamanho das partes em cópias multipart (padrão: 256 MB)
+            max_workers: Número máximo de partes simultâneas (usa s3_max_concurrency)
             
         Returns:
-            True se upload foi bem-sucedido
+            True se copiado com sucesso
         """
         try:
-            object_key = object_key or Path(file_path).name
-            
-            self.client.upload_file(file_path, bucket_name, object_key)
-            self.logger.info(f"Arquivo '{file_path}' enviado para '{bucket_name}/{object_key}'")
+            self._copy(source_bucket, source_key, dest_bucket, dest_key or source_key,
+                       source_service or self, extra_args, part_size, max_workers)
+            self.logger.info(f"Objeto '{source_bucket}/{source_key}' copiado para "
+                             f"'{dest_bucket}/{dest_key or source_key}'")
             return True
             
-        except ClientError as e:
-            self.logger.error(f"Erro ao fazer upload do arquivo: {e}")
+        except (ClientError, BotoCoreError) as e:
+            self.logger.error(f"Erro ao copiar objeto '{source_bucket}/{source_key}': {e}")
             return False
     
-    def download_file(self, bucket_name: str, object_key: str, 
-                     file_path: str) -> bool:
+    @invalidates('objects')
+    def copy_prefix(self, source_bucket: str, source_prefix: str, dest_bucket: str,
+                    dest_prefix: Optional[str] = None,
+                    source_service: Optional['S3Service'] = None,
+                    extra_args: Optional[Dict[str, Any]] = None,
+                    max_workers: Optional[int] = None,
+                    progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
         """
-        Faz download de um objeto do S3
+        Copia todos os objetos de um prefixo no próprio S3, em paralelo
+        
+        A listagem da origem (particionada, ver iter_objects_parallel) alimenta
+        um pool de cópias com número limitado de cópias pendentes.
         
         Args:
-            bucket_name: Nome do bucket
-            object_key: Chave do objeto
-            file_path: Caminho local para salvar o arquivo
+            source_bucket: Bucket de origem
+            source_prefix: Prefixo de origem ('' copia o bucket inteiro)
+            dest_bucket: Bucket de destino
+            dest_prefix: Prefixo de destino (usa o prefixo de origem se não especificado)
+            source_service: Serviço S3 da conta de origem (ver copy_object)
+            extra_args: Parâmetros adicionais do destino (ex: StorageClass)
+            max_workers: Número máximo de cópias simultâneas (usa Config.max_workers)
+            progress: Função chamada com os contadores após cada objeto
             
         Returns:
-            True se download foi bem-sucedido
+            Contadores (copied, bytes) e lista de falhas (key, error)
         """
+        source_service = source_service or self
+        max_workers = max_workers or get_config().max_workers
+        dest_prefix = source_prefix if dest_prefix is None else dest_prefix
+        result: Dict[str, Any] = {'copied': 0, 'bytes': 0, 'failed': []}
+        
+        def copy(obj: Dict[str, Any]) -> None:
+            dest_key = dest_prefix + obj['key'][len(source_prefix):]
+            self._copy(source_bucket, obj['key'], dest_bucket, dest_key, source_service,
+                       extra_args, None, None, size=obj['size'], etag=obj['etag'])
+        
+        def collect(future, obj: Dict[str, Any]) -> None:
+            try:
+                future.result()
+                result['copied'] += 1
+                result['bytes'] += obj['size']
+            except (ClientError, BotoCoreError) as e:
+                result['failed'].append({'key': obj['key'], 'error': str(e)})
+            if progress is not None:
+                progress({'copied': result['copied'], 'bytes': result['bytes'],
+                          'failed': len(result['failed'])})
+        
+        listing = source_service.iter_objects_parallel(source_bucket, source_prefix,
+                                                       max_workers=max_workers, ordered=False)
         try:
-            # Cria diretório se não existir
-            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                in_flight: Dict[Any, Dict[str, Any]] = {}
+                for obj in listing:
+                    if obj['key'].endswith('/') and not obj['size']:
+                        continue
+                    if len(in_flight) >= max_workers * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future, in_flight.pop(future))
+                    in_flight[executor.submit(copy, obj)] = obj
+                
+                for future, obj in in_flight.items():
+                    collect(future, obj)
+        except ClientError as e:
+            self.logger.error(f"Erro ao listar objetos no bucket '{source_bucket}': {e}")
+            result['failed'].append({'key': source_prefix, 'error': str(e)})
+        
+        self.logger.info(f"Cópia de '{source_bucket}/{source_prefix}' para '{dest_bucket}/{dest_prefix}': "
+                         f"{result['copied']} objetos, {len(result['failed'])} falhas")
+        return result
+    
+    def _copy(self, source_bucket: str, source_key: str, dest_bucket: str, dest_key: str,
+              source_service: 'S3Service', extra_args: Optional[Dict[str, Any]],
+              part_size: Optional[int], max_workers: Optional[int],
+              size: Optional[int] = None, etag: Optional[str] = None) -> None:
+        """Copia um objeto (CopyObject ou UploadPartCopy); propaga erros"""
+        head = None
+        if size is None or size > COPY_OBJECT_LIMIT:
+            head = source_service.client.head_object(Bucket=source_bucket, Key=source_key)
+            size, etag = head['ContentLength'], head['ETag']
+        
+        copy_source = {'Bucket': source_bucket, 'Key': source_key}
+        
+        if size <= COPY_OBJECT_LIMIT:
+            self.client.copy_object(CopySource=copy_source, CopySourceIfMatch=etag,
+                                    Bucket=dest_bucket, Key=dest_key, **(extra_args or {}))
+            return
+        
+        # O multipart upload não herda os metadados da origem
+        params = {field: head[field] for field in _COPIED_HEADERS if head.get(field)}
+        params.update(extra_args or {})
+        upload_id = self.client.create_multipart_upload(Bucket=dest_bucket, Key=dest_key,
+                                                        **params)['UploadId']
+        part_size = adjusted_chunksize(size, part_size or _COPY_PART_SIZE)
+        
+        def copy_part(part: Tuple[int, Tuple[int, int]]) -> Dict[str, Any]:
+            part_number, (start, end) = part
+            response = self.client.upload_part_copy(
+                Bucket=dest_bucket, Key=dest_key, UploadId=upload_id, PartNumber=part_number,
+                CopySource=copy_source, CopySourceRange=f"bytes={start}-{end}",
+                CopySourceIfMatch=etag
+            )
+            return {'PartNumber': part_number, 'ETag': response['CopyPartResult']['ETag']}
+        
+        try:
+            parts = []
+            numbered = list(enumerate(byte_ranges(size, part_size), start=1))
+            workers = max_workers or self.get_transfer_config().max_request_concurrency
+            for _, part, error in iter_concurrent(copy_part, numbered, workers):
+                if error is not None:
+                    raise error
+                parts.append(part)
             
-            self.client.download_file(bucket_name, object_key, file_path)
-            self.logger.info(f"Arquivo '{bucket_name}/{object_key}' baixado para '{file_path}'")
-            return True
+            self.client.complete_multipart_upload(
+                Bucket=dest_bucket, Key=dest_key, UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])}
+            )
+        except Exception:
+            # Falha ao abortar não pode esconder o erro original da cópia
+            try:
+                self.client.abort_multipart_upload(Bucket=dest_bucket, Key=dest_key,
+                                                   UploadId=upload_id)
+            except (ClientError, BotoCoreError) as abort_error:
+                self.logger.warning(f"Erro ao abortar multipart upload {upload_id}: {abort_error}")
+            raise
+    
+    def grant_cross_account_read(self, bucket_name: str, account_id: str, prefix: str = "") -> bool:
+        """
+        Concede a outra conta leitura de um bucket (ou prefixo) pela política do bucket
+        
+        Permite que a conta de destino de uma cópia leia e liste a origem.
+        A declaração tem Sid próprio e é substituída em chamadas repetidas;
+        as demais declarações da política são preservadas. Objetos
+        criptografados com chaves KMS da conta de origem exigem também
+        permissão de uso da chave.
+        
+        Args:
+            bucket_name: Bucket de origem (desta conta)
+            account_id: ID da conta que receberá acesso
+            prefix: Prefixo liberado ('' libera o bucket inteiro)
             
+        Returns:
+            True se a política foi aplicada
+        """
+        try:
+            policy = json.loads(self.client.get_bucket_policy(Bucket=bucket_name)['Policy'])
         except ClientError as e:
-            self.logger.error(f"Erro ao fazer download do arquivo: {e}")
-            return False
+            if e.response['Error']['Code'] != 'NoSuchBucketPolicy':
+                # Sem ler a política atual não é seguro sobrescrevê-la
+                self.logger.error(f"Erro ao obter política do bucket: {e}")
+                return False
+            policy = {'Version': '2012-10-17', 'Statement': []}
+        
+        sid = f"AwsAgentCrossAccountRead{account_id}"
+        principal = {'AWS': f"arn:aws:iam::{account_id}:root"}
+        list_statement: Dict[str, Any] = {
+            'Sid': f"{sid}List", 'Effect': 'Allow', 'Principal': principal,
+            'Action': 's3:ListBucket', 'Resource': f"arn:aws:s3:::{bucket_name}",
+        }
+        if prefix:
+            list_statement['Condition'] = {'StringLike': {'s3:prefix': f"{prefix}*"}}
+        
+        statements = [statement for statement in policy.get('Statement', [])
+                      if statement.get('Sid') not in (sid, f"{sid}List")]
+        statements += [
+            {
+                'Sid': sid, 'Effect': 'Allow', 'Principal': principal,
+                'Action': ['s3:GetObject', 's3:GetObjectVersion', 's3:GetObjectTagging'],
+                'Resource': f"arn:aws:s3:::{bucket_name}/{prefix}*",
+            },
+            list_statement,
+        ]
+        policy['Statement'] = statements
+        return self.set_bucket_policy(bucket_name, policy)
     
-    def delete_object(self, bucket_name: str, object_key: str) -> bool:
+    def list_multipart_uploads(self, bucket_names: Optional[List[str]] = None,
+                               older_than: Optional[float] = None,
+                               max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Remove um objeto do S3
+        Lista multipart uploads incompletos em vários buckets em paralelo
+        
+        Partes de uploads incompletos são cobradas até o upload ser concluído
+        ou abortado.
         
         Args:
-            bucket_name: Nome do bucket
-            object_key: Chave do objeto
+            bucket_names: Buckets a consultar (todos se não especificado)
+            older_than: Apenas uploads iniciados há mais de tantas horas
+            max_workers: Número máximo de consultas simultâneas (usa Config.max_workers)
             
         Returns:
-            True se removido com sucesso
+            Lista de uploads (bucket, key, upload_id, initiated, in_journal)
         """
-        try:
-            self.client.delete_object(Bucket=bucket_name, Key=object_key)
-            self.logger.info(f"Objeto '{bucket_name}/{object_key}' removido")
-            return True
+        if bucket_names is None:
+            bucket_names = [bucket['name'] for bucket in self.list_buckets(resolve_regions='off')]
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=older_than) if older_than else None
+        journaled = {upload['upload_id'] for upload in get_upload_journal().list_uploads()}
+        
+        def list_bucket(bucket_name: str) -> List[Dict[str, Any]]:
+            uploads = []
+            paginator = self.client.get_paginator('list_multipart_uploads')
+            for page in paginator.paginate(Bucket=bucket_name):
+                for upload in page.get('Uploads', []):
+                    if cutoff is not None and upload['Initiated'] > cutoff:
+                        continue
+                    uploads.append({
+                        'bucket': bucket_name,
+                        'key': upload['Key'],
+                        'upload_id': upload['UploadId'],
+                        'initiated': upload['Initiated'],
+                        'storage_class': upload.get('StorageClass', 'STANDARD'),
+                        'in_journal': upload['UploadId'] in journaled,
+                    })
+            return uploads
+        
+        uploads = []
+        for bucket_name, result, error in iter_concurrent(list_bucket, bucket_names,
+                                                          max_workers or get_config().max_workers):
+            if error is not None:
+                self.logger.warning(f"Erro ao listar multipart uploads de '{bucket_name}': {error}")
+                continue
+            uploads.extend(result)
+        
+        uploads.sort(key=lambda upload: upload['initiated'])
+        return uploads
+    
+    def abort_multipart_uploads(self, uploads: List[Dict[str, Any]],
+                                max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Aborta multipart uploads em paralelo, liberando as partes armazenadas
+        
+        Args:
+            uploads: Uploads com 'bucket', 'key' e 'upload_id' (ex: de list_multipart_uploads)
+            max_workers: Número máximo de operações simultâneas (usa Config.max_workers)
             
-        except ClientError as e:
-            self.logger.error(f"Erro ao remover objeto: {e}")
-            return False
+        Returns:
+            Número de uploads abortados e lista de falhas (upload_id, error)
+        """
+        journal = get_upload_journal()
+        
+        def abort(upload: Dict[str, Any]) -> None:
+            try:
+                self.client.abort_multipart_upload(Bucket=upload['bucket'], Key=upload['key'],
+                                                   UploadId=upload['upload_id'])
+            except ClientError as e:
+                # Já concluído ou abortado: só falta limpar o diário
+                if e.response.get('Error', {}).get('Code') != 'NoSuchUpload':
+                    raise
+            journal.forget(upload['upload_id'])
+        
+        result: Dict[str, Any] = {'aborted': 0, 'failed': []}
+        for upload, _, error in iter_concurrent(abort, uploads, max_workers or get_config().max_workers):
+            if error is not None:
+                result['failed'].append({'upload_id': upload['upload_id'], 'error': str(error)})
+            else:
+                result['aborted'] += 1
+        
+        if result['aborted']:
+            self.logger.info(f"{result['aborted']} multipart uploads abortados")
+        return result
     
-    def get_object_info(self, bucket_name: str, object_key: str) -> Optional[Dict[str, Any]]:
+    def _delete_batch(self, bucket_name: str,
+                      batch: List[Dict[str, str]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Remove um lote com novas tentativas: (removidos, falhas definitivas)"""
+        pending = batch
+        failed: List[Dict[str, Any]] = []
+        
+        for attempt in range(_DELETE_MAX_RETRIES + 1):
+            if attempt:
+                _backoff(attempt)
+            
+            connection_error = False
+            try:
+                response = self.client.delete_objects(
+                    Bucket=bucket_name, Delete={'Objects': pending, 'Quiet': True}
+                )
+                errors = response.get('Errors', [])
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code', '')
+                errors = [dict(entry, Code=code, Message=str(e)) for entry in pending]
+            except BotoCoreError as e:
+                # Falhas de conexão (timeout, endpoint inacessível) também são transitórias
+                connection_error = True
+                errors = [dict(entry, Code=type(e).__name__, Message=str(e)) for entry in pending]
+            
+            retry = []
+            for error in errors:
+                entry = {'Key': error['Key']}
+                if error.get('VersionId'):
+                    entry['VersionId'] = error['VersionId']
+                retryable = connection_error or error.get('Code') in _RETRYABLE_ERRORS
+                if retryable and attempt < _DELETE_MAX_RETRIES:
+                    retry.append(entry)
+                else:
+                    failed.append({'key': error['Key'], 'version_id': error.get('VersionId'),
+                                   'code': error.get('Code'), 'message': error.get('Message', '')})
+            
+            if not retry:
+                break
+            pending = retry
+        
+        return len(batch) - len(failed), failed
+    
+    def iter_objects(self, bucket_name: str, prefix: str = "",
+                     page_size: int = 1000,
+                     max_keys: Optional[int] = None) -> Iterator[Dict[str, Any]]:
         """
-        Obtém informações detalhadas sobre um objeto
+        Itera sobre os objetos de um bucket, página por página
         
         Args:
             bucket_name: Nome do bucket
-            object_key: Chave do objeto
+            prefix: Prefixo para filtrar objetos
+            page_size: Número de objetos por página (máximo 1000)
+            max_keys: Número máximo de objetos retornados (todos se não especificado)
             
         Returns:
-            Informações do objeto ou None se não encontrado
+            Iterador de objetos
+            
+        Raises:
+            ClientError: Se a consulta falhar
+        """
+        for obj in self.iter_paginated('list_objects_v2', 'Contents', page_size, max_keys,
+                                       Bucket=bucket_name, Prefix=prefix):
+            yield self._format_object(obj)
+    
+    def iter_objects_parallel(self, bucket_name: str, prefix: str = "",
+                              max_workers: Optional[int] = None, ordered: bool = True,
+                              delimiter: Optional[str] = "/",
+                              partitions: Optional[int] = None,
+                              page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre os objetos de um bucket listando partições em paralelo
+        
+        O ListObjectsV2 é sequencial por prefixo. Para buckets muito grandes o
+        espaço de chaves é dividido em partições disjuntas, descobertas pelos
+        CommonPrefixes do delimitador ou, em níveis grandes demais para serem
+        enumerados, por pontos de divisão amostrados com StartAfter. As
+        partições são listadas simultaneamente e cada uma mantém no máximo
+        algumas páginas em memória.
+        
+        Args:
+            bucket_name: Nome do bucket
+            prefix: Prefixo para filtrar objetos
+            max_workers: Número máximo de listagens simultâneas (usa Config.max_workers)
+            ordered: Se True, entrega os objetos em ordem de chave; se False, na
+                ordem em que as páginas ficam prontas
+            delimiter: Delimitador usado para descobrir partições (None usa apenas amostragem)
+            partitions: Número desejado de partições (padrão: 4 por worker)
+            page_size: Número de objetos por página (máximo 1000)
+            
+        Returns:
+            Iterador de objetos
+            
+        Raises:
+            ClientError: Se alguma consulta falhar
+        """
+        max_workers = max_workers or get_config().max_workers
+        target = partitions or max_workers * 4
+        
+        ranges, loose = self._discover_partitions(bucket_name, prefix, delimiter,
+                                                  target, max_workers)
+        
+        yield from self._iter_partitioned(
+            ranges, loose, lambda key_range: self._iter_range_pages(bucket_name, key_range, page_size),
+            max_workers, ordered
+        )
+    
+    def _iter_partitioned(self, ranges: List[_KeyRange], loose: List[Dict[str, Any]],
+                          iter_pages: Callable[[_KeyRange], Iterator[List[Dict[str, Any]]]],
+                          max_workers: int, ordered: bool) -> Iterator[Dict[str, Any]]:
+        """
+        Lista faixas de chaves simultaneamente e entrega os itens
+        
+        Args:
+            ranges: Faixas disjuntas a listar
+            loose: Itens já conhecidos (fora das faixas)
+            iter_pages: Função que itera sobre as páginas de uma faixa
+            max_workers: Número máximo de listagens simultâneas
+            ordered: Se True, entrega os itens em ordem de chave
+            
+        Returns:
+            Iterador de itens
         """
+        # Objetos soltos de níveis já enumerados entram como unidades prontas
+        units: List[Tuple[str, Any]] = [(obj['key'], obj) for obj in loose]
+        units += [(key_range.lower_bound, key_range) for key_range in ranges]
+        units.sort(key=lambda unit: unit[0])
+        
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ranges) or 1)))
+        
+        def put(sink: queue.Queue, message: Tuple[str, Any]) -> bool:
+            while not stop.is_set():
+                try:
+                    sink.put(message, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def list_range(key_range: _KeyRange, sink: queue.Queue) -> None:
+            try:
+                for page in iter_pages(key_range):
+                    if not put(sink, ('page', page)) or stop.is_set():
+                        return
+                put(sink, ('done', key_range))
+            except Exception as e:
+                put(sink, ('error', e))
+        
+        def receive(source: queue.Queue) -> Tuple[str, Any]:
+            kind, payload = source.get()
+            if kind == 'error':
+                raise payload
+            return kind, payload
+        
         try:
-            response = self.client.head_object(Bucket=bucket_name, Key=object_key)
+            if ordered:
+                # Janela de partições em andamento à frente do consumidor
+                sinks: Dict[int, queue.Queue] = {}
+                range_positions = [i for i, (_, unit) in enumerate(units) if isinstance(unit, _KeyRange)]
+                next_start = 0
+                
+                for i, (_, unit) in enumerate(units):
+                    if not isinstance(unit, _KeyRange):
+                        yield unit
+                        continue
+                    
+                    while next_start < len(range_positions) and len(sinks) <= max_workers:
+                        position = range_positions[next_start]
+                        sinks[position] = queue.Queue(maxsize=_PARTITION_QUEUE_PAGES)
+                        executor.submit(list_range, units[position][1], sinks[position])
+                        next_start += 1
+                    
+                    kind, payload = receive(sinks[i])
+                    while kind != 'done':
+                        yield from payload
+                        kind, payload = receive(sinks[i])
+                    del sinks[i]
+            else:
+                sink: queue.Queue = queue.Queue(maxsize=_PARTITION_QUEUE_PAGES * max_workers)
+                for key_range in ranges:
+                    executor.submit(list_range, key_range, sink)
+                
+                yield from loose
+                pending = len(ranges)
+                while pending:
+                    kind, payload = receive(sink)
+                    if kind == 'done':
+                        pending -= 1
+                    else:
+                        yield from payload
+        finally:
+            # Consumidor parou (ou falhou): interrompe as listagens em andamento
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _iter_range_pages(self, bucket_name: str, key_range: _KeyRange,
+                          page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Itera sobre as páginas (já formatadas) de uma faixa de chaves"""
+        params: Dict[str, Any] = {'Bucket': bucket_name, 'Prefix': key_range.prefix}
+        if key_range.start_after:
+            params['StartAfter'] = key_range.start_after
+        
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(PaginationConfig={'PageSize': page_size}, **params):
+            items = []
+            for obj in page.get('Contents', []):
+                if key_range.end is not None and obj['Key'] > key_range.end:
+                    if items:
+                        yield items
+                    return
+                items.append(self._format_object(obj))
+            if items:
+                yield items
+    
+    def iter_object_versions(self, bucket_name: str, prefix: str = "",
+                             max_workers: Optional[int] = None,
+                             page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Itera sobre todas as versões e marcadores de exclusão de um bucket
+        
+        A primeira página é lida diretamente; apenas se ela vier truncada o
+        restante do espaço de chaves é dividido por pontos de divisão
+        amostrados (como em iter_objects_parallel) e as faixas são listadas
+        simultaneamente com ListObjectVersions. Os itens são entregues sem
+        ordem definida.
+        
+        Args:
+            bucket_name: Nome do bucket
+            prefix: Prefixo para filtrar objetos
+            max_workers: Número máximo de listagens simultâneas (usa Config.max_workers)
+            page_size: Número de versões por página (máximo 1000)
             
-            return {
-                'key': object_key,
-                'size': response['ContentLength'],
-                'last_modified': response['LastModified'],
-                'etag': response['ETag'],
-                'content_type': response.get('ContentType', 'unknown'),
-                'metadata': response.get('Metadata', {}),
-                'storage_class': response.get('StorageClass', 'STANDARD')
+        Returns:
+            Iterador de versões (key, version_id, is_latest, delete_marker, size, last_modified)
+            
+        Raises:
+            ClientError: Se alguma consulta falhar
+        """
+        max_workers = max_workers or get_config().max_workers
+        
+        # Buckets pequenos cabem em uma página: sem sondas de divisão
+        response = self.client.list_object_versions(Bucket=bucket_name, Prefix=prefix,
+                                                    MaxKeys=page_size)
+        first_page = self._format_versions(response)
+        if not response.get('IsTruncated'):
+            yield from first_page
+            return
+        
+        # A última chave da página pode ter mais versões: entram apenas as
+        # chaves completas e a divisão cobre as chaves seguintes
+        marker = response.get('NextKeyMarker') or max(item['key'] for item in first_page)
+        complete = [item for item in first_page if item['key'] < marker]
+        start_after = max((item['key'] for item in complete), default=None)
+        
+        # Sem delimitador: prefixos só com versões antigas não aparecem no ListObjectsV2
+        ranges = self._split_prefix(bucket_name, prefix, max_workers * 4, max_workers, start_after)
+        
+        yield from self._iter_partitioned(
+            ranges, complete,
+            lambda key_range: self._iter_version_pages(bucket_name, key_range, page_size),
+            max_workers, ordered=False
+        )
+    
+    def _iter_version_pages(self, bucket_name: str, key_range: _KeyRange,
+                            page_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Itera sobre as páginas de versões de uma faixa de chaves"""
+        params: Dict[str, Any] = {'Bucket': bucket_name, 'Prefix': key_range.prefix}
+        if key_range.start_after:
+            # Sem VersionIdMarker, o KeyMarker começa na chave seguinte
+            params['KeyMarker'] = key_range.start_after
+        
+        paginator = self.client.get_paginator('list_object_versions')
+        for page in paginator.paginate(PaginationConfig={'PageSize': page_size}, **params):
+            items = self._format_versions(page)
+            if key_range.end is not None:
+                past_end = any(item['key'] > key_range.end for item in items)
+                items = [item for item in items if item['key'] <= key_range.end]
+                if items:
+                    yield items
+                if past_end:
+                    return
+            elif items:
+                yield items
+    
+    def _format_versions(self, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Formata as versões e marcadores de exclusão de uma página de ListObjectVersions"""
+        return [
+            {
+                'key': version['Key'],
+                'version_id': version['VersionId'],
+                'is_latest': version.get('IsLatest', False),
+                'delete_marker': delete_marker,
+                'size': version.get('Size', 0),
+                'last_modified': version['LastModified'],
             }
+            for field, delete_marker in (('Versions', False), ('DeleteMarkers', True))
+            for version in page.get(field, [])
+        ]
+    
+    def _discover_partitions(self, bucket_name: str, prefix: str, delimiter: Optional[str],
+                             target: int, max_workers: int) -> Tuple[List[_KeyRange], List[Dict[str, Any]]]:
+        """
+        Divide o espaço de chaves de um prefixo em faixas disjuntas
+        
+        Args:
+            bucket_name: Nome do bucket
+            prefix: Prefixo a dividir
+            delimiter: Delimitador dos níveis (None usa apenas amostragem)
+            target: Número desejado de partições
+            max_workers: Número máximo de consultas simultâneas
             
-        except ClientError as e:
-            self.logger.error(f"Erro ao obter informações do objeto: {e}")
-            return None
+        Returns:
+            Tupla (faixas a listar, objetos soltos dos níveis enumerados)
+        """
+        if not delimiter:
+            return self._split_prefix(bucket_name, prefix, target, max_workers), []
+        
+        ranges: List[_KeyRange] = []
+        loose: List[Dict[str, Any]] = []
+        frontier = [prefix]
+        
+        for _ in range(_MAX_DISCOVERY_DEPTH):
+            if not frontier or len(ranges) + len(frontier) >= target:
+                break
+            
+            next_frontier = []
+            levels = iter_concurrent(
+                lambda level: self._list_level(bucket_name, level, delimiter), frontier, max_workers
+            )
+            for level, result, error in levels:
+                if error is not None:
+                    raise error
+                
+                prefixes, objects, truncated = result
+                if truncated:
+                    # Nível grande demais para enumerar: divide por amostragem
+                    ranges.extend(self._split_prefix(bucket_name, level,
+                                                     max(2, target // len(frontier)), max_workers))
+                else:
+                    loose.extend(objects)
+                    next_frontier.extend(prefixes)
+            
+            frontier = next_frontier
+        
+        ranges.extend(_KeyRange(level) for level in frontier)
+        return ranges, loose
+    
+    def _list_level(self, bucket_name: str, prefix: str,
+                    delimiter: str) -> Tuple[List[str], List[Dict[str, Any]], bool]:
+        """Lista a primeira página de um nível: (subprefixos, objetos soltos, truncado)"""
+        response = self.client.list_objects_v2(Bucket=bucket_name, Prefix=prefix,
+                                               Delimiter=delimiter, MaxKeys=1000)
+        prefixes = [cp['Prefix'] for cp in response.get('CommonPrefixes', [])]
+        objects = [self._format_object(obj) for obj in response.get('Contents', [])]
+        return prefixes, objects, bool(response.get('IsTruncated'))
+    
+    def _split_prefix(self, bucket_name: str, prefix: str, target: int,
+                      max_workers: int, start_after: Optional[str] = None) -> List[_KeyRange]:
+        """
+        Divide um prefixo em faixas usando chaves reais como pontos de divisão
+        
+        Cada sonda pede a primeira chave após um radical + caractere
+        (MaxKeys=1). A cada rodada os intervalos entre os pontos conhecidos
+        são refinados com radicais de vários comprimentos. O número de sondas
+        por rodada é proporcional a target e a divisão para assim que há
+        pontos suficientes. Com start_after, apenas as chaves após ele são
+        divididas.
+        """
+        def first_key_after(start_after: str) -> Optional[str]:
+            response = self.client.list_objects_v2(Bucket=bucket_name, Prefix=prefix,
+                                                   StartAfter=start_after, MaxKeys=1)
+            contents = response.get('Contents', [])
+            return contents[0]['Key'] if contents else None
+        
+        points: List[str] = []
+        probed = set()
+        for _ in range(_SPLIT_ROUNDS):
+            # Radicais de cada intervalo (a, b) a partir do prefixo comum de a e b;
+            # radicais a partir de b só revelariam b ou chaves após ele
+            levels: Dict[int, List[str]] = {}
+            for start, end in zip([start_after or prefix] + points, points + [None]):
+                depth = len(os.path.commonprefix([start, end])) if end is not None else len(prefix)
+                for size in range(max(depth, len(prefix)), len(start) + 1):
+                    # Só caracteres após o da chave conhecida revelam chaves novas
+                    floor = start[size] if size < len(start) else ''
+                    levels.setdefault(size, []).extend(
+                        start[:size] + char for char in _SPLIT_CHARS
+                        if char > floor and start[:size] + char not in probed
+                        and (end is None or start[:size] + char < end)
+                    )
+            
+            # O orçamento da rodada é dividido entre os comprimentos de radical
+            # (curtos cobrem mais chaves, longos refinam regiões densas) e cada
+            # comprimento é amostrado uniformemente
+            budget = min(_MAX_SPLIT_PROBES, max(target, 1) * _SPLIT_PROBES_PER_TARGET)
+            levels = {size: list(dict.fromkeys(level)) for size, level in levels.items() if level}
+            if not levels:
+                break
+            quota = -(-budget // len(levels))
+            probes: List[str] = []
+            for size in sorted(levels):
+                level = levels[size]
+                if len(level) > quota:
+                    level = [level[i * len(level) // quota] for i in range(quota)]
+                probes += level
+            probes = probes[:budget]
+            probed.update(probes)
+            
+            found = set()
+            for _, key, error in iter_concurrent(first_key_after, probes, max_workers):
+                if error is not None:
+                    raise error
+                if key is not None:
+                    found.add(key)
+            
+            points = sorted(set(points) | found)
+            if len(points) >= target:
+                break
+        
+        # Faixas (início, p0], (p0, p1], ..., (pn, fim)
+        return [_KeyRange(prefix, start, end)
+                for start, end in zip([start_after] + points, points + [None])]
+    
+    def _format_object(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata objeto para exibição"""
+        return {
+            'key': obj['Key'],
+            'size': obj['Size'],
+            'last_modified': obj['LastModified'],
+            'etag': obj['ETag'],
+            'storage_class': obj.get('StorageClass', 'STANDARD')
+        }
+    
+    def list_objects(self, bucket_name: str, prefix: str = "", 
+                    max_keys: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Lista objetos em um bucket
+        
+        Args:
+            bucket_name: Nome do bucket
+            prefix: Prefixo para filtrar objetos
+            max_keys: Número máximo de objetos a retornar (todos se não especificado)
+            
+        Returns:
+            Lista de objetos
+        """
+        try:
+            return list(self.iter_objects(bucket_name, prefix, max_keys=max_keys))
+            
+        except ClientError as e:
+            self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
+            return []
+    
+    def configure_transfers(self, **settings: Any) -> None:
+        """
+        Ajusta as transferências deste serviço
+
+        Args:
+            **settings: Parâmetros do TransferConfig (max_concurrency, multipart_threshold,
+                multipart_chunksize, use_threads, max_bandwidth); None volta ao valor da configuração
+        """
+        build_transfer_config(**{k: v for k, v in settings.items() if v is not None})
+        for name, value in settings.items():
+            if value is None:
+                self.transfer_settings.pop(name, None)
+            else:
+                self.transfer_settings[name] = value
+
+    def get_transfer_config(self, **overrides: Any) -> TransferConfig:
+        """
+        Obtém a configuração de transferência efetiva
+
+        Args:
+            **overrides: Parâmetros que substituem os ajustes do serviço
+
+        Returns:
+            Configuração de transferência do boto3
+        """
+        return build_transfer_config(**{**self.transfer_settings, **overrides})
+
+    def _log_transfer(self, message: str, tracker: TransferProgress) -> None:
+        tracker.finish()
+        self.logger.info(f"{message}: {tracker}")
+
+    @invalidates('objects')
+    def upload_file(self, file_path: str, bucket_name: str, 
+                   object_key: Optional[str] = None,
+                   transfer_config: Optional[TransferConfig] = None,
+                   progress: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """
+        Faz upload de um arquivo para S3
+        
+        Arquivos acima de multipart_threshold são enviados em partes paralelas
+        conforme a configuração de transferência.
+
+        Args:
+            file_path: Caminho do arquivo local
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto (se None, usa o nome do arquivo)
+            transfer_config: Configuração de transferência (usa a do serviço se não especificada)
+            progress: Função chamada periodicamente com o TransferProgress
+            
+        Returns:
+            True se upload foi bem-sucedido
+        """
+        try:
+            object_key = object_key or Path(file_path).name
+            tracker = TransferProgress(f"{bucket_name}/{object_key}",
+                                       os.path.getsize(file_path), on_update=progress)
+            
+            self.client.upload_file(file_path, bucket_name, object_key,
+                                    Config=transfer_config or self.get_transfer_config(),
+                                    Callback=tracker)
+            self._log_transfer(f"Arquivo '{file_path}' enviado para '{bucket_name}/{object_key}'", tracker)
+            return True
+            
+        except (ClientError, S3UploadFailedError, OSError) as e:
+            self.logger.error(f"Erro ao fazer upload do arquivo: {e}")
+            return False
+    
+    @invalidates('objects')
+    def upload_file_resumable(self, file_path: str, bucket_name: str,
+                              object_key: Optional[str] = None,
+                              part_size: Optional[int] = None,
+                              max_workers: Optional[int] = None,
+                              extra_args: Optional[Dict[str, Any]] = None,
+                              progress: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """
+        Faz upload de um arquivo grande com retomada após falhas
+        
+        O multipart upload e cada parte concluída são registrados no diário
+        local (``<config_dir>/uploads.db``). Se o envio for interrompido, uma
+        nova chamada com os mesmos argumentos confere as partes com
+        ListParts e envia apenas as que faltam. Se o arquivo mudou desde o
+        início, o upload anterior é abortado e o envio recomeça.
+        
+        Args:
+            file_path: Caminho do arquivo local
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto (se None, usa o nome do arquivo)
+            part_size: Tamanho de cada parte (usa s3_multipart_chunksize)
+            max_workers: Número máximo de partes simultâneas (usa s3_max_concurrency)
+            extra_args: Parâmetros adicionais do objeto (ex: ContentType, Metadata)
+            progress: Função chamada periodicamente com o TransferProgress
+            
+        Returns:
+            True se upload foi concluído (False mantém o progresso para retomada)
+        """
+        transfer_config = self.get_transfer_config()
+        max_workers = max_workers or transfer_config.max_request_concurrency
+        object_key = object_key or Path(file_path).name
+        file_path = os.path.abspath(file_path)
+        journal = get_upload_journal()
+        
+        try:
+            stat = os.stat(file_path)
+            part_size = adjusted_chunksize(stat.st_size, part_size or transfer_config.multipart_chunksize)
+            tracker = TransferProgress(f"{bucket_name}/{object_key}", stat.st_size, on_update=progress)
+            
+            record = journal.find(bucket_name, object_key, file_path)
+            done: Dict[int, str] = {}
+            if record is not None:
+                unchanged = (record['file_size'], record['file_mtime'], record['part_size']) == \
+                    (stat.st_size, stat.st_mtime, part_size)
+                if unchanged:
+                    done = self._reconcile_parts(bucket_name, object_key, record['upload_id'],
+                                                 journal.get_parts(record['upload_id']))
+                if done is None or not unchanged:
+                    self.logger.info(f"Upload anterior de '{file_path}' descartado "
+                                     f"({'arquivo alterado' if not unchanged else 'upload inexistente'})")
+                    self.abort_multipart_uploads([{'bucket': bucket_name, 'key': object_key,
+                                                   'upload_id': record['upload_id']}])
+                    record, done = None, {}
+            
+            if record is None:
+                upload_id = self.client.create_multipart_upload(
+                    Bucket=bucket_name, Key=object_key, **(extra_args or {})
+                )['UploadId']
+                journal.start(upload_id, bucket_name, object_key, file_path,
+                              stat.st_size, stat.st_mtime, part_size)
+            else:
+                upload_id = record['upload_id']
+                self.logger.info(f"Retomando upload de '{file_path}': "
+                                 f"{len(done)} partes já enviadas")
+            
+            total_parts = max(1, -(-stat.st_size // part_size))
+            resumed = sum(min(part_size, stat.st_size - (number - 1) * part_size) for number in done)
+            tracker(resumed)
+            
+            def upload_part(part_number: int) -> str:
+                with open(file_path, 'rb') as f:
+                    f.seek((part_number - 1) * part_size)
+                    data = f.read(part_size)
+                checksum = base64.b64encode(hashlib.md5(data).digest()).decode()
+                etag = self.client.upload_part(
+                    Bucket=bucket_name, Key=object_key, UploadId=upload_id,
+                    PartNumber=part_number, Body=data, ContentMD5=checksum
+                )['ETag']
+                journal.record_part(upload_id, part_number, etag, checksum, len(data))
+                tracker(len(data))
+                return etag
+            
+            missing = [number for number in range(1, total_parts + 1) if number not in done]
+            errors = []
+            for part_number, etag, error in iter_concurrent(upload_part, missing, max_workers):
+                if error is not None:
+                    errors.append(error)
+                else:
+                    done[part_number] = etag
+            if errors:
+                self.logger.error(f"Upload de '{file_path}' interrompido ({len(errors)} partes "
+                                  f"com erro, {len(done)}/{total_parts} enviadas): {errors[0]}. "
+                                  f"Execute novamente para retomar.")
+                return False
+            
+            self.client.complete_multipart_upload(
+                Bucket=bucket_name, Key=object_key, UploadId=upload_id,
+                MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': done[number]}
+                                           for number in sorted(done)]}
+            )
+            journal.forget(upload_id)
+            self._log_transfer(f"Arquivo '{file_path}' enviado para '{bucket_name}/{object_key}'", tracker)
+            return True
+            
+        except (ClientError, BotoCoreError, OSError) as e:
+            self.logger.error(f"Erro ao fazer upload do arquivo: {e}")
+            return False
+    
+    def _reconcile_parts(self, bucket_name: str, object_key: str, upload_id: str,
+                         journaled: Dict[int, Dict[str, Any]]) -> Optional[Dict[int, str]]:
+        """
+        Confere as partes do diário com as partes no S3
+        
+        Returns:
+            Partes válidas (número -> ETag) ou None se o upload não existe mais
+        """
+        try:
+            listed = {}
+            paginator = self.client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=bucket_name, Key=object_key, UploadId=upload_id):
+                for part in page.get('Parts', []):
+                    listed[part['PartNumber']] = part
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'NoSuchUpload':
+                return None
+            raise
+        
+        # Só valem as partes registradas cujo ETag e tamanho conferem com o S3
+        return {
+            number: part['ETag']
+            for number, part in listed.items()
+            if number in journaled and journaled[number]['etag'] == part['ETag']
+            and journaled[number]['size'] == part['Size']
+        }
+    
+    @invalidates('objects')
+    def upload_stream(self, source: Union[io.IOBase, Iterable[bytes]], bucket_name: str,
+                      object_key: str, part_size: Optional[int] = None,
+                      max_workers: Optional[int] = None,
+                      extra_args: Optional[Dict[str, Any]] = None,
+                      progress: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """
+        Faz upload de dados gerados em fluxo (arquivo binário ou iterador de bytes)
+        
+        Os dados são lidos em um conjunto fixo de buffers de part_size e
+        enviados como partes de um multipart upload em paralelo; cada buffer
+        volta ao conjunto quando sua parte termina. A memória fica limitada a
+        part_size x (max_workers + 1), qualquer que seja o tamanho total.
+        Dados menores que uma parte são enviados com um único PutObject.
+        
+        Args:
+            source: Objeto de arquivo binário (ex: gzip, pipe) ou iterador de blocos de bytes
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            part_size: Tamanho de cada parte (usa s3_multipart_chunksize; tamanho
+                máximo do objeto = part_size x 10.000)
+            max_workers: Número máximo de partes simultâneas (usa s3_max_concurrency)
+            extra_args: Parâmetros adicionais do objeto (ex: ContentType, Metadata)
+            progress: Função chamada periodicamente com o TransferProgress
+            
+        Returns:
+            True se upload foi bem-sucedido
+        """
+        transfer_config = self.get_transfer_config()
+        part_size = part_size or transfer_config.multipart_chunksize
+        max_workers = max_workers or transfer_config.max_request_concurrency
+        extra_args = extra_args or {}
+        
+        filler = StreamFiller(source)
+        tracker = TransferProgress(f"{bucket_name}/{object_key}", on_update=progress)
+        upload_id = None
+        
+        try:
+            first = bytearray(part_size)
+            view = memoryview(first)
+            size = filler.fill(view)
+            
+            if size < part_size:
+                self.client.put_object(Bucket=bucket_name, Key=object_key,
+                                       Body=BufferReader(view[:size]), **extra_args)
+                tracker(size)
+                self._log_transfer(f"Fluxo enviado para '{bucket_name}/{object_key}'", tracker)
+                return True
+            
+            upload_id = self.client.create_multipart_upload(
+                Bucket=bucket_name, Key=object_key, **extra_args
+            )['UploadId']
+            
+            # Buffers livres: o leitor espera aqui quando todas as partes estão em envio
+            free: queue.Queue = queue.Queue()
+            for _ in range(max_workers):
+                free.put(bytearray(part_size))
+            
+            def upload_part(part_number: int, buffer: bytearray, length: int) -> Dict[str, Any]:
+                try:
+                    response = self.client.upload_part(
+                        Bucket=bucket_name, Key=object_key, UploadId=upload_id,
+                        PartNumber=part_number, Body=BufferReader(memoryview(buffer)[:length])
+                    )
+                    tracker(length)
+                    return {'PartNumber': part_number, 'ETag': response['ETag']}
+                finally:
+                    free.put(buffer)
+            
+            parts = []
+            futures = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                buffer, length, part_number = first, size, 1
+                while length:
+                    if part_number > 10000:
+                        raise ValueError(f"Fluxo excede 10.000 partes de {part_size} bytes; "
+                                         "aumente part_size")
+                    futures.append(executor.submit(upload_part, part_number, buffer, length))
+                    
+                    # Falhas interrompem a leitura sem esperar o fim da origem
+                    for future in [f for f in futures if f.done()]:
+                        parts.append(future.result())
+                        futures.remove(future)
+                    
+                    if length < part_size:
+                        break
+                    buffer = free.get()
+                    length = filler.fill(memoryview(buffer))
+                    part_number += 1
+                
+                parts += [future.result() for future in futures]
+            
+            self.client.complete_multipart_upload(
+                Bucket=bucket_name, Key=object_key, UploadId=upload_id,
+                MultipartUpload={'Parts': sorted(parts, key=lambda part: part['PartNumber'])}
+            )
+            self._log_transfer(f"Fluxo enviado para '{bucket_name}/{object_key}' "
+                               f"em {len(parts)} partes", tracker)
+            return True
+            
+        except Exception as e:
+            # Partes órfãs são cobradas: aborta também em erros da própria origem
+            if upload_id is not None:
+                try:
+                    self.client.abort_multipart_upload(Bucket=bucket_name, Key=object_key,
+                                                       UploadId=upload_id)
+                except ClientError as abort_error:
+                    self.logger.warning(f"Erro ao abortar multipart upload {upload_id}: {abort_error}")
+            if not isinstance(e, (ClientError, BotoCoreError, OSError, ValueError, TypeError)):
+                raise
+            self.logger.error(f"Erro ao enviar fluxo para '{bucket_name}/{object_key}': {e}")
+            return False
+    
+    def download_file(self, bucket_name: str, object_key: str, 
+                     file_path: str,
+                     transfer_config: Optional[TransferConfig] = None,
+                     progress: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """
+        Faz download de um objeto do S3
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            file_path: Caminho local para salvar o arquivo
+            transfer_config: Configuração de transferência (usa a do serviço se não especificada)
+            progress: Função chamada periodicamente com o TransferProgress
+            
+        Returns:
+            True se download foi bem-sucedido
+        """
+        try:
+            # Cria diretório se não existir
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+
+            # O tamanho só é consultado quando há quem acompanhe o progresso
+            total = None
+            if progress is not None:
+                total = self.client.head_object(Bucket=bucket_name, Key=object_key)['ContentLength']
+            tracker = TransferProgress(f"{bucket_name}/{object_key}", total, on_update=progress)
+            
+            self.client.download_file(bucket_name, object_key, file_path,
+                                      Config=transfer_config or self.get_transfer_config(),
+                                      Callback=tracker)
+            self._log_transfer(f"Arquivo '{bucket_name}/{object_key}' baixado para '{file_path}'", tracker)
+            return True
+            
+        except (ClientError, OSError) as e:
+            self.logger.error(f"Erro ao fazer download do arquivo: {e}")
+            return False
+    
+    def download_file_ranged(self, bucket_name: str, object_key: str, file_path: str,
+                             part_size: Optional[int] = None,
+                             max_workers: Optional[int] = None,
+                             progress: Optional[Callable[[TransferProgress], None]] = None) -> bool:
+        """
+        Faz download de um objeto grande com GETs de faixas em paralelo
+        
+        O arquivo de destino é pré-alocado e cada faixa é gravada diretamente
+        na sua posição pela thread que a baixou, sem passar por uma fila de
+        escrita central. Todas as faixas exigem o mesmo ETag (If-Match), então
+        um objeto substituído durante o download gera erro em vez de um
+        arquivo misturado. O arquivo só aparece em file_path quando completo.
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            file_path: Caminho local para salvar o arquivo
+            part_size: Tamanho de cada faixa (usa s3_multipart_chunksize)
+            max_workers: Número máximo de faixas simultâneas (usa s3_max_concurrency)
+            progress: Função chamada periodicamente com o TransferProgress
+            
+        Returns:
+            True se download foi bem-sucedido
+        """
+        transfer_config = self.get_transfer_config()
+        part_size = part_size or transfer_config.multipart_chunksize
+        max_workers = max_workers or transfer_config.max_request_concurrency
+        temp_path = f"{file_path}.part"
+        
+        try:
+            head = self.client.head_object(Bucket=bucket_name, Key=object_key)
+            size, etag = head['ContentLength'], head['ETag']
+            tracker = TransferProgress(f"{bucket_name}/{object_key}", size, on_update=progress)
+            
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.truncate(size)
+            
+            def fetch(byte_range: Tuple[int, int]) -> None:
+                start, end = byte_range
+                for attempt in range(_RANGE_MAX_RETRIES + 1):
+                    written = 0
+                    try:
+                        body = get_range(self.client, bucket_name, object_key, start, end, etag)['Body']
+                        with open(temp_path, 'r+b') as f:
+                            f.seek(start)
+                            for chunk in body.iter_chunks(1024 * 1024):
+                                f.write(chunk)
+                                written += len(chunk)
+                                tracker(len(chunk))
+                        return
+                    except (BotoCoreError, ClientError) as e:
+                        code = e.response.get('Error', {}).get('Code') if isinstance(e, ClientError) else None
+                        retryable = code is None or code in _RETRYABLE_ERRORS
+                        if not retryable or attempt == _RANGE_MAX_RETRIES:
+                            raise
+                        # A faixa é baixada de novo desde o início
+                        tracker(-written)
+                        _backoff(attempt + 1)
+            
+            for _, _, error in iter_concurrent(fetch, byte_ranges(size, part_size), max_workers):
+                if error is not None:
+                    raise error
+            
+            os.replace(temp_path, file_path)
+            self._log_transfer(f"Arquivo '{bucket_name}/{object_key}' baixado para '{file_path}'", tracker)
+            return True
+            
+        except (ClientError, BotoCoreError, OSError) as e:
+            self.logger.error(f"Erro ao fazer download do arquivo: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+    
+    def open_object(self, bucket_name: str, object_key: str,
+                    encoding: Optional[str] = None, part_size: Optional[int] = None,
+                    read_ahead: int = 4, version_id: Optional[str] = None) -> io.IOBase:
+        """
+        Abre um objeto S3 para leitura em fluxo
+        
+        O objeto é lido por faixas, com as próximas faixas buscadas em
+        paralelo enquanto a atual é consumida; ele nunca é carregado inteiro
+        em memória. Use com 'with' para liberar as threads de leitura.
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            encoding: Se informado, retorna um leitor de texto (ex: 'utf-8' para JSONL)
+            part_size: Tamanho de cada faixa (usa s3_multipart_chunksize)
+            read_ahead: Número de faixas buscadas à frente da leitura
+            version_id: Versão específica do objeto
+            
+        Returns:
+            Objeto de arquivo binário (io.BufferedReader) ou de texto (io.TextIOWrapper)
+            
+        Raises:
+            ClientError: Se o objeto não existir ou não puder ser lido
+        """
+        params = {'Bucket': bucket_name, 'Key': object_key}
+        if version_id:
+            params['VersionId'] = version_id
+        head = self.client.head_object(**params)
+        part_size = part_size or self.get_transfer_config().multipart_chunksize
+        
+        raw = S3ObjectReader(self.client, bucket_name, object_key, head['ContentLength'],
+                             etag=head['ETag'], part_size=part_size, read_ahead=read_ahead,
+                             version_id=version_id)
+        reader = io.BufferedReader(raw, buffer_size=min(part_size, 1024 * 1024))
+        if encoding:
+            return io.TextIOWrapper(reader, encoding=encoding)
+        return reader
+    
+    def find_inventory_manifest(self, bucket_name: str, prefix: str) -> Optional[str]:
+        """
+        Localiza o manifest.json da entrega mais recente de um S3 Inventory
+        
+        Args:
+            bucket_name: Bucket de destino do inventário
+            prefix: Pasta da configuração ('<prefixo>/<bucket de origem>/<configuração>/')
+            
+        Returns:
+            Chave do manifest.json ou None se não houver entregas
+        """
+        prefix = normalize_prefix(prefix)
+        try:
+            paginator = self.client.get_paginator('list_objects_v2')
+            folders = [
+                common['Prefix']
+                for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix, Delimiter='/')
+                for common in page.get('CommonPrefixes', [])
+            ]
+        except ClientError as e:
+            self.logger.error(f"Erro ao procurar inventário em '{bucket_name}/{prefix}': {e}")
+            return None
+        return latest_manifest_key(folders)
+    
+    def analyze_inventory(self, bucket_name: str, manifest_key: str, prefix_depth: int = 1,
+                          max_workers: Optional[int] = None, processes: Optional[int] = None,
+                          progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                          ) -> Optional[Dict[str, Any]]:
+        """
+        Agrega uma entrega do S3 Inventory sem listar o bucket de origem
+        
+        Os arquivos de dados listados no manifest.json são baixados em
+        paralelo para um diretório temporário e agregados em um pool de
+        processos (ver s3_inventory.aggregate_inventory_file); cada arquivo é
+        removido assim que agregado, e o número de arquivos baixados e ainda
+        não agregados é limitado.
+        
+        Args:
+            bucket_name: Bucket de destino do inventário
+            manifest_key: Chave do manifest.json ou pasta da configuração
+                (usa a entrega mais recente, ver find_inventory_manifest)
+            prefix_depth: Profundidade dos prefixos agregados
+            max_workers: Número máximo de downloads simultâneos (usa Config.max_workers)
+            processes: Número de processos de agregação (padrão: número de CPUs)
+            progress: Função chamada com os contadores após cada arquivo
+            
+        Returns:
+            Totais (objects, size, prefixes, storage_classes, ages, encryption),
+            dados da entrega e lista de arquivos com falha, ou None em caso de erro
+        """
+        delivery = self._read_inventory_manifest(bucket_name, manifest_key)
+        if delivery is None:
+            return None
+        manifest_key, manifest = delivery
+        
+        aggregate = InventoryAggregate()
+        
+        def combine(partial: InventoryAggregate) -> Dict[str, Any]:
+            aggregate.merge(partial)
+            return {'objects': aggregate.objects, 'size': aggregate.size}
+        
+        failed = self._map_inventory_files(
+            bucket_name, manifest, aggregate_inventory_file,
+            (manifest.created_at.timestamp(), prefix_depth), combine,
+            max_workers, processes, progress
+        )
+        
+        result = aggregate.as_dict()
+        result.update({
+            'source_bucket': manifest.source_bucket,
+            'manifest_key': manifest_key,
+            'created_at': manifest.created_at,
+            'files': len(manifest.files),
+            'failed': failed,
+        })
+        self.logger.info(f"Inventário de '{manifest.source_bucket}' ({manifest_key}): "
+                         f"{aggregate.objects} objetos, {len(failed)} arquivos com falha")
+        return result
+    
+    def _read_inventory_manifest(self, bucket_name: str,
+                                 manifest_key: str) -> Optional[Tuple[str, InventoryManifest]]:
+        """Lê o manifest.json (ou o da entrega mais recente de uma pasta); None em caso de erro"""
+        if not manifest_key.endswith('manifest.json'):
+            manifest_key = self.find_inventory_manifest(bucket_name, manifest_key)
+            if manifest_key is None:
+                self.logger.error(f"Nenhuma entrega de inventário encontrada em '{bucket_name}'")
+                return None
+        
+        try:
+            body = self.client.get_object(Bucket=bucket_name, Key=manifest_key)['Body'].read()
+            return manifest_key, parse_manifest(json.loads(body))
+        except (ClientError, ValueError, KeyError) as e:
+            self.logger.error(f"Erro ao ler manifesto '{bucket_name}/{manifest_key}': {e}")
+            return None
+    
+    def _map_inventory_files(self, bucket_name: str, manifest: InventoryManifest,
+                             worker: Callable[..., Any], args: Tuple[Any, ...],
+                             combine: Callable[[Any], Dict[str, Any]],
+                             max_workers: Optional[int], processes: Optional[int],
+                             progress: Optional[Callable[[Dict[str, Any]], None]]
+                             ) -> List[Dict[str, str]]:
+        """
+        Baixa os arquivos de dados de um inventário e os processa em um pool de processos
+        
+        worker(caminho, formato, colunas, *args) é executada em outro processo
+        para cada arquivo; combine recebe cada resultado e devolve os
+        contadores repassados a progress (junto com files, total_files e
+        failed). Um arquivo com falha repete os últimos contadores.
+        
+        Returns:
+            Lista de arquivos com falha (key, error)
+        """
+        max_workers = max_workers or get_config().max_workers
+        processes = processes or os.cpu_count() or 1
+        data_bucket = manifest.destination_bucket or bucket_name
+        failed: List[Dict[str, str]] = []
+        files = enumerate(manifest.files)
+        done_files = 0
+        counters: Dict[str, Any] = {}
+        
+        # Processos iniciados do zero: fork com as threads de download ativas não é seguro
+        with tempfile.TemporaryDirectory(prefix='aws-agent-inventory-') as workdir, \
+                ThreadPoolExecutor(max_workers=max_workers) as downloader, \
+                ProcessPoolExecutor(max_workers=processes,
+                                    mp_context=multiprocessing.get_context('spawn')) as pool:
+            
+            def download(index: int, entry: Dict[str, Any]) -> str:
+                path = os.path.join(workdir, f"{index}-{os.path.basename(entry['key'])}")
+                self.client.download_file(data_bucket, entry['key'], path,
+                                          Config=self.get_transfer_config())
+                return path
+            
+            downloads: Dict[Any, Dict[str, Any]] = {}
+            parsing: Dict[Any, Tuple[Dict[str, Any], str]] = {}
+            
+            def schedule() -> None:
+                # Limita os arquivos em disco: baixando ou aguardando processamento
+                while len(downloads) + len(parsing) < max_workers + processes:
+                    item = next(files, None)
+                    if item is None:
+                        return
+                    downloads[downloader.submit(download, *item)] = item[1]
+            
+            schedule()
+            while downloads or parsing:
+                finished, _ = wait(list(downloads) + list(parsing), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future in downloads:
+                        entry = downloads.pop(future)
+                        try:
+                            path = future.result()
+                        except (ClientError, BotoCoreError, OSError) as e:
+                            failed.append({'key': entry['key'], 'error': str(e)})
+                            continue
+                        parsing[pool.submit(worker, path, manifest.file_format,
+                                            manifest.columns, *args)] = (entry, path)
+                        continue
+                    
+                    entry, path = parsing.pop(future)
+                    try:
+                        counters = combine(future.result())
+                    except Exception as e:
+                        failed.append({'key': entry['key'], 'error': str(e)})
+                    finally:
+                        os.remove(path)
+                    done_files += 1
+                    if progress is not None:
+                        progress({'files': done_files, 'total_files': len(manifest.files),
+                                  'failed': len(failed), **counters})
+                schedule()
+        
+        for failure in failed:
+            self.logger.error(f"Erro ao processar arquivo de inventário '{failure['key']}': {failure['error']}")
+        return failed
+    
+    def prefix_usage(self, bucket_name: str, depth: int = 3, prefix: str = "",
+                     inventory_bucket: Optional[str] = None,
+                     inventory_manifest: Optional[str] = None,
+                     max_workers: Optional[int] = None,
+                     processes: Optional[int] = None,
+                     progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                     ) -> Optional[PrefixTree]:
+        """
+        Calcula o uso de armazenamento por prefixo (como o du)
+        
+        Os objetos são lidos da listagem paralela do bucket ou, se
+        informado, de uma entrega do S3 Inventory (ver analyze_inventory) e
+        acumulados em uma árvore de prefixos com profundidade limitada; a
+        memória usada depende do número de prefixos, não do número de objetos.
+        
+        Args:
+            bucket_name: Nome do bucket
+            depth: Número máximo de níveis de prefixo a partir da raiz do bucket
+            prefix: Considera apenas as chaves com este prefixo
+            inventory_bucket: Bucket de destino do inventário (usa a listagem se não especificado)
+            inventory_manifest: Chave do manifest.json ou pasta da configuração do inventário
+            max_workers: Número máximo de partições ou downloads simultâneos
+            processes: Número de processos para os arquivos do inventário
+            progress: Função chamada com os contadores durante o processamento
+            
+        Returns:
+            Árvore de prefixos (ver s3_usage.PrefixTree) ou None em caso de erro
+        """
+        tree = PrefixTree(bucket_name, depth)
+        
+        if inventory_bucket and inventory_manifest:
+            delivery = self._read_inventory_manifest(inventory_bucket, inventory_manifest)
+            if delivery is None:
+                return None
+            _, manifest = delivery
+            if manifest.source_bucket and manifest.source_bucket != bucket_name:
+                self.logger.error(f"O inventário descreve o bucket '{manifest.source_bucket}', "
+                                  f"não '{bucket_name}'")
+                return None
+            
+            def combine(partial: PrefixTree) -> Dict[str, Any]:
+                tree.merge(partial)
+                return {'objects': tree.root.objects, 'size': tree.root.size}
+            
+            failed = self._map_inventory_files(inventory_bucket, manifest, inventory_prefix_tree,
+                                               (bucket_name, depth, prefix), combine,
+                                               max_workers, processes, progress)
+            if failed:
+                # Uma árvore parcial subestimaria os prefixos afetados
+                return None
+            tree.created_at = manifest.created_at.timestamp()
+            return tree
+        
+        try:
+            for obj in self.iter_objects_parallel(bucket_name, prefix, max_workers=max_workers,
+                                                  ordered=False):
+                tree.add(obj['key'], obj['size'], obj['last_modified'].timestamp())
+                if progress is not None and not tree.root.objects % 10000:
+                    progress({'objects': tree.root.objects, 'size': tree.root.size})
+        except ClientError as e:
+            self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
+            return None
+        
+        return tree
+    
+    def load_object_arrays(self, bucket_name: str, prefix_depth: int = 1,
+                           inventory_bucket: Optional[str] = None,
+                           inventory_manifest: Optional[str] = None,
+                           max_workers: Optional[int] = None,
+                           processes: Optional[int] = None,
+                           progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                           ) -> Optional[ObjectArrays]:
+        """
+        Carrega tamanho, idade, classe e prefixo dos objetos de um bucket em arrays NumPy
+        
+        Os arrays alimentam a simulação de ciclo de vida (ver
+        simulate_lifecycle) e podem ser reaproveitados entre simulações.
+        Requer NumPy (extra 'analytics').
+        
+        Args:
+            bucket_name: Nome do bucket
+            prefix_depth: Profundidade dos prefixos usados pelos filtros das regras
+            inventory_bucket: Bucket de destino do inventário (usa a listagem se não especificado)
+            inventory_manifest: Chave do manifest.json ou pasta da configuração do inventário
+            max_workers: Número máximo de partições ou downloads simultâneos
+            processes: Número de processos para os arquivos do inventário
+            progress: Função chamada com os contadores durante o carregamento
+            
+        Returns:
+            Arrays dos objetos ou None em caso de erro
+        """
+        if inventory_bucket and inventory_manifest:
+            delivery = self._read_inventory_manifest(inventory_bucket, inventory_manifest)
+            if delivery is None:
+                return None
+            _, manifest = delivery
+            parts: List[ObjectArrays] = []
+            
+            def combine(part: ObjectArrays) -> Dict[str, Any]:
+                parts.append(part)
+                return {'objects': sum(len(loaded) for loaded in parts)}
+            
+            failed = self._map_inventory_files(
+                inventory_bucket, manifest, inventory_object_arrays,
+                (manifest.created_at.timestamp(), prefix_depth), combine,
+                max_workers, processes, progress
+            )
+            if failed or not parts:
+                return None
+            return ObjectArrays.concatenate(parts)
+        
+        reference = datetime.now(timezone.utc).timestamp()
+        try:
+            objects = self.iter_objects_parallel(bucket_name, max_workers=max_workers, ordered=False)
+            return ObjectArrays.from_objects(objects, reference, prefix_depth)
+        except ClientError as e:
+            self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
+            return None
+    
+    def get_lifecycle_rules(self, bucket_name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Obtém as regras de ciclo de vida de um bucket
+        
+        Args:
+            bucket_name: Nome do bucket
+            
+        Returns:
+            Regras no formato da API (lista vazia se não houver configuração) ou None em caso de erro
+        """
+        try:
+            response = self.client.get_bucket_lifecycle_configuration(Bucket=bucket_name)
+            return response.get('Rules', [])
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchLifecycleConfiguration':
+                return []
+            self.logger.error(f"Erro ao obter ciclo de vida do bucket: {e}")
+            return None
+    
+    def simulate_lifecycle(self, bucket_name: str, variants: Dict[str, List[Any]],
+                           months: int = 12, monthly_reads: float = 0.0,
+                           prices: Optional[Dict[str, StoragePrice]] = None,
+                           include_current: bool = False,
+                           objects: Optional[ObjectArrays] = None,
+                           **load_options: Any) -> Optional[Dict[str, Any]]:
+        """
+        Projeta os custos de variantes de regras de ciclo de vida sem aplicá-las
+        
+        Args:
+            bucket_name: Nome do bucket
+            variants: Nome da variante -> regras (formato da API ou s3_lifecycle.LifecycleRule)
+            months: Número de meses projetados
+            monthly_reads: Fração dos bytes lida por mês
+            prices: Preços por classe que substituem s3_lifecycle.DEFAULT_PRICES
+            include_current: Se True, inclui as regras atuais do bucket como variante 'atual'
+            objects: Arrays já carregados (ver load_object_arrays)
+            **load_options: Opções de load_object_arrays (ex: inventory_bucket, prefix_depth)
+            
+        Returns:
+            Projeção sem regras ('baseline') e de cada variante ('variants', com
+            'savings'), ou None em caso de erro
+        """
+        variants = dict(variants)
+        if include_current:
+            current = self.get_lifecycle_rules(bucket_name)
+            if current is None:
+                return None
+            variants['atual'] = current
+        
+        if objects is None:
+            objects = self.load_object_arrays(bucket_name, **load_options)
+            if objects is None:
+                return None
+        
+        try:
+            return compare_lifecycle(objects, variants, months, monthly_reads, prices)
+        except ValueError as e:
+            self.logger.error(f"Regras de ciclo de vida não simuláveis: {e}")
+            return None
+    
+    def index_objects(self, index: DuplicateIndex, bucket_names: Optional[List[str]] = None,
+                      account: str = "", min_size: int = 1,
+                      max_workers: Optional[int] = None,
+                      progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Grava a listagem de buckets em um índice de duplicatas
+        
+        Args:
+            index: Índice de duplicatas
+            bucket_names: Buckets a listar (todos os buckets se não especificado)
+            account: Conta registrada junto aos objetos ('' para a conta do serviço)
+            min_size: Ignora objetos menores que este tamanho
+            max_workers: Número máximo de listagens simultâneas por bucket
+            progress: Função chamada com {'bucket', 'objects'} durante a listagem
+            
+        Returns:
+            Buckets que não puderam ser listados ({'bucket', 'error'})
+        """
+        if bucket_names is None:
+            bucket_names = [bucket['name'] for bucket in self.list_buckets(resolve_regions='off')]
+        
+        failed = []
+        for bucket_name in bucket_names:
+            try:
+                objects = self.iter_objects_parallel(bucket_name, max_workers=max_workers, ordered=False)
+                index.add(account, bucket_name, objects, min_size, progress)
+            except ClientError as e:
+                self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
+                failed.append({'bucket': bucket_name, 'error': str(e)})
+        return failed
+    
+    def get_object_checksums(self, bucket_name: str, object_keys: List[str],
+                             max_workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+        """
+        Obtém o checksum do objeto inteiro de vários objetos com HEADs simultâneos
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_keys: Chaves dos objetos
+            max_workers: Número máximo de consultas simultâneas (usa Config.max_workers)
+            
+        Returns:
+            Chave -> 'ALGORITMO:valor', ou None para objetos sem checksum do
+            objeto inteiro ou cuja consulta falhou
+        """
+        def head(key: str) -> Optional[str]:
+            for attempt in range(_HEAD_MAX_RETRIES + 1):
+                try:
+                    response = self.client.head_object(Bucket=bucket_name, Key=key,
+                                                       ChecksumMode='ENABLED')
+                    return full_object_checksum(response)
+                except ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code not in _RETRYABLE_ERRORS or attempt == _HEAD_MAX_RETRIES:
+                        raise
+                    _backoff(attempt + 1)
+        
+        checksums = {}
+        for key, checksum, error in iter_concurrent(head, object_keys,
+                                                    max_workers or get_config().max_workers):
+            if error is not None:
+                self.logger.warning(f"Erro ao consultar checksum de '{bucket_name}/{key}': {error}")
+            checksums[key] = checksum
+        return checksums
+    
+    def find_duplicates(self, bucket_names: Optional[List[str]] = None, min_size: int = 1,
+                        confirm: bool = False, max_workers: Optional[int] = None,
+                        workdir: Optional[str] = None,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                        ) -> Iterator[Dict[str, Any]]:
+        """
+        Procura objetos duplicados (mesmo tamanho e ETag) entre buckets
+        
+        As listagens são gravadas em um índice temporário em disco e os grupos
+        são entregues um tamanho por vez, com memória constante. Para contas
+        diferentes, veja AWSAgent.find_duplicates_across_accounts.
+        
+        Args:
+            bucket_names: Buckets analisados (todos os buckets se não especificado)
+            min_size: Ignora objetos menores que este tamanho
+            confirm: Se True, confirma ETags multipart pelo checksum do objeto
+                inteiro (HEAD), agrupando também cópias enviadas com partes diferentes
+            max_workers: Número máximo de listagens e consultas simultâneas
+            workdir: Diretório do índice temporário
+            progress: Função chamada com {'bucket', 'objects'} durante a listagem
+            
+        Returns:
+            Iterador de grupos de duplicatas (ver s3_dedup.duplicate_groups)
+        """
+        with DuplicateIndex(workdir) as index:
+            self.index_objects(index, bucket_names, min_size=min_size,
+                               max_workers=max_workers, progress=progress)
+            verify = checksum_verifier({'': self}, max_workers) if confirm else None
+            yield from iter_duplicate_groups(index, verify)
+    
+    def sync(self, local_dir: str, bucket_name: str, prefix: str = "",
+             direction: str = 'upload', delete: bool = False, dry_run: bool = False,
+             exclude: Optional[List[str]] = None,
+             transfer_config: Optional[TransferConfig] = None,
+             max_workers: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sincroniza um diretório local com um prefixo S3
+        
+        Apenas arquivos novos ou alterados são transferidos. A comparação usa
+        tamanho e data de modificação e, quando elas não bastam, o ETag
+        calculado localmente. As transferências são executadas em paralelo.
+        
+        Args:
+            local_dir: Diretório local
+            bucket_name: Nome do bucket
+            prefix: Prefixo S3 correspondente ao diretório
+            direction: 'upload' (local -> S3) ou 'download' (S3 -> local)
+            delete: Se True, remove do destino o que não existe na origem
+            dry_run: Se True, apenas retorna o plano sem transferir nada
+            exclude: Padrões fnmatch de caminhos relativos a ignorar
+            transfer_config: Configuração de transferência (usa a do serviço se não especificada)
+            max_workers: Número máximo de transferências simultâneas (usa Config.max_workers)
+            
+        Returns:
+            Resumo com o plano e os totais, ou None se a listagem falhar
+        """
+        max_workers = max_workers or get_config().max_workers
+        transfer_config = transfer_config or self.get_transfer_config()
+        prefix = normalize_prefix(prefix)
+        
+        if direction == 'download':
+            Path(local_dir).mkdir(parents=True, exist_ok=True)
+        elif not Path(local_dir).is_dir():
+            self.logger.error(f"Diretório '{local_dir}' não encontrado")
+            return None
+        
+        local_files = scan_local(local_dir, exclude)
+        try:
+            remote_objects = {}
+            for obj in self.iter_objects_parallel(bucket_name, prefix, max_workers=max_workers,
+                                                  ordered=False):
+                relative = obj['key'][len(prefix):]
+                # Marcadores de "diretório" não são arquivos
+                if not relative or relative.endswith('/'):
+                    continue
+                if exclude and any(fnmatch.fnmatch(relative, pattern) for pattern in exclude):
+                    continue
+                remote_objects[relative] = obj
+        except ClientError as e:
+            self.logger.error(f"Erro ao listar objetos no bucket '{bucket_name}': {e}")
+            return None
+        
+        def reproducible(relative: str) -> bool:
+            # Sem consulta possível, o ETag é tratado como não reproduzível (vale a data)
+            try:
+                return etag_reproducible(self.client.head_object(Bucket=bucket_name,
+                                                                 Key=prefix + relative))
+            except ClientError:
+                return False
+        
+        actions, unchanged = build_sync_plan(local_files, remote_objects, direction, local_dir,
+                                             prefix, delete, transfer_config, max_workers,
+                                             reproducible)
+        
+        summary: Dict[str, Any] = {
+            'direction': direction,
+            'dry_run': dry_run,
+            'plan': [action.as_dict() for action in actions],
+            'unchanged': unchanged,
+            'transferred': 0,
+            'deleted': 0,
+            'bytes': 0,
+            'failed': [],
+        }
+        if dry_run or not actions:
+            return summary
+        
+        root = os.path.realpath(local_dir)
+        
+        def run(action: SyncAction) -> None:
+            if action.action == 'upload':
+                extra_args = {}
+                content_type = mimetypes.guess_type(action.path)[0]
+                if content_type:
+                    extra_args['ContentType'] = content_type
+                self.client.upload_file(action.path, bucket_name, action.key,
+                                        ExtraArgs=extra_args or None, Config=transfer_config)
+            elif action.action == 'download':
+                # Chaves com '..' não podem escrever fora do diretório
+                if not os.path.realpath(action.path).startswith(root + os.sep):
+                    raise ValueError(f"Chave fora do diretório de destino: {action.key}")
+                Path(action.path).parent.mkdir(parents=True, exist_ok=True)
+                self.client.download_file(bucket_name, action.key, action.path,
+                                          Config=transfer_config)
+                mtime = remote_objects[action.key[len(prefix):]]['last_modified'].timestamp()
+                os.utime(action.path, (mtime, mtime))
+            else:
+                os.remove(action.path)
+        
+        pending = [action for action in actions if action.action != 'delete_remote']
+        for action, _, error in iter_concurrent(run, pending, max_workers):
+            if error is not None:
+                summary['failed'].append({'key': action.key, 'error': str(error)})
+            elif action.action == 'delete_local':
+                summary['deleted'] += 1
+            else:
+                summary['transferred'] += 1
+                summary['bytes'] += action.size
+        
+        remote_deletes = [action.key for action in actions if action.action == 'delete_remote']
+        if remote_deletes:
+            deleted = self.delete_objects(bucket_name, remote_deletes, max_workers=max_workers)
+            summary['deleted'] += deleted['deleted']
+            summary['failed'] += [{'key': failure['key'], 'error': failure['message']}
+                                  for failure in deleted['failed']]
+        
+        if direction == 'upload':
+            self.invalidate_inventory('objects')
+        
+        self.logger.info(
+            f"Sincronização {direction} de '{local_dir}' com '{bucket_name}/{prefix}': "
+            f"{summary['transferred']} transferidos, {summary['deleted']} removidos, "
+            f"{unchanged} inalterados, {len(summary['failed'])} falhas"
+        )
+        return summary
+    
+    @invalidates('objects')
+    def delete_object(self, bucket_name: str, object_key: str) -> bool:
+        """
+        Remove um objeto do S3
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            
+        Returns:
+            True se removido com sucesso
+        """
+        try:
+            self.client.delete_object(Bucket=bucket_name, Key=object_key)
+            self.logger.info(f"Objeto '{bucket_name}/{object_key}' removido")
+            return True
+            
+        except ClientError as e:
+            self.logger.error(f"Erro ao remover objeto: {e}")
+            return False
+    
+    def get_object_info(self, bucket_name: str, object_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtém informações detalhadas sobre um objeto
+        
+        Args:
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            
+        Returns:
+            Informações do objeto ou None se não encontrado
+        """
+        try:
+            response = self.client.head_object(Bucket=bucket_name, Key=object_key)
+            return self._format_head(object_key, response)
+            
+        except ClientError as e:
+            self.logger.error(f"Erro ao obter informações do objeto: {e}")
+            return None
+    
+    def get_objects_info(self, bucket_name: str, objects: Iterable[Union[str, Dict[str, Any]]],
+                         max_workers: Optional[int] = None,
+                         use_cache: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Obtém informações de muitos objetos com consultas HEAD simultâneas
+        
+        Os resultados são entregues à medida que ficam prontos (sem ordem
+        definida), consumindo a entrada aos poucos. Throttling é repetido com
+        backoff. Objetos vindos de uma listagem (com 'etag' e 'last_modified',
+        ex: iter_objects_parallel) são procurados antes no cache de metadados
+        e só são consultados se mudaram desde a última auditoria.
+        
+        Args:
+            bucket_name: Nome do bucket
+            objects: Chaves ou objetos de uma listagem
+            max_workers: Número máximo de consultas simultâneas (usa Config.max_workers)
+            use_cache: Se True, usa e atualiza o cache de metadados do inventário
+            
+        Returns:
+            Iterador de informações (formato de get_object_info); objetos com
+            falha aparecem como {'key', 'error'}
+        """
+        max_workers = max_workers or get_config().max_workers
+        cache = get_inventory_cache() if use_cache else None
+        
+        def head(key: str) -> Dict[str, Any]:
+            for attempt in range(_HEAD_MAX_RETRIES + 1):
+                try:
+                    response = self.client.head_object(Bucket=bucket_name, Key=key)
+                    return self._format_head(key, response)
+                except ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code not in _RETRYABLE_ERRORS or attempt == _HEAD_MAX_RETRIES:
+                        return {'key': key, 'error': code or str(e)}
+                    _backoff(attempt + 1)
+        
+        def groups() -> Iterator[List[Tuple[str, Optional[str], Optional[float]]]]:
+            group = []
+            for obj in objects:
+                if isinstance(obj, str):
+                    group.append((obj, None, None))
+                else:
+                    modified = obj.get('last_modified')
+                    group.append((obj['key'], obj.get('etag'),
+                                  modified.timestamp() if modified else None))
+                if len(group) == _METADATA_CACHE_BATCH:
+                    yield group
+                    group = []
+            if group:
+                yield group
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        in_flight: set = set()
+        fetched: List[Dict[str, Any]] = []
+        counts = {'cached': 0, 'fetched': 0}
+        
+        def completed(block: bool) -> Iterator[Dict[str, Any]]:
+            nonlocal in_flight
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, timeout=None if block else 0,
+                                   return_when=FIRST_COMPLETED)
+            for future in done:
+                info = future.result()
+                counts['fetched'] += 1
+                if cache is not None and 'error' not in info:
+                    fetched.append(info)
+                yield info
+        
+        try:
+            for group in groups():
+                known = [entry for entry in group if entry[1]]
+                cached = cache.get_object_metadata(bucket_name, known) if cache and known else {}
+                
+                for key, _, _ in group:
+                    if key in cached:
+                        counts['cached'] += 1
+                        yield cached[key]
+                        continue
+                    # Limita as consultas pendentes: a entrada não corre à frente
+                    while len(in_flight) >= max_workers * 2:
+                        yield from completed(block=True)
+                    in_flight.add(executor.submit(head, key))
+                
+                yield from completed(block=False)
+                if len(fetched) >= _METADATA_CACHE_BATCH:
+                    cache.set_object_metadata(bucket_name, fetched)
+                    fetched = []
+            
+            while in_flight:
+                yield from completed(block=True)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if cache is not None and fetched:
+                cache.set_object_metadata(bucket_name, fetched)
+            self.logger.debug(f"Metadados de '{bucket_name}': {counts['cached']} do cache, "
+                              f"{counts['fetched']} consultados")
+    
+    def _format_head(self, object_key: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Formata a resposta de um HeadObject"""
+        return {
+            'key': object_key,
+            'size': response['ContentLength'],
+            'last_modified': response['LastModified'],
+            'etag': response['ETag'],
+            'content_type': response.get('ContentType', 'unknown'),
+            'metadata': response.get('Metadata', {}),
+            'storage_class': response.get('StorageClass', 'STANDARD'),
+            'encryption': response.get('ServerSideEncryption'),
+            'kms_key_id': response.get('SSEKMSKeyId'),
+        }
     
     def get_bucket_policy(self, bucket_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,333 @@
+"""
+Detecção de objetos duplicados entre buckets e contas
+
+Objetos com o mesmo tamanho e o mesmo ETag são candidatos a duplicatas. O
+ETag de um upload simples é o MD5 do conteúdo, mas o de um multipart upload
+é o MD5 dos MD5 das partes seguido do número de partes ('...-N'): o mesmo
+conteúdo enviado com partes de tamanhos diferentes tem ETags diferentes.
+Por isso, dentro de cada tamanho, os ETags multipart podem ser confirmados
+pelo checksum do objeto inteiro (HEAD com ChecksumMode), que não depende
+da divisão em partes.
+
+As listagens são gravadas em um índice SQLite temporário em disco, de modo
+que a memória usada não cresce com o número de objetos: apenas um tamanho
+por vez é carregado para agrupamento.
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Algoritmos de checksum do S3, na ordem de preferência para comparação
+CHECKSUM_ALGORITHMS = ('CRC64NVME', 'SHA256', 'SHA1', 'CRC32C', 'CRC32')
+
+# Objetos gravados no índice por transação
+_INSERT_BATCH = 10_000
+
+# Cache de páginas do SQLite (KiB); o restante do índice fica em disco
+_CACHE_KIB = 64 * 1024
+
+
+class DedupEntry(NamedTuple):
+    """Objeto registrado no índice de duplicatas"""
+    id: int
+    size: int
+    etag: str
+    account: str
+    bucket: str
+    key: str
+
+
+def is_multipart_etag(etag: str) -> bool:
+    """Indica se o ETag é de um multipart upload ('"<md5>-<partes>"')"""
+    return '-' in etag
+
+
+def full_object_checksum(response: Dict[str, Any]) -> Optional[str]:
+    """
+    Extrai o checksum do objeto inteiro de uma resposta de HeadObject
+
+    Checksums compostos (calculados sobre as partes, com sufixo '-N')
+    dependem da divisão em partes e não servem para comparar conteúdo.
+
+    Args:
+        response: Resposta de head_object com ChecksumMode='ENABLED'
+
+    Returns:
+        'ALGORITMO:valor' ou None se o objeto não tiver checksum do objeto inteiro
+    """
+    if response.get('ChecksumType') == 'COMPOSITE':
+        return None
+    for algorithm in CHECKSUM_ALGORITHMS:
+        value = response.get(f'Checksum{algorithm}')
+        if value and '-' not in value:
+            return f"{algorithm}:{value}"
+    return None
+
+
+class DuplicateIndex:
+    """
+    Índice em disco de (tamanho, ETag) dos objetos de vários buckets
+
+    O banco é temporário e removido em close (ou ao sair do bloco with).
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Cria o índice
+
+        Args:
+            directory: Diretório do arquivo temporário (usa o diretório temporário do sistema)
+        """
+        fd, path = tempfile.mkstemp(prefix='aws-agent-dedup-', suffix='.db', dir=directory)
+        os.close(fd)
+        os.chmod(path, 0o600)
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._locations: Dict[Tuple[str, str], int] = {}
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco criando o esquema"""
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        # Dados descartáveis: sem journal nem fsync
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute(f"PRAGMA cache_size=-{_CACHE_KIB}")
+        conn.execute("PRAGMA temp_store=FILE")
+        conn.execute("""
+            CREATE TABLE locations (
+                id INTEGER PRIMARY KEY,
+                account TEXT NOT NULL,
+                bucket TEXT NOT NULL
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE objects (
+                size INTEGER NOT NULL,
+                etag TEXT NOT NULL,
+                location INTEGER NOT NULL,
+                key TEXT NOT NULL
+            )
+        """)
+        conn.commit()
+        return conn
+
+    def _location_id(self, account: str, bucket: str) -> int:
+        """Obtém (ou registra) o identificador de um bucket de uma conta"""
+        location = self._locations.get((account, bucket))
+        if location is None:
+            cursor = self._conn.execute("INSERT INTO locations (account, bucket) VALUES (?, ?)",
+                                        (account, bucket))
+            location = self._locations[(account, bucket)] = cursor.lastrowid
+        return location
+
+    def add(self, account: str, bucket: str, objects: Iterable[Dict[str, Any]],
+            min_size: int = 1,
+            progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> int:
+        """
+        Grava os objetos de uma listagem no índice
+
+        Args:
+            account: Conta dona do bucket ('' para a conta atual)
+            bucket: Nome do bucket
+            objects: Objetos de uma listagem (com 'key', 'size' e 'etag')
+            min_size: Ignora objetos menores que este tamanho (objetos vazios nunca ocupam espaço)
+            progress: Função chamada com {'bucket', 'objects'} a cada lote gravado
+
+        Returns:
+            Número de objetos gravados
+        """
+        min_size = max(min_size, 1)
+        count = 0
+        with self._lock:
+            location = self._location_id(account, bucket)
+            rows = ((obj['size'], obj['etag'], location, obj['key'])
+                    for obj in objects if obj['size'] >= min_size)
+            while True:
+                batch = list(itertools.islice(rows, _INSERT_BATCH))
+                if not batch:
+                    break
+                self._conn.executemany("INSERT INTO objects VALUES (?, ?, ?, ?)", batch)
+                self._conn.commit()
+                count += len(batch)
+                if progress:
+                    progress({'bucket': bucket, 'objects': count})
+        return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def iter_size_classes(self) -> Iterator[List[DedupEntry]]:
+        """
+        Percorre os tamanhos compartilhados por mais de um objeto
+
+        Returns:
+            Iterador de listas de objetos com o mesmo tamanho, em ordem de tamanho
+        """
+        with self._lock:
+            self._conn.execute("CREATE INDEX IF NOT EXISTS objects_size ON objects (size, etag)")
+            cursor = self._conn.execute("""
+                SELECT o.rowid, o.size, o.etag, l.account, l.bucket, o.key
+                FROM objects o JOIN locations l ON l.id = o.location
+                WHERE o.size IN (SELECT size FROM objects GROUP BY size HAVING COUNT(*) > 1)
+                ORDER BY o.size, o.etag
+            """)
+        for _, rows in itertools.groupby(cursor, key=lambda row: row[1]):
+            yield [DedupEntry(*row) for row in rows]
+
+    def close(self) -> None:
+        """Fecha e remove o índice"""
+        with self._lock:
+            self._conn.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> 'DuplicateIndex':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def duplicate_groups(entries: List[DedupEntry],
+                     checksums: Optional[Dict[int, Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Agrupa objetos de mesmo tamanho por ETag e, se disponível, por checksum
+
+    Args:
+        entries: Objetos de um mesmo tamanho
+        checksums: ID do objeto -> checksum do objeto inteiro (ver full_object_checksum)
+
+    Returns:
+        Grupos com mais de um objeto: size, etag, objects (account, bucket,
+        key), reclaimable (bytes liberados mantendo uma cópia), match ('etag'
+        ou 'checksum') e verified (conteúdo confirmado por MD5 ou checksum)
+    """
+    checksums = checksums or {}
+    parent = {entry.id: entry.id for entry in entries}
+
+    def find(item: int) -> int:
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    first_by_value: Dict[str, int] = {}
+    for entry in entries:
+        for value in (f"etag:{entry.etag}", checksums.get(entry.id)):
+            if value is None:
+                continue
+            first = first_by_value.setdefault(value, entry.id)
+            parent[find(entry.id)] = find(first)
+
+    components: Dict[int, List[DedupEntry]] = defaultdict(list)
+    for entry in entries:
+        components[find(entry.id)].append(entry)
+
+    groups = []
+    for members in components.values():
+        if len(members) < 2:
+            continue
+        etags = {member.etag for member in members}
+        found = {checksums.get(member.id) for member in members}
+        single_md5 = len(etags) == 1 and not is_multipart_etag(next(iter(etags)))
+        groups.append({
+            'size': members[0].size,
+            'etag': members[0].etag,
+            'objects': [{'account': member.account, 'bucket': member.bucket, 'key': member.key}
+                        for member in members],
+            'reclaimable': members[0].size * (len(members) - 1),
+            'match': 'etag' if len(etags) == 1 else 'checksum',
+            'verified': single_md5 or (len(found) == 1 and None not in found),
+        })
+    return groups
+
+
+def iter_duplicate_groups(index: DuplicateIndex,
+                          verify: Optional[Callable[[List[DedupEntry]], Dict[int, Optional[str]]]] = None
+                          ) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os grupos de duplicatas de um índice
+
+    Args:
+        index: Índice com as listagens
+        verify: Função que obtém o checksum do objeto inteiro dos objetos
+            informados (ID -> checksum); chamada apenas para os ETags multipart
+
+    Returns:
+        Iterador de grupos (formato de duplicate_groups), em ordem de tamanho
+    """
+    for entries in index.iter_size_classes():
+        checksums = None
+        if verify is not None:
+            multipart = [entry for entry in entries if is_multipart_etag(entry.etag)]
+            if multipart:
+                checksums = verify(multipart)
+        yield from duplicate_groups(entries, checksums)
+
+
+def checksum_verifier(services: Dict[str, Any], max_workers: Optional[int] = None
+                      ) -> Callable[[List[DedupEntry]], Dict[int, Optional[str]]]:
+    """
+    Cria uma função de verificação que consulta os objetos na conta de cada um
+
+    Args:
+        services: Conta -> S3Service usado para consultar os objetos dela
+        max_workers: Número máximo de consultas simultâneas
+
+    Returns:
+        Função para o parâmetro verify de iter_duplicate_groups
+    """
+    def verify(entries: List[DedupEntry]) -> Dict[int, Optional[str]]:
+        by_bucket: Dict[Tuple[str, str], List[DedupEntry]] = defaultdict(list)
+        for entry in entries:
+            by_bucket[(entry.account, entry.bucket)].append(entry)
+
+        checksums = {}
+        for (account, bucket), members in by_bucket.items():
+            found = services[account].get_object_checksums(
+                bucket, [member.key for member in members], max_workers
+            )
+            checksums.update({member.id: found.get(member.key) for member in members})
+        return checksums
+
+    return verify
+
+
+def summarize_duplicates(groups: Iterable[Dict[str, Any]], top: int = 20) -> Dict[str, Any]:
+    """
+    Totaliza grupos de duplicatas mantendo apenas os maiores em memória
+
+    Args:
+        groups: Grupos (ver iter_duplicate_groups)
+        top: Número de grupos mantidos, pelos bytes recuperáveis
+
+    Returns:
+        Dicionário com groups, duplicates (cópias excedentes), reclaimable,
+        verified_reclaimable e top (maiores grupos, em ordem decrescente)
+    """
+    summary = {'groups': 0, 'duplicates': 0, 'reclaimable': 0, 'verified_reclaimable': 0}
+    largest: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    for order, group in enumerate(groups):
+        summary['groups'] += 1
+        summary['duplicates'] += len(group['objects']) - 1
+        summary['reclaimable'] += group['reclaimable']
+        if group['verified']:
+            summary['verified_reclaimable'] += group['reclaimable']
+
+        item = (group['reclaimable'], -order, group)
+        if len(largest) < top:
+            heapq.heappush(largest, item)
+        elif top and item[:2] > largest[0][:2]:
+            heapq.heapreplace(largest, item)
+
+    summary['top'] = [group for _, _, group in sorted(largest, key=lambda item: item[:2], reverse=True)]
+    return summary
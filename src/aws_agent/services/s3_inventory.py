@@ -0,0 +1,425 @@
+"""
+Análise de relatórios do S3 Inventory
+
+Este módulo lê entregas do S3 Inventory (``manifest.json`` e os arquivos de
+dados CSV.gz, ORC ou Parquet) e agrega os objetos listados por prefixo,
+classe de armazenamento, faixa de idade e status de criptografia. Cada
+arquivo de dados é processado de forma independente, em blocos de linhas, e
+produz um ``InventoryAggregate`` que pode ser combinado com os demais; assim
+os arquivos podem ser processados em paralelo em vários processos.
+
+Com NumPy instalado a agregação de cada bloco é feita por colunas; sem ele,
+linha a linha em Python. Arquivos ORC e Parquet exigem pyarrow. Ambos fazem
+parte do extra ``analytics``. Os mesmos arquivos também alimentam a árvore
+de prefixos de ``s3_usage``.
+"""
+
+import csv
+import gzip
+import math
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import unquote_plus
+
+from .s3_usage import PrefixTree
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+
+INVENTORY_FORMATS = ('CSV', 'ORC', 'Parquet')
+
+# Limites das faixas de idade em dias (a última faixa não tem limite superior)
+AGE_BUCKETS = (30, 90, 180, 365)
+
+# Linhas agregadas por bloco
+_CHUNK_ROWS = 100_000
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_MANIFEST_FOLDER = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}Z$')
+
+# Colunas usadas na agregação
+_COLUMNS = ('key', 'size', 'last_modified_date', 'storage_class',
+            'encryption_status', 'is_delete_marker')
+
+
+class InventoryManifest(NamedTuple):
+    """Manifesto de uma entrega do S3 Inventory"""
+    source_bucket: str
+    destination_bucket: str
+    file_format: str
+    columns: List[str]
+    files: List[Dict[str, Any]]
+    created_at: datetime
+
+
+def column_name(name: str) -> str:
+    """
+    Normaliza o nome de uma coluna do inventário
+
+    O esquema CSV usa nomes como 'LastModifiedDate'; ORC e Parquet usam
+    'last_modified_date'.
+
+    Args:
+        name: Nome da coluna
+
+    Returns:
+        Nome em snake_case
+    """
+    return _CAMEL_BOUNDARY.sub('_', name.strip()).lower()
+
+
+def parse_manifest(manifest: Dict[str, Any]) -> InventoryManifest:
+    """
+    Interpreta o manifest.json de uma entrega do S3 Inventory
+
+    Args:
+        manifest: Conteúdo do manifest.json
+
+    Returns:
+        Manifesto
+
+    Raises:
+        ValueError: Se o formato dos arquivos não for suportado
+    """
+    file_format = manifest['fileFormat']
+    if file_format not in INVENTORY_FORMATS:
+        raise ValueError(f"Formato de inventário não suportado: {file_format}")
+
+    schema = manifest.get('fileSchema', '')
+    if file_format == 'CSV':
+        columns = [column_name(name) for name in schema.split(',')]
+    else:
+        # ORC/Parquet: as colunas vêm do próprio arquivo
+        columns = []
+
+    destination = manifest.get('destinationBucket', '')
+    return InventoryManifest(
+        source_bucket=manifest.get('sourceBucket', ''),
+        destination_bucket=destination.rsplit(':', 1)[-1],
+        file_format=file_format,
+        columns=columns,
+        files=manifest.get('files', []),
+        created_at=datetime.fromtimestamp(int(manifest['creationTimestamp']) / 1000, timezone.utc),
+    )
+
+
+def latest_manifest_key(folders: Sequence[str]) -> Optional[str]:
+    """
+    Escolhe a entrega mais recente entre as pastas de um inventário
+
+    Args:
+        folders: Prefixos comuns sob '<prefixo>/<bucket de origem>/<configuração>/'
+
+    Returns:
+        Chave do manifest.json mais recente ou None
+    """
+    deliveries = [folder for folder in folders
+                  if _MANIFEST_FOLDER.match(folder.rstrip('/').rsplit('/', 1)[-1])]
+    if not deliveries:
+        return None
+    return max(deliveries) + 'manifest.json'
+
+
+def prefix_of(key: str, depth: int) -> str:
+    """
+    Prefixo de uma chave até a profundidade indicada
+
+    Args:
+        key: Chave do objeto
+        depth: Número de níveis de "diretório"
+
+    Returns:
+        Prefixo com barra final ('' para objetos na raiz)
+    """
+    parts = key.split('/', depth)
+    if len(parts) <= depth:
+        parts = parts[:-1]
+    else:
+        parts = parts[:depth]
+    return '/'.join(parts) + '/' if parts else ''
+
+
+def age_bucket_labels() -> List[str]:
+    """Rótulos das faixas de idade (ex: '0-30d', '365d+')"""
+    bounds = (0,) + AGE_BUCKETS
+    labels = [f"{low}-{high}d" for low, high in zip(bounds, bounds[1:])]
+    return labels + [f"{AGE_BUCKETS[-1]}d+"]
+
+
+class InventoryAggregate:
+    """
+    Totais de objetos e bytes de um inventário, por dimensão
+
+    Cada dimensão (prefixes, storage_classes, ages, encryption) mapeia um
+    valor para [objetos, bytes].
+    """
+
+    DIMENSIONS = ('prefixes', 'storage_classes', 'ages', 'encryption')
+
+    def __init__(self):
+        self.objects = 0
+        self.size = 0
+        self.prefixes: Dict[str, List[int]] = {}
+        self.storage_classes: Dict[str, List[int]] = {}
+        self.ages: Dict[str, List[int]] = {}
+        self.encryption: Dict[str, List[int]] = {}
+
+    def add(self, dimension: str, value: str, objects: int, size: int) -> None:
+        """Soma objetos e bytes a um valor de uma dimensão"""
+        totals = getattr(self, dimension).setdefault(value, [0, 0])
+        totals[0] += objects
+        totals[1] += size
+
+    def merge(self, other: 'InventoryAggregate') -> 'InventoryAggregate':
+        """
+        Combina os totais de outro agregado a este
+
+        Args:
+            other: Agregado a combinar
+
+        Returns:
+            Este agregado
+        """
+        self.objects += other.objects
+        self.size += other.size
+        for dimension in self.DIMENSIONS:
+            for value, (objects, size) in getattr(other, dimension).items():
+                self.add(dimension, value, objects, size)
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Representação serializável dos totais
+
+        Returns:
+            Dicionário com objects, size e, por dimensão, valor -> {objects, size}
+            (faixas de idade em ordem crescente; demais valores em ordem
+            decrescente de bytes)
+        """
+        labels = age_bucket_labels()
+        result: Dict[str, Any] = {'objects': self.objects, 'size': self.size}
+        for dimension in self.DIMENSIONS:
+            if dimension == 'ages':
+                totals = sorted(self.ages.items(), key=lambda item: labels.index(item[0]))
+            else:
+                totals = sorted(getattr(self, dimension).items(), key=lambda item: -item[1][1])
+            result[dimension] = {value: {'objects': objects, 'size': size}
+                                 for value, (objects, size) in totals}
+        return result
+
+
+def to_timestamp(value: Any) -> float:
+    """
+    Converte uma data de modificação do inventário
+
+    Args:
+        value: Data ISO 8601 (CSV), datetime (ORC/Parquet) ou vazio
+
+    Returns:
+        Segundos desde a época (NaN se ausente)
+    """
+    if not value:
+        return float('nan')
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    # CSV: '2024-05-01T12:00:00.000Z'
+    return datetime.fromisoformat(value[:19]).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _aggregate_rows(aggregate: InventoryAggregate, chunk: Dict[str, List[Any]],
+                    reference: float, depth: int) -> None:
+    """Agrega um bloco linha a linha"""
+    keys = chunk['key']
+    unknown = ['unknown'] * len(keys)
+    storage = chunk.get('storage_class') or unknown
+    encryption = chunk.get('encryption_status') or unknown
+    modified = chunk.get('last_modified_date') or [None] * len(keys)
+    labels = age_bucket_labels()
+
+    for key, size, when, storage_class, status in zip(keys, chunk['size'], modified,
+                                                      storage, encryption):
+        size = int(size or 0)
+        aggregate.objects += 1
+        aggregate.size += size
+        aggregate.add('prefixes', prefix_of(key, depth), 1, size)
+        aggregate.add('storage_classes', storage_class or 'unknown', 1, size)
+        aggregate.add('encryption', status or 'unknown', 1, size)
+
+        age = (reference - to_timestamp(when)) / 86400
+        if not math.isnan(age):
+            index = sum(1 for bound in AGE_BUCKETS if age >= bound)
+            aggregate.add('ages', labels[index], 1, size)
+
+
+def _grouped_sums(values: Any, sizes: Any) -> Iterator[Tuple[Any, int, int]]:
+    """Agrupa por valor com NumPy: (valor, objetos, bytes) com somas inteiras exatas"""
+    if not len(values):
+        return iter(())
+    uniques, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.add.reduceat(sizes[order], starts)
+    return zip(uniques.tolist(), counts.tolist(), sums.tolist())
+
+
+def _aggregate_columns(aggregate: InventoryAggregate, chunk: Dict[str, List[Any]],
+                       reference: float, depth: int) -> None:
+    """Agrega um bloco por colunas com NumPy"""
+    count = len(chunk['key'])
+    sizes = np.array([int(size or 0) for size in chunk['size']], dtype=np.int64)
+    aggregate.objects += count
+    aggregate.size += int(sizes.sum())
+
+    prefixes = np.array([prefix_of(key, depth) for key in chunk['key']], dtype=object)
+    for value, objects, size in _grouped_sums(prefixes, sizes):
+        aggregate.add('prefixes', value, objects, size)
+
+    for dimension, column in (('storage_classes', 'storage_class'),
+                              ('encryption', 'encryption_status')):
+        values = np.array([value or 'unknown' for value in chunk[column]], dtype=object) \
+            if chunk.get(column) else np.full(count, 'unknown', dtype=object)
+        for value, objects, size in _grouped_sums(values, sizes):
+            aggregate.add(dimension, value, objects, size)
+
+    if chunk.get('last_modified_date'):
+        modified = np.array([to_timestamp(value) for value in chunk['last_modified_date']])
+        ages = (reference - modified) / 86400
+        known = ~np.isnan(ages)
+        indexes = np.searchsorted(np.array(AGE_BUCKETS), ages[known], side='right')
+        labels = age_bucket_labels()
+        for index, objects, size in _grouped_sums(indexes, sizes[known]):
+            aggregate.add('ages', labels[index], objects, size)
+
+
+def _iter_csv_chunks(path: str, columns: List[str]) -> Iterator[Dict[str, List[Any]]]:
+    """Lê um arquivo CSV.gz do inventário em blocos de colunas"""
+    wanted = {name: index for index, name in enumerate(columns) if name in _COLUMNS}
+    with gzip.open(path, 'rt', newline='', encoding='utf-8') as f:
+        chunk: Dict[str, List[Any]] = {name: [] for name in wanted}
+        rows = 0
+        for row in csv.reader(f):
+            for name, index in wanted.items():
+                chunk[name].append(row[index] if index < len(row) else '')
+            rows += 1
+            if rows == _CHUNK_ROWS:
+                yield chunk
+                chunk = {name: [] for name in wanted}
+                rows = 0
+        if rows:
+            yield chunk
+
+
+def _iter_arrow_chunks(path: str, file_format: str) -> Iterator[Dict[str, List[Any]]]:
+    """Lê um arquivo ORC ou Parquet do inventário em blocos de colunas (requer pyarrow)"""
+    try:
+        import pyarrow.orc as orc
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            f"Inventários {file_format} exigem pyarrow (pip install aws-multi-account-agent[analytics])"
+        ) from e
+
+    if file_format == 'Parquet':
+        parquet = pq.ParquetFile(path)
+        names = [name for name in parquet.schema_arrow.names if column_name(name) in _COLUMNS]
+        batches = parquet.iter_batches(batch_size=_CHUNK_ROWS, columns=names)
+    else:
+        orc_file = orc.ORCFile(path)
+        names = [name for name in orc_file.schema.names if column_name(name) in _COLUMNS]
+        batches = (orc_file.read_stripe(index, columns=names) for index in range(orc_file.nstripes))
+
+    for batch in batches:
+        yield {column_name(name): column for name, column in batch.to_pydict().items()}
+
+
+def _is_true(value: Any) -> bool:
+    """Valor verdadeiro em colunas booleanas (CSV usa 'true'/'false')"""
+    return value is True or (isinstance(value, str) and value.lower() == 'true')
+
+
+def iter_inventory_chunks(path: str, file_format: str,
+                          columns: List[str]) -> Iterator[Dict[str, List[Any]]]:
+    """
+    Lê um arquivo de dados do inventário em blocos de colunas
+
+    Marcadores de exclusão são descartados e as chaves de arquivos CSV
+    (codificadas como URL) são decodificadas.
+
+    Args:
+        path: Caminho local do arquivo
+        file_format: 'CSV', 'ORC' ou 'Parquet'
+        columns: Colunas do esquema CSV (normalizadas, ver column_name)
+
+    Returns:
+        Iterador de blocos nome da coluna -> valores
+    """
+    chunks = _iter_csv_chunks(path, columns) if file_format == 'CSV' \
+        else _iter_arrow_chunks(path, file_format)
+
+    for chunk in chunks:
+        markers = chunk.pop('is_delete_marker', None)
+        if markers and any(_is_true(marker) for marker in markers):
+            keep = [not _is_true(marker) for marker in markers]
+            chunk = {name: [value for value, kept in zip(values, keep) if kept]
+                     for name, values in chunk.items()}
+        if file_format == 'CSV':
+            chunk['key'] = [unquote_plus(key) for key in chunk['key']]
+        if chunk['key']:
+            yield chunk
+
+
+def aggregate_inventory_file(path: str, file_format: str, columns: List[str],
+                             reference: float, depth: int = 1) -> InventoryAggregate:
+    """
+    Agrega um arquivo de dados do inventário
+
+    Executada nos processos de trabalho de S3Service.analyze_inventory.
+
+    Args:
+        path: Caminho local do arquivo
+        file_format: 'CSV', 'ORC' ou 'Parquet'
+        columns: Colunas do esquema CSV (normalizadas, ver column_name)
+        reference: Instante de referência das idades (segundos desde a época)
+        depth: Profundidade dos prefixos agregados
+
+    Returns:
+        Totais do arquivo
+    """
+    aggregate_chunk = _aggregate_columns if np is not None else _aggregate_rows
+    aggregate = InventoryAggregate()
+    for chunk in iter_inventory_chunks(path, file_format, columns):
+        aggregate_chunk(aggregate, chunk, reference, depth)
+    return aggregate
+
+
+def inventory_prefix_tree(path: str, file_format: str, columns: List[str],
+                          bucket_name: str, depth: int, prefix: str = "") -> PrefixTree:
+    """
+    Monta a árvore de prefixos de um arquivo de dados do inventário
+
+    Executada nos processos de trabalho de S3Service.prefix_usage.
+
+    Args:
+        path: Caminho local do arquivo
+        file_format: 'CSV', 'ORC' ou 'Parquet'
+        columns: Colunas do esquema CSV (normalizadas, ver column_name)
+        bucket_name: Bucket de origem do inventário
+        depth: Profundidade da árvore
+        prefix: Considera apenas as chaves com este prefixo
+
+    Returns:
+        Árvore com os objetos do arquivo
+    """
+    tree = PrefixTree(bucket_name, depth)
+    for chunk in iter_inventory_chunks(path, file_format, columns):
+        modified = chunk.get('last_modified_date') or [None] * len(chunk['key'])
+        for key, size, when in zip(chunk['key'], chunk['size'], modified):
+            if not key.startswith(prefix):
+                continue
+            timestamp = to_timestamp(when)
+            tree.add(key, int(size or 0), None if math.isnan(timestamp) else timestamp)
+    return tree
@@ -0,0 +1,472 @@
+"""
+Simulação de regras de ciclo de vida e custos de classes de armazenamento S3
+
+Este módulo carrega tamanho, idade, classe de armazenamento e prefixo de
+cada objeto em arrays NumPy (``ObjectArrays``, a partir da listagem ou do S3
+Inventory) e projeta, mês a mês, os custos de armazenamento, de transição e
+de leitura de um conjunto de regras de ciclo de vida, sem aplicá-las.
+
+Cada variante de regras reduz os objetos a grupos (regra, classe, idade em
+dias, objeto pequeno) com ``numpy.bincount``; a projeção mensal percorre os
+grupos, e não os objetos, de modo que várias variantes sobre centenas de
+milhões de objetos levam segundos. Requer NumPy (extra ``analytics``).
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .s3_inventory import iter_inventory_chunks, prefix_of, to_timestamp
+from ..utils.helpers import format_currency
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+
+# Classes de armazenamento em ordem de "temperatura": o ciclo de vida só move
+# objetos para classes mais frias (código maior)
+STORAGE_CLASSES = ('STANDARD', 'REDUCED_REDUNDANCY', 'INTELLIGENT_TIERING', 'STANDARD_IA',
+                   'ONEZONE_IA', 'GLACIER_IR', 'GLACIER', 'DEEP_ARCHIVE')
+_CLASS_CODES = {name: code for code, name in enumerate(STORAGE_CLASSES)}
+TRANSITION_CLASSES = STORAGE_CLASSES[2:]
+
+# Objetos menores que isto não são transicionados, salvo filtro de tamanho explícito
+SMALL_OBJECT_SIZE = 128 * 1024
+
+_DAYS_PER_MONTH = 30
+_GIB = 1024 ** 3
+_CHUNK_ROWS = 100_000
+
+
+class StoragePrice(NamedTuple):
+    """Preços de uma classe de armazenamento"""
+    storage: float                  # por GB-mês
+    transition: float = 0.0         # por 1.000 transições para a classe
+    retrieval: float = 0.0          # por GB lido
+    min_size: int = 0               # tamanho mínimo cobrado por objeto
+    overhead: int = 0               # bytes de índice por objeto, cobrados na própria classe
+    standard_overhead: int = 0      # bytes de metadados por objeto, cobrados como STANDARD
+    monitoring: float = 0.0         # por 1.000 objetos-mês (objetos de 128 KB ou mais)
+
+
+# Preços de referência (USD, us-east-1); ajuste com o parâmetro prices
+DEFAULT_PRICES: Dict[str, StoragePrice] = {
+    'STANDARD': StoragePrice(0.023),
+    'REDUCED_REDUNDANCY': StoragePrice(0.024),
+    'INTELLIGENT_TIERING': StoragePrice(0.023, transition=0.01, monitoring=0.0025),
+    'STANDARD_IA': StoragePrice(0.0125, transition=0.01, retrieval=0.01, min_size=SMALL_OBJECT_SIZE),
+    'ONEZONE_IA': StoragePrice(0.01, transition=0.01, retrieval=0.01, min_size=SMALL_OBJECT_SIZE),
+    'GLACIER_IR': StoragePrice(0.004, transition=0.02, retrieval=0.03, min_size=SMALL_OBJECT_SIZE),
+    'GLACIER': StoragePrice(0.0036, transition=0.03, retrieval=0.01,
+                            overhead=32 * 1024, standard_overhead=8 * 1024),
+    'DEEP_ARCHIVE': StoragePrice(0.00099, transition=0.05, retrieval=0.02,
+                                 overhead=32 * 1024, standard_overhead=8 * 1024),
+}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("A simulação de ciclo de vida requer NumPy "
+                          "(pip install aws-multi-account-agent[analytics])")
+
+
+class LifecycleRule(NamedTuple):
+    """Regra de ciclo de vida a simular"""
+    prefix: str = ""
+    transitions: Tuple[Tuple[int, str], ...] = ()   # (dias desde a criação, classe)
+    expiration_days: Optional[int] = None
+    min_size: Optional[int] = None                  # ObjectSizeGreaterThan
+    max_size: Optional[int] = None                  # ObjectSizeLessThan
+    name: str = ""
+
+    @classmethod
+    def from_config(cls, rule: Dict[str, Any]) -> 'LifecycleRule':
+        """
+        Converte uma regra no formato da API (PutBucketLifecycleConfiguration)
+
+        Args:
+            rule: Regra com Filter/Prefix, Transitions e Expiration
+
+        Returns:
+            Regra simulável
+
+        Raises:
+            ValueError: Se a regra usar recursos que não podem ser simulados
+                (filtros por tag, datas absolutas ou classes desconhecidas)
+        """
+        conditions = dict(rule.get('Filter', {}))
+        conditions.update(conditions.pop('And', {}))
+        if 'Tag' in conditions or conditions.get('Tags'):
+            raise ValueError(f"Regra '{rule.get('ID', '')}': filtros por tag não podem ser simulados")
+
+        transitions = []
+        for transition in rule.get('Transitions', []):
+            if 'Days' not in transition:
+                raise ValueError(f"Regra '{rule.get('ID', '')}': apenas transições por dias são simuladas")
+            if transition['StorageClass'] not in TRANSITION_CLASSES:
+                raise ValueError(f"Classe de transição inválida: {transition['StorageClass']}")
+            transitions.append((int(transition['Days']), transition['StorageClass']))
+
+        expiration = rule.get('Expiration', {})
+        if expiration and 'Days' not in expiration:
+            raise ValueError(f"Regra '{rule.get('ID', '')}': apenas expiração por dias é simulada")
+
+        return cls(
+            prefix=conditions.get('Prefix', rule.get('Prefix', '')),
+            transitions=tuple(sorted(transitions)),
+            expiration_days=expiration.get('Days'),
+            min_size=conditions.get('ObjectSizeGreaterThan'),
+            max_size=conditions.get('ObjectSizeLessThan'),
+            name=rule.get('ID', ''),
+        )
+
+
+def rules_from_configuration(rules: Iterable[Any]) -> List[LifecycleRule]:
+    """
+    Converte regras da API (ignorando as desabilitadas) ou já convertidas
+
+    Args:
+        rules: Regras no formato da API ou LifecycleRule
+
+    Returns:
+        Regras simuláveis
+    """
+    return [rule if isinstance(rule, LifecycleRule) else LifecycleRule.from_config(rule)
+            for rule in rules
+            if isinstance(rule, LifecycleRule) or rule.get('Status', 'Enabled') == 'Enabled']
+
+
+class ObjectArrays:
+    """
+    Objetos de um bucket em arrays NumPy
+
+    Atributos: sizes (int64), ages (dias, int32), classes (código em
+    STORAGE_CLASSES, int8) e prefix_codes (índice em prefixes, int32).
+    """
+
+    def __init__(self, sizes: Any, ages: Any, classes: Any, prefix_codes: Any,
+                 prefixes: List[str], prefix_depth: int, reference: float):
+        self.sizes = sizes
+        self.ages = ages
+        self.classes = classes
+        self.prefix_codes = prefix_codes
+        self.prefixes = prefixes
+        self.prefix_depth = prefix_depth
+        self.reference = reference
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @classmethod
+    def from_columns(cls, keys: Sequence[str], sizes: Sequence[Any], modified: Sequence[Any],
+                     storage_classes: Sequence[Optional[str]], reference: float,
+                     prefix_depth: int = 1) -> 'ObjectArrays':
+        """
+        Monta os arrays a partir de colunas
+
+        Args:
+            keys: Chaves dos objetos
+            sizes: Tamanhos
+            modified: Datas de modificação (datetime, texto ISO 8601 ou segundos)
+            storage_classes: Classes de armazenamento (vazio = STANDARD)
+            reference: Instante de referência das idades (segundos desde a época)
+            prefix_depth: Profundidade dos prefixos usados pelos filtros das regras
+
+        Returns:
+            Arrays dos objetos
+        """
+        _require_numpy()
+        count = len(keys)
+        codes: Dict[str, int] = {}
+        prefix_codes = np.fromiter((codes.setdefault(prefix_of(key, prefix_depth), len(codes))
+                                    for key in keys), dtype=np.int32, count=count)
+        stamps = np.fromiter((value if isinstance(value, float) else to_timestamp(value)
+                              for value in modified), dtype=np.float64, count=count)
+        ages = np.floor((reference - stamps) / 86400)
+        ages = np.where(np.isnan(ages), 0, np.maximum(ages, 0)).astype(np.int32)
+
+        return cls(
+            sizes=np.fromiter((int(size or 0) for size in sizes), dtype=np.int64, count=count),
+            ages=ages,
+            classes=np.fromiter((_CLASS_CODES.get(storage or 'STANDARD', 0) for storage in storage_classes),
+                                dtype=np.int8, count=count),
+            prefix_codes=prefix_codes,
+            prefixes=list(codes),
+            prefix_depth=prefix_depth,
+            reference=reference,
+        )
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[Dict[str, Any]], reference: float,
+                     prefix_depth: int = 1) -> 'ObjectArrays':
+        """
+        Monta os arrays a partir de objetos de uma listagem, em blocos
+
+        Args:
+            objects: Objetos com key, size, last_modified e storage_class
+            reference: Instante de referência das idades (segundos desde a época)
+            prefix_depth: Profundidade dos prefixos usados pelos filtros das regras
+
+        Returns:
+            Arrays dos objetos
+        """
+        parts = []
+        columns: Tuple[List[Any], ...] = ([], [], [], [])
+        for obj in objects:
+            columns[0].append(obj['key'])
+            columns[1].append(obj['size'])
+            columns[2].append(obj['last_modified'])
+            columns[3].append(obj.get('storage_class'))
+            if len(columns[0]) == _CHUNK_ROWS:
+                parts.append(cls.from_columns(*columns, reference, prefix_depth))
+                columns = ([], [], [], [])
+        parts.append(cls.from_columns(*columns, reference, prefix_depth))
+        return cls.concatenate(parts)
+
+    @classmethod
+    def concatenate(cls, parts: Sequence['ObjectArrays']) -> 'ObjectArrays':
+        """
+        Junta arrays de várias partes (listagens ou arquivos de inventário)
+
+        Args:
+            parts: Partes com a mesma profundidade de prefixos e referência
+
+        Returns:
+            Arrays com todos os objetos
+        """
+        _require_numpy()
+        merged: Dict[str, int] = {}
+        remapped = []
+        for part in parts:
+            mapping = np.array([merged.setdefault(prefix, len(merged)) for prefix in part.prefixes],
+                               dtype=np.int32)
+            remapped.append(mapping[part.prefix_codes] if len(part) else part.prefix_codes)
+
+        first = parts[0]
+        return cls(
+            sizes=np.concatenate([part.sizes for part in parts]),
+            ages=np.concatenate([part.ages for part in parts]),
+            classes=np.concatenate([part.classes for part in parts]),
+            prefix_codes=np.concatenate(remapped).astype(np.int32),
+            prefixes=list(merged),
+            prefix_depth=first.prefix_depth,
+            reference=first.reference,
+        )
+
+    def rule_mask(self, rule: LifecycleRule) -> Any:
+        """
+        Objetos cobertos pelos filtros de uma regra
+
+        Args:
+            rule: Regra
+
+        Returns:
+            Array booleano
+
+        Raises:
+            ValueError: Se o prefixo da regra não terminar em '/' ou for mais
+                profundo que os prefixos carregados
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if rule.prefix:
+            # Só prefixos completos ("diretórios") já carregados podem ser comparados
+            if not rule.prefix.endswith('/') or rule.prefix.count('/') > self.prefix_depth:
+                raise ValueError(f"Prefixo '{rule.prefix}' não simulável: use prefixos terminados "
+                                 f"em '/' com até {self.prefix_depth} níveis (prefix_depth)")
+            matching = [code for code, prefix in enumerate(self.prefixes) if prefix.startswith(rule.prefix)]
+            mask &= np.isin(self.prefix_codes, matching)
+        if rule.min_size is not None:
+            mask &= self.sizes > rule.min_size
+        if rule.max_size is not None:
+            mask &= self.sizes < rule.max_size
+        return mask
+
+
+def inventory_object_arrays(path: str, file_format: str, columns: List[str],
+                            reference: float, prefix_depth: int) -> ObjectArrays:
+    """
+    Monta os arrays de um arquivo de dados do inventário
+
+    Executada nos processos de trabalho de S3Service.load_object_arrays.
+
+    Args:
+        path: Caminho local do arquivo
+        file_format: 'CSV', 'ORC' ou 'Parquet'
+        columns: Colunas do esquema CSV (normalizadas)
+        reference: Instante de referência das idades (segundos desde a época)
+        prefix_depth: Profundidade dos prefixos
+
+    Returns:
+        Arrays dos objetos do arquivo
+    """
+    parts = []
+    for chunk in iter_inventory_chunks(path, file_format, columns):
+        count = len(chunk['key'])
+        parts.append(ObjectArrays.from_columns(
+            chunk['key'], chunk['size'], chunk.get('last_modified_date') or [None] * count,
+            chunk.get('storage_class') or [None] * count, reference, prefix_depth
+        ))
+    if not parts:
+        parts.append(ObjectArrays.from_columns([], [], [], [], reference, prefix_depth))
+    return ObjectArrays.concatenate(parts)
+
+
+def simulate_lifecycle(objects: ObjectArrays, rules: Sequence[LifecycleRule], months: int = 12,
+                       monthly_reads: float = 0.0,
+                       prices: Optional[Dict[str, StoragePrice]] = None) -> Dict[str, Any]:
+    """
+    Projeta os custos mensais de um conjunto de regras de ciclo de vida
+
+    Cada objeto segue a primeira regra cujos filtros o cobrem. As idades
+    avançam 30 dias por mês; transições já vencidas acontecem no primeiro
+    mês. Taxas de exclusão antecipada não são consideradas.
+
+    Args:
+        objects: Objetos do bucket
+        rules: Regras a simular (lista vazia projeta o custo atual)
+        months: Número de meses projetados
+        monthly_reads: Fração dos bytes lida por mês (custo de leitura)
+        prices: Preços que substituem DEFAULT_PRICES, por classe
+
+    Returns:
+        Totais (storage, transitions, retrieval, total) e projeção de cada mês
+        (month, storage, transitions, retrieval, total, objects, bytes, classes)
+    """
+    _require_numpy()
+    prices = {**DEFAULT_PRICES, **(prices or {})}
+    table = [prices[name] for name in STORAGE_CLASSES]
+    storage_price = np.array([price.storage for price in table])
+    transition_price = np.array([price.transition for price in table])
+    retrieval_price = np.array([price.retrieval for price in table])
+    min_size = np.array([price.min_size for price in table])
+    overhead = np.array([price.overhead * price.storage + price.standard_overhead * table[0].storage
+                         for price in table])
+    monitoring = np.array([price.monitoring for price in table])
+
+    # Regra de cada objeto (0 = nenhuma): a primeira que o cobre
+    rule_of = np.zeros(len(objects), dtype=np.int64)
+    for index in range(len(rules), 0, -1):
+        rule_of[objects.rule_mask(rules[index - 1])] = index
+
+    # Além do maior prazo das regras a idade não muda mais nada
+    horizon = max([days for rule in rules for days, _ in rule.transitions] +
+                  [rule.expiration_days or 0 for rule in rules] + [0])
+    days = horizon + 1
+    classes = len(STORAGE_CLASSES)
+    small = (objects.sizes < SMALL_OBJECT_SIZE).astype(np.int64)
+
+    bins = ((rule_of * classes + objects.classes) * days + np.minimum(objects.ages, horizon)) * 2 + small
+    length = (len(rules) + 1) * classes * days * 2
+    counts = np.bincount(bins, minlength=length)
+    present = np.nonzero(counts)[0]
+    counts = counts[present].astype(np.float64)
+    sizes = np.bincount(bins, weights=objects.sizes, minlength=length)[present]
+    padded = {
+        value: np.bincount(bins, weights=np.maximum(objects.sizes, value), minlength=length)[present]
+        for value in set(min_size.tolist()) if value
+    }
+
+    group_rule, rest = np.divmod(present, classes * days * 2)
+    group_class, rest = np.divmod(rest, days * 2)
+    group_age, group_small = np.divmod(rest, 2)
+    group_small = group_small.astype(bool)
+
+    projection = []
+    previous = group_class.copy()
+    for month in range(months):
+        age = group_age + month * _DAYS_PER_MONTH
+        current = group_class.copy()
+        alive = np.ones(len(present), dtype=bool)
+        for index, rule in enumerate(rules, 1):
+            in_rule = group_rule == index
+            # Objetos pequenos só transicionam com filtro de tamanho explícito
+            movable = in_rule if rule.min_size is not None else in_rule & ~group_small
+            for threshold, target in rule.transitions:
+                mask = movable & (age >= threshold)
+                current[mask] = np.maximum(current[mask], _CLASS_CODES[target])
+            if rule.expiration_days is not None:
+                alive &= ~(in_rule & (age >= rule.expiration_days))
+
+        billable = sizes.copy()
+        for value, padded_sizes in padded.items():
+            selected = min_size[current] == value
+            billable[selected] = padded_sizes[selected]
+
+        moved = alive & (current != previous)
+        storage = (billable * storage_price[current] + counts * overhead[current]) / _GIB
+        storage += counts * np.where(group_small, 0.0, monitoring[current]) / 1000
+        month_storage = float(storage[alive].sum())
+        month_transitions = float((counts[moved] * transition_price[current[moved]]).sum() / 1000)
+        month_retrieval = float((sizes[alive] * retrieval_price[current[alive]]).sum()
+                                * monthly_reads / _GIB)
+
+        by_class = np.bincount(current[alive], weights=sizes[alive], minlength=classes)
+        projection.append({
+            'month': month + 1,
+            'storage': month_storage,
+            'transitions': month_transitions,
+            'retrieval': month_retrieval,
+            'total': month_storage + month_transitions + month_retrieval,
+            'objects': int(counts[alive].sum()),
+            'bytes': int(sizes[alive].sum()),
+            'classes': {STORAGE_CLASSES[code]: int(value) for code, value in enumerate(by_class) if value},
+        })
+        previous = np.where(alive, current, previous)
+
+    return {
+        'months': projection,
+        **{field: sum(month[field] for month in projection)
+           for field in ('storage', 'transitions', 'retrieval', 'total')},
+    }
+
+
+def compare_lifecycle(objects: ObjectArrays, variants: Dict[str, Sequence[Any]], months: int = 12,
+                      monthly_reads: float = 0.0,
+                      prices: Optional[Dict[str, StoragePrice]] = None) -> Dict[str, Any]:
+    """
+    Simula várias variantes de regras e as compara com o custo sem regras
+
+    Args:
+        objects: Objetos do bucket
+        variants: Nome da variante -> regras (formato da API ou LifecycleRule)
+        months: Número de meses projetados
+        monthly_reads: Fração dos bytes lida por mês
+        prices: Preços que substituem DEFAULT_PRICES, por classe
+
+    Returns:
+        {'baseline': projeção sem regras, 'variants': nome -> projeção com 'savings'}
+    """
+    baseline = simulate_lifecycle(objects, [], months, monthly_reads, prices)
+    results = {}
+    for name, rules in variants.items():
+        result = simulate_lifecycle(objects, rules_from_configuration(rules), months,
+                                    monthly_reads, prices)
+        result['savings'] = baseline['total'] - result['total']
+        results[name] = result
+    return {'baseline': baseline, 'variants': results}
+
+
+def comparison_rows(comparison: Dict[str, Any], currency: str = 'USD') -> List[List[str]]:
+    """
+    Formata uma comparação de variantes para exibição em tabela
+
+    Args:
+        comparison: Resultado de compare_lifecycle
+        currency: Moeda dos preços
+
+    Returns:
+        Linhas [variante, armazenamento, transições, leitura, total, economia]
+    """
+    rows = []
+    entries = [('(sem regras)', comparison['baseline'])] + list(comparison['variants'].items())
+    for name, result in entries:
+        savings = result.get('savings')
+        rows.append([
+            name,
+            format_currency(result['storage'], currency),
+            format_currency(result['transitions'], currency),
+            format_currency(result['retrieval'], currency),
+            format_currency(result['total'], currency),
+            format_currency(savings, currency) if savings is not None else '',
+        ])
+    return rows
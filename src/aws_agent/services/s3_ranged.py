@@ -0,0 +1,161 @@
+"""
+Leitura de objetos S3 por faixas de bytes
+
+Este módulo divide objetos em faixas (GET com cabeçalho Range) e fornece o
+``S3ObjectReader``, um leitor de arquivo que busca as próximas faixas em
+segundo plano enquanto o consumidor processa a atual. A memória usada é
+limitada ao tamanho da faixa vezes o número de faixas antecipadas, qualquer
+que seja o tamanho do objeto.
+"""
+
+import io
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def byte_ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """
+    Divide um objeto em faixas de bytes
+
+    Args:
+        size: Tamanho do objeto
+        part_size: Tamanho de cada faixa
+
+    Returns:
+        Lista de faixas (início, fim inclusivo)
+    """
+    return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+
+def get_range(client: Any, bucket_name: str, object_key: str, start: int, end: int,
+              etag: Optional[str] = None, version_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Executa um GET de uma faixa de bytes
+
+    Args:
+        client: Cliente S3
+        bucket_name: Nome do bucket
+        object_key: Chave do objeto
+        start: Primeiro byte
+        end: Último byte (inclusivo)
+        etag: Se informado, falha (412) caso o objeto tenha sido substituído
+        version_id: Versão específica do objeto
+
+    Returns:
+        Resposta do GetObject (o corpo deve ser lido pelo chamador)
+    """
+    params = {'Bucket': bucket_name, 'Key': object_key, 'Range': f"bytes={start}-{end}"}
+    if etag:
+        params['IfMatch'] = etag
+    if version_id:
+        params['VersionId'] = version_id
+    return client.get_object(**params)
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Leitor somente leitura de um objeto S3 com leitura antecipada
+
+    Normalmente obtido por ``S3Service.open_object``, que o envolve em um
+    ``io.BufferedReader`` (e opcionalmente em um ``io.TextIOWrapper``).
+    Suporta seek: ao reposicionar, as faixas fora da nova janela são
+    descartadas.
+    """
+
+    def __init__(self, client: Any, bucket_name: str, object_key: str, size: int,
+                 etag: Optional[str] = None, part_size: int = 8 * 1024 * 1024,
+                 read_ahead: int = 4, version_id: Optional[str] = None):
+        """
+        Inicializa o leitor
+
+        Args:
+            client: Cliente S3
+            bucket_name: Nome do bucket
+            object_key: Chave do objeto
+            size: Tamanho do objeto
+            etag: ETag do objeto (garante que todas as faixas são da mesma versão)
+            part_size: Tamanho de cada faixa buscada
+            read_ahead: Número de faixas buscadas à frente da posição atual
+            version_id: Versão específica do objeto
+        """
+        super().__init__()
+        self.client = client
+        self.bucket_name = bucket_name
+        self.object_key = object_key
+        self.size = size
+        self.etag = etag
+        self.version_id = version_id
+        self.part_size = part_size
+        self.read_ahead = max(0, read_ahead)
+
+        self._position = 0
+        self._parts: Dict[int, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.read_ahead),
+                                            thread_name_prefix='s3-read-ahead')
+
+    @property
+    def name(self) -> str:
+        return f"s3://{self.bucket_name}/{self.object_key}"
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"whence inválido: {whence}")
+        if position < 0:
+            raise ValueError("Posição negativa")
+        self._position = position
+        return position
+
+    def _fetch(self, index: int) -> bytes:
+        start = index * self.part_size
+        end = min(start + self.part_size, self.size) - 1
+        response = get_range(self.client, self.bucket_name, self.object_key, start, end,
+                             self.etag, self.version_id)
+        return response['Body'].read()
+
+    def _part(self, index: int) -> bytes:
+        """Obtém uma faixa, agendando as seguintes e descartando as anteriores"""
+        last = (self.size - 1) // self.part_size
+        for ahead in range(index, min(index + self.read_ahead, last) + 1):
+            if ahead not in self._parts:
+                self._parts[ahead] = self._executor.submit(self._fetch, ahead)
+
+        for stale in [i for i in self._parts if i < index or i > index + self.read_ahead]:
+            self._parts.pop(stale).cancel()
+
+        return self._parts[index].result()
+
+    def readinto(self, buffer: Any) -> int:
+        self._checkClosed()
+        if self._position >= self.size or not len(buffer):
+            return 0
+
+        index, offset = divmod(self._position, self.part_size)
+        data = self._part(index)
+        chunk = memoryview(data)[offset:offset + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._parts.values():
+                future.cancel()
+            self._parts.clear()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        super().close()
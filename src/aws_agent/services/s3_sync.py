@@ -0,0 +1,328 @@
+"""
+Planejamento de sincronização entre diretórios locais e o S3
+
+Este módulo compara um diretório local com a listagem de um prefixo S3 e
+decide o que precisa ser transferido. A comparação é feita em camadas, da
+mais barata para a mais cara: tamanho, data de modificação e, só quando
+necessário, o ETag calculado localmente (MD5 simples ou o ETag multipart
+reconstruído a partir do tamanho das partes).
+"""
+
+import fnmatch
+import hashlib
+import math
+import os
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+
+from ..utils.helpers import iter_concurrent
+
+
+SYNC_DIRECTIONS = ('upload', 'download')
+
+# Limites do multipart upload do S3
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MAX_PARTS = 10000
+
+_MIB = 1024 * 1024
+_HASH_BLOCK = 1024 * 1024
+
+# Formato dos ETags (MD5 ou MD5 das partes); ETags de objetos criptografados com
+# SSE-KMS/SSE-C têm o mesmo formato, mas não são MD5 do conteúdo (ver etag_reproducible)
+_ETAG_PATTERN = re.compile(r'^([0-9a-f]{32})(?:-(\d+))?$')
+
+# Criptografias do lado do servidor cujos ETags não são MD5 do conteúdo
+_OPAQUE_ETAG_ENCRYPTION = ('aws:kms', 'aws:kms:dsse')
+
+# Tolerância na comparação de datas em downloads (sistemas de arquivos com resolução de 1-2s)
+_MTIME_TOLERANCE = 2.0
+
+
+class LocalFile(NamedTuple):
+    """Arquivo local candidato à sincronização"""
+    path: str
+    size: int
+    mtime: float
+
+
+class SyncAction(NamedTuple):
+    """Ação planejada pela sincronização"""
+    action: str      # 'upload', 'download', 'delete_remote' ou 'delete_local'
+    key: str
+    path: str
+    size: int
+    reason: str      # 'new', 'size', 'etag', 'mtime' ou 'extraneous'
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Representação serializável da ação"""
+        return self._asdict()
+
+
+def normalize_prefix(prefix: str) -> str:
+    """
+    Normaliza um prefixo S3 para uso como "diretório"
+
+    Args:
+        prefix: Prefixo informado (ex: 'site', 'site/')
+
+    Returns:
+        Prefixo sem barra inicial e com barra final (ou vazio)
+    """
+    prefix = prefix.lstrip('/')
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return prefix
+
+
+def scan_local(root: str, exclude: Optional[Iterable[str]] = None) -> Dict[str, LocalFile]:
+    """
+    Lista os arquivos de um diretório recursivamente
+
+    Args:
+        root: Diretório base
+        exclude: Padrões fnmatch de caminhos relativos a ignorar (ex: '*.tmp', '.git/*')
+
+    Returns:
+        Dicionário caminho relativo (com '/') -> arquivo
+    """
+    patterns = list(exclude or [])
+    files: Dict[str, LocalFile] = {}
+
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            relative = Path(os.path.relpath(path, root)).as_posix()
+            if any(fnmatch.fnmatch(relative, pattern) for pattern in patterns):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Arquivo removido durante a varredura ou link quebrado
+                continue
+            files[relative] = LocalFile(path, stat.st_size, stat.st_mtime)
+
+    return files
+
+
+def adjusted_chunksize(size: int, chunksize: int) -> int:
+    """
+    Tamanho de parte efetivamente usado pelo boto3 para um arquivo
+
+    O boto3 dobra o tamanho da parte até que o arquivo caiba em 10.000 partes
+    e o mantém entre 5 MiB e 5 GiB.
+
+    Args:
+        size: Tamanho do arquivo
+        chunksize: Tamanho de parte configurado
+
+    Returns:
+        Tamanho de parte em bytes
+    """
+    chunksize = min(max(chunksize, MIN_PART_SIZE), MAX_PART_SIZE)
+    while math.ceil(size / chunksize) > MAX_PARTS:
+        chunksize *= 2
+    return min(chunksize, MAX_PART_SIZE)
+
+
+def local_etag(path: str, chunksize: Optional[int] = None) -> str:
+    """
+    Calcula o ETag que o S3 atribuiria a um arquivo
+
+    Args:
+        path: Caminho do arquivo
+        chunksize: Tamanho das partes de um upload multipart (None calcula o MD5 simples)
+
+    Returns:
+        ETag sem aspas ('<md5>' ou '<md5 das partes>-<número de partes>')
+    """
+    if chunksize is None:
+        digest = hashlib.md5()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    parts = []
+    with open(path, 'rb') as f:
+        while True:
+            part = hashlib.md5()
+            remaining = chunksize
+            while remaining:
+                block = f.read(min(_HASH_BLOCK, remaining))
+                if not block:
+                    break
+                part.update(block)
+                remaining -= len(block)
+            if remaining == chunksize:
+                break
+            parts.append(part.digest())
+
+    return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+def etag_reproducible(head: Dict[str, Any]) -> bool:
+    """
+    Indica se o ETag de um objeto é o MD5 do conteúdo (ou das partes)
+
+    Args:
+        head: Resposta de head_object
+
+    Returns:
+        False para objetos criptografados com SSE-KMS, DSSE-KMS ou SSE-C
+    """
+    return (head.get('ServerSideEncryption') not in _OPAQUE_ETAG_ENCRYPTION
+            and not head.get('SSECustomerAlgorithm'))
+
+
+def etag_matches(local: LocalFile, etag: str, chunksize: int,
+                 reproducible: Optional[Callable[[], bool]] = None) -> Optional[bool]:
+    """
+    Compara um arquivo local com o ETag de um objeto
+
+    Para objetos multipart o tamanho das partes não é conhecido: tenta o
+    tamanho configurado, o padrão do boto3 e o menor múltiplo de 1 MiB
+    compatível com o número de partes do ETag.
+
+    A listagem não informa a criptografia do objeto: quando o ETag não
+    confere, reproducible (se informada) confirma se ele é de fato um MD5.
+
+    Args:
+        local: Arquivo local
+        etag: ETag do objeto (com ou sem aspas)
+        chunksize: Tamanho de parte configurado para transferências
+        reproducible: Função que indica se o ETag do objeto é um MD5 (ver etag_reproducible)
+
+    Returns:
+        True/False, ou None se o ETag não puder ser reproduzido localmente
+    """
+    match = _ETAG_PATTERN.match(etag.strip('"').lower())
+    if not match:
+        return None
+
+    if match.group(2) is None:
+        matches = local_etag(local.path) == match.group(1)
+    else:
+        parts = int(match.group(2))
+        # Tamanho configurado, padrão do boto3/AWS CLI e o mínimo compatível com as partes
+        candidates = [adjusted_chunksize(local.size, chunksize),
+                      adjusted_chunksize(local.size, TransferConfig().multipart_chunksize),
+                      max(MIN_PART_SIZE, math.ceil(local.size / parts / _MIB) * _MIB)]
+        candidates = [size for size in dict.fromkeys(candidates)
+                      if math.ceil(local.size / size) == parts]
+        if not candidates:
+            return None
+        matches = any(local_etag(local.path, size) == match.group(0) for size in candidates)
+
+    if not matches and reproducible is not None and not reproducible():
+        return None
+    return matches
+
+
+def _compare(local: LocalFile, remote: Dict[str, Any],
+             direction: str) -> Tuple[Optional[str], bool]:
+    """
+    Comparação barata (sem ler o arquivo)
+
+    Returns:
+        (motivo da transferência ou None, se é preciso comparar o ETag)
+    """
+    if local.size != remote['size']:
+        return 'size', False
+
+    remote_mtime = remote['last_modified'].timestamp()
+    if direction == 'upload':
+        # O LastModified é o instante do upload: arquivo mais antigo já foi enviado
+        return None, local.mtime > remote_mtime
+
+    # Downloads gravam o LastModified como mtime local
+    return None, abs(local.mtime - remote_mtime) > _MTIME_TOLERANCE
+
+
+def build_sync_plan(local_files: Dict[str, LocalFile], remote_objects: Dict[str, Dict[str, Any]],
+                    direction: str, local_dir: str, prefix: str = "", delete: bool = False,
+                    transfer_config: Optional[TransferConfig] = None,
+                    max_workers: int = 10,
+                    reproducible: Optional[Callable[[str], bool]] = None) -> Tuple[List[SyncAction], int]:
+    """
+    Monta o plano de sincronização
+
+    Args:
+        local_files: Arquivos locais (ver scan_local)
+        remote_objects: Objetos remotos por caminho relativo ao prefixo
+        direction: 'upload' (local -> S3) ou 'download' (S3 -> local)
+        local_dir: Diretório local
+        prefix: Prefixo S3 normalizado
+        delete: Se True, remove do destino o que não existe na origem
+        transfer_config: Configuração de transferência (define o tamanho das partes)
+        max_workers: Número máximo de arquivos com ETag calculado simultaneamente
+        reproducible: Função que indica, pelo caminho relativo, se o ETag do
+            objeto é um MD5 (consultada apenas quando o ETag não confere)
+
+    Returns:
+        Tupla (ações, número de arquivos inalterados)
+    """
+    if direction not in SYNC_DIRECTIONS:
+        raise ValueError(f"direction deve ser um de {SYNC_DIRECTIONS}")
+
+    chunksize = (transfer_config or TransferConfig()).multipart_chunksize
+    actions: List[SyncAction] = []
+    to_hash: List[str] = []
+    unchanged = 0
+
+    source, target = (local_files, remote_objects) if direction == 'upload' \
+        else (remote_objects, local_files)
+
+    def action_for(relative: str, reason: str) -> SyncAction:
+        if direction == 'upload':
+            local = local_files[relative]
+            return SyncAction('upload', prefix + relative, local.path, local.size, reason)
+        path = os.path.join(local_dir, *relative.split('/'))
+        return SyncAction('download', prefix + relative, path, remote_objects[relative]['size'], reason)
+
+    for relative in source:
+        if relative not in target:
+            actions.append(action_for(relative, 'new'))
+            continue
+        reason, hash_needed = _compare(local_files[relative], remote_objects[relative], direction)
+        if reason:
+            actions.append(action_for(relative, reason))
+        elif hash_needed:
+            to_hash.append(relative)
+        else:
+            unchanged += 1
+
+    # Só os arquivos com mesmo tamanho e data divergente são lidos do disco
+    def check(relative: str) -> Optional[bool]:
+        confirm = (lambda: reproducible(relative)) if reproducible else None
+        return etag_matches(local_files[relative], remote_objects[relative]['etag'], chunksize, confirm)
+
+    for relative, matches, error in iter_concurrent(check, to_hash, max_workers):
+        if matches:
+            unchanged += 1
+        elif matches is False:
+            actions.append(action_for(relative, 'etag'))
+        elif error is not None or direction == 'upload' or \
+                remote_objects[relative]['last_modified'].timestamp() > local_files[relative].mtime:
+            # ETag não reproduzível: vale a data mais recente
+            actions.append(action_for(relative, 'mtime'))
+        else:
+            unchanged += 1
+
+    if delete:
+        for relative in target:
+            if relative in source:
+                continue
+            if direction == 'upload':
+                actions.append(SyncAction('delete_remote', prefix + relative, '',
+                                          remote_objects[relative]['size'], 'extraneous'))
+            else:
+                local = local_files[relative]
+                actions.append(SyncAction('delete_local', prefix + relative, local.path,
+                                          local.size, 'extraneous'))
+
+    actions.sort(key=lambda action: action.key)
+    return actions, unchanged
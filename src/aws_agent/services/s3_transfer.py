@@ -0,0 +1,249 @@
+"""
+Configuração e acompanhamento de transferências S3
+
+Este módulo monta o ``TransferConfig`` do boto3 a partir da configuração do
+agente (concorrência, multipart, threads e limite de banda) e fornece o
+``TransferProgress``, usado como callback das transferências para medir
+progresso e vazão, além dos auxiliares de upload em fluxo (``StreamFiller`` e
+``BufferReader``), que movem os dados de uma origem qualquer para as partes
+de um multipart upload sem cópias intermediárias.
+"""
+
+import io
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+from boto3.s3.transfer import TransferConfig
+
+from ..core.config import get_config
+from ..utils.helpers import format_size
+
+
+# Parâmetros ajustáveis do TransferConfig -> campo correspondente em Config
+TRANSFER_SETTINGS: Dict[str, str] = {
+    'max_concurrency': 's3_max_concurrency',
+    'multipart_threshold': 's3_multipart_threshold',
+    'multipart_chunksize': 's3_multipart_chunksize',
+    'use_threads': 's3_use_threads',
+    'max_bandwidth': 's3_max_bandwidth',
+}
+
+
+def build_transfer_config(**overrides: Any) -> TransferConfig:
+    """
+    Monta um TransferConfig a partir da configuração do agente
+
+    Args:
+        **overrides: Valores que substituem a configuração (chaves de TRANSFER_SETTINGS)
+
+    Returns:
+        Configuração de transferência do boto3
+
+    Raises:
+        ValueError: Se algum parâmetro não for suportado
+    """
+    unknown = set(overrides) - set(TRANSFER_SETTINGS)
+    if unknown:
+        raise ValueError(f"Parâmetros de transferência não suportados: {sorted(unknown)}")
+
+    config = get_config()
+    settings = {name: getattr(config, field) for name, field in TRANSFER_SETTINGS.items()}
+    settings.update(overrides)
+    return TransferConfig(**settings)
+
+
+class TransferProgress:
+    """
+    Acompanha o progresso e a vazão de uma transferência S3
+
+    Instâncias são passadas como ``Callback`` às transferências do boto3,
+    que as chamam (de várias threads) com o número de bytes transferidos.
+    """
+
+    def __init__(self, description: str, total_bytes: Optional[int] = None,
+                 on_update: Optional[Callable[['TransferProgress'], None]] = None,
+                 interval: float = 0.5):
+        """
+        Inicializa o acompanhamento
+
+        Args:
+            description: Descrição da transferência (ex: 'bucket/chave')
+            total_bytes: Tamanho total em bytes, se conhecido
+            on_update: Função chamada com o progresso a cada intervalo e ao final
+            interval: Intervalo mínimo entre chamadas de on_update em segundos
+        """
+        self.description = description
+        self.total_bytes = total_bytes
+        self.on_update = on_update
+        self.interval = interval
+
+        self.transferred = 0
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._last_update = 0.0
+
+    def __call__(self, bytes_amount: int) -> None:
+        with self._lock:
+            self.transferred += bytes_amount
+            now = time.monotonic()
+            notify = self.on_update is not None and now - self._last_update >= self.interval
+            if notify:
+                self._last_update = now
+
+        if notify:
+            self.on_update(self)
+
+    def finish(self) -> None:
+        """Marca a transferência como concluída e notifica o progresso final"""
+        self.finished_at = time.monotonic()
+        if self.on_update is not None:
+            self.on_update(self)
+
+    @property
+    def elapsed(self) -> float:
+        """Tempo decorrido em segundos"""
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Vazão média em bytes por segundo"""
+        elapsed = self.elapsed
+        return self.transferred / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Percentual concluído (None se o tamanho total não for conhecido)"""
+        if not self.total_bytes:
+            return None
+        return min(100.0, self.transferred * 100.0 / self.total_bytes)
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Tempo restante estimado em segundos"""
+        throughput = self.throughput
+        if not self.total_bytes or throughput <= 0:
+            return None
+        return max(0.0, (self.total_bytes - self.transferred) / throughput)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Resumo da transferência
+
+        Returns:
+            Dicionário com bytes transferidos, total, tempo e vazão
+        """
+        return {
+            'description': self.description,
+            'transferred': self.transferred,
+            'total': self.total_bytes,
+            'percent': self.percent,
+            'elapsed': round(self.elapsed, 3),
+            'throughput': self.throughput,
+        }
+
+    def __str__(self) -> str:
+        done = format_size(self.transferred)
+        if self.total_bytes:
+            done += f" / {format_size(self.total_bytes)} ({self.percent:.1f}%)"
+        return f"{done} em {self.elapsed:.1f}s, {format_size(int(self.throughput))}/s"
+
+
+class StreamFiller:
+    """
+    Preenche buffers a partir de um objeto de arquivo ou de um iterador de bytes
+
+    Objetos com ``readinto`` (arquivos binários, gzip, pipes) escrevem direto
+    no buffer; blocos de iteradores são copiados uma única vez para o buffer,
+    e o restante de um bloco maior que o espaço livre fica para a próxima parte.
+    """
+
+    def __init__(self, source: Union[io.IOBase, Iterable[bytes]]):
+        """
+        Inicializa o preenchimento
+
+        Args:
+            source: Objeto de arquivo binário ou iterador de blocos de bytes
+        """
+        self._readinto = getattr(source, 'readinto', None)
+        self._read = getattr(source, 'read', None) if self._readinto is None else None
+        self._chunks = iter(source) if self._readinto is None and self._read is None else None
+        self._pending = memoryview(b'')
+
+    def _next_chunk(self, size: int) -> memoryview:
+        if self._read is not None:
+            chunk = self._read(size)
+        else:
+            chunk = next(self._chunks, b'')
+        if isinstance(chunk, str):
+            raise TypeError("A origem do upload deve produzir bytes, não str")
+        return memoryview(chunk or b'').cast('B')
+
+    def fill(self, view: memoryview) -> int:
+        """
+        Preenche um buffer até o fim ou até a origem acabar
+
+        Args:
+            view: Buffer de destino
+
+        Returns:
+            Número de bytes escritos (menor que o buffer apenas no fim da origem)
+        """
+        filled = 0
+        while filled < len(view):
+            if self._readinto is not None:
+                count = self._readinto(view[filled:])
+                if not count:
+                    break
+                filled += count
+                continue
+
+            if not self._pending:
+                self._pending = self._next_chunk(len(view) - filled)
+                if not self._pending:
+                    break
+            count = min(len(self._pending), len(view) - filled)
+            view[filled:filled + count] = self._pending[:count]
+            self._pending = self._pending[count:]
+            filled += count
+        return filled
+
+
+class BufferReader(io.RawIOBase):
+    """
+    Objeto de arquivo somente leitura sobre um buffer em memória
+
+    Usado como corpo de ``upload_part``/``put_object``: o botocore lê, mede e
+    reposiciona o corpo (para checksums e novas tentativas) diretamente do
+    buffer da parte, sem criar uma cópia inteira dela.
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def __len__(self) -> int:
+        return len(self._view)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def readinto(self, buffer: Any) -> int:
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
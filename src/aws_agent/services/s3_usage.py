@@ -0,0 +1,238 @@
+"""
+Uso de armazenamento por prefixo (``du`` para o S3)
+
+Este módulo agrega objetos em uma árvore de prefixos com profundidade
+limitada: cada nó acumula número de objetos, bytes e o intervalo de datas de
+modificação de tudo o que está abaixo dele, e chaves mais profundas que o
+limite são contadas no nó do último nível. A memória usada é proporcional ao
+número de prefixos até a profundidade escolhida, e não ao número de objetos.
+
+Árvores podem ser combinadas (listagens particionadas, arquivos de
+inventário processados em paralelo), gravadas em JSON e comparadas com uma
+gravação anterior.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..utils.helpers import format_size
+
+
+class PrefixNode:
+    """Totais acumulados de um prefixo"""
+
+    __slots__ = ('objects', 'size', 'oldest', 'newest', 'children')
+
+    def __init__(self):
+        self.objects = 0
+        self.size = 0
+        self.oldest: Optional[float] = None
+        self.newest: Optional[float] = None
+        self.children: Dict[str, 'PrefixNode'] = {}
+
+    def add(self, objects: int, size: int, oldest: Optional[float], newest: Optional[float]) -> None:
+        """Soma objetos, bytes e o intervalo de datas ao nó"""
+        self.objects += objects
+        self.size += size
+        if oldest is not None and (self.oldest is None or oldest < self.oldest):
+            self.oldest = oldest
+        if newest is not None and (self.newest is None or newest > self.newest):
+            self.newest = newest
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Representação serializável do nó e de seus filhos"""
+        return {
+            'objects': self.objects, 'size': self.size,
+            'oldest': self.oldest, 'newest': self.newest,
+            'children': {name: child.as_dict() for name, child in self.children.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PrefixNode':
+        """Reconstrói um nó a partir de as_dict"""
+        node = cls()
+        node.add(data['objects'], data['size'], data.get('oldest'), data.get('newest'))
+        node.children = {name: cls.from_dict(child) for name, child in data.get('children', {}).items()}
+        return node
+
+
+class PrefixTree:
+    """
+    Árvore de prefixos com totais de objetos, bytes e datas de modificação
+    """
+
+    def __init__(self, bucket_name: str = "", depth: int = 3):
+        """
+        Inicializa a árvore
+
+        Args:
+            bucket_name: Bucket descrito pela árvore
+            depth: Número máximo de níveis de prefixo a partir da raiz do bucket
+        """
+        if depth < 0:
+            raise ValueError("depth deve ser maior ou igual a zero")
+        self.bucket_name = bucket_name
+        self.depth = depth
+        self.root = PrefixNode()
+        self.created_at = time.time()
+
+    def add(self, key: str, size: int, last_modified: Optional[float] = None) -> None:
+        """
+        Conta um objeto em todos os prefixos que o contêm (até a profundidade limite)
+
+        Args:
+            key: Chave do objeto
+            size: Tamanho do objeto
+            last_modified: Data de modificação em segundos desde a época
+        """
+        node = self.root
+        node.add(1, size, last_modified, last_modified)
+        # O último segmento é o nome do objeto, não um prefixo
+        for segment in key.split('/', self.depth)[:-1]:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = PrefixNode()
+            child.add(1, size, last_modified, last_modified)
+            node = child
+
+    def merge(self, other: 'PrefixTree') -> 'PrefixTree':
+        """
+        Combina os totais de outra árvore a esta
+
+        Args:
+            other: Árvore a combinar (com a mesma profundidade)
+
+        Returns:
+            Esta árvore
+        """
+        stack = [(self.root, other.root)]
+        while stack:
+            target, source = stack.pop()
+            target.add(source.objects, source.size, source.oldest, source.newest)
+            for name, child in source.children.items():
+                if name not in target.children:
+                    target.children[name] = PrefixNode()
+                stack.append((target.children[name], child))
+        return self
+
+    def iter_nodes(self, max_depth: Optional[int] = None) -> Iterator[Tuple[str, int, PrefixNode]]:
+        """
+        Percorre os prefixos em pós-ordem (filhos antes do pai, como o du)
+
+        Args:
+            max_depth: Profundidade máxima percorrida (usa a profundidade da árvore)
+
+        Returns:
+            Iterador de tuplas (prefixo, profundidade, nó); a raiz tem prefixo ''
+        """
+        max_depth = self.depth if max_depth is None else max_depth
+
+        def walk(prefix: str, level: int, node: PrefixNode) -> Iterator[Tuple[str, int, PrefixNode]]:
+            if level < max_depth:
+                for name in sorted(node.children):
+                    yield from walk(f"{prefix}{name}/", level + 1, node.children[name])
+            yield prefix, level, node
+
+        yield from walk('', 0, self.root)
+
+    def find(self, prefix: str) -> Optional[PrefixNode]:
+        """
+        Obtém o nó de um prefixo
+
+        Args:
+            prefix: Prefixo com barra final ('' para a raiz)
+
+        Returns:
+            Nó do prefixo ou None se não existir (ou estiver além da profundidade)
+        """
+        node = self.root
+        for segment in prefix.rstrip('/').split('/') if prefix else []:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def du_lines(self, max_depth: Optional[int] = None, min_size: int = 0,
+                 human: bool = True) -> List[str]:
+        """
+        Formata a árvore como a saída do du
+
+        Args:
+            max_depth: Profundidade máxima exibida (usa a profundidade da árvore)
+            min_size: Omite prefixos menores que este tamanho (a raiz é sempre exibida)
+            human: Se True, tamanhos legíveis (ex: '1.5 GB'); senão, bytes
+
+        Returns:
+            Linhas 'tamanho  objetos  s3://bucket/prefixo', com o total na última linha
+        """
+        lines = []
+        for prefix, level, node in self.iter_nodes(max_depth):
+            if level and node.size < min_size:
+                continue
+            size = format_size(node.size) if human else str(node.size)
+            lines.append(f"{size:>12}  {node.objects:>12}  s3://{self.bucket_name}/{prefix}")
+        return lines
+
+    def diff(self, previous: 'PrefixTree', max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Compara esta árvore com uma gravação anterior
+
+        Args:
+            previous: Árvore anterior
+            max_depth: Profundidade máxima comparada (usa a menor das duas árvores)
+
+        Returns:
+            Prefixos alterados (prefix, size, objects, size_delta, objects_delta),
+            em ordem decrescente de variação absoluta de bytes
+        """
+        if max_depth is None:
+            max_depth = min(self.depth, previous.depth)
+
+        def totals(tree: 'PrefixTree') -> Dict[str, Tuple[int, int]]:
+            return {prefix: (node.size, node.objects) for prefix, _, node in tree.iter_nodes(max_depth)}
+
+        current, old = totals(self), totals(previous)
+        changes = []
+        for prefix in set(current) | set(old):
+            size, objects = current.get(prefix, (0, 0))
+            old_size, old_objects = old.get(prefix, (0, 0))
+            if size != old_size or objects != old_objects:
+                changes.append({
+                    'prefix': prefix, 'size': size, 'objects': objects,
+                    'size_delta': size - old_size, 'objects_delta': objects - old_objects,
+                })
+        changes.sort(key=lambda change: (-abs(change['size_delta']), change['prefix']))
+        return changes
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Representação serializável da árvore"""
+        return {'bucket': self.bucket_name, 'depth': self.depth,
+                'created_at': self.created_at, 'root': self.root.as_dict()}
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Grava a árvore em JSON
+
+        Args:
+            path: Caminho do arquivo
+        """
+        Path(path).write_text(json.dumps(self.as_dict(), separators=(',', ':')), encoding='utf-8')
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'PrefixTree':
+        """
+        Lê uma árvore gravada com save
+
+        Args:
+            path: Caminho do arquivo
+
+        Returns:
+            Árvore gravada
+        """
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        tree = cls(data['bucket'], data['depth'])
+        tree.created_at = data['created_at']
+        tree.root = PrefixNode.from_dict(data['root'])
+        return tree
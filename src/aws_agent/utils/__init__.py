@@ -24,6 +24,7 @@ from .helpers import (
     generate_unique_id,
     retry_operation,
     chunk_list,
+    iter_concurrent,
     flatten_dict,
     is_valid_json,
     format_table_data,
@@ -51,6 +52,7 @@ __all__ = [
     'generate_unique_id',
     'retry_operation',
     'chunk_list',
+    'iter_concurrent',
     'flatten_dict',
     'is_valid_json',
     'format_table_data',
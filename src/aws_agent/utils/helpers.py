@@ -8,7 +8,7 @@ do agente AWS, incluindo validação, formatação e helpers diversos.
 import re
 import json
 import yaml
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Callable, Iterable, Iterator, Tuple
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -452,6 +452,44 @@ def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
     return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
 
 
+def iter_concurrent(func: Callable[[Any], Any], items: Iterable[Any],
+                    max_workers: int = 10) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """
+    Executa uma função sobre vários itens em um pool de threads limitado
+
+    Os resultados são entregues à medida que ficam prontos, e não na ordem
+    dos itens. Falhas não interrompem os demais itens: a exceção é devolvida
+    junto com o item que a originou.
+
+    Args:
+        func: Função a executar para cada item
+        items: Itens de entrada
+        max_workers: Número máximo de threads simultâneas
+
+    Returns:
+        Iterador de tuplas (item, resultado, exceção)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    items = list(items)
+    if not items:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        try:
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            # Se o consumidor parar cedo, não inicia o que ainda está na fila
+            for future in futures:
+                future.cancel()
+
+
 def flatten_dict(d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
     """
     Aplaina dicionário aninhado
@@ -0,0 +1,54 @@
+"""
+Testes para o CLI do AWS Agent
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from aws_agent.cli.main import cli
+
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+
+class TestCLIStartup:
+    """Testes para a inicialização rápida do CLI"""
+    
+    def test_import_does_not_load_heavy_modules(self):
+        """Testa que importar o CLI não carrega boto3, rich nem o agente"""
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+        code = (
+            "import sys, aws_agent.cli.main; "
+            "heavy = ('boto3', 'botocore', 'rich', 'aws_agent.core.agent'); "
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in heavy or m in heavy))"
+        )
+        result = subprocess.run([sys.executable, "-c", code], env=env,
+                                capture_output=True, text=True, check=True)
+        assert result.stdout.strip() == "[]"
+    
+    def test_version_does_not_create_agent(self):
+        """Testa que --version e --help não criam o AWSAgent"""
+        runner = CliRunner()
+        with patch("aws_agent.core.agent.AWSAgent") as mock_agent:
+            result = runner.invoke(cli, ["--version"])
+            assert result.exit_code == 0
+            assert "1.0.0" in result.output
+            
+            result = runner.invoke(cli, ["--help"])
+            assert result.exit_code == 0
+            mock_agent.assert_not_called()
+    
+    def test_agent_created_on_demand(self):
+        """Testa que o agente é criado apenas pelos comandos que o usam"""
+        runner = CliRunner()
+        with patch("aws_agent.core.agent.AWSAgent") as mock_agent:
+            mock_agent.return_value.get_available_services.return_value = []
+            result = runner.invoke(cli, ["services"])
+            assert result.exit_code == 0
+            mock_agent.assert_called_once_with()
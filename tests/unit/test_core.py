@@ -11,6 +11,10 @@ import os
 from aws_agent.core.config import Config, get_config, reset_config
 from aws_agent.core.account_manager import AccountManager, AWSCredentials
 from aws_agent.core.agent import AWSAgent
+from aws_agent.core.session_pool import SessionPool, credentials_fingerprint
+from aws_agent.core.identity_cache import IdentityCache
+from aws_agent.core.inventory import InventoryCache
+from aws_agent.core.daemon import AgentDaemon, DaemonClient, DaemonError, RemoteAgent
 
 
 class TestConfig:
@@ -230,6 +234,305 @@ class TestAWSAgent:
             assert agent.current_session is None
             assert agent.services == {}
 
+    def test_aws_agent_execute_across_accounts(self):
+        """Testa execução de operação em várias contas"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config(config_dir=Path(temp_dir) / "test_aws_agent")
+            agent = AWSAgent(config.credentials_path)
+
+            credentials = {
+                'prod': AWSCredentials(access_key_id="AKIA1", secret_access_key="s1", account_id="111111111111"),
+                'dev': AWSCredentials(access_key_id="AKIA2", secret_access_key="s2", account_id="222222222222"),
+            }
+            agent.account_manager.list_accounts = MagicMock(return_value=list(credentials))
+            agent.account_manager.get_account = MagicMock(side_effect=credentials.get)
+
+            def create_service(service_name, session, region):
+                service = MagicMock()
+                if session.access_key == "AKIA2":
+                    service.list_buckets.side_effect = RuntimeError("AccessDenied")
+                else:
+                    service.list_buckets.return_value = [{'name': 'bucket'}]
+                return service
+
+            agent._create_session = MagicMock(side_effect=lambda creds: MagicMock(access_key=creds.access_key_id))
+            agent._create_service = MagicMock(side_effect=create_service)
+
+            results = agent.execute_across_accounts('s3', 'list_buckets', max_workers=2)
+
+            # Fan-out não altera a conexão atual
+            assert agent.current_session is None
+            assert set(results) == {'prod', 'dev'}
+            assert results['prod']['success'] is True
+            assert results['prod']['result'] == [{'name': 'bucket'}]
+            assert results['prod']['account_id'] == "111111111111"
+            assert results['dev']['success'] is False
+            assert "AccessDenied" in results['dev']['error']
+
+            with pytest.raises(ValueError, match="Operação 'nao_existe' não encontrada"):
+                list(agent.iter_execute_across_accounts('s3', 'nao_existe'))
+
+
+class TestSessionPool:
+    """Testes para o pool de sessões e clientes"""
+    
+    def _session(self, access_key="AKIA1", secret="secret"):
+        session = MagicMock()
+        session.region_name = "us-east-1"
+        session.client.side_effect = lambda *args, **kwargs: MagicMock()
+        frozen = session.get_credentials.return_value.get_frozen_credentials.return_value
+        frozen.access_key, frozen.secret_key, frozen.token = access_key, secret, None
+        return session
+    
+    def test_clients_reused_across_sessions_with_same_credentials(self):
+        """Testa reaproveitamento de clientes entre sessões da mesma conta"""
+        pool = SessionPool(ttl=3600, max_size=10)
+        first, second = self._session(), self._session()
+        
+        client = pool.get_client(first, 'ec2', 'us-west-2')
+        assert pool.get_client(second, 'ec2', 'us-west-2') is client
+        second.client.assert_not_called()
+        
+        # Região e credenciais diferentes geram clientes distintos
+        assert pool.get_client(first, 'ec2', 'eu-west-1') is not client
+        assert pool.get_client(self._session(secret="rotated"), 'ec2', 'us-west-2') is not client
+    
+    def test_lru_eviction_and_ttl(self):
+        """Testa descarte LRU e expiração por TTL"""
+        pool = SessionPool(ttl=3600, max_size=2)
+        session = self._session()
+        
+        ec2 = pool.get_client(session, 'ec2')
+        pool.get_client(session, 's3')
+        pool.get_client(session, 'ec2')  # ec2 passa a ser o mais recente
+        pool.get_client(session, 'iam')  # descarta s3
+        
+        assert pool.get_stats()['clients'] == 2
+        assert pool.get_client(session, 'ec2') is ec2
+        
+        pool.ttl = 0
+        with patch('aws_agent.core.session_pool.time.monotonic', return_value=10**9):
+            assert pool.purge_expired() == 2
+    
+    def test_invalidate_account(self):
+        """Testa remoção das entradas de uma conta"""
+        pool = SessionPool(ttl=3600, max_size=10)
+        session = self._session()
+        pool.get_client(session, 'sts')
+        pool.get_client(self._session(access_key="AKIA2"), 'sts')
+        
+        pool.invalidate(credentials_fingerprint("AKIA1", "secret"))
+        assert pool.get_stats()['clients'] == 1
+
+
+class TestIdentityCache:
+    """Testes para o cache de identidade STS"""
+    
+    def _session(self, secret="secret"):
+        session = MagicMock()
+        frozen = session.get_credentials.return_value.get_frozen_credentials.return_value
+        frozen.access_key, frozen.secret_key, frozen.token = "AKIA1", secret, None
+        session.client.return_value.get_caller_identity.return_value = {
+            'Account': '123456789012',
+            'UserId': 'AIDA1',
+            'Arn': 'arn:aws:iam::123456789012:user/test',
+            'ResponseMetadata': {},
+        }
+        return session
+    
+    def test_identity_cached_per_credentials(self):
+        """Testa que a identidade é consultada uma única vez por credencial"""
+        cache = IdentityCache(ttl=900)
+        session = self._session()
+        sts = session.client.return_value
+        
+        identity = cache.get_caller_identity(session)
+        assert identity['Account'] == '123456789012'
+        assert 'ResponseMetadata' not in identity
+        
+        cache.get_caller_identity(session)
+        assert sts.get_caller_identity.call_count == 1
+        
+        # Revalidação forçada e troca de credenciais consultam o STS
+        cache.get_caller_identity(session, force_refresh=True)
+        assert sts.get_caller_identity.call_count == 2
+        
+        rotated = self._session(secret="rotated")
+        cache.get_caller_identity(rotated)
+        assert rotated.client.return_value.get_caller_identity.call_count == 1
+    
+    def test_identity_cache_disabled(self):
+        """Testa cache desativado com TTL zero"""
+        cache = IdentityCache(ttl=0)
+        session = self._session(secret="uncached")
+        
+        cache.get_caller_identity(session)
+        cache.get_caller_identity(session)
+        assert session.client.return_value.get_caller_identity.call_count == 2
+
+
+class TestInventoryCache:
+    """Testes para o inventário local de recursos"""
+    
+    def test_inventory_ttl_and_invalidation(self):
+        """Testa leitura dentro do TTL, datetimes e invalidação"""
+        from datetime import datetime
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db", ttls={'ec2.instances': 60})
+            created = datetime(2024, 1, 1, 12, 30)
+            fetch = MagicMock(return_value=[{'instance_id': 'i-1', 'launch_time': created}])
+            
+            first = cache.get_or_fetch('123', 'us-east-1', 'ec2', 'instances', fetch)
+            second = cache.get_or_fetch('123', 'us-east-1', 'ec2', 'instances', fetch)
+            assert first == second
+            assert second[0]['launch_time'] == created
+            assert fetch.call_count == 1
+            
+            # Parâmetros diferentes geram entradas diferentes
+            cache.get_or_fetch('123', 'us-east-1', 'ec2', 'instances', fetch, params={'state': 'running'})
+            assert fetch.call_count == 2
+            
+            assert cache.invalidate('123', 'us-east-1', 'ec2', 'instances') == 2
+            cache.get_or_fetch('123', 'us-east-1', 'ec2', 'instances', fetch)
+            assert fetch.call_count == 3
+            cache.close()
+    
+    def test_inventory_stale_while_revalidate(self):
+        """Testa que entradas vencidas são servidas e atualizadas em segundo plano"""
+        import threading
+        import time
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db",
+                                   ttls={'s3.buckets': 10}, max_stale=3600)
+            cache.put('123', 'global', 's3', 'buckets', [{'name': 'old'}])
+            
+            refreshed = threading.Event()
+            
+            def fetch():
+                refreshed.set()
+                return [{'name': 'new'}]
+            
+            with patch('aws_agent.core.inventory.time.time', return_value=time.time() + 60):
+                data = cache.get_or_fetch('123', 'global', 's3', 'buckets', fetch)
+            assert data == [{'name': 'old'}]
+            assert refreshed.wait(5)
+            
+            for _ in range(50):
+                if not cache._refreshing:
+                    break
+                time.sleep(0.05)
+            assert cache.get('123', 'global', 's3', 'buckets')[0] == [{'name': 'new'}]
+            cache.close()
+
+
+class TestInventorySync:
+    """Testes para a sincronização incremental do inventário"""
+    
+    def test_incremental_sync_patches_changed_resources(self):
+        """Testa que apenas os recursos citados nos eventos são consultados"""
+        import time
+        from aws_agent.core.inventory_sync import InventorySync, event_targets
+        
+        assert event_targets({
+            'EventName': 'UpdateFunctionConfiguration20150331v2',
+            'Resources': [{'ResourceType': 'AWS::Lambda::Function',
+                           'ResourceName': 'arn:aws:lambda:us-east-1:123:function:api'}]
+        }) == [(('lambda', 'functions'), 'api')]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db")
+            cache.put('123', 'us-east-1', 'ec2', 'instances',
+                      [{'instance_id': 'i-1', 'state': 'running'},
+                       {'instance_id': 'i-3', 'state': 'running'}])
+            cache.put('123', 'us-east-1', 'ec2', 'instances', [], params={'state': 'stopped'})
+            cache.put('123', 'us-east-1', 'ec2', 'volumes', [{'volume_id': 'vol-1'}])
+            watermark = time.time() - 600
+            cache.set_sync_state('123', 'us-east-1', watermark, time.time())
+            
+            ec2 = MagicMock(is_global=False, service_name='ec2',
+                            inventory_keys={'instances': 'instance_id'})
+            ec2.for_region.return_value = ec2
+            ec2.describe_inventory_items.return_value = {
+                'i-2': {'instance_id': 'i-2', 'state': 'pending'}, 'i-3': None
+            }
+            
+            events = [
+                {'EventName': 'RunInstances',
+                 'Resources': [{'ResourceType': 'AWS::EC2::Instance', 'ResourceName': 'i-2'}]},
+                {'EventName': 'TerminateInstances',
+                 'Resources': [{'ResourceType': 'AWS::EC2::Instance', 'ResourceName': 'i-3'}]},
+                {'EventName': 'CreateFunction20150331', 'Resources': []},
+            ]
+            client = MagicMock()
+            client.get_paginator.return_value.paginate.return_value = [{'Events': events}]
+            
+            with patch('aws_agent.core.inventory_sync.get_identity_cache') as identity, \
+                 patch('aws_agent.core.inventory_sync.get_session_pool') as pool:
+                identity.return_value.get_caller_identity.return_value = {'Account': '123'}
+                pool.return_value.get_client.return_value = client
+                
+                sync = InventorySync(Mock(), {'ec2': ec2}, cache=cache,
+                                     full_sync_interval=86400, lag=60)
+                results = sync.sync(['us-east-1'])
+            
+            assert results == [{'region': 'us-east-1', 'mode': 'incremental', 'events': 3,
+                                'patched': 2, 'relisted': 0}]
+            ec2.describe_inventory_items.assert_called_once_with('instances', ['i-2', 'i-3'])
+            ec2.fetch_resources.assert_not_called()
+            
+            data, _ = cache.get('123', 'us-east-1', 'ec2', 'instances')
+            assert [item['instance_id'] for item in data] == ['i-1', 'i-2']
+            # Listagens filtradas não podem ser atualizadas e são descartadas
+            assert cache.get('123', 'us-east-1', 'ec2', 'instances', {'state': 'stopped'}) is None
+            assert cache.get_sync_state('123', 'us-east-1')['watermark'] > watermark
+            cache.close()
+
+
+class TestAgentDaemon:
+    """Testes para o daemon residente"""
+    
+    def test_daemon_rpc(self):
+        """Testa chamadas JSON-RPC ao daemon por socket Unix"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            socket_path = Path(temp_dir) / "agent.sock"
+            agent = MagicMock()
+            agent.current_account = "prod"
+            agent.list_accounts.return_value = [{'account_name': 'prod'}]
+            agent.execute_operation.return_value = {'Buckets': []}
+            
+            daemon = AgentDaemon(agent=agent, socket_path=socket_path)
+            daemon.start(background=True)
+            try:
+                assert oct(socket_path.stat().st_mode & 0o777) == oct(0o600)
+                
+                client = DaemonClient(socket_path, timeout=5)
+                assert client.is_running()
+                assert client.call('list_accounts') == [{'account_name': 'prod'}]
+                
+                remote = RemoteAgent(client)
+                assert remote.current_account == "prod"
+                assert remote.execute_operation('s3', 'list_buckets') == {'Buckets': []}
+                agent.execute_operation.assert_called_once_with('s3', 'list_buckets')
+                
+                # Apenas métodos da lista branca são expostos
+                with pytest.raises(DaemonError):
+                    client.call('remove_account', 'prod')
+                with pytest.raises(AttributeError):
+                    remote.add_account
+                agent.remove_account.assert_not_called()
+                
+                agent.connect.side_effect = RuntimeError("boom")
+                with pytest.raises(DaemonError) as exc_info:
+                    remote.connect('prod')
+                assert exc_info.value.error_type == 'RuntimeError'
+            finally:
+                daemon.stop()
+            
+            assert not socket_path.exists()
+            assert not DaemonClient(socket_path).is_running()
+
 
 class TestGetConfig:
     """Testes para a função get_config"""
@@ -5,11 +5,13 @@ Tests for AWS services
 import unittest
 from unittest.mock import Mock, patch, MagicMock
 import boto3
+from botocore.exceptions import ClientError
 
 from aws_agent.services.ec2 import EC2Service
 from aws_agent.services.s3 import S3Service
 from aws_agent.services.iam import IAMService
 from aws_agent.services.lambda_service import LambdaService
+from aws_agent.services.registry import ServiceRegistry, LazyServiceMap
 
 
 class TestEC2Service(unittest.TestCase):
@@ -26,11 +28,14 @@ class TestEC2Service(unittest.TestCase):
         """Test EC2Service initialization"""
         self.assertEqual(self.service.region, "us-east-1")
         self.assertEqual(self.service.session, self.mock_session)
+        # Cliente é criado apenas no primeiro acesso
+        self.mock_session.client.assert_not_called()
+        self.assertIs(self.service.client, self.mock_client)
         self.mock_session.client.assert_called_with('ec2', region_name="us-east-1")
     
     def test_list_instances(self):
         """Test listing EC2 instances"""
-        self.mock_client.describe_instances.return_value = {
+        self.mock_client.get_paginator.return_value.paginate.return_value = [{
             'Reservations': [
                 {
                     'Instances': [
@@ -44,7 +49,7 @@ class TestEC2Service(unittest.TestCase):
                     ]
                 }
             ]
-        }
+        }]
         
         result = self.service.list_instances()
         
@@ -53,6 +58,46 @@ class TestEC2Service(unittest.TestCase):
         self.assertEqual(result[0]['InstanceType'], 't2.micro')
         self.assertEqual(result[0]['State']['Name'], 'running')
 
+    def test_list_resources_all_regions(self):
+        """Test listing EC2 resources across regions concurrently"""
+        clients = {}
+
+        def make_client(service, region_name=None):
+            client = clients.setdefault((service, region_name), Mock())
+            paginator = client.get_paginator.return_value
+            if region_name == 'eu-west-1':
+                paginator.paginate.side_effect = ClientError(
+                    {'Error': {'Code': 'AuthFailure', 'Message': 'Region disabled'}},
+                    'DescribeVolumes'
+                )
+            else:
+                paginator.paginate.return_value = [{'Volumes': [{
+                    'VolumeId': f"vol-{region_name}",
+                    'Size': 8,
+                    'VolumeType': 'gp3',
+                    'State': 'available',
+                    'AvailabilityZone': f"{region_name}a",
+                }]}]
+            return client
+
+        self.mock_session.client.side_effect = make_client
+        self.service._clients.clear()
+
+        outcomes = list(self.service.iter_resources_all_regions(
+            'volumes', regions=['us-east-1', 'us-west-2'], max_workers=2
+        ))
+        self.assertEqual({o['region'] for o in outcomes}, {'us-east-1', 'us-west-2'})
+
+        volumes = self.service.list_resources_all_regions(
+            'volumes', regions=['us-east-1', 'us-west-2', 'eu-west-1'], max_workers=3
+        )
+        self.assertEqual(
+            sorted(v['region'] for v in volumes), ['us-east-1', 'us-west-2']
+        )
+        # Clientes por região ficam no cache compartilhado da instância original
+        self.assertIn('ec2_us-west-2', self.service._clients)
+        self.assertIn('ec2_eu-west-1', self.service._clients)
+
 
 class TestS3Service(unittest.TestCase):
     """Tests for S3Service"""
@@ -68,23 +113,1110 @@ class TestS3Service(unittest.TestCase):
         """Test S3Service initialization"""
         self.assertEqual(self.service.region, "us-east-1")
         self.assertEqual(self.service.session, self.mock_session)
+        # Cliente é criado apenas no primeiro acesso
+        self.mock_session.client.assert_not_called()
+        self.assertIs(self.service.client, self.mock_client)
         self.mock_session.client.assert_called_with('s3', region_name="us-east-1")
     
     def test_list_buckets(self):
-        """Test listing S3 buckets"""
+        """Test listing S3 buckets with cached, concurrent region resolution"""
+        import tempfile
+        from pathlib import Path
+        from aws_agent.core.inventory import InventoryCache
+        
         self.mock_client.list_buckets.return_value = {
             'Buckets': [
-                {
-                    'Name': 'test-bucket',
-                    'CreationDate': '2023-01-01T00:00:00Z'
-                }
+                {'Name': 'test-bucket', 'CreationDate': '2023-01-01T00:00:00Z'},
+                {'Name': 'eu-bucket', 'CreationDate': '2023-01-02T00:00:00Z'},
+                {'Name': 'new-bucket', 'CreationDate': '2023-01-03T00:00:00Z',
+                 'BucketRegion': 'sa-east-1'},
             ]
         }
+        self.mock_client.get_bucket_location.side_effect = lambda Bucket: {
+            'LocationConstraint': 'eu-west-1' if Bucket == 'eu-bucket' else None
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db")
+            with patch('aws_agent.services.s3.get_inventory_cache', return_value=cache):
+                result = self.service.list_buckets(resolve_regions='off')
+                self.assertEqual([b['region'] for b in result], [None, None, 'sa-east-1'])
+                self.mock_client.get_bucket_location.assert_not_called()
+                
+                result = self.service.list_buckets()
+                self.assertEqual(result[0]['name'], 'test-bucket')
+                self.assertEqual([b['region'] for b in result], ['us-east-1', 'eu-west-1', 'sa-east-1'])
+                self.assertEqual(self.mock_client.get_bucket_location.call_count, 2)
+                
+                # Com as regiões em cache a listagem é uma única chamada
+                self.assertEqual(self.service.list_buckets(), result)
+                self.assertEqual(self.mock_client.get_bucket_location.call_count, 2)
+                self.assertEqual(cache.get_bucket_regions(['eu-bucket']), {'eu-bucket': 'eu-west-1'})
+            cache.close()
+    
+    def test_iter_objects_parallel(self):
+        """Test partitioned listing returns every key once, ordered or not"""
+        keys = sorted(
+            ['top.txt', 'logs/readme.txt']
+            + [f'logs/2024/{month:02d}/{day:02d}.log' for month in range(1, 13) for day in range(1, 29)]
+            + [f'flat/{i:05d}' for i in range(2500)]
+        )
         
-        result = self.service.list_buckets()
+        def list_objects_v2(Bucket, Prefix='', Delimiter=None, StartAfter='', MaxKeys=1000):
+            contents, prefixes = [], []
+            for key in keys:
+                if not key.startswith(Prefix) or key <= StartAfter:
+                    continue
+                if Delimiter and Delimiter in key[len(Prefix):]:
+                    common = key[:key.index(Delimiter, len(Prefix)) + 1]
+                    if common not in prefixes:
+                        prefixes.append(common)
+                else:
+                    contents.append({'Key': key, 'Size': 1, 'LastModified': None, 'ETag': '"x"'})
+                if len(contents) + len(prefixes) == MaxKeys:
+                    break
+            last = max([c['Key'] for c in contents] + prefixes, default=None)
+            truncated = last is not None and any(k > last and k.startswith(Prefix) for k in keys)
+            return {'Contents': contents, 'CommonPrefixes': [{'Prefix': p} for p in prefixes],
+                    'IsTruncated': truncated}
         
-        self.assertEqual(len(result), 1)
-        self.assertEqual(result[0]['Name'], 'test-bucket')
+        def paginate(PaginationConfig, **params):
+            while True:
+                page = list_objects_v2(MaxKeys=PaginationConfig['PageSize'], **params)
+                yield page
+                if not page['IsTruncated']:
+                    return
+                params['StartAfter'] = page['Contents'][-1]['Key']
+        
+        self.mock_client.list_objects_v2.side_effect = list_objects_v2
+        self.mock_client.get_paginator.return_value.paginate.side_effect = paginate
+        
+        ordered = [obj['key'] for obj in self.service.iter_objects_parallel(
+            'logs-bucket', max_workers=8, page_size=100)]
+        self.assertEqual(ordered, keys)
+        
+        unordered = [obj['key'] for obj in self.service.iter_objects_parallel(
+            'logs-bucket', max_workers=8, ordered=False, delimiter=None)]
+        self.assertEqual(sorted(unordered), keys)
+        
+        # Consumidor que para cedo não bloqueia
+        stream = self.service.iter_objects_parallel('logs-bucket', max_workers=4, page_size=10)
+        self.assertEqual(next(stream)['key'], keys[0])
+        stream.close()
+    
+    def test_split_prefix_probe_budget(self):
+        """Test key-space splitting spends probes in proportion to the partitions requested"""
+        from aws_agent.services import s3 as s3_module
+        
+        keys = sorted([f'flat/{i:05d}' for i in range(2500)]
+                      + [f'logs/{day:03d}.log' for day in range(365)] + ['z.txt'])
+        
+        def list_objects_v2(Bucket, Prefix='', StartAfter='', MaxKeys=1000, **kwargs):
+            found = [k for k in keys if k.startswith(Prefix) and k > StartAfter][:MaxKeys]
+            return {'Contents': [{'Key': k} for k in found]}
+        
+        self.mock_client.list_objects_v2.side_effect = list_objects_v2
+        
+        for target in (4, 16, 64):
+            self.mock_client.list_objects_v2.reset_mock()
+            ranges = self.service._split_prefix('data', '', target, max_workers=4)
+            
+            probes = self.mock_client.list_objects_v2.call_count
+            self.assertLessEqual(
+                probes, s3_module._SPLIT_ROUNDS * target * s3_module._SPLIT_PROBES_PER_TARGET)
+            self.assertGreaterEqual(len(ranges), min(target, 4))
+            
+            # Faixas disjuntas e contíguas cobrindo todo o espaço de chaves
+            self.assertIsNone(ranges[0].start_after)
+            self.assertIsNone(ranges[-1].end)
+            for previous, current in zip(ranges, ranges[1:]):
+                self.assertEqual(previous.end, current.start_after)
+        
+        # Poucas partições custam poucas sondas (duas rodadas de 8)
+        self.mock_client.list_objects_v2.reset_mock()
+        self.assertEqual(len(self.service._split_prefix('data', '', 4, max_workers=4)), 6)
+        self.assertEqual(self.mock_client.list_objects_v2.call_count, 16)
+    
+    def test_empty_versioned_bucket(self):
+        """Test bulk delete removes every version in batches, retrying throttled keys"""
+        import threading
+        
+        # 1500 chaves atuais com 2 versões cada + 600 chaves só com marcador de exclusão
+        current = [f'data/{i:05d}' for i in range(1500)]
+        versions = sorted([(key, f'v{n}', False) for key in current for n in (1, 2)]
+                          + [(f'gone/{i:04d}', 'dm', True) for i in range(600)])
+        
+        def list_objects_v2(Bucket, Prefix='', StartAfter='', MaxKeys=1000, **kwargs):
+            keys = [k for k in current if k.startswith(Prefix) and k > StartAfter][:MaxKeys]
+            return {'Contents': [{'Key': k} for k in keys]}
+        
+        def version_page(page):
+            return {
+                'Versions': [{'Key': k, 'VersionId': v, 'LastModified': None, 'Size': 1}
+                             for k, v, marker in page if not marker],
+                'DeleteMarkers': [{'Key': k, 'VersionId': v, 'LastModified': None}
+                                  for k, v, marker in page if marker],
+            }
+        
+        def paginate(PaginationConfig, Bucket, Prefix='', KeyMarker=''):
+            remaining = [v for v in versions if v[0].startswith(Prefix) and v[0] > KeyMarker]
+            for start in range(0, len(remaining), PaginationConfig['PageSize']):
+                yield version_page(remaining[start:start + PaginationConfig['PageSize']])
+        
+        def list_object_versions(Bucket, Prefix='', MaxKeys=1000):
+            remaining = [v for v in versions if v[0].startswith(Prefix)]
+            # Página terminando no meio das versões de uma chave
+            page = remaining[:MaxKeys - 1]
+            return dict(version_page(page), IsTruncated=len(remaining) > len(page),
+                        NextKeyMarker=page[-1][0], NextVersionIdMarker=page[-1][1])
+        
+        deleted = []
+        calls = []
+        lock = threading.Lock()
+        
+        def delete_objects(Bucket, Delete):
+            with lock:
+                calls.append(len(Delete['Objects']))
+                first_call = len(calls) == 1
+            errors = []
+            for entry in Delete['Objects']:
+                if first_call and entry['Key'] == Delete['Objects'][0]['Key']:
+                    errors.append(dict(entry, Code='SlowDown', Message='Reduce your request rate'))
+                elif entry['Key'] == 'data/00007' and entry['VersionId'] == 'v2':
+                    errors.append(dict(entry, Code='AccessDenied', Message='Object locked'))
+                else:
+                    with lock:
+                        deleted.append((entry['Key'], entry['VersionId']))
+            return {'Errors': errors}
+        
+        self.mock_client.get_bucket_versioning.return_value = {'Status': 'Suspended'}
+        self.mock_client.list_objects_v2.side_effect = list_objects_v2
+        self.mock_client.list_object_versions.side_effect = list_object_versions
+        self.mock_client.get_paginator.return_value.paginate.side_effect = paginate
+        self.mock_client.delete_objects.side_effect = delete_objects
+        self.service.invalidate_inventory = Mock()
+        
+        with patch('aws_agent.services.s3.time.sleep'):
+            result = self.service.delete_objects(
+                'archive', self.service.iter_object_versions('archive', max_workers=4), max_workers=4)
+        
+        self.assertTrue(all(size <= 1000 for size in calls))
+        self.assertEqual(result['deleted'], len(versions) - 1)
+        self.assertEqual(sorted(deleted), sorted((k, v) for k, v, _ in versions
+                                                 if (k, v) != ('data/00007', 'v2')))
+        self.assertEqual(result['failed'], [{'key': 'data/00007', 'version_id': 'v2',
+                                             'code': 'AccessDenied', 'message': 'Object locked'}])
+        
+        with patch('aws_agent.services.s3.time.sleep'):
+            self.assertFalse(self.service.empty_bucket('archive', max_workers=4))
+    
+    def test_delete_objects_retries_connection_errors(self):
+        """Test dropped connections are retried and recorded as failures once retries run out"""
+        from botocore.exceptions import EndpointConnectionError
+        
+        attempts = []
+        
+        def delete_objects(Bucket, Delete):
+            attempts.append(Bucket)
+            if Bucket == 'offline' or len(attempts) <= 2:
+                raise EndpointConnectionError(endpoint_url='https://s3.amazonaws.com')
+            return {'Errors': []}
+        
+        self.mock_client.delete_objects.side_effect = delete_objects
+        self.service.invalidate_inventory = Mock()
+        
+        with patch('aws_agent.services.s3.time.sleep'):
+            result = self.service.delete_objects('flaky', ['a', 'b'], max_workers=1)
+        self.assertEqual(result['deleted'], 2)
+        self.assertEqual(result['failed'], [])
+        self.assertEqual(len(attempts), 3)
+        
+        with patch('aws_agent.services.s3.time.sleep'):
+            result = self.service.delete_objects('offline', ['a', 'b'], max_workers=1)
+        self.assertEqual(result['deleted'], 0)
+        self.assertEqual(sorted(failure['key'] for failure in result['failed']), ['a', 'b'])
+        self.assertEqual(result['failed'][0]['code'], 'EndpointConnectionError')
+    
+    def test_empty_small_versioned_bucket_lists_once(self):
+        """Test a bucket whose versions fit in one page is emptied without split probes"""
+        self.mock_client.get_bucket_versioning.return_value = {'Status': 'Enabled'}
+        self.mock_client.list_object_versions.return_value = {
+            'Versions': [{'Key': key, 'VersionId': 'v1', 'LastModified': None, 'Size': 1}
+                         for key in ('a.txt', 'b.txt', 'c/d.txt')],
+            'DeleteMarkers': [{'Key': 'a.txt', 'VersionId': 'dm', 'LastModified': None}],
+            'IsTruncated': False,
+        }
+        self.mock_client.delete_objects.return_value = {'Errors': []}
+        self.service.invalidate_inventory = Mock()
+        
+        self.assertTrue(self.service.empty_bucket('tiny', max_workers=4))
+        
+        self.assertEqual(self.mock_client.list_object_versions.call_count, 1)
+        self.mock_client.list_objects_v2.assert_not_called()
+        self.mock_client.get_paginator.assert_not_called()
+        deleted = self.mock_client.delete_objects.call_args.kwargs['Delete']['Objects']
+        self.assertEqual(len(deleted), 4)
+    
+    def test_ranged_download_and_streaming_reader(self):
+        """Test ranged GETs rebuild the object and the reader streams lines"""
+        import io
+        import json
+        import os
+        import tempfile
+        from botocore.exceptions import ReadTimeoutError
+        from botocore.response import StreamingBody
+        
+        data = b''.join(json.dumps({'id': i, 'pad': 'x' * (i % 7)}).encode() + b'\n' for i in range(500))
+        ranges = []
+        failed_once = set()
+        
+        def get_object(Bucket, Key, Range, IfMatch=None, VersionId=None):
+            self.assertEqual(IfMatch, '"etag-1"')
+            start, end = (int(n) for n in Range[len('bytes='):].split('-'))
+            ranges.append(start)
+            # Primeira tentativa de uma faixa do meio falha por timeout
+            if start == 4096 and start not in failed_once:
+                failed_once.add(start)
+                raise ReadTimeoutError(endpoint_url='https://s3.amazonaws.com')
+            chunk = data[start:end + 1]
+            return {'Body': StreamingBody(io.BytesIO(chunk), len(chunk))}
+        
+        self.mock_client.head_object.return_value = {'ContentLength': len(data), 'ETag': '"etag-1"'}
+        self.mock_client.get_object.side_effect = get_object
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            target = os.path.join(temp_dir, 'dumps', 'db.jsonl')
+            with patch('aws_agent.services.s3.time.sleep'):
+                self.assertTrue(self.service.download_file_ranged(
+                    'dumps', 'db.jsonl', target, part_size=1024, max_workers=4))
+            with open(target, 'rb') as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual(os.listdir(os.path.dirname(target)), ['db.jsonl'])
+        self.assertEqual(len(ranges), -(-len(data) // 1024) + 1)
+        
+        ranges.clear()
+        with self.service.open_object('dumps', 'db.jsonl', encoding='utf-8',
+                                      part_size=4000, read_ahead=2) as reader:
+            self.assertEqual(json.loads(reader.readline()), {'id': 0, 'pad': ''})
+            # Só a faixa atual e as antecipadas foram buscadas
+            self.assertLessEqual(len(ranges), 3)
+            lines = [json.loads(line) for line in reader]
+        self.assertEqual([line['id'] for line in lines], list(range(1, 500)))
+        
+        with self.service.open_object('dumps', 'db.jsonl', part_size=1000) as reader:
+            reader.seek(-10, io.SEEK_END)
+            self.assertEqual(reader.read(), data[-10:])
+            reader.seek(2500)
+            self.assertEqual(reader.read(1200), data[2500:3700])
+    
+    def test_upload_stream_multipart(self):
+        """Test streaming uploads split generator data into bounded concurrent parts"""
+        import io
+        import threading
+        data = bytes(range(256)) * 40  # 10240 bytes
+        received = {}
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def upload_part(Bucket, Key, UploadId, PartNumber, Body):
+            with lock:
+                active.append(PartNumber)
+                peak.append(len(active))
+            content = Body.read()
+            with lock:
+                received[PartNumber] = content
+                active.remove(PartNumber)
+            return {'ETag': f'"etag-{PartNumber}"'}
+        
+        self.mock_client.create_multipart_upload.return_value = {'UploadId': 'up-1'}
+        self.mock_client.upload_part.side_effect = upload_part
+        self.service.invalidate_inventory = Mock()
+        
+        # Blocos de tamanhos irregulares, que não coincidem com as partes
+        chunks = (data[i:i + 777] for i in range(0, len(data), 777))
+        self.assertTrue(self.service.upload_stream(chunks, 'exports', 'dump.gz', part_size=1024,
+                                                   max_workers=3,
+                                                   extra_args={'ContentType': 'application/gzip'}))
+        
+        self.assertEqual(b''.join(received[n] for n in sorted(received)), data)
+        self.assertEqual(sorted(received), list(range(1, 11)))
+        self.assertLessEqual(max(peak), 3)
+        self.mock_client.create_multipart_upload.assert_called_once_with(
+            Bucket='exports', Key='dump.gz', ContentType='application/gzip')
+        parts = self.mock_client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        self.assertEqual(parts[0], {'PartNumber': 1, 'ETag': '"etag-1"'})
+        
+        # Origem menor que uma parte: um único PutObject a partir de um arquivo
+        self.assertTrue(self.service.upload_stream(io.BytesIO(b'small'), 'exports', 'small.txt',
+                                                   part_size=1024))
+        self.assertEqual(self.mock_client.put_object.call_args.kwargs['Body'].read(), b'small')
+        
+        # Falha em uma parte aborta o multipart upload
+        self.mock_client.upload_part.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'denied'}}, 'UploadPart')
+        self.assertFalse(self.service.upload_stream(io.BytesIO(data), 'exports', 'dump.gz',
+                                                    part_size=1024, max_workers=2))
+        self.mock_client.abort_multipart_upload.assert_called_once_with(
+            Bucket='exports', Key='dump.gz', UploadId='up-1')
+    
+    def test_bucket_statistics_from_cloudwatch(self):
+        """Test bucket statistics come from batched CloudWatch queries, listing only as fallback"""
+        from datetime import datetime, timezone
+        
+        def metric(name, bucket, storage_type):
+            return {'Namespace': 'AWS/S3', 'MetricName': name,
+                    'Dimensions': [{'Name': 'BucketName', 'Value': bucket},
+                                   {'Name': 'StorageType', 'Value': storage_type}]}
+        
+        listed = {
+            'BucketSizeBytes': [metric('BucketSizeBytes', 'logs', 'StandardStorage'),
+                                metric('BucketSizeBytes', 'logs', 'GlacierStorage'),
+                                metric('BucketSizeBytes', 'media', 'StandardStorage'),
+                                metric('BucketSizeBytes', 'other', 'StandardStorage')],
+            'NumberOfObjects': [metric('NumberOfObjects', 'logs', 'AllStorageTypes'),
+                                metric('NumberOfObjects', 'media', 'AllStorageTypes')],
+        }
+        values = {('logs', 'StandardStorage'): 1000.0, ('logs', 'GlacierStorage'): 5000.0,
+                  ('media', 'StandardStorage'): 700.0, ('logs', 'AllStorageTypes'): 42.0,
+                  ('media', 'AllStorageTypes'): 7.0}
+        latest = datetime(2024, 5, 2, tzinfo=timezone.utc)
+        batches = []
+        
+        def get_metric_data(MetricDataQueries, **kwargs):
+            self.assertEqual(kwargs['ScanBy'], 'TimestampDescending')
+            batches.append(len(MetricDataQueries))
+            results = []
+            for query in MetricDataQueries:
+                dims = {d['Name']: d['Value'] for d in query['MetricStat']['Metric']['Dimensions']}
+                results.append({'Id': query['Id'],
+                                'Values': [values[(dims['BucketName'], dims['StorageType'])], 1.0],
+                                'Timestamps': [latest, datetime(2024, 5, 1, tzinfo=timezone.utc)]})
+            return [{'MetricDataResults': results}]
+        
+        def get_paginator(name):
+            paginator = Mock()
+            if name == 'list_metrics':
+                paginator.paginate.side_effect = lambda **kw: [{'Metrics': listed[kw['MetricName']]}]
+            else:
+                paginator.paginate.side_effect = get_metric_data
+            return paginator
+        
+        self.mock_client.get_paginator.side_effect = get_paginator
+        listing = [{'key': 'a', 'size': 3, 'storage_class': 'STANDARD'},
+                   {'key': 'b', 'size': 4, 'storage_class': 'GLACIER'}]
+        
+        with patch('aws_agent.services.s3._METRIC_QUERIES_PER_CALL', 2), \
+                patch.object(self.service, 'get_bucket_region', return_value='us-east-1'), \
+                patch.object(self.service, 'iter_objects_parallel',
+                             side_effect=lambda *a, **kw: iter(listing)) as iter_objects:
+            stats = self.service.get_bucket_statistics(['logs', 'media', 'new'])
+        
+        # 5 séries dos buckets pedidos em lotes de 2 consultas
+        self.assertEqual(batches, [2, 2, 1])
+        self.assertEqual(stats['logs']['objects'], 42)
+        self.assertEqual(stats['logs']['size'], 6000)
+        self.assertEqual(stats['logs']['storage_classes'],
+                         {'StandardStorage': 1000, 'GlacierStorage': 5000})
+        self.assertEqual(stats['logs']['timestamp'], latest)
+        self.assertEqual((stats['media']['objects'], stats['media']['size']), (7, 700))
+        self.assertNotIn('other', stats)
+        
+        # Bucket sem métricas (criado há menos de um dia) é somado pela listagem
+        self.assertEqual(stats['new']['source'], 'listing')
+        self.assertEqual((stats['new']['objects'], stats['new']['size']), (2, 7))
+        self.assertEqual(stats['new']['storage_classes'], {'STANDARD': 3, 'GLACIER': 4})
+        iter_objects.assert_called_once()
+    
+    def test_analyze_inventory_report(self):
+        """Test S3 Inventory deliveries are aggregated from the manifest's data files"""
+        import gzip
+        import json
+        import shutil
+        import tempfile
+        from pathlib import Path
+        
+        workdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, workdir)
+        
+        rows = [
+            ['media', 'videos/2024/a.mp4', '1000', '2024-04-25T10:00:00.000Z', 'STANDARD', 'SSE-S3', 'false'],
+            ['media', 'videos/b%20c.mp4', '3000', '2023-01-01T00:00:00.000Z', 'GLACIER', 'SSE-KMS', 'false'],
+            ['media', 'logs/x.gz', '', '2024-04-30T00:00:00.000Z', 'STANDARD', 'SSE-S3', 'true'],
+            ['media', 'root.txt', '5', '2024-02-15T00:00:00.000Z', 'STANDARD', 'NOT-SSE', 'false'],
+        ]
+        data = {}
+        for index, chunk in enumerate((rows[:2], rows[2:])):
+            key = f"inv/media/daily/data/part-{index}.csv.gz"
+            path = workdir / f"part-{index}.csv.gz"
+            with gzip.open(path, 'wt') as f:
+                f.writelines(','.join(f'"{value}"' for value in row) + '\n' for row in chunk)
+            data[key] = path
+        
+        manifest = {
+            'sourceBucket': 'media', 'destinationBucket': 'arn:aws:s3:::reports',
+            'fileFormat': 'CSV', 'creationTimestamp': '1714521600000',  # 2024-05-01
+            'fileSchema': 'Bucket, Key, Size, LastModifiedDate, StorageClass, EncryptionStatus, IsDeleteMarker',
+            'files': [{'key': key, 'size': 1, 'MD5checksum': ''} for key in data],
+        }
+        self.mock_client.get_object.return_value = {'Body': Mock(read=Mock(
+            return_value=json.dumps(manifest).encode()))}
+        self.mock_client.download_file.side_effect = \
+            lambda bucket, key, path, Config=None: shutil.copy(data[key], path)
+        self.mock_client.get_paginator.return_value.paginate.return_value = [{'CommonPrefixes': [
+            {'Prefix': 'inv/media/daily/2024-04-30T01-00Z/'},
+            {'Prefix': 'inv/media/daily/2024-05-01T01-00Z/'},
+            {'Prefix': 'inv/media/daily/data/'},
+            {'Prefix': 'inv/media/daily/hive/'},
+        ]}]
+        updates = []
+        
+        result = self.service.analyze_inventory('reports', 'inv/media/daily', max_workers=2,
+                                                processes=2, progress=updates.append)
+        
+        self.assertEqual(self.mock_client.get_object.call_args.kwargs['Key'],
+                         'inv/media/daily/2024-05-01T01-00Z/manifest.json')
+        self.assertEqual({call.args[0] for call in self.mock_client.download_file.call_args_list},
+                         {'reports'})
+        self.assertEqual(result['failed'], [])
+        self.assertEqual((result['objects'], result['size']), (3, 4005))
+        self.assertEqual(result['prefixes'], {'videos/': {'objects': 2, 'size': 4000},
+                                              '': {'objects': 1, 'size': 5}})
+        self.assertEqual(result['storage_classes']['GLACIER'], {'objects': 1, 'size': 3000})
+        self.assertEqual(result['ages'], {'365d+': {'objects': 1, 'size': 3000},
+                                          '0-30d': {'objects': 1, 'size': 1000},
+                                          '30-90d': {'objects': 1, 'size': 5}})
+        self.assertEqual(result['encryption']['NOT-SSE'], {'objects': 1, 'size': 5})
+        self.assertEqual(updates[-1]['files'], 2)
+        
+        # Arquivo corrompido (não é gzip) processado primeiro: entra em failed e o
+        # progresso continua com os contadores disponíveis
+        corrupt_key = 'inv/media/daily/data/part-corrupt.csv.gz'
+        data[corrupt_key] = workdir / 'corrupt.csv.gz'
+        data[corrupt_key].write_bytes(b'not gzip')
+        manifest['files'].insert(0, {'key': corrupt_key, 'size': 1, 'MD5checksum': ''})
+        self.mock_client.get_object.return_value = {'Body': Mock(read=Mock(
+            return_value=json.dumps(manifest).encode()))}
+        messages = []
+        
+        result = self.service.analyze_inventory(
+            'reports', 'inv/media/daily/2024-05-01T01-00Z/manifest.json', max_workers=1, processes=1,
+            progress=lambda p: messages.append(
+                f"{p['files']}/{p['total_files']} arquivos, {p.get('objects', 0)} objetos, "
+                f"{p['failed']} com falha")
+        )
+        
+        self.assertEqual([failure['key'] for failure in result['failed']], [corrupt_key])
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[0], "1/3 arquivos, 0 objetos, 1 com falha")
+        self.assertTrue(messages[-1].startswith("3/3 arquivos, "))
+    
+    def test_prefix_usage_tree(self):
+        """Test prefix usage aggregates into a depth-bounded tree that renders, persists and diffs"""
+        import gzip
+        import json
+        import shutil
+        import tempfile
+        from datetime import datetime, timezone
+        from pathlib import Path
+        from aws_agent.services.s3_usage import PrefixTree
+        
+        workdir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, workdir)
+        day = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        listing = [
+            {'key': 'logs/2024/05/01/a.gz', 'size': 100, 'last_modified': day},
+            {'key': 'logs/2024/05/02/b.gz', 'size': 200, 'last_modified': day.replace(day=2)},
+            {'key': 'logs/2023/c.gz', 'size': 50, 'last_modified': day.replace(year=2023)},
+            {'key': 'media/x.mp4', 'size': 1000, 'last_modified': day},
+            {'key': 'index.html', 'size': 5, 'last_modified': day},
+        ]
+        
+        with patch.object(self.service, 'iter_objects_parallel', return_value=iter(listing)):
+            tree = self.service.prefix_usage('site', depth=2)
+        
+        self.assertEqual((tree.root.objects, tree.root.size), (5, 1355))
+        logs = tree.find('logs/')
+        self.assertEqual((logs.objects, logs.size), (3, 350))
+        self.assertEqual((logs.oldest, logs.newest),
+                         (day.replace(year=2023).timestamp(), day.replace(day=2).timestamp()))
+        # Chaves além da profundidade são contadas no último nível
+        self.assertEqual(tree.find('logs/2024/').size, 300)
+        self.assertIsNone(tree.find('logs/2024/05/'))
+        self.assertEqual([line.split()[-1] for line in tree.du_lines(human=False)],
+                         ['s3://site/logs/2023/', 's3://site/logs/2024/', 's3://site/logs/',
+                          's3://site/media/', 's3://site/'])
+        self.assertEqual(tree.du_lines(human=False)[-1].split()[:2], ['1355', '5'])
+        
+        # Gravação e comparação com uma nova medição
+        path = workdir / 'site.json'
+        tree.save(path)
+        previous = PrefixTree.load(path)
+        self.assertEqual(previous.du_lines(), tree.du_lines())
+        
+        later = listing[1:] + [{'key': 'media/y.mp4', 'size': 4000, 'last_modified': day}]
+        with patch.object(self.service, 'iter_objects_parallel', return_value=iter(later)):
+            current = self.service.prefix_usage('site', depth=2)
+        changes = {change['prefix']: change for change in current.diff(previous)}
+        self.assertEqual(current.diff(previous)[0]['prefix'], 'media/')
+        self.assertEqual(changes['']['size_delta'], 3900)
+        self.assertEqual(changes['media/']['size_delta'], 4000)
+        self.assertEqual(changes['logs/2024/']['objects_delta'], -1)
+        self.assertNotIn('logs/2023/', changes)
+        
+        # Mesma árvore a partir de uma entrega do S3 Inventory
+        data = workdir / 'part-0.csv.gz'
+        with gzip.open(data, 'wt') as f:
+            for obj in listing:
+                f.write(f'"site","{obj["key"]}","{obj["size"]}",'
+                        f'"{obj["last_modified"]:%Y-%m-%dT%H:%M:%S}.000Z"\n')
+        manifest = {'sourceBucket': 'site', 'destinationBucket': 'arn:aws:s3:::reports',
+                    'fileFormat': 'CSV', 'creationTimestamp': '1714521600000',
+                    'fileSchema': 'Bucket, Key, Size, LastModifiedDate',
+                    'files': [{'key': 'inv/data/part-0.csv.gz', 'size': 1}]}
+        self.mock_client.get_object.return_value = {'Body': Mock(read=Mock(
+            return_value=json.dumps(manifest).encode()))}
+        self.mock_client.download_file.side_effect = \
+            lambda bucket, key, path, Config=None: shutil.copy(data, path)
+        
+        from_inventory = self.service.prefix_usage(
+            'site', depth=2, prefix='logs/', inventory_bucket='reports',
+            inventory_manifest='inv/site/daily/2024-05-01T01-00Z/manifest.json', processes=1)
+        self.assertEqual((from_inventory.root.objects, from_inventory.root.size), (3, 350))
+        self.assertEqual(from_inventory.find('logs/2024/').objects, 2)
+        self.assertIsNone(self.service.prefix_usage(
+            'other', inventory_bucket='reports', inventory_manifest='inv/manifest.json'))
+    
+    def test_simulate_lifecycle_costs(self):
+        """Test lifecycle variants are projected with vectorized transitions and expirations"""
+        from datetime import datetime, timedelta, timezone
+        from aws_agent.services import s3_lifecycle
+        from aws_agent.utils.helpers import format_currency
+        
+        if s3_lifecycle.np is None:
+            self.skipTest("NumPy não instalado")
+        
+        gib = 1024 ** 3
+        now = datetime.now(timezone.utc)
+        listing = [
+            {'key': 'logs/a.gz', 'size': gib, 'last_modified': now - timedelta(days=10),
+             'storage_class': 'STANDARD'},
+            {'key': 'logs/b.gz', 'size': gib, 'last_modified': now - timedelta(days=100),
+             'storage_class': 'STANDARD'},
+            {'key': 'logs/tiny.txt', 'size': 100, 'last_modified': now - timedelta(days=100),
+             'storage_class': 'STANDARD'},
+            {'key': 'tmp/old.bin', 'size': gib, 'last_modified': now - timedelta(days=400),
+             'storage_class': 'STANDARD'},
+        ]
+        self.mock_client.get_bucket_lifecycle_configuration.return_value = {'Rules': [
+            {'ID': 'tmp', 'Status': 'Enabled', 'Filter': {'Prefix': 'tmp/'}, 'Expiration': {'Days': 365}},
+            {'ID': 'off', 'Status': 'Disabled', 'Filter': {}, 'Expiration': {'Days': 1}},
+        ]}
+        variants = {'arquivar logs': [
+            {'ID': 'logs', 'Status': 'Enabled', 'Filter': {'Prefix': 'logs/'},
+             'Transitions': [{'Days': 30, 'StorageClass': 'STANDARD_IA'},
+                             {'Days': 90, 'StorageClass': 'GLACIER'}]},
+        ]}
+        
+        with patch.object(self.service, 'iter_objects_parallel', return_value=iter(listing)):
+            result = self.service.simulate_lifecycle('data', variants, months=2, include_current=True)
+        
+        baseline = result['baseline']
+        self.assertAlmostEqual(baseline['months'][0]['storage'], 3 * 0.023, places=6)
+        
+        archive = result['variants']['arquivar logs']
+        first, second = archive['months']
+        # b.gz vai direto para o GLACIER; tiny.txt (< 128 KB) não transiciona
+        self.assertEqual(first['classes']['GLACIER'], gib)
+        self.assertEqual(first['classes']['STANDARD'], 2 * gib + 100)
+        self.assertAlmostEqual(first['transitions'], 0.03 / 1000)
+        # a.gz passa dos 30 dias no segundo mês
+        self.assertEqual(second['classes']['STANDARD_IA'], gib)
+        self.assertAlmostEqual(second['transitions'], 0.01 / 1000)
+        self.assertGreater(archive['savings'], 0)
+        
+        # Regras atuais do bucket: só a regra habilitada, que expira o objeto de tmp/
+        current = result['variants']['atual']
+        self.assertEqual(current['months'][0]['objects'], 3)
+        self.assertAlmostEqual(current['savings'], 2 * 0.023, places=6)
+        
+        rows = s3_lifecycle.comparison_rows(result)
+        self.assertEqual([row[0] for row in rows], ['(sem regras)', 'arquivar logs', 'atual'])
+        self.assertEqual(rows[0][4], format_currency(baseline['total']))
+        
+        # Prefixo mais profundo que os prefixos carregados não é simulável
+        objects = s3_lifecycle.ObjectArrays.from_objects(listing, now.timestamp())
+        self.assertIsNone(self.service.simulate_lifecycle(
+            'data', {'x': [{'Filter': {'Prefix': 'logs/2024/'}, 'Expiration': {'Days': 1}}]},
+            objects=objects))
+    
+    def test_find_duplicates_across_buckets(self):
+        """Test duplicates are grouped by size and ETag, with multipart ETags confirmed by checksum"""
+        import os
+        from aws_agent.services.s3_dedup import DuplicateIndex, summarize_duplicates
+        
+        mb = 1024 * 1024
+        listings = {
+            'artefatos': [
+                {'key': 'build/app.zip', 'size': 10 * mb, 'etag': '"aaa"'},
+                {'key': 'big/dump-8mb-parts.tar', 'size': 64 * mb, 'etag': '"bbb-8"'},
+                {'key': 'big/other.tar', 'size': 64 * mb, 'etag': '"ccc-8"'},
+                {'key': 'vazio', 'size': 0, 'etag': '"d41d8cd98f00b204e9800998ecf8427e"'},
+            ],
+            'backup': [
+                {'key': 'copia/app.zip', 'size': 10 * mb, 'etag': '"aaa"'},
+                {'key': 'copia/app-2.zip', 'size': 10 * mb, 'etag': '"aaa"'},
+                {'key': 'diferente.zip', 'size': 10 * mb, 'etag': '"fff"'},
+                {'key': 'dump-16mb-parts.tar', 'size': 64 * mb, 'etag': '"ddd-4"'},
+                {'key': 'vazio', 'size': 0, 'etag': '"d41d8cd98f00b204e9800998ecf8427e"'},
+            ],
+        }
+        checksums = {
+            'big/dump-8mb-parts.tar': {'ChecksumCRC64NVME': 'same==', 'ChecksumType': 'FULL_OBJECT'},
+            'dump-16mb-parts.tar': {'ChecksumCRC64NVME': 'same==', 'ChecksumType': 'FULL_OBJECT'},
+            'big/other.tar': {'ChecksumCRC32': 'abc-8', 'ChecksumType': 'COMPOSITE'},
+        }
+        self.mock_client.head_object.side_effect = lambda Bucket, Key, ChecksumMode: checksums[Key]
+        listing = lambda bucket, **kwargs: iter(listings[bucket])
+        
+        with patch.object(self.service, 'iter_objects_parallel', side_effect=listing):
+            groups = list(self.service.find_duplicates(['artefatos', 'backup']))
+        
+        # Sem confirmação, apenas ETags idênticos; objetos vazios são ignorados
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0]['reclaimable'], 20 * mb)
+        self.assertTrue(groups[0]['verified'])
+        self.assertEqual(sorted(obj['bucket'] for obj in groups[0]['objects']),
+                         ['artefatos', 'backup', 'backup'])
+        self.mock_client.head_object.assert_not_called()
+        
+        with patch.object(self.service, 'iter_objects_parallel', side_effect=listing):
+            summary = summarize_duplicates(
+                self.service.find_duplicates(['artefatos', 'backup'], confirm=True), top=1)
+        
+        # O mesmo arquivo enviado com partes diferentes é reconhecido pelo checksum
+        self.assertEqual(summary['groups'], 2)
+        self.assertEqual(summary['duplicates'], 3)
+        self.assertEqual(summary['reclaimable'], 84 * mb)
+        self.assertEqual(summary['verified_reclaimable'], 84 * mb)
+        top, = summary['top']
+        self.assertEqual(top['match'], 'checksum')
+        self.assertEqual({obj['key'] for obj in top['objects']},
+                         {'big/dump-8mb-parts.tar', 'dump-16mb-parts.tar'})
+        # Apenas objetos com ETag multipart são consultados
+        self.assertEqual(self.mock_client.head_object.call_count, 3)
+        
+        # O índice em disco é removido ao final
+        index = DuplicateIndex()
+        path = index.path
+        index.add('', 'b', [{'key': 'k', 'size': 1, 'etag': '"e"'}])
+        self.assertEqual(len(index), 1)
+        index.close()
+        self.assertFalse(os.path.exists(path))
+    
+    def test_copy_object_and_prefix_server_side(self):
+        """Test server-side copies: CopyObject, parallel UploadPartCopy and cross-account prefixes"""
+        import json
+        from datetime import datetime
+        
+        self.service.invalidate_inventory = Mock()
+        self.mock_client.upload_part_copy.side_effect = lambda **kwargs: {
+            'CopyPartResult': {'ETag': f'"part-{kwargs["PartNumber"]}"'}}
+        self.mock_client.create_multipart_upload.return_value = {'UploadId': 'copy-1'}
+        
+        # Objeto pequeno: um único CopyObject condicionado ao ETag da origem
+        self.mock_client.head_object.return_value = {'ContentLength': 100, 'ETag': '"small"'}
+        self.assertTrue(self.service.copy_object('src', 'a.txt', 'dst', 'b.txt'))
+        self.mock_client.copy_object.assert_called_once_with(
+            CopySource={'Bucket': 'src', 'Key': 'a.txt'}, CopySourceIfMatch='"small"',
+            Bucket='dst', Key='b.txt')
+        
+        # Acima do limite do CopyObject: partes copiadas no servidor, com metadados da origem
+        size = 12 * 1024 * 1024
+        self.mock_client.head_object.return_value = {
+            'ContentLength': size, 'ETag': '"big-2"', 'ContentType': 'video/mp4',
+            'Metadata': {'owner': 'marcos'}}
+        with patch('aws_agent.services.s3.COPY_OBJECT_LIMIT', 1024):
+            self.assertTrue(self.service.copy_object('src', 'big.mp4', 'dst',
+                                                     part_size=5 * 1024 * 1024, max_workers=3))
+        self.mock_client.create_multipart_upload.assert_called_once_with(
+            Bucket='dst', Key='big.mp4', ContentType='video/mp4', Metadata={'owner': 'marcos'})
+        ranges = sorted(call.kwargs['CopySourceRange']
+                        for call in self.mock_client.upload_part_copy.call_args_list)
+        self.assertEqual(ranges, ['bytes=0-5242879', 'bytes=10485760-12582911',
+                                  'bytes=5242880-10485759'])
+        parts = self.mock_client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+        self.assertEqual([part['PartNumber'] for part in parts], [1, 2, 3])
+        
+        # Falha em uma parte aborta o multipart upload
+        self.mock_client.upload_part_copy.side_effect = ClientError(
+            {'Error': {'Code': 'PreconditionFailed', 'Message': 'changed'}}, 'UploadPartCopy')
+        with patch('aws_agent.services.s3.COPY_OBJECT_LIMIT', 1024):
+            self.assertFalse(self.service.copy_object('src', 'big.mp4', 'dst'))
+        self.mock_client.abort_multipart_upload.assert_called_once_with(
+            Bucket='dst', Key='big.mp4', UploadId='copy-1')
+        
+        # Falha ao abortar não substitui o erro original da cópia
+        self.mock_client.abort_multipart_upload.side_effect = ClientError(
+            {'Error': {'Code': 'NoSuchUpload', 'Message': 'gone'}}, 'AbortMultipartUpload')
+        with patch('aws_agent.services.s3.COPY_OBJECT_LIMIT', 1024), \
+                self.assertRaises(ClientError) as raised:
+            self.service._copy('src', 'big.mp4', 'dst', 'big.mp4', self.service, None, None, None)
+        self.assertEqual(raised.exception.response['Error']['Code'], 'PreconditionFailed')
+        self.mock_client.abort_multipart_upload.side_effect = None
+        
+        # Prefixo de outra conta: listado pela origem, copiado pelo destino
+        source = Mock()
+        now = datetime(2024, 1, 1)
+        source.iter_objects_parallel.return_value = iter([
+            {'key': 'logs/', 'size': 0, 'etag': '"d"', 'last_modified': now},
+            {'key': 'logs/1.gz', 'size': 10, 'etag': '"e1"', 'last_modified': now},
+            {'key': 'logs/2.gz', 'size': 20, 'etag': '"e2"', 'last_modified': now},
+        ])
+        self.mock_client.copy_object.reset_mock()
+        
+        def copy_object(**kwargs):
+            if kwargs['Key'] == 'archive/2.gz':
+                raise ClientError({'Error': {'Code': 'AccessDenied', 'Message': 'no'}}, 'CopyObject')
+            return {}
+        
+        self.mock_client.copy_object.side_effect = copy_object
+        result = self.service.copy_prefix('src', 'logs/', 'dst', 'archive/', source_service=source,
+                                          max_workers=2)
+        self.assertEqual((result['copied'], result['bytes']), (1, 10))
+        self.assertEqual([failure['key'] for failure in result['failed']], ['logs/2.gz'])
+        source.client.head_object.assert_not_called()
+        self.assertEqual(self.mock_client.copy_object.call_count, 2)
+        
+        # Concessão de leitura preserva declarações existentes da política
+        existing = {'Version': '2012-10-17', 'Statement': [{'Sid': 'Other', 'Effect': 'Deny'}]}
+        self.mock_client.get_bucket_policy.return_value = {'Policy': json.dumps(existing)}
+        self.assertTrue(self.service.grant_cross_account_read('src', '123456789012', 'logs/'))
+        policy = json.loads(self.mock_client.put_bucket_policy.call_args.kwargs['Policy'])
+        self.assertEqual([statement['Sid'] for statement in policy['Statement']],
+                         ['Other', 'AwsAgentCrossAccountRead123456789012',
+                          'AwsAgentCrossAccountRead123456789012List'])
+        self.assertEqual(policy['Statement'][1]['Resource'], 'arn:aws:s3:::src/logs/*')
+        
+        # Erro ao ler a política atual não a sobrescreve
+        self.mock_client.put_bucket_policy.reset_mock()
+        self.mock_client.get_bucket_policy.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'no'}}, 'GetBucketPolicy')
+        self.assertFalse(self.service.grant_cross_account_read('src', '123456789012'))
+        self.mock_client.put_bucket_policy.assert_not_called()
+    
+    def test_resumable_upload_and_stale_uploads(self):
+        """Test interrupted uploads resume with only missing parts; stale uploads are aborted"""
+        import tempfile
+        from datetime import datetime, timedelta, timezone
+        from pathlib import Path
+        from aws_agent.core.upload_journal import UploadJournal
+        
+        mib = 1024 * 1024
+        server_parts = {}
+        sent = []
+        
+        def upload_part(Bucket, Key, UploadId, PartNumber, Body, ContentMD5):
+            sent.append(PartNumber)
+            if PartNumber == 3 and sent.count(3) == 1:
+                raise ClientError({'Error': {'Code': 'RequestTimeout', 'Message': 'timeout'}}, 'UploadPart')
+            server_parts[PartNumber] = {'PartNumber': PartNumber, 'ETag': f'"e{PartNumber}"',
+                                        'Size': len(Body)}
+            return {'ETag': f'"e{PartNumber}"'}
+        
+        def paginate(**kwargs):
+            if kwargs.get('UploadId'):
+                yield {'Parts': list(server_parts.values())}
+            else:
+                now = datetime.now(timezone.utc)
+                yield {'Uploads': [
+                    {'Key': 'old.bin', 'UploadId': 'stale-1', 'Initiated': now - timedelta(days=3)},
+                    {'Key': 'new.bin', 'UploadId': 'fresh-1', 'Initiated': now},
+                ]}
+        
+        self.mock_client.create_multipart_upload.return_value = {'UploadId': 'up-1'}
+        self.mock_client.upload_part.side_effect = upload_part
+        self.mock_client.get_paginator.return_value.paginate.side_effect = paginate
+        self.service.invalidate_inventory = Mock()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            journal = UploadJournal(Path(temp_dir) / "uploads.db")
+            file_path = Path(temp_dir) / "backup.tar"
+            file_path.write_bytes(b'a' * (12 * mib))
+            
+            with patch('aws_agent.services.s3.get_upload_journal', return_value=journal):
+                self.assertFalse(self.service.upload_file_resumable(
+                    str(file_path), 'backups', part_size=5 * mib, max_workers=1))
+                self.assertEqual(journal.list_uploads()[0]['parts'], 2)
+                
+                self.assertTrue(self.service.upload_file_resumable(
+                    str(file_path), 'backups', part_size=5 * mib, max_workers=1))
+                
+                uploads = self.service.list_multipart_uploads(['backups'], older_than=24)
+                result = self.service.abort_multipart_uploads(uploads)
+            
+            # Segunda execução enviou apenas a parte que faltava
+            self.assertEqual(sorted(sent), [1, 2, 3, 3])
+            self.mock_client.create_multipart_upload.assert_called_once()
+            parts = self.mock_client.complete_multipart_upload.call_args.kwargs['MultipartUpload']['Parts']
+            self.assertEqual([part['PartNumber'] for part in parts], [1, 2, 3])
+            self.assertEqual(journal.list_uploads(), [])
+            journal.close()
+        
+        self.assertEqual([upload['upload_id'] for upload in uploads], ['stale-1'])
+        self.assertEqual(result, {'aborted': 1, 'failed': []})
+        self.mock_client.abort_multipart_upload.assert_called_once_with(
+            Bucket='backups', Key='old.bin', UploadId='stale-1')
+    
+    def test_get_objects_info_concurrent_and_cached(self):
+        """Test batch HEADs retry throttling, report errors and skip unchanged objects"""
+        import tempfile
+        import threading
+        from datetime import datetime, timezone
+        from pathlib import Path
+        from aws_agent.core.inventory import InventoryCache
+        
+        modified = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        listing = [{'key': f'docs/{i:04d}.pdf', 'etag': f'"e{i}"', 'last_modified': modified}
+                   for i in range(1200)]
+        heads = []
+        lock = threading.Lock()
+        
+        def head_object(Bucket, Key):
+            with lock:
+                heads.append(Key)
+                throttled = Key == 'docs/0005.pdf' and heads.count(Key) == 1
+            if throttled:
+                raise ClientError({'Error': {'Code': '503', 'Message': 'Slow Down'}}, 'HeadObject')
+            if Key == 'docs/0666.pdf':
+                raise ClientError({'Error': {'Code': '404', 'Message': 'Not Found'}}, 'HeadObject')
+            number = int(Key[5:9])
+            return {'ContentLength': number, 'LastModified': modified, 'ETag': f'"e{number}"',
+                    'ContentType': 'application/pdf', 'ServerSideEncryption': 'aws:kms'}
+        
+        self.mock_client.head_object.side_effect = head_object
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db")
+            with patch('aws_agent.services.s3.get_inventory_cache', return_value=cache), \
+                 patch('aws_agent.services.s3.time.sleep'):
+                first = list(self.service.get_objects_info('docs', iter(listing), max_workers=8))
+                self.assertEqual(len(heads), 1201)
+                
+                # Reauditoria: apenas o objeto alterado e o que falhou são consultados
+                heads.clear()
+                listing[10] = dict(listing[10], etag='"changed"')
+                second = list(self.service.get_objects_info('docs', listing, max_workers=8))
+            cache.close()
+        
+        self.assertEqual(sorted(heads), ['docs/0010.pdf', 'docs/0666.pdf'])
+        self.assertEqual(len(first), 1200)
+        self.assertEqual(len(second), 1200)
+        errors = [info for info in first if 'error' in info]
+        self.assertEqual(errors, [{'key': 'docs/0666.pdf', 'error': '404'}])
+        by_key = {info['key']: info for info in second}
+        self.assertEqual(by_key['docs/0042.pdf']['encryption'], 'aws:kms')
+        self.assertEqual(by_key['docs/0042.pdf']['last_modified'], modified)
+    
+    def test_transfer_config_and_progress(self):
+        """Test transfers use the tuned TransferConfig and report progress"""
+        import tempfile
+        from pathlib import Path
+        from aws_agent.core.inventory import InventoryCache
+        
+        self.service.configure_transfers(max_concurrency=64, multipart_chunksize=64 * 1024 * 1024)
+        config = self.service.get_transfer_config(use_threads=False)
+        self.assertEqual(config.max_request_concurrency, 64)
+        self.assertEqual(config.multipart_chunksize, 64 * 1024 * 1024)
+        self.assertFalse(config.use_threads)
+        with self.assertRaises(ValueError):
+            self.service.configure_transfers(preferred_client='crt')
+        
+        def fake_upload(path, bucket, key, Config=None, Callback=None):
+            for _ in range(4):
+                Callback(256)
+        
+        self.mock_client.upload_file.side_effect = fake_upload
+        updates = []
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = Path(temp_dir) / "artifact.bin"
+            file_path.write_bytes(b"x" * 1024)
+            cache = InventoryCache(Path(temp_dir) / "inventory.db")
+            self.service.get_account_id = Mock(return_value='123456789012')
+            
+            with patch('aws_agent.services.base.get_inventory_cache', return_value=cache):
+                self.assertTrue(self.service.upload_file(
+                    str(file_path), 'artifacts', progress=lambda p: updates.append(p.summary())))
+            cache.close()
+        
+        _, kwargs = self.mock_client.upload_file.call_args
+        self.assertEqual(kwargs['Config'].max_request_concurrency, 64)
+        self.assertEqual(updates[-1]['transferred'], 1024)
+        self.assertEqual(updates[-1]['percent'], 100.0)
+        self.assertEqual(updates[-1]['description'], 'artifacts/artifact.bin')
+    
+    def test_sync_transfers_only_changed_files(self):
+        """Test directory sync plans and uploads only new or changed files"""
+        import os
+        import tempfile
+        import time
+        from datetime import datetime, timezone
+        from pathlib import Path
+        from aws_agent.core.inventory import InventoryCache
+        from aws_agent.services.s3_sync import local_etag
+        
+        uploaded_at = time.time()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            site = Path(temp_dir) / "site"
+            (site / "css").mkdir(parents=True)
+            files = {
+                'index.html': b'<html>v1</html>',
+                'css/app.css': b'body{}',
+                'about.html': b'<html>ab</html>',
+                'new.html': b'<html>new</html>',
+            }
+            for name, content in files.items():
+                (site / name).write_bytes(content)
+            
+            # index.html: mesmo tamanho, conteúdo alterado depois do upload
+            remote = {
+                'index.html': local_etag(str(site / 'index.html')),
+                'css/app.css': local_etag(str(site / 'css/app.css')),
+                'about.html': local_etag(str(site / 'about.html')),
+            }
+            (site / 'index.html').write_bytes(b'<html>v2</html>')
+            os.utime(site / 'css/app.css', (uploaded_at - 60, uploaded_at - 60))
+            # about.html: data mais recente, mas conteúdo igual
+            os.utime(site / 'about.html', (uploaded_at + 60, uploaded_at + 60))
+            
+            listing = [
+                {'key': f'www/{name}', 'size': len(files[name]), 'etag': f'"{etag}"',
+                 'last_modified': datetime.fromtimestamp(uploaded_at, timezone.utc)}
+                for name, etag in remote.items()
+            ] + [{'key': 'www/old.html', 'size': 3, 'etag': '"x"',
+                  'last_modified': datetime.fromtimestamp(uploaded_at, timezone.utc)}]
+            self.service.iter_objects_parallel = Mock(side_effect=lambda *a, **k: iter(listing))
+            self.mock_client.head_object.return_value = {'ServerSideEncryption': 'AES256'}
+            
+            result = self.service.sync(str(site), 'site-bucket', 'www', delete=True, dry_run=True)
+            plan = {(a['action'], a['key'], a['reason']) for a in result['plan']}
+            self.assertEqual(plan, {
+                ('upload', 'www/index.html', 'etag'),
+                ('upload', 'www/new.html', 'new'),
+                ('delete_remote', 'www/old.html', 'extraneous'),
+            })
+            self.assertEqual(result['unchanged'], 2)
+            # Só o ETag divergente é confirmado com HEAD
+            self.mock_client.head_object.assert_called_once_with(Bucket='site-bucket',
+                                                                 Key='www/index.html')
+            
+            # Com SSE-KMS o ETag não é MD5: vale a regra da data
+            self.mock_client.head_object.return_value = {'ServerSideEncryption': 'aws:kms'}
+            result = self.service.sync(str(site), 'site-bucket', 'www', dry_run=True)
+            self.assertIn(('upload', 'www/index.html', 'mtime'),
+                          {(a['action'], a['key'], a['reason']) for a in result['plan']})
+            self.mock_client.upload_file.assert_not_called()
+            
+            self.mock_client.delete_objects.return_value = {}
+            cache = InventoryCache(Path(temp_dir) / "inventory.db")
+            self.service.get_account_id = Mock(return_value='123456789012')
+            with patch('aws_agent.services.base.get_inventory_cache', return_value=cache):
+                result = self.service.sync(str(site), 'site-bucket', 'www', delete=True)
+            cache.close()
+        
+        self.assertEqual((result['transferred'], result['deleted'], result['failed']), (2, 1, []))
+        keys = sorted(call.args[2] for call in self.mock_client.upload_file.call_args_list)
+        self.assertEqual(keys, ['www/index.html', 'www/new.html'])
+        self.assertEqual(self.mock_client.upload_file.call_args.kwargs['ExtraArgs'],
+                         {'ContentType': 'text/html'})
+        self.mock_client.delete_objects.assert_called_once_with(
+            Bucket='site-bucket', Delete={'Objects': [{'Key': 'www/old.html'}], 'Quiet': True})
+    
+    def test_multipart_etag(self):
+        """Test local multipart ETag matches the S3 algorithm"""
+        import hashlib
+        import tempfile
+        from aws_agent.services.s3_sync import LocalFile, etag_matches, etag_reproducible, local_etag
+        
+        mib = 1024 * 1024
+        data = bytes(range(256)) * (12 * mib // 256)
+        parts = [data[i:i + 5 * mib] for i in range(0, len(data), 5 * mib)]
+        expected = hashlib.md5(b''.join(hashlib.md5(p).digest() for p in parts)).hexdigest() + '-3'
+        
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            self.assertEqual(local_etag(f.name, 5 * mib), expected)
+            local = LocalFile(f.name, len(data), 0.0)
+            # Tamanho de parte deduzido do número de partes
+            self.assertTrue(etag_matches(local, f'"{expected}"', 8 * mib))
+            self.assertFalse(etag_matches(local, '"' + '0' * 32 + '-3"', 8 * mib))
+            self.assertIsNone(etag_matches(local, '"kms-opaque-etag"', 8 * mib))
+            # ETags de objetos SSE-KMS/SSE-C têm formato de MD5, mas não são reproduzíveis
+            self.assertIsNone(etag_matches(local, '"' + '0' * 32 + '"', 8 * mib, lambda: False))
+            self.assertTrue(etag_matches(local, f'"{expected}"', 8 * mib, lambda: False))
+            self.assertFalse(etag_reproducible({'SSECustomerAlgorithm': 'AES256'}))
+            self.assertFalse(etag_reproducible({'ServerSideEncryption': 'aws:kms'}))
+            self.assertTrue(etag_reproducible({'ServerSideEncryption': 'AES256'}))
+    
+    def test_list_cached_invalidated_by_mutations(self):
+        """Test cached listings are invalidated by mutating methods"""
+        import tempfile
+        from pathlib import Path
+        from aws_agent.core.inventory import InventoryCache
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db", default_ttl=300)
+            self.service.get_account_id = Mock(return_value='123456789012')
+            buckets = [{'name': 'bucket-a'}]
+            self.service.iter_buckets = Mock(side_effect=lambda **kwargs: iter(list(buckets)))
+            
+            with patch('aws_agent.services.base.get_inventory_cache', return_value=cache), \
+                 patch('aws_agent.services.s3.get_inventory_cache', return_value=cache):
+                self.assertEqual(self.service.list_cached('buckets'), [{'name': 'bucket-a'}])
+                self.assertEqual(self.service.list_cached('buckets'), [{'name': 'bucket-a'}])
+                self.assertEqual(self.service.iter_buckets.call_count, 1)
+                
+                self.service.create_bucket('bucket-b')
+                buckets.append({'name': 'bucket-b'})
+                self.assertEqual(len(self.service.list_cached('buckets')), 2)
+                self.assertEqual(self.service.iter_buckets.call_count, 2)
+            cache.close()
+    
+    def test_list_cached_does_not_store_failed_listing(self):
+        """Test a failed ListBuckets is not cached as an empty listing"""
+        import tempfile
+        from pathlib import Path
+        from botocore.exceptions import ClientError
+        from aws_agent.core.inventory import InventoryCache
+        
+        throttled = ClientError({'Error': {'Code': 'SlowDown', 'Message': 'Reduce your request rate'}},
+                                'ListBuckets')
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = InventoryCache(Path(temp_dir) / "inventory.db", default_ttl=300)
+            self.service.get_account_id = Mock(return_value='123456789012')
+            self.mock_client.list_buckets.side_effect = throttled
+            
+            with patch('aws_agent.services.base.get_inventory_cache', return_value=cache), \
+                 patch('aws_agent.services.s3.get_inventory_cache', return_value=cache):
+                # A falha é informada (handle_aws_error) em vez de virar lista vazia
+                with self.assertRaises(ValueError):
+                    self.service.list_cached('buckets')
+                scope = self.service._inventory_scope()
+                self.assertIsNone(cache.get(*scope, 's3', 'buckets'))
+                self.assertEqual(self.service.list_buckets(), [])
+                
+                # A próxima consulta vai à AWS e grava o resultado válido
+                self.mock_client.list_buckets.side_effect = None
+                self.mock_client.list_buckets.return_value = {'Buckets': [
+                    {'Name': 'bucket-a', 'CreationDate': None, 'BucketRegion': 'us-east-1'}]}
+                self.assertEqual([b['name'] for b in self.service.list_cached('buckets')], ['bucket-a'])
+                self.assertEqual(self.mock_client.list_buckets.call_count, 3)
+                self.assertIsNotNone(cache.get(*scope, 's3', 'buckets'))
+            cache.close()
 
 
 class TestIAMService(unittest.TestCase):
@@ -101,11 +1233,14 @@ class TestIAMService(unittest.TestCase):
         """Test IAMService initialization"""
         self.assertEqual(self.service.region, "us-east-1")
         self.assertEqual(self.service.session, self.mock_session)
+        # Cliente é criado apenas no primeiro acesso
+        self.mock_session.client.assert_not_called()
+        self.assertIs(self.service.client, self.mock_client)
         self.mock_session.client.assert_called_with('iam', region_name="us-east-1")
     
     def test_list_users(self):
         """Test listing IAM users"""
-        self.mock_client.list_users.return_value = {
+        self.mock_client.get_paginator.return_value.paginate.return_value = [{
             'Users': [
                 {
                     'UserName': 'test-user',
@@ -114,13 +1249,52 @@ class TestIAMService(unittest.TestCase):
                     'CreateDate': '2023-01-01T00:00:00Z'
                 }
             ]
-        }
+        }]
         
         result = self.service.list_users()
         
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]['UserName'], 'test-user')
 
+    def test_iter_policies_streams_pages(self):
+        """Test policies are streamed across pages with early stop"""
+        def page(start):
+            return {'Policies': [{
+                'PolicyName': f"policy-{i}",
+                'PolicyId': f"ANPA{i}",
+                'Arn': f"arn:aws:iam::123456789012:policy/policy-{i}",
+                'Path': '/',
+                'CreateDate': '2023-01-01T00:00:00Z',
+                'UpdateDate': '2023-01-01T00:00:00Z',
+            } for i in range(start, start + 2)]}
+        
+        fetched = []
+        
+        def paginate(**kwargs):
+            for start in (0, 2, 4):
+                fetched.append(start)
+                yield page(start)
+        
+        paginator = self.mock_client.get_paginator.return_value
+        paginator.paginate.side_effect = paginate
+        
+        policies = self.service.list_policies(scope='All', page_size=2)
+        self.assertEqual([p['policy_name'] for p in policies],
+                         [f"policy-{i}" for i in range(6)])
+        self.mock_client.get_paginator.assert_called_with('list_policies')
+        paginator.paginate.assert_called_with(Scope='All', PaginationConfig={'PageSize': 2})
+        
+        # Parada antecipada não busca as páginas restantes
+        fetched.clear()
+        first = list(self.service.iter_policies(max_items=3))
+        self.assertEqual(len(first), 3)
+        self.assertEqual(fetched, [0, 2])
+        
+        paginator.paginate.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'Denied'}}, 'ListPolicies'
+        )
+        self.assertEqual(self.service.list_policies(), [])
+
 
 class TestLambdaService(unittest.TestCase):
     """Tests for LambdaService"""
@@ -136,11 +1310,14 @@ class TestLambdaService(unittest.TestCase):
         """Test LambdaService initialization"""
         self.assertEqual(self.service.region, "us-east-1")
         self.assertEqual(self.service.session, self.mock_session)
+        # Cliente é criado apenas no primeiro acesso
+        self.mock_session.client.assert_not_called()
+        self.assertIs(self.service.client, self.mock_client)
         self.mock_session.client.assert_called_with('lambda', region_name="us-east-1")
     
     def test_list_functions(self):
         """Test listing Lambda functions"""
-        self.mock_client.list_functions.return_value = {
+        self.mock_client.get_paginator.return_value.paginate.return_value = [{
             'Functions': [
                 {
                     'FunctionName': 'test-function',
@@ -154,7 +1331,7 @@ class TestLambdaService(unittest.TestCase):
                     'LastModified': '2023-01-01T00:00:00.000+0000'
                 }
             ]
-        }
+        }]
         
         result = self.service.list_functions()
         
@@ -163,5 +1340,58 @@ class TestLambdaService(unittest.TestCase):
         self.assertEqual(result[0]['Runtime'], 'python3.9')
 
 
+class TestServiceRegistry(unittest.TestCase):
+    """Tests for ServiceRegistry and LazyServiceMap"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_session = Mock()
+        self.mock_session.region_name = "us-east-1"
+        self.registry = ServiceRegistry(load_entry_points=False)
+    
+    def test_lazy_service_map(self):
+        """Test services are created only on first access"""
+        services = LazyServiceMap(self.registry)
+        self.assertEqual(services, {})
+        self.assertNotIn('s3', services)
+        
+        services.bind(self.mock_session, "us-east-1")
+        self.assertIn('s3', services)
+        self.assertEqual(sorted(services), ['ec2', 'iam', 'lambda', 's3'])
+        self.assertEqual(services.loaded(), [])
+        
+        s3_service = services['s3']
+        self.assertIsInstance(s3_service, S3Service)
+        self.assertIs(services['s3'], s3_service)
+        self.assertEqual(services.loaded(), ['s3'])
+        self.mock_session.client.assert_not_called()
+        
+        self.assertIsNone(services.get('rds'))
+        services.clear()
+        self.assertEqual(services, {})
+    
+    def test_entry_point_services(self):
+        """Test third-party services are discovered without being imported"""
+        entry_point = Mock()
+        entry_point.name = 'custom'
+        entry_point.value = 'custom_pkg:CustomService'
+        entry_point.load.return_value = EC2Service
+        
+        with patch('importlib.metadata.entry_points') as mock_entry_points:
+            mock_entry_points.return_value.select.return_value = [entry_point]
+            registry = ServiceRegistry()
+            self.assertIn('custom', registry.names())
+        
+        entry_point.load.assert_not_called()
+        self.assertIs(registry.resolve('custom'), EC2Service)
+        
+        with self.assertRaises(ValueError):
+            registry.resolve('unknown')
+        
+        registry.register('invalid', Mock)
+        with self.assertRaises(TypeError):
+            registry.resolve('invalid')
+
+
 if __name__ == '__main__':
     unittest.main()